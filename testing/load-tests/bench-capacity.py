@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark the capacity planner on synthetic fleets
+
+Gives every host of a seeded synthetic connectivity spec a capacity and every
+service a resource demand, scales a share of them out through
+scaling_targets, adds active plans pinned to the hosts, and times demand
+aggregation, the over-commit check and the proposed placement. One host is
+deliberately over-committed by a plan and must be reported, the proposal must
+fit every machine it places on, and it must not leave the fullest machine
+with less headroom than the spec's own placement.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / 'tools' / 'planning-validators'))
+sys.path.insert(0, str(HERE))
+
+import capacity_planner  # noqa: E402
+import synthetic_fleet  # noqa: E402
+from connectivity_model import SERVICE_SECTIONS, compile_spec  # noqa: E402
+from plan_index import PlanRecord  # noqa: E402
+
+
+def add_resources(spec, rng):
+    """Declare host capacities, service demands and scaling targets; returns the host to overload"""
+    hosts = spec['network_architecture']['physical_infrastructure']
+    for host in hosts.values():
+        host['capacity'] = {'cpu': f"{rng.choice((64, 96, 128))} cores", 'memory': f"{rng.choice((128, 256))}GB",
+                            'disk': '4TB'}
+    scaling = {}
+    for section in SERVICE_SECTIONS:
+        for name, service in (spec.get(section) or {}).items():
+            if not isinstance(service, dict) or 'host_ip' not in service:
+                continue
+            service['resources'] = {'cpu': f"{rng.choice((100, 250, 500, 1000))}m",
+                                    'memory': f"{rng.choice((128, 256, 512, 1024))}MB",
+                                    'disk': f"{rng.choice((1, 2, 5))}GB"}
+            if rng.random() < 0.1:
+                scaling[name] = {'min_replicas': 1, 'max_replicas': rng.randint(2, 4)}
+    spec.setdefault('load_balancing', {})['scaling_targets'] = scaling
+    return sorted(hosts)[0]
+
+
+def plan_records(hosts, count, overloaded, capacity, rng):
+    records = []
+    for i in range(count):
+        machine = rng.choice(hosts)
+        records.append(PlanRecord(f"plans/active/plan-{i:05d}.yml", f"plan-{i:05d}", '1.0.0', 'draft', 'active', [],
+                                  resources=[(0, machine, {'cpu': '500m', 'memory': '1GB', 'disk': '20GB'})]))
+    # More CPU than the machine has, pinned so no placement can relieve it
+    records.append(PlanRecord('plans/active/overload.yml', 'overload', '1.0.0', 'draft', 'active', [],
+                              resources=[(0, overloaded, {'cpu': f"{capacity[0] // 1000 + 1} cores"})]))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the capacity planner on synthetic fleets')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000, 50000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--plans', type=int, default=500, help='Active plans pinned to the hosts')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 Capacity planner")
+    print(f"   {'services':>9} {'hosts':>6} {'demands':>8} {'fleet ms':>9} {'plan ms':>8} {'moves':>6} "
+          f"{'worst headroom':>22}")
+    for size in args.services:
+        rng = random.Random(args.seed)
+        spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed, conflict_rate=0)
+        overloaded = add_resources(spec, rng)
+        model = compile_spec(spec)
+        del spec
+
+        start = time.perf_counter()
+        fleet = capacity_planner.fleet_from_model(model)
+        fleet_ms = (time.perf_counter() - start) * 1000
+        records = plan_records(sorted(fleet.machines), args.plans, overloaded,
+                               fleet.machines[overloaded].capacity, rng)
+
+        start = time.perf_counter()
+        plan = capacity_planner.plan_capacity(fleet, capacity_planner.plan_demands(records))
+        plan_ms = (time.perf_counter() - start) * 1000
+
+        # The overloaded machine stays over-full whatever is placed, so headroom is compared without it
+        others = [fleet.machines[name] for name in plan.proposed if name != overloaded]
+        current = min(machine.headroom(plan.load.get(machine.name, capacity_planner.ZERO)) for machine in others)
+        proposed = min(machine.headroom(plan.proposed[machine.name]) for machine in others)
+        print(f"   {size:9d} {len(fleet.machines):6d} {len(plan.demands):8d} {fleet_ms:9.1f} {plan_ms:8.1f} "
+              f"{len(plan.moves):6d} {current:9.0%} → {proposed:4.0%} proposed")
+
+        overcommitted = {path for _, code, _, path in plan.findings if code == 'DP302'}
+        if f"{fleet.machines[overloaded].path}.cpu" not in overcommitted:
+            failures.append(f"{size} services: over-committed {overloaded} not reported")
+        for machine in others:
+            if not machine.fits(capacity_planner.ZERO, plan.proposed[machine.name]):
+                failures.append(f"{size} services: proposal over-commits {machine.name}")
+        if proposed < current:
+            failures.append(f"{size} services: proposal leaves less headroom than the spec's placement")
+
+    if failures:
+        print("\n❌ Capacity planner benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Over-commitment reported and every proposal fits with at least the spec's headroom")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark delta validation against full validation
+
+Commits a seeded synthetic connectivity spec and plan tree to a scratch git
+repository, then edits one service so its host port collides with another
+on the same host and one plan step's duration, and times a full validation
+of each against `--since HEAD`: cold, and with a cache warmed by validating
+the committed revision (each run gets its own copy). The delta run must
+report the injected port conflict, validate the edited plan, and report
+nothing the full validation does not.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+VALIDATORS = REPO_ROOT / 'tools' / 'planning-validators'
+sys.path.insert(0, str(VALIDATORS))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic_fleet  # noqa: E402
+from spec_loader import load_yaml  # noqa: E402
+
+# Suites of a plan report that are not plans
+BATCH_SUITES = ('changes', 'rollout', 'capacity')
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(['git', '-c', 'user.name=bench', '-c', 'user.email=bench@localhost', *args],
+                   cwd=repo, check=True, stdout=subprocess.DEVNULL)
+
+
+def warm_up(tool: str, cache: Path, *options: str) -> None:
+    """Validate the committed revision, leaving its results and snapshots in the cache directory"""
+    subprocess.run([sys.executable, str(VALIDATORS / tool), '--cache-dir', str(cache), *options],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_ROOT)
+
+
+def run(tool: str, *options: str, cache: Path = None):
+    """(wall seconds, JSON report) of one validator process, uncached unless given a cache directory to copy"""
+    if cache is None:
+        options += ('--no-cache',)
+    else:
+        copy = cache.with_name(f"{cache.name}-run")
+        shutil.rmtree(copy, ignore_errors=True)
+        shutil.copytree(cache, copy)
+        options += ('--cache-dir', str(copy))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(VALIDATORS / tool), '--format', 'json', *options],
+                               capture_output=True, cwd=REPO_ROOT)
+    return time.perf_counter() - start, json.loads(completed.stdout)
+
+
+def findings(report, targets=None):
+    """{(target, code, path)} of a report, optionally restricted to some suites"""
+    return {(suite['target'], finding['code'], finding['path'])
+            for suite in report['suites'] if targets is None or suite['target'] in targets
+            for check in suite['checks'] for finding in check['findings']}
+
+
+def edit_spec(spec):
+    """Move a service onto another's host port on the same host; returns its name"""
+    services = spec['application_services']
+    names = list(services)
+    edited = names[len(names) // 2]
+    victim = next(name for name in names if name != edited
+                  and services[name]['host_ip'] == services[edited]['host_ip']
+                  and services[name]['host_port'] != services[edited]['host_port'])
+    services[edited]['host_port'] = services[victim]['host_port']
+    return edited
+
+
+def edit_plan(plans_dir: Path) -> Path:
+    """Lengthen the first step of the first active plan"""
+    plan_file = sorted((plans_dir / 'active').glob('*.yml'))[0]
+    plan = load_yaml(plan_file)
+    plan['deployment_steps'][0]['estimated_duration'] = '45 minutes'
+    synthetic_fleet.dump_yaml(plan, str(plan_file))
+    return plan_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark --since delta validation against full validation')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--plans', type=int, default=2000, help='Plans in the synthetic plan tree')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 Full vs --since HEAD validation (one edited service, one edited plan)")
+    print(f"   {'validator':<24} {'size':>6} {'cache':>5} {'full s':>7} {'since s':>8} {'speedup':>8} {'checked':>12}")
+    with tempfile.TemporaryDirectory() as scratch:
+        repo = Path(scratch) / 'repo'
+        repo.mkdir()
+        git(repo, 'init', '-q')
+        plans_dir = repo / 'deployment-plans'
+        synthetic_fleet.generate_plan_tree(str(plans_dir), args.plans, seed=args.seed, conflict_rate=0)
+        spec_file = repo / 'connectivity.yml'
+        pattern = str(plans_dir / '**')
+
+        for size in args.services:
+            spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed, conflict_rate=0)
+            synthetic_fleet.dump_yaml(spec, str(spec_file))
+            git(repo, 'add', '-A')
+            git(repo, 'commit', '-q', '--allow-empty', '-m', f"{size} services")
+            cache = Path(scratch) / f"cache-{size}"
+            warm_up('validate-connectivity.py', cache, '--config', str(spec_file))
+            edited = edit_spec(spec)
+            synthetic_fleet.dump_yaml(spec, str(spec_file))
+
+            for label, warm in (('cold', None), ('warm', cache)):
+                full_s, full = run('validate-connectivity.py', '--config', str(spec_file), cache=warm)
+                since_s, delta = run('validate-connectivity.py', '--config', str(spec_file), '--since', 'HEAD',
+                                     cache=warm)
+                examined = sum(check['examined'] for suite in delta['suites'] for check in suite['checks']
+                               if check['name'] == 'changed_entities')
+                print(f"   {'validate-connectivity':<24} {size:6d} {label:>5} {full_s:7.2f} {since_s:8.2f} "
+                      f"{full_s / since_s:7.1f}x {examined:5d} changes")
+
+                path = f"application_services.{edited}.host_port"
+                if not any(code == 'CV102' and finding_path == path for _, code, finding_path in findings(delta)):
+                    failures.append(f"{size} services ({label}): injected port conflict on {edited} not reported")
+                extra = {(code, finding_path) for _, code, finding_path in findings(delta)} - \
+                        {(code, finding_path) for _, code, finding_path in findings(full)}
+                if extra:
+                    failures.append(f"{size} services ({label}): --since reported {len(extra)} findings the full "
+                                    f"run did not, e.g. {sorted(extra)[0]}")
+            git(repo, 'checkout', '-q', '--', 'connectivity.yml')
+
+        # Plans are timed once; their cost does not depend on the spec
+        cache = Path(scratch) / 'cache-plans'
+        warm_up('validate-deployment-plan.py', cache, pattern)
+        plan_file = edit_plan(plans_dir)
+        for label, warm in (('cold', None), ('warm', cache)):
+            full_s, full = run('validate-deployment-plan.py', pattern, cache=warm)
+            since_s, delta = run('validate-deployment-plan.py', pattern, '--since', 'HEAD', cache=warm)
+            checked = {suite['target'] for suite in delta['suites'] if suite['target'] not in BATCH_SUITES}
+            print(f"   {'validate-deployment-plan':<24} {args.plans:6d} {label:>5} {full_s:7.2f} {since_s:8.2f} "
+                  f"{full_s / since_s:7.1f}x {len(checked):5d} plans")
+
+            if not any(os.path.samefile(target, plan_file) for target in checked):
+                failures.append(f"edited plan {plan_file.name} not validated ({label})")
+            if findings(delta, checked) != findings(full, checked):
+                failures.append(f"--since plan findings differ from the full run's for the same plans ({label})")
+
+    if failures:
+        print("\n❌ Delta validation benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Every delta run reported the injected changes and nothing the full run did not")
+
+
+if __name__ == "__main__":
+    main()
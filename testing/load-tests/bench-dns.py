@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark DNS record graph resolution and bulk DNS queries
+
+Compiles seeded synthetic connectivity specs, resolves every record through
+dns_graph.DnsGraph, then serves the records with dns_probe.StubDnsServer on
+loopback and queries each name over one UDP socket at each requested
+in-flight limit. Fails when a name goes unanswered or an answer differs from
+the record graph.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / 'tools' / 'planning-validators'))
+sys.path.insert(0, str(HERE))
+
+import dns_graph  # noqa: E402
+import dns_probe  # noqa: E402
+import synthetic_fleet  # noqa: E402
+from connectivity_model import compile_spec  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DNS graph resolution and bulk queries')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--in-flight', type=int, nargs='*', default=[16, 256],
+                        help='Maximum queries in flight to benchmark')
+    parser.add_argument('--timeout', type=float, default=dns_probe.DEFAULT_TIMEOUT, help='Per-query timeout')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 DNS record graph and bulk queries")
+    print(f"   {'services':>9} {'names':>7} {'resolve ms':>11} {'in-flight':>10} {'wall s':>8} "
+          f"{'q/s':>8} {'p50 ms':>7} {'p99 ms':>7}")
+    for size in args.services:
+        spec, injected = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed)
+        model = compile_spec(spec)
+        del spec
+
+        start = time.perf_counter()
+        graph = dns_graph.DnsGraph(model)
+        outcomes = Counter(resolution.outcome for resolution in graph.resolve_all().values())
+        resolve_ms = (time.perf_counter() - start) * 1000
+        if outcomes[dns_graph.DANGLING] < injected['dangling_cname']:
+            failures.append(f"{size} services: {outcomes[dns_graph.DANGLING]} dangling names, "
+                            f"expected at least {injected['dangling_cname']}")
+
+        names = list(graph.records)
+        with dns_probe.StubDnsServer(graph) as server:
+            for limit in args.in_flight:
+                start = time.perf_counter()
+                answers = dns_probe.query_all(names, server.address, args.timeout, max_in_flight=limit)
+                elapsed = time.perf_counter() - start
+
+                latencies = sorted(answer.elapsed for answer in answers if answer.answered)
+                p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+                p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0
+                print(f"   {size:9d} {len(names):7d} {resolve_ms:11.1f} {limit:10d} {elapsed:8.2f} "
+                      f"{len(answers) / elapsed:8.0f} {p50:7.2f} {p99:7.2f}")
+
+                unanswered = sum(not answer.answered for answer in answers)
+                mismatched = sum(1 for answer in answers if answer.answered and dns_probe.compare(graph, answer))
+                if unanswered or mismatched:
+                    failures.append(f"{size} services, {limit} in flight: {unanswered} unanswered, "
+                                    f"{mismatched} differing from the graph")
+
+    if failures:
+        print("\n❌ DNS benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Every name answered as the record graph resolves it")
+
+
+if __name__ == "__main__":
+    main()
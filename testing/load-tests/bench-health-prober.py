@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pooled health prober against loopback stand-in servers
+
+Declares synthetic health endpoints spread over several origins, serves them
+with health_prober.StandInServer on ephemeral ports and samples them with
+HealthProber at each requested pool size. Reports throughput, latency
+percentiles and connections opened; fails when an endpoint is unavailable
+(without injected failures) or the pool opened more connections than its
+limit allows.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools' / 'planning-validators'))
+
+import health_prober  # noqa: E402
+
+
+def synthetic_targets(endpoints: int, origins: int):
+    """Endpoints spread round-robin over `origins` (host, port) pairs in TEST-NET-1"""
+    targets = []
+    for i in range(endpoints):
+        origin = i % origins
+        host = f"192.0.2.{origin // 8 + 1}"
+        port = 8100 + origin % 8
+        url = f"http://{host}:{port}/health/{i}"
+        targets.append(health_prober.parse_health_url(f"service_{i}", host, url))
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pooled health prober')
+    parser.add_argument('--endpoints', type=int, default=200, help='Synthetic health endpoints')
+    parser.add_argument('--origins', type=int, default=8, help='Distinct host:port origins')
+    parser.add_argument('--samples', type=int, default=10, help='Samples per endpoint')
+    parser.add_argument('--pool-sizes', type=int, nargs='*', default=[1, 4, 16],
+                        help='Connections per origin to benchmark')
+    parser.add_argument('--latency', type=float, default=0.001, help='Stand-in response delay in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of stand-in responses that are 503')
+    parser.add_argument('--retries', type=int, default=2, help='Retries per failed request')
+    args = parser.parse_args()
+
+    targets = synthetic_targets(args.endpoints, args.origins)
+    failures = []
+    print(f"📊 Health prober: {args.endpoints} endpoints on {args.origins} origins, "
+          f"{args.samples} samples each, {args.latency * 1000:g} ms server latency")
+    print(f"   {'pool':>4} {'wall s':>8} {'req/s':>8} {'conns':>6} {'avail':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+
+    with health_prober.StandInServer(targets, args.latency, args.failure_rate, same_ports=False) as server:
+        for size in args.pool_sizes:
+            prober = health_prober.HealthProber(retries=args.retries, connections_per_host=size,
+                                                resolve=server.resolve)
+            start = time.perf_counter()
+            samples = prober.probe(targets, args.samples)
+            elapsed = time.perf_counter() - start
+
+            stats = health_prober.aggregate(samples, lambda target: 'all')['all']
+            print(f"   {size:4d} {elapsed:8.2f} {prober.requests / elapsed:8.0f} {prober.connections:6d} "
+                  f"{stats.availability:7.1%} {health_prober.format_ms(stats.percentile(0.5)):>7} "
+                  f"{health_prober.format_ms(stats.percentile(0.95)):>7} "
+                  f"{health_prober.format_ms(stats.percentile(0.99)):>7}")
+
+            if len(samples) != len(targets) * args.samples:
+                failures.append(f"pool {size}: {len(samples)} samples, expected {len(targets) * args.samples}")
+            if not args.failure_rate and stats.ok != stats.samples:
+                failures.append(f"pool {size}: {stats.samples - stats.ok} failed samples {dict(stats.errors)}")
+            if prober.connections > args.origins * size:
+                failures.append(f"pool {size}: opened {prober.connections} connections "
+                                f"for {args.origins} origins")
+
+    if failures:
+        print("\n❌ Health prober benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Every endpoint answered within the pool limits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark listener snapshot ingestion against per-port socket probing
+
+Compiles seeded synthetic connectivity specs, renders `ss -tulpn` and
+`docker ps` snapshots for every host with synthetic_fleet (including
+injected drift), then times parsing them into the listener index and
+comparing it with every allocated port. For reference, the same number of
+ports is probed with port_scanner on loopback, the cheapest case for
+connect-based checking. Fails when injected drift goes unreported.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / 'tools' / 'planning-validators'))
+sys.path.insert(0, str(HERE))
+
+import listener_index  # noqa: E402
+import port_scanner  # noqa: E402
+import synthetic_fleet  # noqa: E402
+from connectivity_model import compile_spec  # noqa: E402
+
+# Finding code each kind of injected drift must raise
+EXPECTED_CODES = {
+    'not_listening': 'CV706',
+    'foreign_process': 'CV705',
+    'wrong_container': 'CV705',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark listener snapshots against port probing')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000, 50000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--probe-limit', type=int, default=10000,
+                        help='Most loopback ports to probe for the reference timing')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 Listener snapshots vs port probing")
+    print(f"   {'services':>9} {'hosts':>6} {'listeners':>10} {'parse ms':>9} {'compare ms':>11} "
+          f"{'probe ms':>9} {'speedup':>8}")
+    for size in args.services:
+        spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed)
+        snapshots, injected = synthetic_fleet.generate_listener_snapshots(spec, seed=args.seed)
+        model = compile_spec(spec)
+        del spec
+
+        start = time.perf_counter()
+        index = listener_index.ListenerIndex()
+        for host_ip, text in snapshots.items():
+            index.add(host_ip, listener_index.parse_snapshot(text, host_ip))
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        compared, findings = listener_index.compare(model, index)
+        compare_ms = (time.perf_counter() - start) * 1000
+
+        # Closed loopback ports refuse at once, so this is a lower bound for probing real hosts
+        probed = min(compared, args.probe_limit)
+        start = time.perf_counter()
+        port_scanner.scan_ports([('127.0.0.1', 20000 + port % 40000) for port in range(probed)], timeout=0.5)
+        probe_ms = (time.perf_counter() - start) * 1000 * compared / max(1, probed)
+
+        print(f"   {size:9d} {len(snapshots):6d} {len(index):10d} {parse_ms:9.1f} {compare_ms:11.1f} "
+              f"{probe_ms:9.0f} {probe_ms / (parse_ms + compare_ms):7.0f}x")
+
+        codes = Counter(code for _, code, _, _ in findings)
+        expected = Counter()
+        for kind, count in injected.items():
+            expected[EXPECTED_CODES[kind]] += count
+        for code, count in expected.items():
+            if codes[code] < count:
+                failures.append(f"{size} services: {codes[code]} {code} reported, {count} injected")
+
+    if failures:
+        print("\n❌ Listener benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ All injected drift reported (probe times beyond --probe-limit ports are extrapolated)")
+
+
+if __name__ == "__main__":
+    main()
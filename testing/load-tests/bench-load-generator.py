@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the built-in load generator against loopback stand-in servers
+
+Checks that the latency histogram keeps its precision against exact
+percentiles, that open-loop runs hold the requested rate, that injected 503s
+show up in the error rate, and that an overloaded stand-in shows its queueing
+delay in open-loop percentiles where a closed-loop run hides it.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / 'tools' / 'planning-validators'))
+
+import health_prober  # noqa: E402
+import load_generator  # noqa: E402
+
+URL = 'http://api.doggpack.local:8200/'
+
+
+def run(load, stand_in, **options):
+    generator = load_generator.LoadGenerator(2.0, stand_in.resolve)
+    return generator.run(load, **options)
+
+
+def bench_histogram(samples: int, seed: int, failures: list) -> None:
+    rng = random.Random(seed)
+    latencies = [rng.lognormvariate(-5, 1.2) for _ in range(samples)]
+    histogram = load_generator.LatencyHistogram()
+    start = time.perf_counter()
+    for latency in latencies:
+        histogram.record(latency)
+    record_ns = (time.perf_counter() - start) / samples * 1e9
+
+    ordered = sorted(int(latency * 1_000_000) for latency in latencies)
+    worst = 0.0
+    for fraction in (0.5, 0.9, 0.99, 0.999):
+        exact = ordered[max(1, -(-int(fraction * 1000) * samples // 1000)) - 1] / 1_000_000
+        worst = max(worst, abs(histogram.percentile(fraction) - exact) / exact)
+    print(f"   histogram: {samples} values, {record_ns:.0f} ns/record, {len(histogram.counts)} counters, "
+          f"worst percentile error {worst:.2%}")
+    if worst > 10 ** -histogram.significant_digits:
+        failures.append(f"histogram percentile error {worst:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the load generator against loopback stand-ins')
+    parser.add_argument('--rates', type=float, nargs='*', default=[200, 1000], help='Open-loop rates to hold')
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per open-loop run')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 Load generator")
+    bench_histogram(200_000, args.seed, failures)
+
+    load = load_generator.parse_ab_command(f"ab -n 1000 -c 10 {URL}")
+    with health_prober.StandInServer([load.target], same_ports=False) as stand_in:
+        for rate in args.rates:
+            result = run(load, stand_in, mode=load_generator.OPEN, requests=None, duration=args.duration,
+                         concurrency=20, rps=rate)
+            print(f"   open loop {rate:g} req/s: held {result.achieved_rps:.1f} req/s, "
+                  f"p99 {health_prober.format_ms(result.histogram.percentile(0.99))} ms, {result.errors or 'no errors'}")
+            if abs(result.achieved_rps - rate) > rate * 0.05 or result.errors:
+                failures.append(f"open loop at {rate:g} req/s held {result.achieved_rps:.1f} req/s")
+
+    with health_prober.StandInServer([load.target], failure_rate=0.1, seed=args.seed, same_ports=False) as stand_in:
+        result = run(load, stand_in, requests=4000)
+        print(f"   10% injected 503s: error rate {result.error_rate:.1%} over {result.requests} requests")
+        if abs(result.error_rate - 0.1) > 0.02:
+            failures.append(f"error rate {result.error_rate:.1%} with 10% injected")
+
+    # Two connections to a 20 ms server serve at most ~100 req/s; offer 150
+    with health_prober.StandInServer([load.target], latency=0.02, same_ports=False) as stand_in:
+        closed = run(load, stand_in, requests=150, concurrency=2)
+        opened = run(load, stand_in, mode=load_generator.OPEN, requests=150, concurrency=2, rps=150)
+        closed_p99 = closed.histogram.percentile(0.99)
+        open_p99 = opened.histogram.percentile(0.99)
+        print(f"   overloaded stand-in: closed-loop p99 {closed_p99 * 1000:.1f} ms, "
+              f"open-loop p99 {open_p99 * 1000:.1f} ms (queueing included)")
+        if open_p99 < closed_p99 * 2:
+            failures.append("open-loop run did not expose the queueing delay of an overloaded server")
+
+    if failures:
+        print("\n❌ Load generator benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Load generator holds its rates and reports latency and errors faithfully")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled deployment plan schema
+
+Compiles the schema from the plan template, then checks thousands of seeded
+synthetic plans against it and times the single pass over each. A share of
+the plans carry one of every kind of violation the schema knows about; each
+must be reported with its YAML path from that one pass, and the clean plans
+must report nothing.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / 'tools' / 'planning-validators'))
+sys.path.insert(0, str(HERE))
+
+import plan_schema  # noqa: E402
+import synthetic_fleet  # noqa: E402
+
+
+def _set(path, value):
+    def inject(plan):
+        target = plan
+        for part in path[:-1]:
+            target = target[part]
+        target[path[-1]] = value
+    return inject
+
+
+def _drop(path):
+    def inject(plan):
+        target = plan
+        for part in path[:-1]:
+            target = target[part]
+        del target[path[-1]]
+    return inject
+
+
+def _duplicate_step(plan):
+    plan['deployment_steps'][2]['name'] = plan['deployment_steps'][1]['name']
+
+
+# (injection, code, YAML path it must be reported at)
+FAULTS = [
+    (_drop(('metadata', 'status')), 'DP102', 'metadata'),
+    (_set(('metadata', 'risk_level'), 'extreme'), 'DP114', 'metadata.risk_level'),
+    (_set(('metadata', 'created_date'), '2025-02-30'), 'DP116', 'metadata.created_date'),
+    (_set(('description',), 'Deploys things'), 'DP115', 'description'),
+    (_set(('environment', 'target_machines', 0, 'resources_required', 'memory'), 'plenty'), 'DP111',
+     'environment.target_machines[0].resources_required.memory'),
+    (_set(('deployment_steps', 3, 'assigned_to'), 'CCX'), 'DP107', 'deployment_steps[3].assigned_to'),
+    (_duplicate_step, 'DP106', 'deployment_steps[2].name'),
+    (_drop(('deployment_steps', 4, 'description')), 'DP105', 'deployment_steps[4]'),
+    (_set(('deployment_steps', 5, 'estimated_duration'), 'a while'), 'DP112',
+     'deployment_steps[5].estimated_duration'),
+    (_set(('deployment_steps', 6, 'dependencies'), 'step_000 and step_001'), 'DP115',
+     'deployment_steps[6].dependencies'),
+    (_set(('rollback_plan', 'trigger_conditions'), 'health check fails'), 'DP115',
+     'rollback_plan.trigger_conditions'),
+    (_drop(('rollback_plan', 'rollback_steps')), 'DP109', 'rollback_plan'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compiled deployment plan schema')
+    parser.add_argument('--plans', type=int, nargs='*', default=[1000, 5000], help='Plan counts to check')
+    parser.add_argument('--steps', type=int, default=20, help='Deployment steps per plan')
+    parser.add_argument('--faulty', type=float, default=0.1, help='Share of plans given every violation')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    start = time.perf_counter()
+    schema = plan_schema.PlanSchema()
+    compile_ms = (time.perf_counter() - start) * 1000
+    if schema.problem:
+        print(f"❌ {schema.problem}")
+        sys.exit(1)
+    print(f"📊 Plan schema compiled from {Path(schema.template).name} in {compile_ms:.1f} ms")
+    print(f"   {'plans':>6} {'faulty':>7} {'total ms':>9} {'µs/plan':>8} {'plans/s':>9} {'findings':>9}")
+
+    for count in args.plans:
+        rng = random.Random(args.seed)
+        plans = []
+        faulty = set(rng.sample(range(count), int(count * args.faulty)))
+        for i in range(count):
+            steps = synthetic_fleet.synthetic_steps(rng, args.steps, fan_in=0.3)
+            plan = synthetic_fleet.plan_document(rng, f"plan-{i:05d}", 'draft', [], steps)
+            if i in faulty:
+                for inject, _, _ in FAULTS:
+                    inject(plan)
+            plans.append(plan)
+
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            results = [schema.validate(plan) for plan in plans]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        findings = sum(len(result) for result in results)
+        print(f"   {count:6d} {len(faulty):7d} {best * 1000:9.1f} {best / count * 1e6:8.1f} {count / best:9.0f} "
+              f"{findings:9d}")
+
+        expected = {(code, path) for _, code, path in FAULTS}
+        for i, result in enumerate(results):
+            reported = {(finding.code, finding.path) for finding in result}
+            if i in faulty:
+                missed = expected - reported
+                if missed:
+                    failures.append(f"plan {i}: one pass missed "
+                                    f"{', '.join(sorted(f'{c} at {p}' for c, p in missed))}")
+            elif reported:
+                failures.append(f"clean plan {i} reported {', '.join(sorted(f'{c} at {p}' for c, p in reported))}")
+        if len(failures) > 10:
+            break
+
+    if failures:
+        print("\n❌ Plan schema benchmark failed:")
+        for failure in failures[:10]:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print(f"\n✅ All {len(FAULTS)} injected violations reported in one pass and clean plans reported nothing")
+
+
+if __name__ == "__main__":
+    main()
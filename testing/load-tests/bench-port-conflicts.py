@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the interval-indexed port conflict engine
+
+Generates a seeded set of synthetic port allocations (single ports, ranges,
+reserved ports, TCP and UDP) spread across many hosts and times
+port_conflicts.find_conflicts over them.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools' / 'planning-validators'))
+
+import port_conflicts  # noqa: E402
+from port_conflicts import PortInterval  # noqa: E402
+
+
+def generate_intervals(count: int, hosts: int, seed: int):
+    """Build `count` synthetic allocations with a small share of collisions"""
+    rng = random.Random(seed)
+    scopes = [f"10.{i // 250}.{i % 250}.1" for i in range(hosts)]
+    intervals = []
+
+    for i in range(count):
+        scope = rng.choice(scopes)
+        protocol = 'udp' if rng.random() < 0.1 else 'tcp'
+        start = rng.randint(1024, 65000)
+        end = start + rng.randint(1, 20) if rng.random() < 0.05 else start
+        intervals.append(PortInterval(scope, protocol, start, end, f"service_{i}", 'host_port'))
+
+    reserved = [22, 53, 80, 443, 2376, 2377, 4789, 7946]
+    for scope in scopes:
+        for port in reserved:
+            intervals.append(PortInterval(scope, port_conflicts.ANY_PROTOCOL, port, port,
+                                          'reserved system port', kind=port_conflicts.RESERVED))
+    return intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the port conflict engine')
+    parser.add_argument('--allocations', type=int, default=50000, help='Synthetic allocations to generate')
+    parser.add_argument('--hosts', type=int, default=50, help='Number of synthetic hosts')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions')
+    parser.add_argument('--max-seconds', type=float, default=1.0,
+                        help='Fail if the best run takes longer than this')
+    args = parser.parse_args()
+
+    intervals = generate_intervals(args.allocations, args.hosts, args.seed)
+    timings = []
+    conflicts = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        conflicts = port_conflicts.find_conflicts(intervals)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"📊 Port conflict engine: {len(intervals)} intervals across {args.hosts} hosts")
+    print(f"   • conflicts found: {len(conflicts)}")
+    print(f"   • best: {best * 1000:.1f} ms, mean: {sum(timings) / len(timings) * 1000:.1f} ms")
+
+    if best > args.max_seconds:
+        print(f"❌ Best run exceeded {args.max_seconds:.2f}s threshold")
+        sys.exit(1)
+    print("✅ Within threshold")
+
+
+if __name__ == "__main__":
+    main()
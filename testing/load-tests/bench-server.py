@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark the resident validation server
+
+Starts validation-server.py on a seeded synthetic connectivity spec and plan
+tree and times every endpoint, sequentially and from concurrent clients,
+against the validator CLIs started afresh for each call. The run endpoint must
+report what the CLI reports; a service moved onto another's host port and a
+plan step given an invalid instance must both show up in the next responses
+once saved; and the server must remove its socket when stopped.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+VALIDATORS = REPO_ROOT / 'tools' / 'planning-validators'
+sys.path.insert(0, str(VALIDATORS))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic_fleet  # noqa: E402
+from spec_loader import load_yaml  # noqa: E402
+from server_transport import request  # noqa: E402
+
+# Seconds a started server may take to load the spec and plans, and a save to show up
+STARTUP_TIMEOUT = 300
+RELOAD_TIMEOUT = 30
+
+
+def percentile(samples, share):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def timed(address, endpoint, params, count):
+    """Milliseconds each of `count` sequential requests took, and the last answer"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        status, answer = request(address, endpoint, params)
+        samples.append((time.perf_counter() - start) * 1000)
+        if status != 200:
+            raise RuntimeError(f"{endpoint} answered {status}: {answer.get('error')}")
+    return samples, answer
+
+
+def findings(report):
+    return {(finding['code'], finding['path']) for suite in report['suites']
+            for check in suite['checks'] for finding in check['findings']}
+
+
+def wait_for(address, check, timeout):
+    """Seconds until check(address) holds, or None on timeout"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if check(address):
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def cli(tool, *options):
+    """(wall seconds, completed process) of one validator process"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(VALIDATORS / tool), *options], capture_output=True, text=True,
+                               cwd=REPO_ROOT)
+    return time.perf_counter() - start, completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resident validation server')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--plans', type=int, default=500, help='Plans in the synthetic plan tree')
+    parser.add_argument('--requests', type=int, default=100, help='Sequential requests per endpoint')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent clients for the mixed load')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    failures = []
+    print("📊 Validation server latency")
+    print(f"   {'services':>9}  {'request':<28} {'p50 ms':>8} {'p95 ms':>8} {'cli ms':>8}")
+    with tempfile.TemporaryDirectory() as scratch:
+        plans_dir = Path(scratch) / 'deployment-plans'
+        synthetic_fleet.generate_plan_tree(str(plans_dir), args.plans, seed=args.seed, conflict_rate=0)
+        pattern = str(plans_dir / '**')
+
+        for size in args.services:
+            spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed, conflict_rate=0)
+            spec_file = Path(scratch) / f"connectivity-{size}.yml"
+            synthetic_fleet.dump_yaml(spec, str(spec_file))
+            services = spec['application_services']
+            names = list(services)
+            probe = services[names[0]]
+            domain = next((service['domains']['internal'] for service in services.values()
+                           if (service.get('domains') or {}).get('internal')), 'missing.example')
+            address = str(Path(scratch) / 'server.sock')
+            log = open(Path(scratch) / f"server-{size}.log", 'w')
+            server = subprocess.Popen([sys.executable, str(VALIDATORS / 'validation-server.py'), '--config',
+                                       str(spec_file), '--plans', pattern, '--socket', address],
+                                      stdout=log, stderr=subprocess.STDOUT, cwd=REPO_ROOT)
+            try:
+                started = wait_for(address, lambda a: request(a, '/status')[0] == 200, STARTUP_TIMEOUT)
+                if started is None:
+                    failures.append(f"{size} services: server did not start within {STARTUP_TIMEOUT}s")
+                    continue
+                print(f"   {size:9d}  {'startup (load and validate)':<28} {started * 1000:8.0f}")
+
+                spec_cli, completed = cli('validate-connectivity.py', '--config', str(spec_file), '--format', 'json',
+                                          '--no-cache')
+                cli_report = json.loads(completed.stdout)
+                plans_cli, _ = cli('validate-deployment-plan.py', pattern, '--no-cache', '--jobs', '1')
+                cases = [
+                    ('status', '/status', {}, None),
+                    ('spec report', '/spec', {}, spec_cli),
+                    ('plan batch report', '/plans', {}, plans_cli),
+                    ('lookup port', '/lookup', {'port': probe['host_port'], 'host': probe['host_ip']}, None),
+                    ('lookup domain', '/lookup', {'domain': domain}, None),
+                    ('allocate', '/allocate', {'name': ['bench_new_mcp'], 'host': probe['host_ip'],
+                                               'network': probe['docker_network']}, None),
+                    ('run validate-connectivity', '/run', {'tool': 'validate-connectivity', 'cwd': str(REPO_ROOT),
+                                                           'argv': ['--config', str(spec_file), '--format', 'json',
+                                                                    '--no-cache']}, spec_cli),
+                ]
+                answers = {}
+                for label, endpoint, params, baseline in cases:
+                    samples, answers[label] = timed(address, endpoint, params, args.requests)
+                    reference = f"{baseline * 1000:8.0f}" if baseline else f"{'':>8}"
+                    print(f"   {size:9d}  {label:<28} {percentile(samples, 0.5):8.2f} "
+                          f"{percentile(samples, 0.95):8.2f} {reference}")
+
+                if findings(answers['spec report']['report']) != findings(cli_report):
+                    failures.append(f"{size} services: resident spec findings differ from the CLI's")
+                run = answers['run validate-connectivity']
+                if run['exit'] != completed.returncode or findings(json.loads(run['stdout'])) != findings(cli_report):
+                    failures.append(f"{size} services: run endpoint output differs from the CLI's")
+                if not any(claim['owner'] == names[0] for claim in answers['lookup port']['claims']):
+                    failures.append(f"{size} services: port lookup missed {names[0]}")
+                if 'bench_new_mcp' not in answers['allocate'].get('allocations', {}):
+                    failures.append(f"{size} services: allocate proposed nothing")
+
+                # Mixed load from concurrent clients
+                mixed = [case for case in cases if case[1] != '/run']
+                jobs = [mixed[i % len(mixed)] for i in range(args.clients * 20)]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                    samples = list(pool.map(lambda case: timed(address, case[1], case[2], 1)[0][0], jobs))
+                elapsed = time.perf_counter() - start
+                print(f"   {size:9d}  {f'{args.clients} concurrent clients':<28} {percentile(samples, 0.5):8.2f} "
+                      f"{percentile(samples, 0.95):8.2f}   {len(jobs) / elapsed:.0f} requests/s")
+
+                # Saves show up in the next responses
+                edited = names[len(names) // 2]
+                victim = next(name for name in names if name != edited
+                              and services[name]['host_ip'] == services[edited]['host_ip']
+                              and services[name]['host_port'] != services[edited]['host_port'])
+                services[edited]['host_port'] = services[victim]['host_port']
+                synthetic_fleet.dump_yaml(spec, str(spec_file))
+                path = f"application_services.{edited}.host_port"
+                reloaded = wait_for(address, lambda a: ('CV102', path) in findings(request(a, '/spec')[1]['report']),
+                                    RELOAD_TIMEOUT)
+                if reloaded is None:
+                    failures.append(f"{size} services: saved port conflict not reported within {RELOAD_TIMEOUT}s")
+                else:
+                    print(f"   {size:9d}  {'spec save → report':<28} {reloaded * 1000:8.0f}")
+
+                plan_file = str(sorted((plans_dir / 'active').glob('*.yml'))[0])
+                plan = load_yaml(plan_file)
+                original = plan['deployment_steps'][0]['assigned_to']
+                plan['deployment_steps'][0]['assigned_to'] = 'CCX'
+
+                def plan_failing(a):
+                    suites = request(a, '/plans', {'plans': [plan_file]})[1]['report']['suites']
+                    return any(not suite['success'] for suite in suites)
+
+                synthetic_fleet.dump_yaml(plan, plan_file)
+                reloaded = wait_for(address, plan_failing, RELOAD_TIMEOUT)
+                if reloaded is None:
+                    failures.append(f"{size} services: saved invalid plan not reported within {RELOAD_TIMEOUT}s")
+                else:
+                    print(f"   {size:9d}  {'plan save → report':<28} {reloaded * 1000:8.0f}")
+                plan['deployment_steps'][0]['assigned_to'] = original
+                synthetic_fleet.dump_yaml(plan, plan_file)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                log.close()
+            if os.path.exists(address):
+                failures.append(f"{size} services: socket left behind after SIGTERM")
+
+    if failures:
+        print("\n❌ Validation server benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Resident results matched the CLIs and every save showed up in the next responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark connectivity spec loading and validator startup
+
+Reports in-process parse timings for the pure-Python SafeLoader, libyaml's
+CSafeLoader and a binary snapshot, then end-to-end wall time of
+`validate-connectivity.py --summary-only` with a cold (empty) and a warm
+(snapshot present) cache directory. With --services it also writes a seeded
+synthetic spec both as one file and split into one file per section behind
+an include manifest, and compares how many sections, how much time and how
+much memory --summary-only needs against a full validation of each; the
+split spec must report exactly what the single file does.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+VALIDATORS = REPO_ROOT / 'tools' / 'planning-validators'
+sys.path.insert(0, str(VALIDATORS))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yaml  # noqa: E402
+import spec_loader  # noqa: E402
+import synthetic_fleet  # noqa: E402
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_cli(config: Path, cache_dir: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(VALIDATORS / 'validate-connectivity.py'), '--config', str(config),
+         '--cache-dir', cache_dir, '--summary-only'],
+        check=True, stdout=subprocess.DEVNULL, cwd=REPO_ROOT,
+    )
+    return time.perf_counter() - start
+
+
+def run_validator(config: Path, *options: str):
+    """(wall seconds, peak RSS in MiB, stdout) of one uncached validator process"""
+    command = [sys.executable, str(VALIDATORS / 'validate-connectivity.py'), '--config', str(config),
+               '--no-cache', *options]
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as output:
+        process = subprocess.Popen(command, stdout=output, stderr=subprocess.DEVNULL, cwd=REPO_ROOT)
+        _, _, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        output.seek(0)
+        # ru_maxrss is in KiB on Linux
+        return elapsed, usage.ru_maxrss / 1024, output.read().decode()
+
+
+def write_split(spec: dict, root: Path) -> Path:
+    """Write `spec` as a manifest holding metadata plus one included file per other section"""
+    sections = root / 'sections'
+    sections.mkdir()
+    for index, (name, value) in enumerate(spec.items()):
+        if name != 'metadata':
+            synthetic_fleet.dump_yaml({name: value}, str(sections / f"{index:02d}-{name}.yml"))
+    manifest = root / 'connectivity.yml'
+    synthetic_fleet.dump_yaml({'metadata': spec.get('metadata', {}), 'include': ['sections/*.yml']}, str(manifest))
+    return manifest
+
+
+def lazy_load(config: Path, sections, repeat: int) -> tuple:
+    """(best seconds, peak traced MiB, sections parsed, MiB of spec text parsed, sections) of opening a spec"""
+    elapsed = best_of(repeat, lambda: spec_loader.load_spec(config, None, sections))
+    # Traced separately: tracemalloc slows allocation-heavy parsing several times over
+    tracemalloc.start()
+    spec, _ = spec_loader.load_spec(config, None, sections)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    parsed = sum(end - start for spec_file in spec.files for name, (start, end) in spec_file.spans.items()
+                 if name in spec.parsed)
+    return elapsed, peak, len(spec.parsed), parsed / 2 ** 20, len(spec)
+
+
+def finding_codes(report: str) -> Counter:
+    report = json.loads(report or '{}')
+    return Counter(finding['code'] for suite in report.get('suites', ()) for check in suite['checks']
+                   for finding in check['findings'])
+
+
+def summary_sections():
+    """The sections validate-connectivity.py --summary-only reads"""
+    script = importlib.util.spec_from_file_location('validate_connectivity', VALIDATORS / 'validate-connectivity.py')
+    validator = importlib.util.module_from_spec(script)
+    script.loader.exec_module(validator)
+    return validator.sections_read('port_conflicts', 'port_summary')
+
+
+def bench_lazy(services: int, seed: int, repeat: int, failures: list) -> None:
+    spec, _ = synthetic_fleet.generate_connectivity_spec(services, seed=seed)
+    with tempfile.TemporaryDirectory() as root:
+        single = Path(root) / 'single.yml'
+        synthetic_fleet.dump_yaml(spec, str(single))
+        split_dir = Path(root) / 'split'
+        split_dir.mkdir()
+        split = write_split(spec, split_dir)
+        del spec
+
+        print(f"\n📊 Lazy loading: {services} synthetic services ({single.stat().st_size / 2 ** 20:.1f} MiB)")
+        print(f"   {'layout':>6} {'command':>14} {'sections':>8} {'parsed MiB':>10} {'load ms':>8} "
+              f"{'traced MiB':>10} {'wall s':>7} {'peak RSS MiB':>12}")
+        reports = {}
+        for layout, config in (('single', single), ('split', split)):
+            for command, sections, options in (('--summary-only', summary_sections(), ('--summary-only',)),
+                                               ('full', None, ('--format', 'json'))):
+                elapsed, traced, parsed, size, total = lazy_load(config, sections, repeat)
+                wall, rss, output = run_validator(config, *options)
+                reports[layout, command] = output.replace(str(config), 'SPEC')
+                print(f"   {layout:>6} {command:>14} {parsed:>4d}/{total:<3d} {size:10.2f} {elapsed * 1000:8.1f} "
+                      f"{traced:10.1f} {wall:7.2f} {rss:12.1f}")
+                if command != 'full' and parsed >= total:
+                    failures.append(f"{layout}: --summary-only parsed all {total} sections")
+
+        if reports['single', '--summary-only'] != reports['split', '--summary-only']:
+            failures.append("split spec summary differs from the single file's")
+        if finding_codes(reports['single', 'full']) != finding_codes(reports['split', 'full']):
+            failures.append("split spec findings differ from the single file's")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark spec parsing and validator startup')
+    parser.add_argument('--config', default=str(REPO_ROOT / 'planning/specifications/connectivity-port-mapping.yml'),
+                        help='Connectivity spec to load')
+    parser.add_argument('--repeat', type=int, default=10, help='Repetitions per measurement')
+    parser.add_argument('--services', type=int, nargs='*', default=[],
+                        help='Synthetic spec sizes to compare lazy and split loading on')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    config = Path(args.config).resolve()
+    text = config.read_text()
+
+    print(f"📊 Spec loading: {config.name} ({len(text.splitlines())} lines)")
+    print(f"   • libyaml available: {spec_loader.using_libyaml()}")
+
+    pure = best_of(args.repeat, lambda: yaml.load(text, Loader=yaml.SafeLoader))
+    print(f"   • SafeLoader:   {pure * 1000:8.2f} ms")
+    if hasattr(yaml, 'CSafeLoader'):
+        fast = best_of(args.repeat, lambda: yaml.load(text, Loader=yaml.CSafeLoader))
+        print(f"   • CSafeLoader:  {fast * 1000:8.2f} ms ({pure / fast:.1f}x)")
+
+    summary = spec_loader.load_spec(config, None, summary_sections())[0]
+    print(f"   • --summary-only parses {len(summary.parsed)} of {len(summary)} sections")
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        spec_loader.load_spec(config, snapshot_dir)
+        warm = best_of(args.repeat, lambda: spec_loader.load_spec(config, snapshot_dir))
+        print(f"   • snapshot:     {warm * 1000:8.2f} ms ({pure / warm:.1f}x)")
+
+    cold_runs = []
+    warm_runs = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold_runs.append(run_cli(config, cache_dir))
+            warm_runs.append(run_cli(config, cache_dir))
+
+    print(f"\n📊 --summary-only startup (median of {args.repeat})")
+    print(f"   • cold: {statistics.median(cold_runs) * 1000:8.1f} ms")
+    print(f"   • warm: {statistics.median(warm_runs) * 1000:8.1f} ms")
+
+    failures = []
+    for services in args.services:
+        bench_lazy(services, args.seed, min(args.repeat, 3), failures)
+    if failures:
+        print("\n❌ Lazy loading benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    if args.services:
+        print("\n✅ --summary-only parses only the sections it reads, and split specs validate like single files")
+
+
+if __name__ == "__main__":
+    main()
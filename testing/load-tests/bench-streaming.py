@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compare peak RSS of full and streaming connectivity validation
+
+Generates seeded synthetic specs of increasing size and runs
+`validate-connectivity.py` on each in a fresh process, once loading the
+whole spec and once with --stream, recording wall time and the child's
+peak resident set size. Full loads are skipped above --max-full services,
+where they would exhaust a small runner's memory. When both modes run,
+their findings must match.
+
+Streaming never holds the parsed tree, only the compiled model, whose
+records have a fixed size per entry. Its peak RSS may therefore grow by at
+most --max-kib-per-service between the smallest and largest spec; a mode
+that kept raw trees or per-entry history would exceed the budget.
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parents[1]
+VALIDATOR = REPO_ROOT / 'tools' / 'planning-validators' / 'validate-connectivity.py'
+sys.path.insert(0, str(HERE))
+
+import synthetic_fleet  # noqa: E402
+
+
+def run_validator(config: str, stream: bool):
+    """(wall seconds, peak RSS in MiB, finding codes) of one validator process"""
+    command = [sys.executable, str(VALIDATOR), '--config', config, '--no-cache', '--format', 'json']
+    if stream:
+        command.append('--stream')
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as output:
+        process = subprocess.Popen(command, stdout=output, stderr=subprocess.DEVNULL, cwd=REPO_ROOT)
+        _, _, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        output.seek(0)
+        report = json.loads(output.read() or b'{}')
+    codes = Counter(finding['code'] for suite in report.get('suites', ()) for check in suite['checks']
+                    for finding in check['findings'])
+    # ru_maxrss is in KiB on Linux
+    return elapsed, usage.ru_maxrss / 1024, codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare peak RSS of full and streaming spec validation')
+    parser.add_argument('--services', type=int, nargs='*', default=[10000, 50000, 200000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--max-full', type=int, default=50000,
+                        help='Largest spec validated with a full load as well as streaming')
+    parser.add_argument('--max-kib-per-service', type=float, default=5.0,
+                        help='Largest streaming peak RSS growth allowed per added service')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    print(f"📊 Connectivity validation memory ({VALIDATOR.name})")
+    print(f"   {'services':>9} {'spec MiB':>9} {'mode':>7} {'wall s':>8} {'peak RSS MiB':>13}")
+    mismatches = []
+    # services -> streaming peak RSS in MiB
+    streamed = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.services:
+            spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed)
+            config = os.path.join(workdir, f"connectivity-{size}.yml")
+            synthetic_fleet.dump_yaml(spec, config)
+            del spec
+            gc.collect()
+            spec_mib = os.path.getsize(config) / 2 ** 20
+
+            modes = (False, True) if size <= args.max_full else (True,)
+            codes = {}
+            for stream in modes:
+                elapsed, peak, codes[stream] = run_validator(config, stream)
+                mode = 'stream' if stream else 'full'
+                if stream:
+                    streamed[size] = peak
+                print(f"   {size:9d} {spec_mib:9.1f} {mode:>7} {elapsed:8.2f} {peak:13.1f}")
+            if len(codes) == 2 and codes[False] != codes[True]:
+                mismatches.append(f"{size} services: full {dict(codes[False])} vs stream {dict(codes[True])}")
+            os.remove(config)
+
+    failures = list(mismatches)
+    if len(streamed) >= 2:
+        smallest, largest = min(streamed), max(streamed)
+        per_service = (streamed[largest] - streamed[smallest]) * 1024 / (largest - smallest)
+        print(f"\n   Streaming peak RSS grows {per_service:.2f} KiB per service "
+              f"(budget {args.max_kib_per_service:g})")
+        if per_service > args.max_kib_per_service:
+            failures.append(f"streaming peak RSS grows {per_service:.2f} KiB per service between {smallest} "
+                            f"and {largest} services, over the {args.max_kib_per_service:g} KiB budget")
+
+    if failures:
+        print("\n❌ Streaming benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Streaming and full validation agree and streaming memory stays within its per-service budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark both planning validators on seeded synthetic fleets
+
+Generates connectivity specs and deployment-plan trees with synthetic_fleet,
+then times every check (best of --repeat runs) and measures its peak traced
+memory in a separate tracemalloc pass. Results are compared against a stored
+baseline; a check that is slower or hungrier than the baseline by more than
+the tolerance fails the run. Injected conflicts must still be reported.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parents[1]
+VALIDATORS = REPO_ROOT / 'tools' / 'planning-validators'
+sys.path.insert(0, str(VALIDATORS))
+sys.path.insert(0, str(HERE))
+
+import synthetic_fleet  # noqa: E402
+
+DEFAULT_BASELINE = HERE / 'baselines' / 'validators.json'
+
+# Finding code each injected conflict must raise, and how many per injection
+EXPECTED_CODES = {
+    'port_conflict': 'CV102',
+    'container_ip_conflict': 'CV603',
+    'reserved_port': 'CV501',
+    'invalid_a_record': 'CV402',
+    'dangling_cname': 'CV404',
+    'network_overlap': 'CV602',
+    'forward_collision': 'CV112',
+    'orphaned_forward': 'CV113',
+    'missing_dependency': 'DP201',
+    'deprecated_dependency': 'DP202',
+    'plan_cycle': 'DP203',
+    'step_cycle': 'DP108',
+    'invalid_instance': 'DP107',
+}
+
+
+def load_script(name: str):
+    """Import a hyphenated validator script as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), VALIDATORS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Measurements:
+    """Best wall time and peak traced memory per check"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.peak_kib = {}
+        self.examined = Counter()
+        self.codes = Counter()
+        self.injected = Counter()
+        self.missed = []
+
+    def collect(self, check_results) -> None:
+        """Items examined and finding codes of the latest run"""
+        self.examined = Counter()
+        self.codes = Counter()
+        for result in check_results:
+            self.examined[result.name] += result.examined
+            self.codes.update(finding.code for finding in result.findings)
+
+    def time(self, name: str, elapsed: float) -> None:
+        self.seconds[name] = min(elapsed, self.seconds.get(name, float('inf')))
+
+    def as_dict(self):
+        return {name: {'ms': round(self.seconds[name] * 1000, 3),
+                       'peak_kib': round(self.peak_kib.get(name, 0.0), 1)}
+                for name in self.seconds}
+
+
+@contextlib.contextmanager
+def measure(results: Measurements, name: str, traced: bool):
+    """Time a block, or record its peak memory above the current level when traced"""
+    if traced:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        yield
+        results.peak_kib[name] = max(0, tracemalloc.get_traced_memory()[1] - current) / 1024
+    else:
+        # Like timeit, keep collector pauses out of the timed region
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            yield
+            results.time(name, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+
+def bench_connectivity(module, config: str, repeat: int, traced: bool, results: Measurements) -> None:
+    for _ in range(1 if traced else repeat):
+        validator = module.ConnectivityValidator(config)
+        checks = [
+            ('load_config', validator.load_config),
+            ('port_conflicts', validator.validate_port_conflicts),
+            ('ip_assignments', validator.validate_ip_assignments),
+            ('port_ranges', validator.validate_port_ranges),
+            ('domain_mappings', validator.validate_domain_mappings),
+            ('system_ports', validator.check_system_ports),
+            ('port_forwarding', validator.validate_port_forwarding),
+            ('docker_networking', validator.validate_docker_networking),
+            ('port_summary', validator.generate_port_summary),
+        ]
+        for name, check in checks:
+            with measure(results, name, traced):
+                check()
+        results.collect(validator.results.values())
+        results.examined['load_config'] = results.examined['compile_spec']
+
+
+def bench_plans(module, root: str, repeat: int, traced: bool, results: Measurements) -> None:
+    plan_files = sorted(str(path) for path in Path(root).rglob('*.yml'))
+    for _ in range(1 if traced else repeat):
+        with measure(results, 'plan_index', traced):
+            index = module.build_plan_index(plan_files)
+        with measure(results, 'load_plan', traced):
+            plans = [module.load_plan(plan_file)[0] for plan_file in plan_files]
+
+        structure = [module.CheckResult('structure') for _ in plan_files]
+        with measure(results, 'structure', traced):
+            for plan_file, plan, result in zip(plan_files, plans, structure):
+                module.validate_deployment_plan(plan_file, plan, result)
+
+        dependencies = [module.CheckResult('dependencies') for _ in plan_files]
+        with measure(results, 'dependencies', traced):
+            for plan_file, plan, result in zip(plan_files, plans, dependencies):
+                module.validate_dependencies(plan_file, plan, index, result)
+
+        with measure(results, 'rollout_order', traced):
+            rollout = module.check_rollout_order(index)
+
+        results.collect(structure + dependencies + [rollout])
+
+
+def run_scenario(kind: str, size: int, args, workdir: str) -> Measurements:
+    results = Measurements()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if kind == 'connectivity':
+            spec, injected = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed,
+                                                                        conflict_rate=args.conflict_rate)
+            config = os.path.join(workdir, f"connectivity-{size}.yml")
+            synthetic_fleet.dump_yaml(spec, config)
+            del spec
+            module = load_script('validate-connectivity')
+            bench = lambda traced: bench_connectivity(module, config, args.repeat, traced, results)  # noqa: E731
+        else:
+            root = os.path.join(workdir, f"plans-{size}", 'deployment-plans')
+            injected = synthetic_fleet.generate_plan_tree(root, size, args.steps, args.seed, args.conflict_rate)
+            module = load_script('validate-deployment-plan')
+            bench = lambda traced: bench_plans(module, root, args.repeat, traced, results)  # noqa: E731
+
+        bench(False)
+        if not args.no_memory:
+            tracemalloc.start()
+            try:
+                bench(True)
+            finally:
+                tracemalloc.stop()
+
+    results.injected = injected
+    results.missed = [
+        f"{conflict} ({results.codes[EXPECTED_CODES[conflict]]}/{count} {EXPECTED_CODES[conflict]} reported)"
+        for conflict, count in injected.items() if results.codes[EXPECTED_CODES[conflict]] < count
+    ]
+    return results
+
+
+def compare(name: str, current: dict, baseline: dict, args) -> list:
+    """Threshold failures for one scenario"""
+    failures = []
+    for check, values in current.items():
+        reference = baseline.get(check)
+        if not reference:
+            continue
+        delta_ms = values['ms'] - reference['ms']
+        if delta_ms > args.min_delta_ms and values['ms'] > reference['ms'] * (1 + args.tolerance):
+            failures.append(f"{name} {check}: {values['ms']:.1f} ms vs baseline {reference['ms']:.1f} ms")
+        delta_kib = values['peak_kib'] - reference['peak_kib']
+        if (not args.no_memory and delta_kib > args.min_delta_kib
+                and values['peak_kib'] > reference['peak_kib'] * (1 + args.tolerance)):
+            failures.append(f"{name} {check}: {values['peak_kib']:.0f} KiB peak vs baseline "
+                            f"{reference['peak_kib']:.0f} KiB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the planning validators against a stored baseline')
+    parser.add_argument('--services', type=int, nargs='*', default=[10, 1000, 10000],
+                        help='Connectivity spec sizes to benchmark (up to 100000)')
+    parser.add_argument('--plans', type=int, nargs='*', default=[100, 2000],
+                        help='Deployment-plan tree sizes to benchmark')
+    parser.add_argument('--steps', type=int, default=20, help='Deployment steps per synthetic plan')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--conflict-rate', type=float, default=0.01, help='Share of entries with injected conflicts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per scenario (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store these results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='Allowed relative regression in time and peak memory (1.0 = +100%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=25.0,
+                        help='Ignore time regressions smaller than this many milliseconds')
+    parser.add_argument('--min-delta-kib', type=float, default=512.0,
+                        help='Ignore memory regressions smaller than this many KiB')
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    scenarios = {}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind, sizes in (('connectivity', args.services), ('plans', args.plans)):
+            for size in sizes:
+                name = f"{kind}-{size}"
+                results = run_scenario(kind, size, args, workdir)
+                scenarios[name] = results.as_dict()
+                reference = baseline.get('scenarios', {}).get(name, {})
+
+                print(f"\n📊 {name} ({', '.join(f'{k}={v}' for k, v in sorted(results.injected.items()))})")
+                print(f"   {'check':<18} {'best ms':>10} {'peak KiB':>10} {'baseline ms':>12} {'examined':>9}")
+                for check, values in scenarios[name].items():
+                    base = reference.get(check, {}).get('ms')
+                    base_text = f"{base:12.1f}" if base is not None else f"{'-':>12}"
+                    print(f"   {check:<18} {values['ms']:10.1f} {values['peak_kib']:10.0f} {base_text} "
+                          f"{results.examined[check]:9d}")
+
+                for miss in results.missed:
+                    failures.append(f"{name}: injected {miss}")
+                if not args.update_baseline:
+                    failures.extend(compare(name, scenarios[name], reference, args))
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        stored = baseline.get('scenarios', {})
+        stored.update(scenarios)
+        baseline_path.write_text(json.dumps({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'steps': args.steps,
+            'conflict_rate': args.conflict_rate,
+            'scenarios': dict(sorted(stored.items())),
+        }, indent=2) + '\n')
+        print(f"\n✅ Baseline written to {baseline_path}")
+        return
+
+    if failures:
+        print("\n❌ Benchmark thresholds failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ All checks within baseline thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark watch-mode re-validation of connectivity specs
+
+Writes seeded synthetic specs, validates each once with the resident spec
+kept in memory, then applies typical saves (a changed port, an added and a
+removed service, a changed DNS record, a comment) and times how long the
+resident spec takes to re-parse and the whole watch cycle takes to
+re-validate. After every save the findings must match a fresh validation of
+the same file.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+VALIDATORS = HERE.parents[1] / 'tools' / 'planning-validators'
+sys.path.insert(0, str(VALIDATORS))
+sys.path.insert(0, str(HERE))
+
+import synthetic_fleet  # noqa: E402
+from resident_spec import ResidentSpec  # noqa: E402
+
+# Checks a fresh validation runs; the watch cycle runs the same ones
+FRESH_CHECKS = ('load_config', 'validate_port_conflicts', 'validate_ip_assignments', 'validate_port_ranges',
+                'validate_domain_mappings', 'check_system_ports', 'validate_port_forwarding',
+                'validate_docker_networking')
+
+
+def load_script(name: str):
+    """Import a hyphenated validator script as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), VALIDATORS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TimedSpec(ResidentSpec):
+    """Resident spec that records how long its last refresh took"""
+
+    def refresh(self):
+        start = time.perf_counter()
+        try:
+            return super().refresh()
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+
+def entry_span(text: str, key: str):
+    """Start and end offsets of a service entry's block"""
+    start = text.index(f"\n  {key}:\n") + 1
+    following = re.compile(r'^ {0,2}\S', re.M).search(text, text.index('\n', start) + 1)
+    return start, following.start() if following else len(text)
+
+
+def saves(text: str, service: str):
+    """(description, new text) pairs, each one save on top of the previous"""
+    start, end = entry_span(text, service)
+    block = text[start:end]
+    port = re.search(r'host_port: (\d+)', block)
+    text = text[:start] + block[:port.start(1)] + str(int(port.group(1)) + 1) + block[port.end(1):] + text[end:]
+    yield 'change a host port', text
+
+    start, end = entry_span(text, service)
+    copy = text[start:end].replace(f"  {service}:", f"  {service}_copy:", 1).replace(
+        'container_name: "', 'container_name: "copy-', 1)
+    yield 'add a service', text[:end] + copy + text[end:]
+    yield 'remove a service', text
+
+    record = re.search(r'(- name: "[^"]+"\n\s+type: ")CNAME("\n\s+value: ")[^"]+"', text)
+    text = text[:record.start()] + record.group(1) + 'A' + record.group(2) + '192.168.0.250"' + text[record.end():]
+    yield 'change a DNS record', text
+    yield 'edit a comment', text.replace('\n', '\n# reviewed\n', 1)
+
+
+def findings(results) -> Counter:
+    """Finding codes and paths of the spec checks, which both runs must agree on"""
+    return Counter((finding.code, finding.path) for result in results
+                   if result.name not in ('load_spec', 'load_config', 'port_summary')
+                   for finding in result.findings)
+
+
+def fresh_findings(module, config: str) -> Counter:
+    validator = module.ConnectivityValidator(config)
+    for name in FRESH_CHECKS:
+        getattr(validator, name)()
+    return findings(validator.results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark watch-mode re-validation')
+    parser.add_argument('--services', type=int, nargs='*', default=[1000, 10000],
+                        help='Connectivity spec sizes to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--no-parity', action='store_true',
+                        help='Skip comparing each cycle with a fresh validation')
+    args = parser.parse_args()
+
+    module = load_script('validate-connectivity')
+    failures = []
+    print("📊 Watch-mode re-validation")
+    print(f"   {'services':>9}  {'save':<22} {'parse ms':>9} {'cycle ms':>9} {'entries':>8} {'checks':>7}")
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull:
+        for size in args.services:
+            spec, _ = synthetic_fleet.generate_connectivity_spec(size, seed=args.seed)
+            service = sorted(spec['application_services'])[len(spec['application_services']) // 2]
+            config = os.path.join(workdir, f"connectivity-{size}.yml")
+            synthetic_fleet.dump_yaml(spec, config)
+            del spec
+            text = Path(config).read_text(encoding='utf-8')
+
+            validator = module.ConnectivityValidator(config)
+            validator._compiled_entries = {}
+            resident = TimedSpec(config)
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                validator.revalidate(resident)
+            print(f"   {size:9d}  {'first validation':<22} {'':>9} {(time.perf_counter() - start) * 1000:9.0f}")
+
+            for description, new_text in saves(text, service):
+                Path(config).write_text(new_text, encoding='utf-8')
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    start = time.perf_counter()
+                    validator.revalidate(resident)
+                    cycle_ms = (time.perf_counter() - start) * 1000
+                parse_ms = resident.elapsed * 1000
+                entries = 'whole' if resident.parsed_whole else str(sum(resident.reparsed.values()))
+                rerun = re.search(r're-ran (\d+)/', output.getvalue())
+                rerun = rerun.group(1) if rerun else '0'
+                print(f"   {size:9d}  {description:<22} {parse_ms:9.1f} {cycle_ms:9.0f} {entries:>8} {rerun:>7}")
+
+                if not args.no_parity:
+                    with contextlib.redirect_stdout(devnull):
+                        expected = fresh_findings(module, config)
+                    if findings(validator.results.values()) != expected:
+                        failures.append(f"{size} services, {description}: findings differ from a fresh validation")
+
+    if failures:
+        print("\n❌ Watch benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Every watch cycle matched a fresh validation")
+
+
+if __name__ == "__main__":
+    main()
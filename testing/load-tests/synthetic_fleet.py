@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic DoggPack fleet generator
+
+Builds connectivity specs with anywhere from 10 to 100k services spread over
+many hosts, Docker networks and DNS records, and deployment-plan trees with
+thousands of plans and deep step graphs. A small, reported share of entries
+carries deliberately injected conflicts so benchmarks can also check that
+the validators still find them.
+"""
+
+import argparse
+import json
+import os
+import random
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+INSTANCES = ('CDTZ', 'CCN', 'CCW')
+
+# (name prefix, first host port); names steer validate_port_ranges' expectations
+SERVICE_KINDS = (('mcp', 8100), ('api', 8200), ('monitoring', 8500), ('app', 9000))
+
+PORT_RANGES = {
+    'mcp_servers': '8100-8199',
+    'web_interfaces': '8200-8299',
+    'api_services': '8300-8399',
+    'monitoring': '8500-8599',
+    'external_access': '3000-3099',
+    'vpn_wireguard': '51820-51830',
+}
+RESERVED_PORTS = ['22', '53', '80', '443', '2376', '2377', '4789', '7946']
+
+
+def _emit(value, indent: str, lines: List[str]) -> None:
+    """Block-style YAML for dicts, lists and scalars, strings double-quoted like the real specs
+
+    yaml.dump spends most of its time in the pure-Python representer even with
+    CSafeDumper, which makes 100k-service specs take tens of seconds to write.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f"{indent}{key}:")
+                _emit(item, indent + '  ', lines)
+            else:
+                lines.append(f"{indent}{key}: {_scalar(item)}")
+    else:
+        for item in value:
+            if isinstance(item, dict) and item:
+                nested: List[str] = []
+                _emit(item, indent + '  ', nested)
+                lines.append(f"{indent}- {nested[0].lstrip()}")
+                lines.extend(nested[1:])
+            else:
+                lines.append(f"{indent}- {_scalar(item)}")
+
+
+def _scalar(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return '{}' if isinstance(value, dict) else '[]'
+    return json.dumps(value)
+
+
+def dump_yaml(data: Dict, path: str) -> None:
+    lines: List[str] = []
+    _emit(data, '', lines)
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def _host_ip(index: int) -> str:
+    return f"192.168.{index // 250}.{index % 250 + 1}"
+
+
+def _container_ip(network: int, slot: int) -> str:
+    # Skip .0 and .255 in every /24 so slots never land on a network or broadcast address
+    return f"10.{network + 1}.{slot // 254}.{slot % 254 + 1}"
+
+
+def generate_connectivity_spec(services: int, hosts: int = 0, seed: int = 42,
+                               conflict_rate: float = 0.01) -> Tuple[Dict, Counter]:
+    """A connectivity spec plus a Counter of the conflicts injected into it"""
+    rng = random.Random(seed)
+    hosts = hosts or max(1, services // 100)
+    networks = max(2, services // 50000 + 2)
+    injected = Counter()
+
+    spec = {
+        'metadata': {'name': f"synthetic-fleet-{services}", 'version': '1.0.0', 'status': 'draft'},
+        'network_architecture': {
+            'physical_infrastructure': {
+                f"host{i:05d}": {'ip': _host_ip(i), 'role': 'synthetic', 'os': 'Ubuntu 22.04',
+                                 'docker_role': 'manager' if i == 0 else 'worker'}
+                for i in range(hosts)
+            },
+            'vlan_structure': {'infrastructure': '192.168.0.0/16', 'guest': '172.31.0.0/16'},
+        },
+        'docker_networking': {
+            'swarm_networks': {
+                f"net{n:03d}": {'driver': 'overlay', 'subnet': f"10.{n + 1}.0.0/16"}
+                for n in range(networks)
+            },
+            'bridge_networks': {},
+        },
+        'port_allocation': {'port_ranges': dict(PORT_RANGES), 'reserved_system_ports': list(RESERVED_PORTS)},
+        'application_services': {},
+        'port_forwarding': {'external_access': []},
+        'domain_mapping': {
+            'internal_domains': {'base_domain': 'fleet.local', 'dns_server': _host_ip(0), 'records': [
+                {'name': f"host{i:05d}", 'type': 'A', 'value': _host_ip(i)} for i in range(hosts)
+            ]},
+            'external_domains': {'base_domain': 'fleet.net', 'records': []},
+        },
+    }
+
+    section = spec['application_services']
+    internal = spec['domain_mapping']['internal_domains']['records']
+    external = spec['domain_mapping']['external_domains']['records']
+    forwards = spec['port_forwarding']['external_access']
+    next_port: Dict[Tuple[int, int], int] = Counter()
+    network_slots = Counter()
+    external_port = 20000
+    names: List[str] = []
+    injections = max(1, int(services * conflict_rate)) if conflict_rate > 0 else 0
+    inject_at = set(rng.sample(range(services), min(services, injections))) if injections else set()
+    kinds_cycle = ['port_conflict', 'container_ip_conflict', 'reserved_port', 'invalid_a_record', 'dangling_cname']
+
+    for i in range(services):
+        kind_index = i % len(SERVICE_KINDS)
+        prefix, base_port = SERVICE_KINDS[kind_index]
+        host = rng.randrange(hosts)
+        network = rng.randrange(networks)
+        port = base_port + next_port[(host, kind_index)]
+        next_port[(host, kind_index)] += 1
+        name = f"{prefix}_{i:06d}"
+
+        service = {
+            'container_name': name.replace('_', '-'),
+            'image': f"doggpack/{prefix}:latest",
+            'host_ip': _host_ip(host),
+            'host_port': port,
+            'container_port': 8080,
+            'docker_network': f"net{network:03d}",
+            'container_ip': _container_ip(network, network_slots[network]),
+            'external_access': False,
+            'domains': {'internal': f"{name}.fleet.local"},
+            'health_check': f"http://{_host_ip(host)}:{port}/health",
+        }
+        network_slots[network] += 1
+        internal.append({'name': name, 'type': 'CNAME', 'value': f"host{host:05d}.fleet.local"})
+
+        if rng.random() < 0.05:
+            service['external_access'] = True
+            service['external_port'] = external_port
+            service['domains']['external'] = f"{name}.fleet.net"
+            external.append({'name': name, 'type': 'CNAME', 'value': 'fleet.net', 'proxied': True})
+            if rng.random() < 0.2:
+                forwards.append({'external_port': external_port, 'protocol': 'TCP',
+                                 'internal_ip': _host_ip(host), 'internal_port': port,
+                                 'description': f"{name} direct"})
+            external_port += 1
+
+        if i in inject_at and section:
+            kind = kinds_cycle[sum(injected.values()) % len(kinds_cycle)]
+            victim = section[rng.choice(names)]
+            if kind == 'port_conflict':
+                service['host_ip'] = victim['host_ip']
+                service['host_port'] = victim['host_port']
+            elif kind == 'container_ip_conflict':
+                service['docker_network'] = victim['docker_network']
+                service['container_ip'] = victim['container_ip']
+            elif kind == 'reserved_port':
+                service['host_port'] = 443
+            elif kind == 'invalid_a_record':
+                internal.append({'name': f"{name}-broken", 'type': 'A', 'value': '999.0.0.1'})
+            else:
+                internal[-1]['value'] = f"retired{host:05d}.fleet.local"
+            injected[kind] += 1
+
+        section[name] = service
+        names.append(name)
+
+    if injections:
+        # A bridge network that overlaps the first overlay network
+        spec['docker_networking']['bridge_networks']['overlapping_bridge'] = {
+            'driver': 'bridge', 'subnet': '10.1.0.0/24'}
+        injected['network_overlap'] += 1
+
+    first = section[names[0]] if names else None
+    second = next((section[name] for name in names
+                   if (section[name]['host_ip'], section[name]['host_port']) != (first['host_ip'], first['host_port'])),
+                  None) if first else None
+    if injections and second:
+        # Two forwards claiming one external port for different services, and one to a port nothing binds
+        for victim in (first, second):
+            forwards.append({'external_port': external_port, 'protocol': 'TCP', 'internal_ip': victim['host_ip'],
+                             'internal_port': victim['host_port'], 'description': 'colliding forward'})
+        injected['forward_collision'] += 1
+        forwards.append({'external_port': external_port + 1, 'protocol': 'TCP', 'internal_ip': first['host_ip'],
+                         'internal_port': 65000, 'description': 'orphaned forward'})
+        injected['orphaned_forward'] += 1
+
+    return spec, injected
+
+
+def generate_listener_snapshots(spec: Dict, seed: int = 42, drift_rate: float = 0.01) -> Tuple[Dict[str, str], Counter]:
+    """`ss -tulpn` followed by `docker ps` output per host IP, plus a Counter of the drift injected
+
+    Every service publishes its host port through docker-proxy, except a
+    reported share that is not running, whose port a stale container holds,
+    or whose port a process outside Docker holds.
+    """
+    rng = random.Random(seed)
+    injected = Counter()
+    sockets = defaultdict(list)
+    containers = defaultdict(list)
+    claimed = set()
+    pid = 1000
+    for service in spec['application_services'].values():
+        host_ip, port = service['host_ip'], service['host_port']
+        if (host_ip, port) in claimed:
+            # An injected port conflict: the first service's container holds the port
+            continue
+        claimed.add((host_ip, port))
+        container = service['container_name']
+        pid += 1
+        roll = rng.random()
+        if roll < drift_rate:
+            injected['not_listening'] += 1
+            continue
+        if roll < drift_rate * 2:
+            sockets[host_ip].append(f"tcp   LISTEN 0      128    0.0.0.0:{port:<13} 0.0.0.0:*     "
+                                    f"users:((\"python3\",pid={pid},fd=3))")
+            injected['foreign_process'] += 1
+            continue
+        if roll < drift_rate * 3:
+            container = f"{container}-old"
+            injected['wrong_container'] += 1
+        sockets[host_ip].append(f"tcp   LISTEN 0      4096   0.0.0.0:{port:<13} 0.0.0.0:*     "
+                                f"users:((\"docker-proxy\",pid={pid},fd=4))")
+        containers[host_ip].append((container, f"0.0.0.0:{port}->{service['container_port']}/tcp, "
+                                               f":::{port}->{service['container_port']}/tcp"))
+
+    snapshots = {}
+    for host in spec['network_architecture']['physical_infrastructure'].values():
+        host_ip = host['ip']
+        width = max((len(name) for name, _ in containers[host_ip]), default=5) + 3
+        lines = ["Netid State  Recv-Q Send-Q Local Address:Port  Peer Address:Port Process",
+                 "tcp   LISTEN 0      128    0.0.0.0:22           0.0.0.0:*     users:((\"sshd\",pid=800,fd=3))"]
+        lines += sockets[host_ip]
+        lines += ['', f"{'NAMES':<{width}}PORTS"]
+        lines += [f"{name:<{width}}{ports}" for name, ports in containers[host_ip]]
+        snapshots[host_ip] = '\n'.join(lines) + '\n'
+    return snapshots, injected
+
+
+def synthetic_steps(rng: random.Random, count: int, fan_in: float) -> List[Dict]:
+    """A deep step DAG: a backbone chain plus random edges to earlier steps"""
+    steps = []
+    for j in range(count):
+        dependencies = [f"step_{j - 1:03d}"] if j else []
+        if j > 2 and rng.random() < fan_in:
+            dependencies.append(f"step_{rng.randrange(j - 1):03d}")
+        assigned = rng.choice(INSTANCES + ('CCN,CCW',))
+        steps.append({
+            'name': f"step_{j:03d}",
+            'assigned_to': assigned,
+            'description': f"Synthetic step {j}",
+            'estimated_duration': f"{rng.randint(1, 15)} minutes",
+            'dependencies': sorted(set(dependencies)),
+        })
+    return steps
+
+
+def plan_document(rng: random.Random, name: str, status: str, dependencies: List[str],
+                  steps: List[Dict]) -> Dict:
+    """A deployment plan with every required section around the given steps"""
+    return {
+        'metadata': {
+            'name': name, 'version': '1.0.0', 'created_date': '2025-08-01', 'created_by': 'CDTZ',
+            'status': status,
+        },
+        'description': {'overview': f"Synthetic plan {name}"},
+        'environment': {'target_machines': [
+            {'name': 'nucdogg', 'resources_required': {'memory': f"{rng.choice((2, 4, 8))}GB"}},
+        ]},
+        'prerequisites': {'dependencies': [
+            {'deployment': dependency, 'status': 'completed'} for dependency in dependencies
+        ]},
+        'deployment_steps': steps,
+        'rollback_plan': {'trigger_conditions': ['health check fails'],
+                          'rollback_steps': [{'name': 'restore', 'description': 'Restore snapshot'}]},
+    }
+
+
+def generate_plan_tree(root: str, plans: int, steps: int = 20, seed: int = 42,
+                       conflict_rate: float = 0.01) -> Counter:
+    """Write a deployment-plans tree under `root`, returning the injected conflicts"""
+    rng = random.Random(seed)
+    injected = Counter()
+    for state in ('active', 'completed', 'deprecated'):
+        os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    states = []
+    for i in range(plans):
+        roll = rng.random()
+        states.append('completed' if roll < 0.3 else 'deprecated' if roll < 0.35 else 'active')
+    names = [f"plan-{i:05d}" for i in range(plans)]
+    injections = max(1, int(plans * conflict_rate)) if conflict_rate > 0 else 0
+    inject_at = sorted(rng.sample(range(1, plans), min(plans - 1, injections))) if injections else []
+    kinds = {}
+    for n, i in enumerate(inject_at):
+        kinds[i] = ('missing_dependency', 'deprecated_dependency', 'plan_cycle',
+                    'step_cycle', 'invalid_instance')[n % 5]
+
+    dependencies: Dict[int, List[str]] = {}
+    for i in range(plans):
+        candidates = [k for k in rng.sample(range(i), min(i, 3)) if states[k] != 'deprecated'] if i else []
+        dependencies[i] = [names[k] for k in candidates]
+
+    deprecated = [k for k in range(plans) if states[k] == 'deprecated']
+    for i, kind in kinds.items():
+        if kind == 'missing_dependency':
+            dependencies[i].append(f"retired-plan-{i:05d}")
+        elif kind == 'deprecated_dependency' and deprecated:
+            dependencies[i].append(names[rng.choice(deprecated)])
+        elif kind == 'plan_cycle':
+            # Make an earlier active plan depend back on this one
+            states[i] = 'active'
+            earlier = next((k for k in range(i - 1, -1, -1) if states[k] == 'active'), None)
+            if earlier is None:
+                continue
+            dependencies[i].append(names[earlier])
+            dependencies[earlier].append(names[i])
+        else:
+            continue
+        injected[kind] += 1
+
+    for i, name in enumerate(names):
+        plan_steps = synthetic_steps(rng, steps, fan_in=0.3)
+        if kinds.get(i) == 'step_cycle' and steps > 2:
+            plan_steps[0]['dependencies'] = [plan_steps[-1]['name']]
+            injected['step_cycle'] += 1
+        elif kinds.get(i) == 'invalid_instance':
+            plan_steps[rng.randrange(steps)]['assigned_to'] = 'CCX'
+            injected['invalid_instance'] += 1
+
+        status = {'completed': 'completed', 'deprecated': 'deprecated'}.get(states[i], 'draft')
+        dump_yaml(plan_document(rng, name, status, dependencies[i], plan_steps),
+                  os.path.join(root, states[i], f"{name}-2025-08-01.yml"))
+
+    return injected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a seeded synthetic DoggPack fleet')
+    parser.add_argument('output', help='Directory to write connectivity.yml and deployment-plans/ into')
+    parser.add_argument('--services', type=int, default=1000, help='Services in the connectivity spec')
+    parser.add_argument('--hosts', type=int, default=0, help='Hosts (default: one per 100 services)')
+    parser.add_argument('--plans', type=int, default=1000, help='Plans in the deployment-plans tree')
+    parser.add_argument('--steps', type=int, default=20, help='Deployment steps per plan')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--conflict-rate', type=float, default=0.01,
+                        help='Share of services/plans that get an injected conflict')
+    parser.add_argument('--listeners', action='store_true',
+                        help='Also write listeners/<host ip>.txt snapshots (ss + docker ps) with injected drift')
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    spec, injected = generate_connectivity_spec(args.services, args.hosts, args.seed, args.conflict_rate)
+    dump_yaml(spec, os.path.join(args.output, 'connectivity.yml'))
+    injected += generate_plan_tree(os.path.join(args.output, 'deployment-plans'), args.plans,
+                                   args.steps, args.seed, args.conflict_rate)
+    if args.listeners:
+        snapshots, drift = generate_listener_snapshots(spec, args.seed, args.conflict_rate)
+        os.makedirs(os.path.join(args.output, 'listeners'), exist_ok=True)
+        for host_ip, text in snapshots.items():
+            with open(os.path.join(args.output, 'listeners', f"{host_ip}.txt"), 'w') as f:
+                f.write(text)
+        injected += drift
+
+    print(f"✅ Wrote {args.services} services and {args.plans} plans to {args.output}")
+    for kind, count in sorted(injected.items()):
+        print(f"   • injected {kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
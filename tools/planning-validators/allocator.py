@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+DoggPack Port and Container-IP Allocator
+
+Keeps a free-space bitmap per host for every port_allocation.port_ranges
+bucket and one per docker_networking subnet. Each bitmap carries a forward
+cursor, so handing out the next free port or address is O(1) amortized.
+"""
+
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import port_conflicts
+from connectivity_model import ConnectivityModel
+
+# Docker network a new service of each type joins unless told otherwise
+DEFAULT_NETWORKS = {
+    'mcp_servers': 'coordination_net',
+    'monitoring': 'coordination_net',
+    'web_interfaces': 'services_net',
+    'api_services': 'api_gateway_net',
+    'databases': 'services_net',
+    'messaging': 'services_net',
+    'development': 'development_net',
+}
+
+FREE = 0
+USED = 1
+
+
+class AllocationError(Exception):
+    """Raised when a request cannot be satisfied"""
+
+
+class Bitmap:
+    """Fixed-size free-space bitmap over an integer range with a next-free cursor"""
+    __slots__ = ('start', 'bits', 'cursor')
+
+    def __init__(self, start: int, size: int):
+        self.start = start
+        self.bits = bytearray(size)
+        self.cursor = 0
+
+    def mark(self, value: int) -> None:
+        offset = value - self.start
+        if 0 <= offset < len(self.bits):
+            self.bits[offset] = USED
+
+    def take(self) -> Optional[int]:
+        """Claim the lowest free value at or after the cursor"""
+        offset = self.bits.find(FREE, self.cursor)
+        if offset < 0:
+            return None
+        self.bits[offset] = USED
+        self.cursor = offset + 1
+        return self.start + offset
+
+    @property
+    def free(self) -> int:
+        return self.bits.count(FREE)
+
+
+class AllocationRequest:
+    """A new service that needs a host port and a container IP"""
+    __slots__ = ('name', 'service_type', 'host', 'network')
+
+    def __init__(self, name: str, service_type: str, host: str, network: Optional[str] = None):
+        self.name = name
+        self.service_type = service_type
+        self.host = host
+        self.network = network or DEFAULT_NETWORKS.get(service_type)
+
+
+class Allocation:
+    """Port and container IP assigned to an AllocationRequest"""
+    __slots__ = ('request', 'host_ip', 'host_port', 'docker_network', 'container_ip')
+
+    def __init__(self, request: AllocationRequest, host_ip: str, host_port: int,
+                 docker_network: Optional[str], container_ip: Optional[str]):
+        self.request = request
+        self.host_ip = host_ip
+        self.host_port = host_port
+        self.docker_network = docker_network
+        self.container_ip = container_ip
+
+    def as_spec(self) -> Dict:
+        entry = {
+            'container_name': self.request.name.replace('_', '-'),
+            'host_ip': self.host_ip,
+            'host_port': self.host_port,
+        }
+        if self.docker_network:
+            entry['docker_network'] = self.docker_network
+            entry['container_ip'] = self.container_ip
+        return entry
+
+
+class Allocator:
+    """Allocates host ports and container IPs against a compiled connectivity model"""
+
+    def __init__(self, model: ConnectivityModel):
+        self.model = model
+        self._port_bitmaps: Dict[Tuple[str, str], Bitmap] = {}
+        self._ip_bitmaps: Dict[str, Bitmap] = {}
+        self._used_ports: Dict[str, List[Tuple[int, int]]] = {}
+
+        for interval in port_conflicts.binding_intervals(model):
+            if interval.scope != port_conflicts.ROUTER_SCOPE:
+                self._used_ports.setdefault(interval.scope, []).append((interval.start, interval.end))
+
+        for network in model.networks:
+            if network.kind == 'vlan' or not network.subnet:
+                continue
+            try:
+                subnet = ipaddress.IPv4Network(network.subnet)
+            except ValueError:
+                continue
+            bitmap = Bitmap(int(subnet.network_address), subnet.num_addresses)
+            # Network, gateway and broadcast addresses are never handed out
+            bitmap.mark(int(subnet.network_address))
+            bitmap.mark(int(subnet.network_address) + 1)
+            bitmap.mark(int(subnet.broadcast_address))
+            self._ip_bitmaps[network.name] = bitmap
+
+        for service in model.services:
+            bitmap = self._ip_bitmaps.get(service.docker_network)
+            if bitmap and service.container_ip:
+                try:
+                    bitmap.mark(int(ipaddress.IPv4Address(service.container_ip)))
+                except ValueError:
+                    pass
+
+    def resolve_host(self, host: str) -> str:
+        """Accept either a hostname from physical_infrastructure or an IP"""
+        if host in self.model.hosts_by_name:
+            return self.model.hosts_by_name[host].ip
+        if host in self.model.hosts_by_ip:
+            return host
+        raise AllocationError(f"Unknown host: {host}")
+
+    def _port_bitmap(self, host_ip: str, service_type: str) -> Bitmap:
+        key = (host_ip, service_type)
+        bitmap = self._port_bitmaps.get(key)
+        if bitmap is None:
+            port_range = self.model.port_ranges.get(service_type)
+            if port_range is None:
+                raise AllocationError(f"Unknown service type (no port range): {service_type}")
+            bitmap = Bitmap(port_range.start, port_range.end - port_range.start + 1)
+            for port in self.model.reserved_ports:
+                bitmap.mark(port)
+            for start, end in self._used_ports.get(host_ip, ()):
+                for port in range(max(start, port_range.start), min(end, port_range.end) + 1):
+                    bitmap.mark(port)
+            self._port_bitmaps[key] = bitmap
+        return bitmap
+
+    def next_port(self, host: str, service_type: str) -> int:
+        host_ip = self.resolve_host(host)
+        port = self._port_bitmap(host_ip, service_type).take()
+        if port is None:
+            raise AllocationError(f"Port range {service_type} exhausted on {host}")
+        return port
+
+    def next_ip(self, network: str) -> str:
+        bitmap = self._ip_bitmaps.get(network)
+        if bitmap is None:
+            raise AllocationError(f"Unknown Docker network: {network}")
+        address = bitmap.take()
+        if address is None:
+            raise AllocationError(f"Subnet of {network} exhausted")
+        return str(ipaddress.IPv4Address(address))
+
+    def allocate(self, request: AllocationRequest) -> Allocation:
+        host_ip = self.resolve_host(request.host)
+        host_port = self.next_port(host_ip, request.service_type)
+        container_ip = self.next_ip(request.network) if request.network else None
+        return Allocation(request, host_ip, host_port, request.network, container_ip)
+
+    def allocate_batch(self, requests: Iterable[AllocationRequest]) -> List[Allocation]:
+        """Assign every request in one pass, failing on the first that cannot fit"""
+        allocations = []
+        added = set()
+        for request in requests:
+            if request.name in self.model.services_by_name or request.name in added:
+                raise AllocationError(f"Service already exists: {request.name}")
+            added.add(request.name)
+            allocations.append(self.allocate(request))
+        return allocations
+
+    def capacity(self) -> Dict[str, Dict[str, int]]:
+        """Free ports per host and bucket, and free addresses per network"""
+        report = {}
+        for host in self.model.hosts:
+            if host.ip:
+                report[host.name] = {name: self._port_bitmap(host.ip, name).free
+                                     for name in self.model.port_ranges}
+        report['networks'] = {name: bitmap.free for name, bitmap in self._ip_bitmaps.items()}
+        return report
+
+
+def build_patch(allocations: Iterable[Allocation], section: str = 'application_services') -> Dict:
+    """Proposed connectivity spec additions for a set of allocations"""
+    return {section: {allocation.request.name: allocation.as_spec() for allocation in allocations}}
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+DoggPack Capacity Planner
+
+Parses the resource quantities plans and services declare ("4 cores", "500m",
+"8GB", "1.5TiB") and adds up what every active plan's target_machines and
+every spec service, times its load_balancing.scaling_targets max_replicas,
+demand of each machine in network_architecture.physical_infrastructure.
+Machines whose demand exceeds their declared capacity are over-committed. A
+worst-fit-decreasing pass then proposes where the service replicas could run
+so the fullest machine keeps as much headroom as possible; plan demands stay
+on the machines they target. Both passes are linear in the number of demands
+times machines, so the check re-runs on every plan change. A fleet that
+declares no capacity, or no demand, is reported rather than passed silently.
+"""
+
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RESOURCES = ('cpu', 'memory', 'disk')
+LABELS = {'cpu': 'CPU', 'memory': 'Memory', 'disk': 'Disk'}
+
+# What a well-formed quantity of each resource looks like, for findings
+UNIT_HINTS = {
+    'cpu': "cores or millicores (e.g. '2 cores', '500m')",
+    'memory': "a size in MB or GB (e.g. '512MB', '8GB')",
+    'disk': "a size in MB, GB or TB (e.g. '50GB', '1TB')",
+}
+
+# Machines that run the Docker CLI only never host services
+CLIENT_ROLES = ('client',)
+
+# Proposed moves listed in the text report
+MOVES_SHOWN = 20
+
+# Plans needing next to nothing say so in words
+NEGLIGIBLE = ('minimal', 'negligible', 'none')
+
+_QUANTITY = re.compile(r'^(\d+(?:\.\d+)?)\s*([a-z]*)$')
+_CPU_UNITS = {'': 1000, 'core': 1000, 'cores': 1000, 'cpu': 1000, 'cpus': 1000, 'vcpu': 1000, 'vcpus': 1000,
+              'm': 1}
+# Sizes are binary whether written GB or GiB, as memory is sold and as Docker reads them
+_BYTE_UNITS = {unit + suffix: 1024 ** power
+               for power, unit in enumerate(('', 'k', 'm', 'g', 't'))
+               for suffix in (('b',) if not unit else ('', 'b', 'ib'))}
+
+# (cpu millicores, memory bytes, disk bytes)
+Vector = Tuple[int, int, int]
+ZERO: Vector = (0, 0, 0)
+
+_parsed: Dict[Tuple[str, object], Optional[int]] = {}
+
+
+def parse_quantity(resource: str, value) -> Optional[int]:
+    """Millicores of a cpu quantity or bytes of a memory/disk size; None when unparseable"""
+    if isinstance(value, (dict, list)):
+        return None
+    # Fleets repeat a handful of quantities across thousands of services
+    key = (resource, value)
+    if key not in _parsed:
+        _parsed[key] = _parse_quantity(resource, value)
+    return _parsed[key]
+
+
+def _parse_quantity(resource: str, value) -> Optional[int]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Bare numbers are only unambiguous for cpu
+        return int(round(value * 1000)) if resource == 'cpu' and value >= 0 else None
+    text = str(value).strip().lower()
+    if text in NEGLIGIBLE:
+        return 0
+    match = _QUANTITY.match(text)
+    if not match:
+        return None
+    units = _CPU_UNITS if resource == 'cpu' else _BYTE_UNITS
+    unit = match.group(2)
+    if unit not in units or (resource != 'cpu' and not unit):
+        return None
+    return int(round(float(match.group(1)) * units[unit]))
+
+
+def format_quantity(resource: str, amount: int) -> str:
+    if resource == 'cpu':
+        return f"{amount / 1000:g} cores"
+    for unit, power in (('TiB', 4), ('GiB', 3), ('MiB', 2), ('KiB', 1)):
+        if amount >= 1024 ** power:
+            return f"{amount / 1024 ** power:.3g} {unit}"
+    return f"{amount} B"
+
+
+def parse_resources(declared: Dict, path: str) -> Tuple[Vector, List[Tuple[str, str, str, str]]]:
+    """Demand vector of a cpu/memory/disk mapping (missing ones count as 0) and DP301 findings"""
+    amounts = []
+    findings = []
+    for resource in RESOURCES:
+        value = declared.get(resource)
+        amount = 0 if value is None else parse_quantity(resource, value)
+        if amount is None:
+            findings.append(('warning', 'DP301', f"{LABELS[resource]} quantity '{value}' should be "
+                             f"{UNIT_HINTS[resource]}", f"{path}.{resource}"))
+            amount = 0
+        amounts.append(amount)
+    return tuple(amounts), findings
+
+
+def parse_capacity_override(text: str) -> Tuple[str, Dict[str, str]]:
+    """Parse HOST=cpu:8,memory:32GB,disk:2TB into (host, quantities); raises ValueError"""
+    host, _, quantities = text.partition('=')
+    declared = {}
+    for item in filter(None, quantities.split(',')):
+        resource, _, value = item.partition(':')
+        resource = resource.strip().lower()
+        if resource not in RESOURCES or parse_quantity(resource, value.strip()) is None:
+            raise ValueError(f"expected HOST=cpu:N,memory:SIZE,disk:SIZE, got {text!r}")
+        declared[resource] = value.strip()
+    if not host.strip() or not declared:
+        raise ValueError(f"expected HOST=cpu:N,memory:SIZE,disk:SIZE, got {text!r}")
+    return host.strip().lower(), declared
+
+
+class Machine:
+    """A physical host and the capacity it declares (None for resources it does not)"""
+    __slots__ = ('name', 'ip', 'capacity', 'eligible', 'path')
+
+    def __init__(self, name: str, ip: Optional[str], capacity: Tuple[Optional[int], ...],
+                 eligible: bool, path: str):
+        self.name = name
+        self.ip = ip
+        self.capacity = capacity
+        # Whether service replicas may be placed here
+        self.eligible = eligible
+        self.path = path
+
+    @property
+    def declared(self) -> bool:
+        return any(amount is not None for amount in self.capacity)
+
+    def fits(self, load: Vector, amount: Vector) -> bool:
+        return all(capacity is None or used + needed <= capacity
+                   for capacity, used, needed in zip(self.capacity, load, amount))
+
+    def headroom(self, load: Vector) -> float:
+        """Smallest share of any declared resource still free (negative when over-committed)"""
+        shares = [(capacity - used) / capacity for capacity, used in zip(self.capacity, load) if capacity]
+        return min(shares) if shares else 1.0
+
+
+class Demand:
+    """What a plan needs on one target machine, or what one replica of a service needs"""
+    __slots__ = ('owner', 'host', 'amount', 'service', 'replica', 'path')
+
+    def __init__(self, owner: str, host: str, amount: Vector, path: str,
+                 service: Optional[str] = None, replica: int = 0):
+        self.owner = owner
+        # Machine name the demand lands on today
+        self.host = host
+        self.amount = amount
+        self.path = path
+        # Service replicas can be moved; plan demands are pinned to their target machine
+        self.service = service
+        self.replica = replica
+
+    @property
+    def movable(self) -> bool:
+        return self.service is not None
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner} replica {self.replica + 1}" if self.replica else self.owner
+
+
+class Fleet:
+    """Machines with their declared capacity and the demand of every spec service"""
+
+    def __init__(self):
+        self.machines: Dict[str, Machine] = {}
+        self.services: List[Demand] = []
+        # Services declaring no resources, which the planner cannot account for
+        self.undeclared = 0
+        self.findings: List[Tuple[str, str, str, str]] = []
+
+    def machine(self, name: str) -> Optional[Machine]:
+        return self.machines.get(name.lower())
+
+
+def fleet_from_model(model, overrides: Iterable[Tuple[str, Dict[str, str]]] = ()) -> Fleet:
+    """Build the fleet from a compiled connectivity spec; overrides replace declared capacities"""
+    fleet = Fleet()
+    overrides = dict(overrides)
+    for host in model.hosts:
+        declared = overrides.get(host.name.lower(), host.capacity)
+        path = f"{host.path}.capacity"
+        capacity: Tuple[Optional[int], ...] = (None, None, None)
+        if declared:
+            amounts, findings = parse_resources(declared, path)
+            fleet.findings.extend(findings)
+            capacity = tuple(amount if resource in declared else None
+                             for resource, amount in zip(RESOURCES, amounts))
+        machine = Machine(host.name.lower(), host.ip, capacity, False, path)
+        machine.eligible = machine.declared and host.docker_role not in CLIENT_ROLES
+        fleet.machines[machine.name] = machine
+    for name in overrides.keys() - fleet.machines.keys():
+        fleet.findings.append(('warning', 'DP303', f"--capacity names {name}, which is not in "
+                               f"physical_infrastructure", 'network_architecture.physical_infrastructure'))
+
+    for name, target in model.scaling_targets.items():
+        if name not in model.services_by_name:
+            fleet.findings.append(('warning', 'DP306', f"Scaling target {name} is not a service",
+                                   f"load_balancing.scaling_targets.{name}"))
+    for service in model.services:
+        if not service.resources:
+            fleet.undeclared += 1
+            continue
+        amount, findings = parse_resources(service.resources, f"{service.path}.resources")
+        fleet.findings.extend(findings)
+        replicas = (model.scaling_targets.get(service.name) or {}).get('max_replicas', 1)
+        try:
+            replicas = max(1, int(replicas))
+        except (TypeError, ValueError):
+            fleet.findings.append(('warning', 'DP306', f"Unparseable max_replicas for {service.name}: {replicas}",
+                                   f"load_balancing.scaling_targets.{service.name}.max_replicas"))
+            replicas = 1
+        host = model.hostname(service.host_ip).lower()
+        for replica in range(replicas):
+            fleet.services.append(Demand(service.name, host, amount, f"{service.path}.resources",
+                                         service.name, replica))
+    return fleet
+
+
+def plan_demands(records: Iterable) -> List[Demand]:
+    """Demands of every active plan's target machines, from plan index records
+
+    Unparseable quantities count as 0; the plan's own DP111 check reports them.
+    """
+    demands = []
+    for record in records:
+        if record.state != 'active':
+            continue
+        for index, machine, required in record.resources:
+            path = f"{record.path}: environment.target_machines[{index}].resources_required"
+            amount, _ = parse_resources(required, path)
+            demands.append(Demand(record.name, machine.lower(), amount, path))
+    return demands
+
+
+class CapacityPlan:
+    """Demand per machine as declared today and under the proposed placement"""
+    __slots__ = ('demands', 'load', 'proposed', 'placement', 'unplaced', 'findings')
+
+    def __init__(self):
+        self.demands: List[Demand] = []
+        self.load: Dict[str, Vector] = {}
+        self.proposed: Dict[str, Vector] = {}
+        # Machine proposed for each movable demand, by position in demands
+        self.placement: Dict[int, str] = {}
+        self.unplaced: List[Demand] = []
+        self.findings: List[Tuple[str, str, str, str]] = []
+
+    @property
+    def moves(self) -> List[Tuple[Demand, str]]:
+        return [(self.demands[i], host) for i, host in sorted(self.placement.items())
+                if host != self.demands[i].host]
+
+
+def _add(load: Vector, amount: Vector) -> Vector:
+    return (load[0] + amount[0], load[1] + amount[1], load[2] + amount[2])
+
+
+def _contributors(demands: List[Demand], resource: int) -> str:
+    """The largest demands on one resource, services summed over their replicas"""
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for demand in demands:
+        totals[demand.owner][0] += demand.amount[resource]
+        totals[demand.owner][1] += 1
+    largest = sorted(totals.items(), key=lambda item: (-item[1][0], item[0]))[:3]
+    return ', '.join(f"{owner}{f' ×{count}' if count > 1 else ''} "
+                     f"{format_quantity(RESOURCES[resource], amount)}"
+                     for owner, (amount, count) in largest if amount)
+
+
+def propose_placement(fleet: Fleet, demands: List[Demand], plan: CapacityPlan) -> None:
+    """Worst-fit decreasing: largest replicas first, each onto the fitting machine with the most headroom
+
+    Plan demands are pinned. Machines are kept in a heap by headroom, so a
+    replica usually costs one pop and push. Replicas of one service go to
+    different machines while any machine without one still fits them.
+    """
+    eligible = [machine for machine in fleet.machines.values() if machine.eligible]
+    load = {machine.name: ZERO for machine in eligible}
+    movable = []
+    for i, demand in enumerate(demands):
+        if demand.movable and any(demand.amount):
+            movable.append(i)
+        elif demand.host in load:
+            load[demand.host] = _add(load[demand.host], demand.amount)
+    if not eligible:
+        return
+
+    totals = [sum(machine.capacity[r] or 0 for machine in eligible) for r in range(len(RESOURCES))]
+
+    def dominant_share(i: int) -> float:
+        return max((demands[i].amount[r] / total for r, total in enumerate(totals) if total), default=0.0)
+
+    machines = {machine.name: machine for machine in eligible}
+    heap = [(-machine.headroom(load[machine.name]), machine.name) for machine in eligible]
+    heapq.heapify(heap)
+    hosting: Dict[str, set] = defaultdict(set)
+    for i in sorted(movable, key=lambda i: (-dominant_share(i), demands[i].owner, demands[i].replica)):
+        demand = demands[i]
+        popped = []
+        best = fallback = None
+        while heap:
+            name = heapq.heappop(heap)[1]
+            popped.append(name)
+            if machines[name].fits(load[name], demand.amount):
+                if name not in hosting[demand.service]:
+                    best = name
+                    break
+                fallback = fallback or name
+        best = best or fallback
+        if best is None:
+            plan.unplaced.append(demand)
+        else:
+            load[best] = _add(load[best], demand.amount)
+            hosting[demand.service].add(best)
+            plan.placement[i] = best
+        for name in popped:
+            heapq.heappush(heap, (-machines[name].headroom(load[name]), name))
+    plan.proposed = load
+
+
+def _keeps_current(fleet: Fleet, plan: CapacityPlan) -> bool:
+    """Whether today's placement fits and leaves at least the proposal's worst headroom"""
+    if any(plan.demands[i].host not in plan.proposed for i in plan.placement) or not plan.proposed:
+        return False
+    current = [fleet.machines[name].headroom(plan.load.get(name, ZERO)) for name in plan.proposed]
+    proposed = [fleet.machines[name].headroom(load) for name, load in plan.proposed.items()]
+    return min(current) >= 0 and min(current) >= min(proposed)
+
+
+def plan_capacity(fleet: Fleet, demands: List[Demand]) -> CapacityPlan:
+    """Aggregate plan and service demand per machine, check it against capacity and propose a placement
+
+    Findings are (severity, code, message, path) tuples:
+      DP301 warning  resource quantity that does not parse
+      DP302 error    machine demand exceeds its declared capacity
+      DP303 warning  plan targets a machine not in physical_infrastructure
+      DP304 warning  demand on a machine that declares no capacity for it
+      DP305 warning  service replicas no machine has room for in the proposal
+      DP306 warning  scaling target that is not a service, or bad max_replicas
+      DP307 warning  no machine declares capacity, or nothing declares resources, so nothing is checked
+    """
+    plan = CapacityPlan()
+    plan.demands = demands + fleet.services
+    plan.findings.extend(fleet.findings)
+    if not any(machine.declared for machine in fleet.machines.values()):
+        plan.findings.append(('warning', 'DP307', "No machine in physical_infrastructure declares capacity, so "
+                              "none is checked; declare it per host or pass --capacity",
+                              'network_architecture.physical_infrastructure'))
+    if not plan.demands:
+        untracked = f" ({fleet.undeclared} services declare none)" if fleet.undeclared else ""
+        plan.findings.append(('warning', 'DP307', f"No active plan or spec service declares resources{untracked}, "
+                              f"so no demand is checked", ''))
+
+    by_host: Dict[str, List[Demand]] = defaultdict(list)
+    for demand in plan.demands:
+        by_host[demand.host].append(demand)
+    for host, host_demands in sorted(by_host.items()):
+        load = ZERO
+        for demand in host_demands:
+            load = _add(load, demand.amount)
+        plan.load[host] = load
+        machine = fleet.machine(host)
+        if machine is None:
+            pinned = next((demand for demand in host_demands if not demand.movable), None)
+            if pinned is not None:
+                plan.findings.append(('warning', 'DP303', f"Plan {pinned.owner} targets {host}, "
+                                      f"which is not in physical_infrastructure", pinned.path))
+            continue
+        undeclared = [r for r, resource in enumerate(RESOURCES) if load[r] and machine.capacity[r] is None]
+        if undeclared:
+            plan.findings.append(('warning', 'DP304', f"{machine.name} is asked for "
+                                  + ', '.join(f"{format_quantity(RESOURCES[r], load[r])} {RESOURCES[r]}"
+                                              for r in undeclared)
+                                  + " but declares no capacity for it", machine.path))
+        for r, resource in enumerate(RESOURCES):
+            capacity = machine.capacity[r]
+            if capacity is not None and load[r] > capacity:
+                plan.findings.append(('error', 'DP302',
+                                      f"{machine.name} is over-committed on {resource}: "
+                                      f"{format_quantity(resource, load[r])} demanded of "
+                                      f"{format_quantity(resource, capacity)} "
+                                      f"({_contributors(host_demands, r)})", f"{machine.path}.{resource}"))
+
+    propose_placement(fleet, plan.demands, plan)
+    if not plan.unplaced and _keeps_current(fleet, plan):
+        # The greedy pass is a heuristic; never propose moves that leave less headroom than today
+        plan.placement = {i: plan.demands[i].host for i in plan.placement}
+        plan.proposed = {name: plan.load.get(name, ZERO) for name in plan.proposed}
+    for demand in plan.unplaced:
+        plan.findings.append(('warning', 'DP305', f"No machine has room for {demand.label} in the proposed "
+                              f"placement", demand.path))
+    return plan
+
+
+def format_plan(fleet: Fleet, plan: CapacityPlan) -> List[str]:
+    """Per-machine load and headroom today and under the proposal, then the proposed moves"""
+    lines = []
+    for name in sorted(set(plan.load) | set(plan.proposed)):
+        machine = fleet.machine(name)
+        load = plan.load.get(name, ZERO)
+        usage = ', '.join(
+            f"{resource} {format_quantity(resource, load[r])}"
+            + (f"/{format_quantity(resource, machine.capacity[r])}" if machine and machine.capacity[r] else '')
+            for r, resource in enumerate(RESOURCES))
+        line = f"   {name}: {usage}"
+        if machine is not None and machine.declared:
+            line += f", headroom {machine.headroom(load):.0%}"
+            if name in plan.proposed:
+                line += f" → {machine.headroom(plan.proposed[name]):.0%} proposed"
+        lines.append(line)
+    moves = plan.moves
+    for demand, host in moves[:MOVES_SHOWN]:
+        lines.append(f"   ↪ move {demand.label} from {demand.host} to {host}")
+    if len(moves) > MOVES_SHOWN:
+        lines.append(f"   ↪ and {len(moves) - MOVES_SHOWN} more moves")
+    return lines
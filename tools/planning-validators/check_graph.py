@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+DoggPack Check Graph
+
+Runs validation checks as a dependency graph on a thread pool. A check starts
+as soon as the checks it depends on have finished, so independent offline
+checks and network-bound probes overlap. Whatever a check prints is buffered
+per thread and written in registration order, so the output of a parallel
+run is the same as that of a sequential one.
+"""
+
+import contextlib
+import io
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_JOBS = 4
+
+
+class Tee(io.TextIOBase):
+    """Write to several streams at once"""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        for stream in self.streams:
+            stream.flush()
+
+
+class ThreadOutput(io.TextIOBase):
+    """Stand-in for sys.stdout that sends each thread's writes to that thread's own stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    @property
+    def target(self):
+        return getattr(self._local, 'stream', None) or self.stream
+
+    def write(self, text: str) -> int:
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    @contextlib.contextmanager
+    def redirect(self, stream):
+        """Send the current thread's writes to `stream` instead"""
+        previous = getattr(self._local, 'stream', None)
+        self._local.stream = stream
+        try:
+            yield stream
+        finally:
+            self._local.stream = previous
+
+
+def tee(stream):
+    """Copy what the current thread prints to `stream` as well, without affecting other threads"""
+    if isinstance(sys.stdout, ThreadOutput):
+        return sys.stdout.redirect(Tee(sys.stdout.target, stream))
+    return contextlib.redirect_stdout(Tee(sys.stdout, stream))
+
+
+def order(names: Iterable[str], after: Dict[str, Tuple[str, ...]]) -> Dict[str, Tuple[str, ...]]:
+    """Prerequisites of each check among `names`; those outside the batch are taken as already run"""
+    names = list(names)
+    present = set(names)
+    prerequisites = {name: tuple(other for other in after.get(name, ()) if other in present) for name in names}
+    # Each check may only wait on checks registered before it, which rules out cycles
+    position = {name: index for index, name in enumerate(names)}
+    for name, others in prerequisites.items():
+        for other in others:
+            if position[other] > position[name]:
+                raise ValueError(f"check {name} depends on {other}, which is registered after it")
+    return prerequisites
+
+
+def run_checks(checks: List[Tuple[str, Callable[[], bool]]], after: Dict[str, Tuple[str, ...]],
+               jobs: int = DEFAULT_JOBS) -> Dict[str, bool]:
+    """Run (name, check) pairs, each after its prerequisites in `after`; returns whether each passed
+
+    With one job the checks simply run in registration order. An exception
+    raised by a check stops further checks from starting and is re-raised
+    once the running ones have finished.
+    """
+    prerequisites = order((name for name, _ in checks), after)
+    if jobs <= 1 or len(checks) <= 1:
+        return {name: check() for name, check in checks}
+
+    output = ThreadOutput(sys.stdout)
+
+    def run(check: Callable[[], bool]) -> Tuple[bool, str]:
+        buffer = io.StringIO()
+        with output.redirect(buffer):
+            try:
+                return check(), buffer.getvalue()
+            except BaseException as error:
+                error.output = buffer.getvalue()
+                raise
+
+    passed: Dict[str, bool] = {}
+    futures = {}
+    written = 0
+    with contextlib.redirect_stdout(output), ThreadPoolExecutor(max_workers=min(jobs, len(checks))) as pool:
+        running = set()
+        failed = False
+        while True:
+            if not failed:
+                for name, check in checks:
+                    if name not in futures and all(other in futures and futures[other].done()
+                                                   for other in prerequisites[name]):
+                        futures[name] = pool.submit(run, check)
+                        running.add(futures[name])
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            failed |= any(future.exception() is not None for future in finished)
+
+            # Write every finished check whose predecessors have all been written
+            while written < len(checks) and checks[written][0] in futures and futures[checks[written][0]].done():
+                name = checks[written][0]
+                if futures[name].exception() is not None:
+                    break
+                passed[name], text = futures[name].result()
+                output.stream.write(text)
+                written += 1
+
+    if failed:
+        # Checks after the first failure are abandoned, as they would be when run in sequence
+        error = next(futures[name].exception() for name, _ in checks[written:]
+                     if name in futures and futures[name].exception() is not None)
+        output.stream.write(getattr(error, 'output', ''))
+        raise error
+    return passed
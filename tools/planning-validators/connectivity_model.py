@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+DoggPack Connectivity Model
+
+Compiles the raw connectivity-port-mapping.yml dictionary into compact typed
+records with prebuilt lookup indexes, so every validation check shares a
+single normalized view of the spec instead of re-walking the raw config.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Top-level sections whose entries describe deployable services
+SERVICE_SECTIONS = (
+    'foundation_services',
+    'development_environments',
+    'application_services',
+    'monitoring_stack',
+    'external_integrations',
+    'load_balancing',
+)
+
+# Service fields that bind a port (or "start-end" range) on the service's host_ip
+HOST_PORT_FIELDS = ('host_port', 'ssh_port', 'vnc_port', 'http_port', 'https_port')
+
+DNS_ZONES = (('internal', 'internal_domains'), ('external', 'external_domains'))
+
+
+class Host:
+    """Physical machine from network_architecture.physical_infrastructure"""
+    __slots__ = ('name', 'ip', 'role', 'os', 'docker_role', 'capacity')
+
+    def __init__(self, name: str, ip: Optional[str], role: str = '', os: str = '', docker_role: str = '',
+                 capacity: Optional[Dict] = None):
+        self.name = name
+        self.ip = ip
+        self.role = role
+        self.os = os
+        self.docker_role = docker_role
+        # Declared cpu/memory/disk quantities, unparsed
+        self.capacity = capacity
+
+    @property
+    def path(self) -> str:
+        return f"network_architecture.physical_infrastructure.{self.name}"
+
+
+class Network:
+    """Docker network or VLAN with its declared subnet"""
+    __slots__ = ('name', 'kind', 'subnet', 'driver', 'purpose')
+
+    def __init__(self, name: str, kind: str, subnet: Optional[str], driver: str = '', purpose: str = ''):
+        self.name = name
+        self.kind = kind  # 'swarm', 'bridge' or 'vlan'
+        self.subnet = subnet
+        self.driver = driver
+        self.purpose = purpose
+
+    @property
+    def path(self) -> str:
+        if self.kind == 'vlan':
+            return f"network_architecture.vlan_structure.{self.name}"
+        return f"docker_networking.{self.kind}_networks.{self.name}.subnet"
+
+
+class Endpoint:
+    """A port, or inclusive port range, bound on a host by a service"""
+    __slots__ = ('service', 'field', 'host_ip', 'port', 'end', 'protocol', 'path')
+
+    def __init__(self, service: str, field: str, host_ip: str, port: int,
+                 protocol: str = 'tcp', end: Optional[int] = None, path: str = ''):
+        self.service = service
+        self.field = field
+        self.host_ip = host_ip
+        self.port = port
+        self.end = port if end is None else end
+        self.protocol = protocol
+        # YAML path of the declaring field, e.g. application_services.web.host_port
+        self.path = path
+
+    @property
+    def ports(self) -> range:
+        return range(self.port, self.end + 1)
+
+    def __repr__(self) -> str:
+        ports = self.port if self.port == self.end else f"{self.port}-{self.end}"
+        return f"Endpoint({self.service}.{self.field} {self.host_ip}:{ports}/{self.protocol})"
+
+
+class ForwardRule:
+    """Router rule from port_forwarding.external_access"""
+    __slots__ = ('index', 'external_port', 'protocol', 'internal_ip', 'internal_port', 'description')
+
+    def __init__(self, index: int, config: Dict):
+        self.index = index
+        self.external_port = config.get('external_port')
+        self.protocol = str(config.get('protocol', 'tcp')).lower()
+        self.internal_ip = config.get('internal_ip')
+        self.internal_port = config.get('internal_port')
+        self.description = config.get('description', '')
+
+    @property
+    def path(self) -> str:
+        return f"port_forwarding.external_access[{self.index}]"
+
+
+class Service:
+    """Deployable service from one of the SERVICE_SECTIONS"""
+    __slots__ = (
+        'name', 'section', 'container_name', 'image', 'host_ip', 'host_port',
+        'container_port', 'docker_network', 'container_ip', 'external_access',
+        'external_port', 'internal_domain', 'external_domain', 'health_check',
+        'protocol', 'resources', 'endpoints',
+    )
+
+    def __init__(self, name: str, section: str, config: Dict):
+        domains = config.get('domains') or {}
+        self.name = name
+        self.section = section
+        self.container_name = config.get('container_name')
+        self.image = config.get('image')
+        self.host_ip = config.get('host_ip', 'unknown')
+        self.host_port = config.get('host_port')
+        self.container_port = config.get('container_port')
+        self.docker_network = config.get('docker_network')
+        self.container_ip = config.get('container_ip')
+        self.external_access = bool(config.get('external_access', False))
+        self.external_port = config.get('external_port')
+        self.internal_domain = domains.get('internal')
+        self.external_domain = domains.get('external')
+        self.health_check = config.get('health_check')
+        self.protocol = str(config.get('protocol', 'tcp')).lower()
+        # cpu/memory/disk one replica needs, unparsed
+        self.resources = config.get('resources') if isinstance(config.get('resources'), dict) else None
+        self.endpoints: Tuple[Endpoint, ...] = ()
+
+    @property
+    def path(self) -> str:
+        return f"{self.section}.{self.name}"
+
+
+class DnsRecord:
+    """Record from domain_mapping.<zone>_domains.records"""
+    __slots__ = ('name', 'type', 'value', 'zone', 'base_domain', 'proxied', 'index')
+
+    def __init__(self, name: str, record_type: str, value: str, zone: str,
+                 base_domain: str, proxied: bool = False, index: int = 0):
+        self.name = name
+        self.type = record_type
+        self.value = value
+        self.zone = zone
+        self.base_domain = base_domain
+        self.proxied = proxied
+        self.index = index
+
+    @property
+    def fqdn(self) -> str:
+        return f"{self.name}.{self.base_domain}" if self.base_domain else self.name
+
+    @property
+    def path(self) -> str:
+        return f"domain_mapping.{self.zone}_domains.records[{self.index}]"
+
+
+class PortRange:
+    """Named range from port_allocation.port_ranges"""
+    __slots__ = ('name', 'start', 'end')
+
+    def __init__(self, name: str, start: int, end: int):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    def __contains__(self, port: int) -> bool:
+        return self.start <= port <= self.end
+
+    @property
+    def path(self) -> str:
+        return f"port_allocation.port_ranges.{self.name}"
+
+
+class ConnectivityModel:
+    """Compiled connectivity spec with lookup indexes"""
+
+    def __init__(self):
+        self.hosts: List[Host] = []
+        self.networks: List[Network] = []
+        self.services: List[Service] = []
+        self.records: List[DnsRecord] = []
+        self.forwards: List[ForwardRule] = []
+        self.port_ranges: Dict[str, PortRange] = {}
+        self.reserved_ports: List[int] = []
+        self.dns_servers: Dict[str, str] = {}
+        # load_balancing.scaling_targets by service name
+        self.scaling_targets: Dict[str, Dict] = {}
+        # (severity, code, message, YAML path) found while compiling
+        self.issues: List[Tuple[str, str, str, str]] = []
+        # Top-level spec sections that were present
+        self.sections: Set[str] = set()
+
+        self.hosts_by_ip: Dict[str, Host] = {}
+        self.hosts_by_name: Dict[str, Host] = {}
+        self.networks_by_name: Dict[str, Network] = {}
+        self.services_by_name: Dict[str, Service] = {}
+        self.services_by_host: Dict[str, List[Service]] = defaultdict(list)
+        self.endpoints_by_host: Dict[str, List[Endpoint]] = defaultdict(list)
+        self.records_by_fqdn: Dict[str, List[DnsRecord]] = defaultdict(list)
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return [endpoint for endpoints in self.endpoints_by_host.values() for endpoint in endpoints]
+
+    def networks_of_kind(self, kind: str) -> List[Network]:
+        return [network for network in self.networks if network.kind == kind]
+
+    def hostname(self, ip: str) -> str:
+        host = self.hosts_by_ip.get(ip)
+        return host.name if host else ip
+
+
+def parse_port_range(value) -> Optional[Tuple[int, int]]:
+    """Parse "8100-8199" or a single port into an inclusive (start, end) tuple"""
+    text = str(value).strip()
+    try:
+        if '-' in text:
+            start, end = map(int, text.split('-', 1))
+        else:
+            start = end = int(text)
+    except ValueError:
+        return None
+    return (start, end) if start <= end else None
+
+
+def _service_endpoints(service: Service, config: Dict, issues: List[Tuple[str, str, str, str]]) -> List[Endpoint]:
+    """Build the host endpoints declared by a service's port fields"""
+    endpoints = []
+    for field in HOST_PORT_FIELDS:
+        value = config.get(field)
+        if not value:
+            continue
+        bounds = parse_port_range(value)
+        if not bounds:
+            issues.append(('error', 'CV011', f"Invalid {field} for {service.name}: {value}",
+                           f"{service.path}.{field}"))
+            continue
+        endpoints.append(Endpoint(service.name, field, service.host_ip, bounds[0],
+                                  service.protocol, bounds[1], f"{service.path}.{field}"))
+    return endpoints
+
+
+# Sections the model is compiled from, in the order compile_spec reads them
+MODEL_SECTIONS = (
+    'network_architecture',
+    'docker_networking',
+    'port_allocation',
+) + SERVICE_SECTIONS + (
+    'port_forwarding',
+    'domain_mapping',
+)
+
+# Marks the end of a top-level section in a stream of spec entries
+SECTION_END = object()
+
+
+class ModelBuilder:
+    """Builds a ConnectivityModel incrementally from (path, value) spec entries
+
+    Each top-level section arrives as the entries below it, followed by
+    ((section,), SECTION_END). Collections for which splits() is true are
+    delivered element by element (one service, one DNS record, one forward
+    rule at a time), so a streaming parser never has to hold them whole.
+    """
+
+    def __init__(self, reuse: Optional[Dict[Tuple, Tuple]] = None):
+        self.model = ConnectivityModel()
+        self.entries = 0
+        self._base_domains: Dict[str, str] = {}
+        # With `reuse` (a previous builder's `compiled`), services and DNS records whose
+        # source dict is the very same object as last time are reused instead of rebuilt
+        self._reuse = reuse
+        self.compiled: Optional[Dict[Tuple, Tuple]] = None if reuse is None else {}
+
+    @staticmethod
+    def reads(path: Tuple) -> bool:
+        """Whether anything at or below `path` is compiled into the model"""
+        return path[0] in MODEL_SECTIONS
+
+    @staticmethod
+    def splits(path: Tuple) -> bool:
+        """Whether the collection at `path` is delivered element by element"""
+        if len(path) == 1:
+            return path[0] in MODEL_SECTIONS
+        if path[0] == 'port_forwarding':
+            return path[1:] == ('external_access',)
+        if path[0] == 'domain_mapping':
+            return len(path) == 2 or (len(path) == 3 and path[2] == 'records')
+        return False
+
+    def feed(self, config: Mapping, sections: Optional[Iterable[str]] = None) -> ConnectivityModel:
+        """Compile an already-parsed spec, reading sections in MODEL_SECTIONS order
+
+        With `sections`, only those are compiled. Sections the model does not
+        read are never accessed, so a lazily loaded spec does not parse them.
+        """
+        config = config or {}
+        wanted = None if sections is None else set(sections)
+        for section in MODEL_SECTIONS + tuple(name for name in config if name not in MODEL_SECTIONS):
+            if section not in config or (wanted is not None and section not in wanted):
+                continue
+            if section in MODEL_SECTIONS:
+                value = config[section]
+                if section in SERVICE_SECTIONS and isinstance(value, dict):
+                    # Services are most of a large spec; skip the per-entry path dispatch
+                    for name, service_config in value.items():
+                        self.add_service(section, name, service_config)
+                    self.entries += len(value)
+                else:
+                    self._feed((section,), value)
+            self.add((section,), SECTION_END)
+        return self.finish()
+
+    def _feed(self, path: Tuple, value) -> None:
+        if self.splits(path) and isinstance(value, (dict, list)):
+            for key, child in (value.items() if isinstance(value, dict) else enumerate(value)):
+                self._feed(path + (key,), child)
+        elif self.reads(path):
+            self.add(path, value)
+
+    def add(self, path: Tuple, value) -> None:
+        """Compile one entry into the model"""
+        model = self.model
+        section = path[0]
+        if value is SECTION_END:
+            model.sections.add(section)
+            if section == 'domain_mapping':
+                self._index_records()
+            return
+        self.entries += 1
+        key = path[1] if len(path) > 1 else None
+
+        if section == 'network_architecture' and isinstance(value, dict):
+            if key == 'physical_infrastructure':
+                for name, host_config in value.items():
+                    self.add_host(name, host_config or {})
+            elif key == 'vlan_structure':
+                for name, subnet in value.items():
+                    model.networks.append(Network(name, 'vlan', subnet))
+        elif section == 'docker_networking' and isinstance(value, dict):
+            kind = {'swarm_networks': 'swarm', 'bridge_networks': 'bridge'}.get(key)
+            for name, net_config in (value.items() if kind else ()):
+                net_config = net_config or {}
+                network = Network(name, kind, net_config.get('subnet'),
+                                  net_config.get('driver', ''), net_config.get('purpose', ''))
+                model.networks.append(network)
+                model.networks_by_name[name] = network
+        elif section == 'port_allocation':
+            if key == 'port_ranges' and isinstance(value, dict):
+                self.add_port_ranges(value)
+            elif key == 'reserved_system_ports' and isinstance(value, list):
+                self.add_reserved_ports(value)
+        elif section in SERVICE_SECTIONS and len(path) == 2:
+            self.add_service(section, key, value)
+        elif section == 'port_forwarding' and len(path) == 3:
+            if isinstance(path[2], int) and isinstance(value, dict):
+                model.forwards.append(ForwardRule(path[2], value))
+        elif section == 'domain_mapping' and len(path) >= 3:
+            zone = next((zone for zone, name in DNS_ZONES if name == key), None)
+            if zone is None:
+                return
+            if path[2] == 'base_domain':
+                self._base_domains[zone] = value or ''
+            elif path[2] == 'dns_server' and value:
+                model.dns_servers[zone] = value
+            elif len(path) == 4 and isinstance(value, dict):
+                known = self._reuse.get(path) if self._reuse else None
+                if known is not None and known[0] is value:
+                    record = known[1]
+                else:
+                    record = DnsRecord(value.get('name'), value.get('type'), value.get('value'),
+                                       zone, '', bool(value.get('proxied', False)), path[3])
+                if self.compiled is not None:
+                    self.compiled[path] = (value, record)
+                model.records.append(record)
+
+    def add_host(self, name: str, config: Dict) -> None:
+        capacity = config.get('capacity')
+        host = Host(name, config.get('ip'), config.get('role', ''), config.get('os', ''),
+                    config.get('docker_role', ''), capacity if isinstance(capacity, dict) else None)
+        self.model.hosts.append(host)
+        self.model.hosts_by_name[name] = host
+        if host.ip:
+            self.model.hosts_by_ip[host.ip] = host
+
+    def add_port_ranges(self, ranges: Dict) -> None:
+        for name, value in ranges.items():
+            bounds = parse_port_range(value)
+            if bounds:
+                self.model.port_ranges[name] = PortRange(name, *bounds)
+            else:
+                self.model.issues.append(('warning', 'CV012', f"Unparseable port range {name}: {value}",
+                                          f"port_allocation.port_ranges.{name}"))
+
+    def add_reserved_ports(self, ports: List) -> None:
+        for index, value in enumerate(ports):
+            try:
+                self.model.reserved_ports.append(int(value))
+            except (TypeError, ValueError):
+                self.model.issues.append(('warning', 'CV013', f"Unparseable reserved system port: {value}",
+                                          f"port_allocation.reserved_system_ports[{index}]"))
+
+    def add_service(self, section: str, name: str, config) -> None:
+        """Add a service and its host endpoints; entries without host_ip or container_name are not services"""
+        model = self.model
+        if not isinstance(config, dict):
+            return
+        if section == 'load_balancing' and name == 'scaling_targets':
+            model.scaling_targets = {str(target): value for target, value in config.items() if isinstance(value, dict)}
+            return
+        if 'host_ip' not in config and 'container_name' not in config:
+            return
+        if name in model.services_by_name:
+            previous = model.services_by_name[name].section
+            model.issues.append(('error', 'CV014', f"Duplicate service name {name} in {previous} and {section}",
+                                 f"{section}.{name}"))
+            return
+        known = self._reuse.get((section, name)) if self._reuse else None
+        if known is not None and known[0] is config:
+            _, service, issues = known
+        else:
+            service = Service(name, section, config)
+            issues = []
+            service.endpoints = tuple(_service_endpoints(service, config, issues))
+        if self.compiled is not None:
+            self.compiled[(section, name)] = (config, service, issues)
+        model.issues.extend(issues)
+        model.services.append(service)
+        model.services_by_name[name] = service
+        model.services_by_host[service.host_ip].append(service)
+        model.endpoints_by_host[service.host_ip].extend(service.endpoints)
+
+    def _index_records(self) -> None:
+        """Apply zone base domains, which may follow the records, and index by FQDN"""
+        self.model.records_by_fqdn.clear()
+        for record in self.model.records:
+            record.base_domain = self._base_domains.get(record.zone, '')
+            self.model.records_by_fqdn[record.fqdn].append(record)
+
+    def finish(self) -> ConnectivityModel:
+        return self.model
+
+
+def compile_spec(config: Dict) -> ConnectivityModel:
+    """Compile a parsed connectivity spec into a ConnectivityModel in one pass"""
+    return ModelBuilder().feed(config)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+DoggPack Delta Checks
+
+Checks only the spec entities a change touched, against indexes of
+everything else in the compiled spec. A changed service's bindings are
+compared with the other claims on the same host and protocol, its container
+IP with every other container IP, its domains are resolved through the
+memoized DNS graph; a changed record also re-checks the CNAMEs and service
+domains that lead to it, and a changed subnet the overlaps and container IPs
+it bounds. Findings carry the same codes the full validation uses.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+import dns_graph
+import network_validator
+import port_conflicts
+import port_forwarding
+from connectivity_model import ConnectivityModel
+from semantic_diff import REMOVED, Change
+
+Finding = Tuple[str, str, str, str]
+
+
+def _owner(path: str) -> str:
+    """YAML path of the entity a field path belongs to"""
+    return path.rsplit('.', 1)[0]
+
+
+def check_changes(model: ConnectivityModel, changes: List[Change]) -> Tuple[int, List[Finding]]:
+    """Validate the added and changed entities of the new spec; returns (entities examined, findings)
+
+    Findings are (severity, code, message, YAML path) tuples with the codes
+    of the full validation.
+    """
+    current: Dict[str, Set[str]] = defaultdict(set)
+    removed: Dict[str, Set[str]] = defaultdict(set)
+    for change in changes:
+        (removed if change.action == REMOVED else current)[change.kind].add(change.key)
+
+    services = [service for service in model.services if service.path in current['service']]
+    forwards = {rule.path for rule in model.forwards if f"{rule.external_port}/{rule.protocol}" in current['forward']}
+    # Entities whose findings belong to this change
+    owners = {service.path for service in services} | forwards
+
+    findings = [issue for issue in model.issues if _owner(issue[3]) in owners]
+    findings += _check_bindings(model, owners, {int(port) for port in current['reserved_port']})
+    findings += _check_forwards(model, owners, current, removed)
+    findings += _check_hosts(model, current['host'])
+    findings += _check_networks(model, services, current['subnet'])
+    findings += _check_names(model, services, current['record'] | removed['record'])
+    findings += _check_ranges(model, services, current['port_range'], bool(current['reserved_port']))
+    return len(changes), findings
+
+
+def _check_bindings(model: ConnectivityModel, owners: Set[str], reserved_added: Set[int]) -> List[Finding]:
+    """Invalid ports, overlaps with any other claim in the same scope, and reserved ports (CV101/102/112/501)"""
+    findings = []
+    intervals = port_conflicts.binding_intervals(model)
+    groups: Dict[Tuple[str, str], List[port_conflicts.PortInterval]] = defaultdict(list)
+    for interval in intervals:
+        groups[(interval.scope, interval.protocol)].append(interval)
+
+    changed = [interval for interval in intervals if _owner(interval.path) in owners]
+    reported = set()
+    for interval in changed:
+        router = interval.scope == port_conflicts.ROUTER_SCOPE
+        if not router and (interval.start < port_conflicts.MIN_PORT or interval.end > port_conflicts.MAX_PORT):
+            findings.append(('error', 'CV101', f"Invalid port {interval.ports} for {interval.label} "
+                             f"on {interval.scope}", interval.path))
+        # Every claim on the same host and protocol; a host holds few enough to scan
+        for other in groups[(interval.scope, interval.protocol)]:
+            if (other is interval or other.start > interval.end or other.end < interval.start
+                    or (other.route is not None and other.route == interval.route)):
+                continue
+            pair = frozenset((id(other), id(interval)))
+            if pair in reported:
+                continue
+            reported.add(pair)
+            if router:
+                findings.append(('error', 'CV112', f"External port {max(other.start, interval.start)}/"
+                                 f"{interval.protocol} forwarded by both {other.owner} (to {_route(other)}) "
+                                 f"and {interval.owner} (to {_route(interval)})", interval.path))
+            else:
+                conflict = port_conflicts.PortConflict(other, interval, interval.protocol)
+                findings.append(('error', 'CV102', conflict.describe(), interval.path))
+
+    if 'port_allocation' in model.sections:
+        reserved = set(model.reserved_ports)
+        for interval in intervals:
+            if interval.scope == port_conflicts.ROUTER_SCOPE or port_conflicts.claims_reserved(interval):
+                continue
+            ports = reserved if _owner(interval.path) in owners else reserved_added
+            for port in sorted(port for port in ports if interval.start <= port <= interval.end):
+                findings.append(('error', 'CV501', f"Service port {port} on {interval.scope} conflicts with "
+                                 f"reserved system port ({interval.label})", interval.path))
+    return findings
+
+
+def _route(interval: port_conflicts.PortInterval) -> str:
+    host, port = interval.route or ('?', None)
+    return host if port is None else f"{host}:{port}"
+
+
+def _check_forwards(model: ConnectivityModel, owners: Set[str], current: Dict[str, Set[str]],
+                    removed: Dict[str, Set[str]]) -> List[Finding]:
+    """Router rules and exposed services the change touched, or whose target binding it changed (CV111-116)"""
+    hosts = {key.split(':', 1)[0] for key in current['binding'] | removed['binding']}
+    relevant = owners | {rule.path for rule in model.forwards if rule.internal_ip in hosts}
+    if not relevant:
+        return []
+    _, findings = port_forwarding.check_forwards(model)
+    # Claim collisions are found per changed interval by _check_bindings
+    return [finding for finding in findings if finding[1] != 'CV112' and _owner(finding[3]) in relevant]
+
+
+def _check_hosts(model: ConnectivityModel, names: Set[str]) -> List[Finding]:
+    """Address syntax, uniqueness and infrastructure VLAN membership of changed hosts (CV201-203)"""
+    findings = []
+    if not names:
+        return findings
+    subnets, _ = network_validator.compile_subnets(model)
+    infra_network = network_validator.infrastructure_vlan(model, subnets)
+    owners: Dict[str, List[str]] = defaultdict(list)
+    for host in model.hosts:
+        if host.ip:
+            owners[host.ip].append(host.name)
+    for host in model.hosts:
+        if host.name not in names or not host.ip:
+            continue
+        path = f"{host.path}.ip"
+        address = network_validator.parse_ipv4(host.ip)
+        if address is None:
+            findings.append(('error', 'CV201', f"Invalid IP address for {host.name}: {host.ip}", path))
+            continue
+        if infra_network and address not in infra_network:
+            findings.append(('warning', 'CV202', f"Machine {host.name} IP {host.ip} not in infrastructure VLAN",
+                             path))
+        for other in owners[host.ip]:
+            if other != host.name:
+                findings.append(('error', 'CV203', f"IP address {host.ip} assigned to both {other} and {host.name}",
+                                 path))
+    return findings
+
+
+def _check_networks(model: ConnectivityModel, services: List, subnet_keys: Set[str]) -> List[Finding]:
+    """Changed subnets' syntax and overlaps, and the container IPs of changed services or networks (CV204/602/603)"""
+    findings = []
+    subnets, errors = network_validator.compile_subnets(model)
+    paths = {network.path for network in model.networks if f"{network.kind} {network.name}" in subnet_keys}
+    findings += [('error', 'CV204', message, path) for message, path in errors if path in paths]
+    for first, second in network_validator.find_overlaps(subnets):
+        if first.path in paths or second.path in paths:
+            findings.append(('error', 'CV602', network_validator.describe_overlap(first, second), second.path))
+
+    names = {network.name for network in model.networks if network.path in paths}
+    changed = {service.path for service in services}
+    checked = services + [service for service in model.services
+                          if service.docker_network in names and service.path not in changed]
+    owners: Dict[int, List[str]] = defaultdict(list)
+    if checked:
+        for service in model.services:
+            address = network_validator.parse_ipv4(service.container_ip) if service.container_ip else None
+            if address is not None:
+                owners[address].append(service.name)
+    for service in checked:
+        # Alone, so only its own address, network and range are checked here
+        for message, path in network_validator.check_container_ips([service], subnets):
+            findings.append(('error', 'CV603', message, path))
+        address = network_validator.parse_ipv4(service.container_ip) if service.container_ip else None
+        for other in owners.get(address, ()):
+            if other != service.name:
+                findings.append(('error', 'CV603', f"Container IP {service.container_ip} assigned to both "
+                                 f"{other} and {service.name}", f"{service.path}.container_ip"))
+    return findings
+
+
+def _check_names(model: ConnectivityModel, services: List, record_keys: Set[str]) -> List[Finding]:
+    """Changed records, the CNAMEs and service domains leading to them, and changed services' domains (CV402-408)"""
+    if not services and not record_keys:
+        return []
+    from network_validator import parse_ipv4
+
+    graph = dns_graph.DnsGraph(model)
+    names = {dns_graph.normalize(key.rsplit(' ', 1)[0]) for key in record_keys}
+    # Every CNAME whose chain runs through a changed name resolves differently now
+    pointing: Dict[str, List[str]] = defaultdict(list)
+    for record in model.records:
+        if record.type == 'CNAME':
+            pointing[graph.target(record)].append(dns_graph.normalize(record.fqdn))
+    pending = list(names)
+    while pending:
+        for name in pointing.get(pending.pop(), ()):
+            if name not in names:
+                names.add(name)
+                pending.append(name)
+
+    findings = []
+    for record in model.records:
+        if (f"{record.fqdn} {record.type}" in record_keys and record.zone == 'internal' and record.type == 'A'
+                and parse_ipv4(record.value) is None):
+            findings.append(('error', 'CV402', f"Invalid IP in A record: {record.name} → {record.value}",
+                             f"{record.path}.value"))
+    findings += dns_graph.check_records(graph, names)
+    changed = {service.path for service in services}
+    readers = services + [service for service in model.services if service.path not in changed and
+                          {dns_graph.normalize(service.internal_domain), dns_graph.normalize(service.external_domain)}
+                          & names]
+    findings += dns_graph.check_service_domains(graph, readers)[1]
+    return findings
+
+
+def _check_ranges(model: ConnectivityModel, services: List, ranges: Set[str], reserved_changed: bool) -> List[Finding]:
+    """Changed services' host ports against the range their name implies, and changed ranges against
+    each other and the reserved ports (CV302/303)"""
+    findings = []
+    for service in services:
+        bucket = port_conflicts.expected_range(service.name)
+        port_range = model.port_ranges.get(bucket) if bucket else None
+        if service.host_port and port_range and service.host_port not in port_range:
+            findings.append(('warning', 'CV302', f"{service.name} port {service.host_port} outside expected range "
+                             f"{bucket} ({port_range.start}-{port_range.end})", f"{service.path}.host_port"))
+    if not ranges and not reserved_changed:
+        return findings
+    paths = {model.port_ranges[name].path for name in ranges if name in model.port_ranges}
+    if reserved_changed:
+        paths.add('port_allocation.reserved_system_ports')
+    intervals = port_conflicts.range_intervals(model)
+    intervals += port_conflicts.reserved_intervals(model, [port_conflicts.ALLOCATION_SCOPE])
+    for conflict in port_conflicts.find_conflicts(intervals):
+        if conflict.first.path in paths or conflict.second.path in paths:
+            start, end = conflict.overlap
+            findings.append(('warning', 'CV303', f"{conflict.first.label} overlaps {conflict.second.label} on ports "
+                             f"{start if start == end else f'{start}-{end}'}", conflict.second.path))
+    return findings
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+DoggPack DNS Record Graph
+
+Treats domain_mapping records as a graph of names: CNAME records are edges,
+A records are terminal addresses. Chains are resolved once per name and
+memoized, so validating every service domain end to end is linear in the
+number of records. Loops, dangling targets inside the managed zones and
+CNAMEs that share a name with other records are reported with the YAML path
+of the offending record.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from connectivity_model import ConnectivityModel, DnsRecord, Service
+
+# Resolution outcomes
+RESOLVED = 'resolved'
+DYNAMIC = 'dynamic'      # ends in an A record whose value is not a literal address (e.g. dynamic_ip)
+EXTERNAL = 'external'    # leaves the managed zones, so it cannot be checked here
+DANGLING = 'dangling'    # points at a managed name that has no record
+LOOP = 'loop'
+MISSING = 'missing'      # the name itself has no record
+
+# Longest CNAME chain before resolution is flagged as suspicious
+MAX_CHAIN = 8
+
+
+def normalize(name) -> str:
+    return str(name or '').strip().rstrip('.').lower()
+
+
+class Resolution:
+    """Where a name leads: the CNAME chain followed and the addresses it ends in"""
+    __slots__ = ('name', 'outcome', 'chain', 'addresses', 'record')
+
+    def __init__(self, name: str, outcome: str, chain: Tuple[str, ...] = (),
+                 addresses: Tuple[str, ...] = (), record: Optional[DnsRecord] = None):
+        self.name = name
+        self.outcome = outcome
+        # Names visited after `name`, in order; for a loop the repeated name closes it
+        self.chain = chain
+        self.addresses = addresses
+        # The record that ended resolution (the dangling or looping CNAME, or the last hop)
+        self.record = record
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome in (RESOLVED, DYNAMIC, EXTERNAL)
+
+    def describe(self) -> str:
+        return ' → '.join((self.name,) + self.chain)
+
+
+class DnsGraph:
+    """Name index over the spec's DNS records with memoized chain resolution"""
+
+    def __init__(self, model: ConnectivityModel):
+        from network_validator import parse_ipv4
+
+        self._parse_ipv4 = parse_ipv4
+        self.zones = sorted({normalize(record.base_domain) for record in model.records if record.base_domain},
+                            key=len, reverse=True)
+        self.records: Dict[str, List[DnsRecord]] = {}
+        for record in model.records:
+            self.records.setdefault(normalize(record.fqdn), []).append(record)
+        self._resolved: Dict[str, Resolution] = {}
+
+    def zone_of(self, name: str) -> Optional[str]:
+        name = normalize(name)
+        for zone in self.zones:
+            if name == zone or name.endswith(f".{zone}"):
+                return zone
+        return None
+
+    def target(self, record: DnsRecord) -> str:
+        """Absolute name a CNAME points at; single labels are relative to the record's zone"""
+        value = str(record.value or '').strip()
+        if value.endswith('.') or '.' in value or not record.base_domain:
+            return normalize(value)
+        return normalize(f"{value}.{record.base_domain}")
+
+    def conflicts(self) -> List[Tuple[DnsRecord, DnsRecord]]:
+        """(CNAME, other record) pairs sharing a name, which DNS does not allow"""
+        pairs = []
+        for records in self.records.values():
+            cnames = [record for record in records if record.type == 'CNAME']
+            if cnames and len(records) > 1:
+                for other in records:
+                    if other is not cnames[0]:
+                        pairs.append((cnames[0], other))
+        return pairs
+
+    def cname(self, name: str) -> Optional[DnsRecord]:
+        """The CNAME record owned by a normalized name, if any"""
+        return next((record for record in self.records.get(name, ()) if record.type == 'CNAME'), None)
+
+    def resolve(self, name: str) -> Resolution:
+        """Follow CNAMEs from `name` to its addresses, memoizing every name on the way"""
+        resolution = self._resolved.get(name)
+        if resolution is not None:
+            return resolution
+        name = normalize(name)
+        if name not in self.records:
+            return Resolution(name, MISSING)
+
+        path: List[str] = []
+        position: Dict[str, int] = {}
+        current = name
+        while current not in self._resolved:
+            if current in position:
+                # Every name on the cycle resolves to the same loop, seen from itself
+                cycle = path[position[current]:]
+                for index, member in enumerate(cycle):
+                    self._resolved[member] = Resolution(member, LOOP, tuple(cycle[index + 1:] + cycle[:index + 1]),
+                                                        (), self.cname(member))
+                del path[position[current]:]
+                break
+
+            records = self.records.get(current)
+            cname = self.cname(current)
+            if not records:
+                # A zone apex without a record is served by the DNS provider, not the spec
+                managed = self.zone_of(current) not in (None, current)
+                self._resolved[current] = Resolution(current, DANGLING if managed else EXTERNAL)
+            elif cname is None:
+                addresses = tuple(str(record.value) for record in records if record.type == 'A')
+                literal = all(self._parse_ipv4(address) is not None for address in addresses)
+                self._resolved[current] = Resolution(current, RESOLVED if addresses and literal else DYNAMIC,
+                                                     (), addresses, records[-1])
+            else:
+                position[current] = len(path)
+                path.append(current)
+                current = self.target(cname)
+
+        # Unwind: each name on the path resolves like its successor, one hop longer
+        tail = self._resolved[current]
+        for member in reversed(path):
+            # A hop to a name without records is blamed on the CNAME that points there
+            record = self.cname(member) if current not in self.records and not tail.chain else tail.record
+            tail = Resolution(member, tail.outcome, (tail.name,) + tail.chain, tail.addresses, record)
+            self._resolved[member] = tail
+        return self._resolved[name]
+
+    def resolve_all(self) -> Dict[str, Resolution]:
+        for name in self.records:
+            if name not in self._resolved:
+                self.resolve(name)
+        return {name: self._resolved[name] for name in self.records}
+
+
+def check_records(graph: DnsGraph, names: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str, str]]:
+    """Conflicts, loops, dangling targets and long chains of every name, or only the given names
+
+    Findings are (severity, code, message, YAML path) tuples:
+      CV403 error    CNAME loop
+      CV404 error    CNAME pointing at a managed name without a record
+      CV405 error    CNAME sharing its name with another record
+      CV408 warning  CNAME chain longer than MAX_CHAIN
+    """
+    if names is None:
+        resolutions = graph.resolve_all()
+    else:
+        resolutions = {name: graph.resolve(name) for name in sorted({normalize(name) for name in names})
+                       if name in graph.records}
+    findings = []
+    for cname, other in graph.conflicts():
+        if normalize(cname.fqdn) in resolutions:
+            findings.append(('error', 'CV405', f"CNAME {cname.fqdn} shares its name with a {other.type} record",
+                             other.path))
+
+    loops = set()
+    for name, resolution in resolutions.items():
+        if resolution.outcome == LOOP and resolution.chain[-1] == name:
+            if frozenset(resolution.chain) not in loops:
+                loops.add(frozenset(resolution.chain))
+                findings.append(('error', 'CV403', f"CNAME loop: {resolution.describe()}", resolution.record.path))
+        elif resolution.outcome == DANGLING and len(resolution.chain) == 1:
+            findings.append(('error', 'CV404', f"CNAME {name} points at {resolution.chain[0]}, which has no record",
+                             f"{resolution.record.path}.value"))
+        elif len(resolution.chain) > MAX_CHAIN:
+            findings.append(('warning', 'CV408', f"CNAME chain of {len(resolution.chain)} hops: "
+                             f"{resolution.describe()}", graph.cname(name).path))
+    return findings
+
+
+def check_service_domains(graph: DnsGraph, services: Iterable[Service]) -> Tuple[int, List[Tuple[str, str, str, str]]]:
+    """Resolve each service domain inside a managed zone; returns (domains examined, findings)
+
+    Findings are (severity, code, message, YAML path) tuples:
+      CV406 error    domain without a record, or not resolving
+      CV407 warning  internal domain resolving away from the service's host
+    """
+    examined = 0
+    findings = []
+    for service in services:
+        for zone, domain in (('internal', service.internal_domain), ('external', service.external_domain)):
+            if not domain or graph.zone_of(domain) is None:
+                continue
+            examined += 1
+            resolution = graph.resolve(domain)
+            path = f"{service.path}.domains.{zone}"
+            if resolution.outcome == MISSING:
+                findings.append(('error', 'CV406', f"{service.name} {zone} domain {domain} has no record "
+                                 f"in domain_mapping", path))
+            elif not resolution.ok:
+                findings.append(('error', 'CV406', f"{service.name} {zone} domain {domain} does not resolve "
+                                 f"({resolution.outcome}: {resolution.describe()})", path))
+            elif (zone == 'internal' and resolution.outcome == RESOLVED
+                  and service.host_ip not in resolution.addresses):
+                findings.append(('warning', 'CV407', f"{service.name} internal domain {domain} resolves to "
+                                 f"{', '.join(resolution.addresses)}, but the service runs on {service.host_ip}",
+                                 path))
+    return examined, findings
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+DoggPack DNS Probe
+
+Sends A queries for every managed record to the zone's configured
+dns_server in bulk over one asyncio UDP socket, matching replies by query ID,
+and compares the CNAME chain and addresses served with what the spec's
+record graph expects. A stub server that answers from the spec on loopback
+makes the comparison testable without the real resolver.
+"""
+
+import itertools
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_RETRIES = 2
+DEFAULT_MAX_IN_FLIGHT = 256
+DNS_PORT = 53
+
+TYPE_A = 1
+TYPE_CNAME = 5
+CLASS_IN = 1
+
+RCODE_OK = 0
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+
+_HEADER = struct.Struct('!HHHHHH')
+_RR = struct.Struct('!HHIH')
+
+
+def encode_name(name: str) -> bytes:
+    labels = [label.encode('idna') for label in name.strip('.').split('.') if label]
+    return b''.join(bytes([len(label)]) + label for label in labels) + b'\x00'
+
+
+def build_query(query_id: int, name: str, qtype: int = TYPE_A) -> bytes:
+    """A recursion-desired query for one name"""
+    return _HEADER.pack(query_id, 0x0100, 1, 0, 0, 0) + encode_name(name) + struct.pack('!HH', qtype, CLASS_IN)
+
+
+def read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Decode a possibly compressed name; returns it and the offset after it"""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return '.'.join(labels).lower(), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    raise ValueError("name compression loop")
+
+
+class DnsAnswer:
+    """What a server said about one name"""
+    __slots__ = ('name', 'rcode', 'cnames', 'addresses', 'elapsed', 'attempts', 'error')
+
+    def __init__(self, name: str, rcode: int = -1, cnames: Tuple[Tuple[str, str], ...] = (),
+                 addresses: Tuple[str, ...] = (), elapsed: float = 0.0, attempts: int = 0, error: str = ''):
+        self.name = name
+        self.rcode = rcode
+        # (owner, target) pairs in the order served
+        self.cnames = cnames
+        self.addresses = addresses
+        self.elapsed = elapsed
+        self.attempts = attempts
+        self.error = error
+
+    @property
+    def answered(self) -> bool:
+        return self.rcode >= 0
+
+
+def parse_response(data: bytes) -> Tuple[int, int, List[Tuple[str, int, str]]]:
+    """(query ID, rcode, [(owner, type, value)]) of a response; only A and CNAME values are decoded"""
+    query_id, flags, questions, answers, _, _ = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    for _ in range(questions):
+        _, offset = read_name(data, offset)
+        offset += 4
+    records = []
+    for _ in range(answers):
+        owner, offset = read_name(data, offset)
+        rtype, _, _, length = _RR.unpack_from(data, offset)
+        offset += _RR.size
+        if rtype == TYPE_A and length == 4:
+            records.append((owner, rtype, socket.inet_ntoa(data[offset:offset + 4])))
+        elif rtype == TYPE_CNAME:
+            records.append((owner, rtype, read_name(data, offset)[0]))
+        offset += length
+    return query_id, flags & 0x000F, records
+
+
+class _ClientProtocol:
+    """Routes datagrams to the pending query with the same ID"""
+
+    def __init__(self):
+        self.pending: Dict[int, 'asyncio.Future'] = {}
+
+    def connection_made(self, transport):
+        pass
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id, rcode, records = parse_response(data)
+        except (struct.error, IndexError, ValueError):
+            return
+        future = self.pending.pop(query_id, None)
+        if future is not None and not future.done():
+            future.set_result((rcode, records))
+
+    def error_received(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+    def connection_lost(self, exc):
+        pass
+
+
+async def query_all_async(names: Iterable[str], server: Tuple[str, int], timeout: float = DEFAULT_TIMEOUT,
+                          retries: int = DEFAULT_RETRIES,
+                          max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> List[DnsAnswer]:
+    """Query every name for A records over one UDP socket, retrying unanswered queries"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_ClientProtocol, remote_addr=server)
+    limit = asyncio.Semaphore(max(1, max_in_flight))
+    ids = itertools.count(random.randrange(65535))
+
+    async def query(name: str) -> DnsAnswer:
+        async with limit:
+            error = ''
+            for attempt in range(1, retries + 2):
+                query_id = next(ids) % 65535 + 1
+                while query_id in protocol.pending:
+                    query_id = next(ids) % 65535 + 1
+                future = loop.create_future()
+                protocol.pending[query_id] = future
+                start = time.perf_counter()
+                transport.sendto(build_query(query_id, name))
+                try:
+                    rcode, records = await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    protocol.pending.pop(query_id, None)
+                    error = f"no answer within {timeout:g}s"
+                    continue
+                except OSError as e:
+                    error = str(e)
+                    continue
+                cnames = tuple((owner, value) for owner, rtype, value in records if rtype == TYPE_CNAME)
+                addresses = tuple(value for _, rtype, value in records if rtype == TYPE_A)
+                return DnsAnswer(name, rcode, cnames, addresses, time.perf_counter() - start, attempt)
+            return DnsAnswer(name, attempts=retries + 1, error=error)
+
+    try:
+        return list(await asyncio.gather(*(query(name) for name in names)))
+    finally:
+        transport.close()
+
+
+def query_all(names: Iterable[str], server: Tuple[str, int], timeout: float = DEFAULT_TIMEOUT,
+              retries: int = DEFAULT_RETRIES, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> List[DnsAnswer]:
+    """Synchronous wrapper around query_all_async for non-async callers"""
+    import asyncio
+
+    return asyncio.run(query_all_async(names, server, timeout, retries, max_in_flight))
+
+
+def parse_server(text: str, default_port: int = DNS_PORT) -> Tuple[str, int]:
+    host, _, port = text.rpartition(':') if text.count(':') == 1 else (text, '', '')
+    return host, int(port) if port else default_port
+
+
+def compare(graph, answer: DnsAnswer) -> Optional[str]:
+    """Why a served answer differs from the spec's record graph, or None when it matches"""
+    from dns_graph import RESOLVED
+
+    expected = graph.resolve(answer.name)
+    first = graph.cname(expected.name)
+    if first is not None:
+        target = graph.target(first)
+        served = dict(answer.cnames).get(expected.name)
+        if served != target:
+            return f"CNAME {expected.name} → {served or 'none'} served, spec says {target}"
+    if expected.outcome == RESOLVED and set(answer.addresses) != set(expected.addresses):
+        return (f"{expected.name} resolves to {', '.join(sorted(answer.addresses)) or 'nothing'}, "
+                f"spec says {', '.join(sorted(expected.addresses))}")
+    return None
+
+
+class StubDnsServer:
+    """Loopback UDP server answering A queries from the spec's record graph
+
+    CNAME chains are followed as a recursive resolver would, names outside
+    the graph get NXDOMAIN, and `overrides` replaces the addresses served for
+    chosen names to simulate drift between the spec and the live zone.
+    """
+
+    def __init__(self, graph, host: str = '127.0.0.1', port: int = 0, overrides: Dict[str, List[str]] = None):
+        self.graph = graph
+        self.overrides = {name.lower(): list(addresses) for name, addresses in (overrides or {}).items()}
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+        self.queries = 0
+        self._thread = None
+        self._running = False
+
+    def answer(self, data: bytes) -> bytes:
+        from dns_graph import LOOP, MISSING
+
+        query_id, flags, _, _, _, _ = _HEADER.unpack_from(data)
+        name, offset = read_name(data, _HEADER.size)
+        question = data[_HEADER.size:offset + 4]
+        resolution = self.graph.resolve(name)
+
+        records = []
+        rcode = RCODE_OK
+        if resolution.outcome == MISSING:
+            rcode = RCODE_NXDOMAIN
+        elif resolution.outcome == LOOP:
+            rcode = RCODE_SERVFAIL
+        else:
+            owner = resolution.name
+            for target in resolution.chain:
+                records.append(encode_name(owner) + _RR.pack(TYPE_CNAME, CLASS_IN, 60, len(encode_name(target)))
+                               + encode_name(target))
+                owner = target
+            addresses = self.overrides.get(resolution.name, resolution.addresses)
+            for address in addresses:
+                try:
+                    packed = socket.inet_aton(address)
+                except OSError:
+                    continue
+                records.append(encode_name(owner) + _RR.pack(TYPE_A, CLASS_IN, 60, 4) + packed)
+
+        header = _HEADER.pack(query_id, 0x8180 | (flags & 0x0100) | rcode, 1, len(records), 0, 0)
+        return header + question + b''.join(records)
+
+    def _serve(self) -> None:
+        self.socket.settimeout(0.2)
+        while self._running:
+            try:
+                data, client = self.socket.recvfrom(512)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.queries += 1
+            try:
+                self.socket.sendto(self.answer(data), client)
+            except (struct.error, IndexError, ValueError, OSError):
+                continue
+
+    def start(self) -> 'StubDnsServer':
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.socket.close()
+
+    def __enter__(self) -> 'StubDnsServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve a stub DNS zone from a connectivity spec')
+    parser.add_argument('--config', '-c', default='planning/specifications/connectivity-port-mapping.yml',
+                        help='Connectivity spec whose domain_mapping records are served')
+    parser.add_argument('--port', type=int, default=0, help='UDP port on 127.0.0.1 (default: ephemeral)')
+    parser.add_argument('--override', action='append', default=[], metavar='NAME=IP[,IP]',
+                        help='Serve different addresses for a name (repeatable)')
+    args = parser.parse_args(argv)
+
+    import spec_loader
+    from connectivity_model import compile_spec
+    from dns_graph import DnsGraph
+
+    overrides = {}
+    for entry in args.override:
+        name, _, addresses = entry.partition('=')
+        overrides[name] = [address for address in addresses.split(',') if address]
+
+    graph = DnsGraph(compile_spec(spec_loader.load_yaml(args.config)))
+    with StubDnsServer(graph, port=args.port, overrides=overrides) as server:
+        host, port = server.address
+        print(f"🧭 Serving {len(graph.records)} names on {host}:{port}/udp")
+        print(f"   Query it with: validate-connectivity.py --query-dns --dns-server {host}:{port}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
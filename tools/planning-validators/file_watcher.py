@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+DoggPack File Watcher
+
+Reports which watched files changed, using Linux inotify through ctypes and
+falling back to polling file metadata where inotify is unavailable (other
+platforms, exhausted watch limits, network filesystems). Directories are
+watched rather than files, so editors that save by writing a temporary file
+and renaming it over the original are seen as one change. Bursts of events
+are merged until the tree has been quiet for a short settle period.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_SETTLE = 0.05
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """libc with inotify_init1, or None where inotify is unavailable"""
+    if not hasattr(os, 'O_CLOEXEC'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """Blocks until watched files change and returns their absolute paths
+
+    `paths` are files or directories; directories are watched recursively
+    for files ending in one of `suffixes`. Changed files include created and
+    deleted ones, so callers should check whether each path still exists; a
+    directory renamed away is reported as the directory's own path.
+    """
+
+    def __init__(self, paths: Iterable[str], suffixes: Tuple[str, ...] = ('.yml', '.yaml'),
+                 interval: float = DEFAULT_INTERVAL, settle: float = DEFAULT_SETTLE, polling: bool = False):
+        self.files: Set[str] = set()
+        self.roots: Set[str] = set()
+        for path in paths:
+            path = os.path.abspath(path)
+            (self.roots if os.path.isdir(path) else self.files).add(path)
+        self.suffixes = suffixes
+        self.interval = interval
+        self.settle = settle
+        self._fd = None
+        self._watches: Dict[int, str] = {}
+        self._snapshot: Dict[str, Tuple[int, int, int]] = {}
+
+        libc = None if polling else _load_inotify()
+        if libc is not None:
+            try:
+                self._start_inotify(libc)
+            except OSError:
+                self.close()
+        self.backend = 'inotify' if self._fd is not None else 'polling'
+        if self._fd is None:
+            self._snapshot = self._scan()
+
+    def _start_inotify(self, libc) -> None:
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._libc = libc
+        for directory in {os.path.dirname(path) for path in self.files}:
+            self._add_watch(directory)
+        for root in self.roots:
+            for directory, _, _ in os.walk(root):
+                self._add_watch(directory)
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            # Typically ENOSPC: fs.inotify.max_user_watches is exhausted
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._watches[wd] = directory
+
+    def watches(self, path: str) -> bool:
+        """Whether a file is one this watcher reports"""
+        if path in self.files:
+            return True
+        return path.endswith(self.suffixes) and any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _scan(self) -> Dict[str, Tuple[int, int, int]]:
+        """(mtime_ns, size, inode) of every watched file that exists"""
+        snapshot = {}
+        candidates = set(self.files)
+        for root in self.roots:
+            for directory, _, names in os.walk(root):
+                candidates.update(os.path.join(directory, name) for name in names if name.endswith(self.suffixes))
+        for path in candidates:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return snapshot
+
+    def _poll(self) -> Set[str]:
+        snapshot = self._scan()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; report every watched file as changed
+                    changed.update(self._scan())
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._watches[wd]
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and any(path.startswith(root + os.sep)
+                                                               for root in self.roots):
+                        self._add_watch(path)
+                        changed.update(self._scan_directory(path))
+                    elif mask & IN_MOVED_FROM:
+                        # Files moved away with their directory produce no events of their own
+                        changed.add(path)
+                    continue
+                if self.watches(path):
+                    changed.add(path)
+
+    def _scan_directory(self, directory: str) -> Set[str]:
+        """Watched files already inside a directory that just appeared"""
+        found = set()
+        for sub, _, names in os.walk(directory):
+            if sub != directory:
+                self._add_watch(sub)
+            found.update(os.path.join(sub, name) for name in names if name.endswith(self.suffixes))
+        return found
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until a batch of changes has settled; an empty set means the timeout expired"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[str] = set()
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if self._fd is not None:
+                ready, _, _ = select.select([self._fd], [], [], self.settle if changed else remaining)
+                batch = self._read_events() if ready else set()
+            else:
+                delay = self.settle if changed else self.interval
+                if remaining is not None:
+                    delay = min(delay, remaining)
+                time.sleep(delay)
+                batch = self._poll()
+            if batch:
+                changed |= batch
+                continue
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'FileWatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
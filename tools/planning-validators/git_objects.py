@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+DoggPack Git Objects
+
+Reads files as they were at any revision straight from the object database,
+without a checkout or a temporary worktree. Blobs are streamed through one
+long-lived `git cat-file --batch` process, so reading many files costs one
+process start, and the paths changed between a revision and the working tree
+(untracked files included) come from a single `git diff`.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Change kinds between a revision and the working tree
+ADDED = 'added'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+
+_STATUS = {'A': ADDED, 'M': MODIFIED, 'T': MODIFIED, 'D': DELETED}
+
+
+class GitObjects:
+    """Object database of the repository containing `cwd`"""
+
+    def __init__(self, cwd='.'):
+        self.root = Path(self._git('rev-parse', '--show-toplevel', cwd=cwd).strip())
+        self._batch: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> 'GitObjects':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+
+    def _git(self, *args: str, cwd=None) -> str:
+        try:
+            completed = subprocess.run(['git', *args], cwd=cwd or self.root, capture_output=True)
+        except FileNotFoundError:
+            raise ValueError("git is not installed")
+        if completed.returncode:
+            message = completed.stderr.decode(errors='replace').strip()
+            raise ValueError(message or f"git {args[0]} failed")
+        return completed.stdout.decode('utf-8', errors='surrogateescape')
+
+    def relative(self, path) -> str:
+        """A path as git names it: relative to the repository root, with forward slashes"""
+        return Path(os.path.relpath(os.path.abspath(path), self.root)).as_posix()
+
+    def commit(self, rev: str) -> str:
+        """Full hash of the commit `rev` names; raises ValueError for anything else"""
+        try:
+            return self._git('rev-parse', '--verify', '--quiet', '--end-of-options', f"{rev}^{{commit}}").strip()
+        except ValueError:
+            raise ValueError(f"Unknown revision: {rev}")
+
+    def changed(self, commit: str, pathspecs: Iterable[str]) -> Dict[str, str]:
+        """Paths under the pathspecs that differ between the commit and the working tree, with their kind
+
+        Renames count as a deletion plus an addition. Untracked files that
+        are not ignored count as added.
+        """
+        pathspecs = list(pathspecs)
+        fields = self._git('diff', '--name-status', '--no-renames', '-z', commit, '--', *pathspecs).split('\0')
+        changes = {path: _STATUS.get(status[:1], MODIFIED) for status, path in zip(fields[::2], fields[1::2])}
+        for path in self._git('ls-files', '-z', '--others', '--exclude-standard', '--', *pathspecs).split('\0'):
+            if path:
+                changes[path] = ADDED
+        return changes
+
+    def files(self, commit: str, pathspecs: Iterable[str]) -> List[str]:
+        """Every file under the pathspecs at the commit"""
+        listing = self._git('ls-tree', '-r', '-z', '--name-only', commit, '--', *pathspecs)
+        return [path for path in listing.split('\0') if path]
+
+    def blob(self, commit: str, path: str) -> Optional[bytes]:
+        """Contents of `path` at the commit, or None when it is not a file there"""
+        if self._batch is None:
+            self._batch = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.root,
+                                           stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        batch = self._batch
+        batch.stdin.write(f"{commit}:{path}\n".encode('utf-8', errors='surrogateescape'))
+        batch.stdin.flush()
+        header = batch.stdout.readline().split()
+        if header[-1] in (b'missing', b'ambiguous'):
+            # "<object> missing", where the object name may contain spaces
+            return None
+        data = batch.stdout.read(int(header[2]) + 1)[:-1]
+        return data if header[1] == b'blob' else None
+
+    def text(self, commit: str, path: str) -> Optional[str]:
+        data = self.blob(commit, path)
+        return None if data is None else data.decode('utf-8')
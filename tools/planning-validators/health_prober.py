@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+DoggPack Health Prober
+
+Samples every service's declared health_check URL concurrently with asyncio
+over pooled keep-alive HTTP/1.1 connections, retrying failed requests, and
+reports availability and p50/p95/p99 latency per service and per host. A
+stand-in server that answers the configured paths on loopback makes the
+prober testable without the real fleet.
+"""
+
+import json
+import math
+import random
+import ssl
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_SAMPLES = 5
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RETRIES = 2
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_CONNECTIONS_PER_HOST = 4
+
+USER_AGENT = 'doggpack-health-prober/1'
+
+# Statuses below this count as healthy (redirects included, as curl -f would)
+HEALTHY_BELOW = 400
+
+
+class HealthTarget:
+    """A service's health_check URL split into its connection origin and request path"""
+    __slots__ = ('service', 'host_ip', 'url', 'scheme', 'host', 'port', 'path')
+
+    def __init__(self, service: str, host_ip: str, url: str, scheme: str, host: str, port: int, path: str):
+        self.service = service
+        self.host_ip = host_ip
+        self.url = url
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.path = path
+
+    @property
+    def origin(self) -> Tuple[str, str, int]:
+        return (self.scheme, self.host, self.port)
+
+
+def parse_health_url(service: str, host_ip: str, url) -> Optional[HealthTarget]:
+    """Parse an http(s) health_check URL, or return None when it is not one"""
+    if not isinstance(url, str):
+        return None
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    path = parts.path or '/'
+    if parts.query:
+        path += f"?{parts.query}"
+    return HealthTarget(service, host_ip, url, parts.scheme, parts.hostname, port, path)
+
+
+def parse_resolve(entries: Iterable[str]) -> Dict[Tuple[str, Optional[int]], Tuple[str, Optional[int]]]:
+    """Parse curl-style overrides 'host[:port]=host[:port]' into a connect-to map"""
+    def split(text: str) -> Tuple[str, Optional[int]]:
+        host, _, port = text.rpartition(':') if ':' in text else (text, '', '')
+        return host, int(port) if port else None
+
+    overrides = {}
+    for entry in entries or ():
+        source, _, destination = entry.partition('=')
+        if not destination:
+            raise ValueError(f"expected HOST[:PORT]=HOST[:PORT], got {entry!r}")
+        overrides[split(source)] = split(destination)
+    return overrides
+
+
+class HealthSample:
+    """Outcome of one health request, after retries"""
+    __slots__ = ('target', 'status', 'elapsed', 'attempts', 'error')
+
+    def __init__(self, target: HealthTarget, status: int, elapsed: float, attempts: int, error: str = ''):
+        self.target = target
+        self.status = status
+        self.elapsed = elapsed
+        self.attempts = attempts
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return 0 < self.status < HEALTHY_BELOW
+
+
+class LatencyStats:
+    """Availability and latency percentiles over a group of samples"""
+    __slots__ = ('samples', 'ok', 'latencies', 'errors')
+
+    def __init__(self):
+        self.samples = 0
+        self.ok = 0
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, sample: HealthSample) -> None:
+        self.samples += 1
+        if sample.ok:
+            self.ok += 1
+            self.latencies.append(sample.elapsed)
+        else:
+            self.errors[sample.error or f"HTTP {sample.status}"] += 1
+
+    @property
+    def availability(self) -> float:
+        return self.ok / self.samples if self.samples else 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile of successful request latency, in seconds"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(fraction * len(ordered)))
+        return ordered[rank - 1]
+
+    def as_dict(self) -> Dict:
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            'samples': self.samples,
+            'ok': self.ok,
+            'availability': round(self.availability, 4),
+            'p50_ms': ms(self.percentile(0.50)),
+            'p95_ms': ms(self.percentile(0.95)),
+            'p99_ms': ms(self.percentile(0.99)),
+            'errors': dict(self.errors),
+        }
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'requests')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive connections to one origin, at most `size` of them open at once
+
+    `host` and `port` are where connections go. For https, `server_hostname`
+    is the name sent as SNI and checked against the certificate, which stays
+    the declared host when --resolve sends connections elsewhere; `context`
+    lets pools share one SSL context.
+    """
+
+    def __init__(self, scheme: str, host: str, port: int, size: int, timeout: float,
+                 server_hostname: Optional[str] = None, context: Optional[ssl.SSLContext] = None):
+        import asyncio
+
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.context = (context or ssl.create_default_context()) if scheme == 'https' else None
+        self.server_hostname = server_hostname
+        self.idle: List[_Connection] = []
+        self.opened = 0
+        self._slots = asyncio.Semaphore(max(1, size))
+
+    async def _open(self) -> _Connection:
+        import asyncio
+
+        tls = {'ssl': self.context, 'server_hostname': self.server_hostname} if self.context else {}
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, **tls), self.timeout)
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, host_header: str, path: str) -> Tuple[int, float]:
+        """GET `path`, reusing an idle connection when there is one
+
+        Returns the status and the request latency, which excludes time spent
+        waiting for a free connection slot.
+        """
+        async with self._slots:
+            start = time.perf_counter()
+            connection = self.idle.pop() if self.idle else None
+            if connection is not None:
+                try:
+                    status = await self._exchange(connection, host_header, path)
+                    return status, time.perf_counter() - start
+                except (ConnectionError, EOFError):
+                    # The server closed the idle connection; retry once on a fresh one
+                    start = time.perf_counter()
+            status = await self._exchange(await self._open(), host_header, path)
+            return status, time.perf_counter() - start
+
+    async def _exchange(self, connection: _Connection, host_header: str, path: str) -> int:
+        import asyncio
+
+        try:
+            status, reusable = await asyncio.wait_for(
+                _http_get(connection, host_header, path), self.timeout)
+        except BaseException:
+            connection.close()
+            raise
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection.close()
+        return status
+
+    def close(self) -> None:
+        for connection in self.idle:
+            connection.close()
+        self.idle.clear()
+
+
+async def _http_get(connection: _Connection, host_header: str, path: str) -> Tuple[int, bool]:
+    """One HTTP/1.1 GET; returns (status, whether the connection can be reused)"""
+    reader, writer = connection.reader, connection.writer
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+        f"Accept: */*\r\nConnection: keep-alive\r\n\r\n".encode('latin-1')
+    )
+    await writer.drain()
+    connection.requests += 1
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise EOFError("connection closed before a response")
+    version, status, *_ = status_line.decode('latin-1').split(None, 2) + ['']
+    if not version.startswith('HTTP/') or not status.isdigit():
+        raise ConnectionError(f"malformed status line {status_line[:60]!r}")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            break
+        if not line:
+            raise EOFError("connection closed in response headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = headers.get('connection', '').lower()
+    reusable = keep_alive != 'close' and (version != 'HTTP/1.0' or keep_alive == 'keep-alive')
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif int(status) not in (204, 304) and not 100 <= int(status) < 200:
+        await reader.read()
+        reusable = False
+    return int(status), reusable
+
+
+class HealthProber:
+    """Repeatedly samples health endpoints over per-origin connection pools"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+                 resolve: Dict = None, backoff: float = 0.05):
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.max_concurrency = max(1, max_concurrency)
+        self.connections_per_host = max(1, connections_per_host)
+        self.resolve = resolve or {}
+        self.backoff = backoff
+        # (scheme, connect host, connect port, TLS server name) -> pool
+        self.pools: Dict[Tuple[str, str, int, Optional[str]], ConnectionPool] = {}
+        self.requests = 0
+        # Shared by every https pool; loading the CA store per connection dominated TLS probes
+        self._context: Optional[ssl.SSLContext] = None
+
+    def _connect_to(self, target: HealthTarget) -> Tuple[str, int]:
+        for key in ((target.host, target.port), (target.host, None)):
+            if key in self.resolve:
+                host, port = self.resolve[key]
+                return host or target.host, port or target.port
+        return target.host, target.port
+
+    def _pool(self, target: HealthTarget) -> ConnectionPool:
+        host, port = self._connect_to(target)
+        server_hostname = target.host if target.scheme == 'https' else None
+        key = (target.scheme, host, port, server_hostname)
+        if key not in self.pools:
+            if server_hostname and self._context is None:
+                self._context = ssl.create_default_context()
+            self.pools[key] = ConnectionPool(target.scheme, host, port, self.connections_per_host, self.timeout,
+                                             server_hostname, self._context)
+        return self.pools[key]
+
+    async def _sample(self, target: HealthTarget, limit) -> HealthSample:
+        import asyncio
+
+        default_port = 443 if target.scheme == 'https' else 80
+        host_header = target.host if target.port == default_port else f"{target.host}:{target.port}"
+        pool = self._pool(target)
+        error = ''
+        status = 0
+        async with limit:
+            for attempt in range(1, self.retries + 2):
+                start = time.perf_counter()
+                try:
+                    self.requests += 1
+                    status, elapsed = await pool.request(host_header, target.path)
+                    # Server errors are worth retrying; client errors are not
+                    if status < 500 or attempt > self.retries:
+                        return HealthSample(target, status, elapsed, attempt)
+                    error = f"HTTP {status}"
+                except asyncio.TimeoutError:
+                    status, error = 0, f"timeout after {self.timeout:g}s"
+                except (OSError, EOFError, asyncio.IncompleteReadError, ValueError) as e:
+                    status, error = 0, str(e) or type(e).__name__
+                if attempt <= self.retries:
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+        return HealthSample(target, status, time.perf_counter() - start, self.retries + 1, error)
+
+    async def probe_async(self, targets: List[HealthTarget], samples: int = DEFAULT_SAMPLES,
+                          interval: float = 0.0) -> List[HealthSample]:
+        """Sample every target `samples` times; each round probes all targets concurrently"""
+        import asyncio
+
+        limit = asyncio.Semaphore(self.max_concurrency)
+        results = []
+        try:
+            for round_number in range(max(1, samples)):
+                if round_number and interval:
+                    await asyncio.sleep(interval)
+                results.extend(await asyncio.gather(*(self._sample(target, limit) for target in targets)))
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+        return results
+
+    def probe(self, targets: List[HealthTarget], samples: int = DEFAULT_SAMPLES,
+              interval: float = 0.0) -> List[HealthSample]:
+        """Synchronous wrapper around probe_async for non-async callers"""
+        import asyncio
+
+        return asyncio.run(self.probe_async(targets, samples, interval))
+
+    @property
+    def connections(self) -> int:
+        return sum(pool.opened for pool in self.pools.values())
+
+
+def aggregate(samples: Iterable[HealthSample], key) -> Dict[str, LatencyStats]:
+    """Group samples into LatencyStats by key(target)"""
+    groups: Dict[str, LatencyStats] = {}
+    for sample in samples:
+        name = key(sample.target)
+        if name not in groups:
+            groups[name] = LatencyStats()
+        groups[name].add(sample)
+    return groups
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f"{seconds * 1000:.1f}"
+
+
+class StandInServer:
+    """Loopback HTTP/1.1 servers answering the configured health paths
+
+    One server is started per port the targets use, on the same port number
+    when it is free and on an ephemeral port otherwise; `resolve` maps each
+    target origin to its stand-in for HealthProber. Configured paths answer
+    200, others 404. `latency` delays every response and `failure_rate`
+    answers that share of requests with 503.
+    """
+
+    def __init__(self, targets: Iterable[HealthTarget], latency: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, same_ports: bool = True):
+        self.paths: Dict[int, set] = defaultdict(set)
+        self.origins: Dict[Tuple[str, int], int] = {}
+        for target in targets:
+            if target.scheme == 'http':
+                self.paths[target.port].add(target.path)
+                self.origins[(target.host, target.port)] = target.port
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.same_ports = same_ports
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self.servers = []
+        self.threads = []
+        self.ports: Dict[int, int] = {}
+
+    def _handler(self, paths: set):
+        from http.server import BaseHTTPRequestHandler
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                stand_in.connections += 1
+
+            def do_GET(self):
+                stand_in.requests += 1
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                if self.path not in paths:
+                    status, body = 404, {'status': 'not found'}
+                elif stand_in.failure_rate and stand_in.random.random() < stand_in.failure_rate:
+                    status, body = 503, {'status': 'unavailable'}
+                else:
+                    status, body = 200, {'status': 'ok'}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StandInServer':
+        from http.server import ThreadingHTTPServer
+
+        for port, paths in sorted(self.paths.items()):
+            server = None
+            for candidate in ((port, 0) if self.same_ports else (0,)):
+                try:
+                    server = ThreadingHTTPServer(('127.0.0.1', candidate), self._handler(paths))
+                    break
+                except OSError:
+                    continue
+            if server is None:
+                raise OSError(f"could not bind a stand-in for port {port}")
+            server.daemon_threads = True
+            self.ports[port] = server.server_address[1]
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self.servers.append(server)
+            self.threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers.clear()
+
+    @property
+    def resolve(self) -> Dict[Tuple[str, Optional[int]], Tuple[str, Optional[int]]]:
+        return {(host, port): ('127.0.0.1', self.ports[local]) for (host, port), local in self.origins.items()}
+
+    def resolve_arguments(self) -> List[str]:
+        return [f"--resolve {host}:{port}={local_host}:{local_port}"
+                for (host, port), (local_host, local_port) in sorted(self.resolve.items())]
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def targets_from_model(model) -> Tuple[List[HealthTarget], List[Tuple[str, str]]]:
+    """Health targets of every service, plus (service, url) pairs that could not be parsed"""
+    targets = []
+    invalid = []
+    for service in model.services:
+        if not service.health_check:
+            continue
+        target = parse_health_url(service.name, service.host_ip, service.health_check)
+        if target is None:
+            invalid.append((service.name, str(service.health_check)))
+        else:
+            targets.append(target)
+    return targets, invalid
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve stand-in health endpoints for a connectivity spec')
+    parser.add_argument('--config', '-c', default='planning/specifications/connectivity-port-mapping.yml',
+                        help='Connectivity spec whose health_check URLs are served')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to delay every response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--ephemeral-ports', action='store_true',
+                        help='Bind ephemeral ports instead of the configured port numbers')
+    args = parser.parse_args(argv)
+
+    import spec_loader
+    from connectivity_model import compile_spec
+
+    targets, _ = targets_from_model(compile_spec(spec_loader.load_yaml(args.config)))
+    with StandInServer(targets, args.latency, args.failure_rate, same_ports=not args.ephemeral_ports) as server:
+        print(f"🩺 Serving {len(targets)} health endpoints on {len(server.servers)} loopback port(s)")
+        print("   Probe them with:")
+        print(f"   validate-connectivity.py --probe-health {' '.join(server.resolve_arguments())}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
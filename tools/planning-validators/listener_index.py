@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+DoggPack Listener Index
+
+Parses saved `ss -tulpn`, `netstat -tulpn` and `docker ps` output (or the
+same commands run locally) into a per-host index of listening sockets and
+published container ports, then compares it with every port the spec
+allocates in one pass. This answers which ports are held by the wrong
+process or container and which declared services are not listening, without
+a connection attempt per port.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from connectivity_model import ConnectivityModel
+
+WILDCARD = '*'
+WILDCARD_ADDRESSES = {'', '*', '0.0.0.0', '::', '::0'}
+
+# Processes that forward published container ports; the container is known from `docker ps`
+DOCKER_PROCESSES = {'docker-proxy', 'dockerd', 'containerd', 'rootlesskit', 'slirp4netns', 'com.docker.backend'}
+
+# `ss` states of listening TCP and bound UDP sockets
+LISTENING_STATES = {'LISTEN', 'UNCONN'}
+
+# Commands run by `--listeners HOST=local`; the first ss/netstat found is used
+LOCAL_COMMANDS = (
+    (('ss', '-tulpn'), ('netstat', '-tulpn')),
+    (('docker', 'ps', '--format', 'table {{.Names}}\t{{.Ports}}'),),
+)
+
+# Published port in docker ps, e.g. 0.0.0.0:8100->8080/tcp or [::]:8000-8002->8000-8002/udp
+_PUBLISHED = re.compile(r'(?:(\[[0-9a-fA-F:]*\]|[0-9a-fA-F.:]*):)?(\d+)(?:-(\d+))?->(\d+)(?:-\d+)?/(tcp|udp|sctp)')
+# One process in ss's users:(("name",pid=1,fd=3),...) column
+_SS_PROCESS = re.compile(r'\("([^"]*)",pid=(\d+)')
+
+
+class Listener:
+    """A socket listening on a host port, or a container port published on it"""
+    __slots__ = ('protocol', 'address', 'port', 'process', 'pid', 'container', 'source', 'line')
+
+    def __init__(self, protocol: str, address: str, port: int, process: str = '', pid: Optional[int] = None,
+                 container: str = '', source: str = '', line: int = 0):
+        self.protocol = protocol
+        # Bound address, or WILDCARD for every address of the host
+        self.address = address
+        self.port = port
+        self.process = process
+        self.pid = pid
+        # Container publishing the port, from docker ps
+        self.container = container
+        # Snapshot and line the listener was read from
+        self.source = source
+        self.line = line
+
+    @property
+    def where(self) -> str:
+        return f"{self.source}:{self.line}"
+
+    @property
+    def docker(self) -> bool:
+        return bool(self.container) or self.process in DOCKER_PROCESSES
+
+    def serves(self, host_ip: str) -> bool:
+        """Whether connections to host_ip reach this socket"""
+        return self.address in (WILDCARD, host_ip)
+
+    def describe(self) -> str:
+        if self.container:
+            return f"container {self.container}"
+        if self.process:
+            return f"{self.process} (pid {self.pid})" if self.pid is not None else self.process
+        return "an unidentified process"
+
+
+def _address(text: str) -> Tuple[str, int]:
+    """(address, port) of ss/netstat's "0.0.0.0:8100", "[::]:8100", ":::8100" or "127.0.0.53%lo:53" """
+    address, _, port = text.rpartition(':')
+    address = address.strip('[]').split('%', 1)[0]
+    return (WILDCARD if address in WILDCARD_ADDRESSES else address), int(port)
+
+
+def _ss_processes(text: str) -> List[Tuple[str, Optional[int]]]:
+    return [(name, int(pid)) for name, pid in _SS_PROCESS.findall(text)] or [('', None)]
+
+
+def _netstat_process(text: str) -> Tuple[str, Optional[int]]:
+    """(program, pid) of "1234/docker-proxy"; netstat truncates names such as "800/sshd: /usr/sbin/s" """
+    pid, _, name = text.partition('/')
+    return (name.split()[0].rstrip(':') if name.strip() else '', int(pid)) if pid.isdigit() else ('', None)
+
+
+def _docker_columns(header: str) -> Dict[str, Tuple[int, Optional[int]]]:
+    """Start and end of the NAMES and PORTS columns of a docker ps header (cell indexes when tab-separated)"""
+    if '\t' in header:
+        cells = [name.strip() for name in header.split('\t')]
+        return {name: (index, None) for index, name in enumerate(cells) if name in ('NAMES', 'PORTS')}
+    starts = [match.start() for match in re.finditer(r'\S+(?: \S+)*', header)]
+    return {header[start:end].strip(): (start, end) for start, end in zip(starts, starts[1:] + [None])
+            if header[start:end].strip() in ('NAMES', 'PORTS')}
+
+
+def _docker_cell(line: str, columns: Dict[str, Tuple[int, Optional[int]]], name: str) -> str:
+    start, end = columns.get(name, (None, None))
+    if start is None:
+        return ''
+    if end is None and '\t' in line:
+        cells = line.split('\t')
+        return cells[start].strip() if start < len(cells) else ''
+    return line[start:end].strip()
+
+
+def parse_snapshot(text: str, source: str = '') -> List[Listener]:
+    """Listeners in ss, netstat or docker ps output; several outputs may be concatenated
+
+    Each header line switches the format. Header-less lines, as left by
+    `netstat -tulpn | grep LISTEN`, are recognised by their first columns.
+    """
+    listeners = []
+    mode = None
+    columns: Dict[str, Tuple[int, Optional[int]]] = {}
+    ss_netid = True
+    for number, line in enumerate(text.splitlines(), 1):
+        words = line.split()
+        if not words or words[0][0] in '#$' or words[0] == 'Active':
+            continue
+        first = words[0]
+        if first in ('Netid', 'State', 'Proto') and 'Local Address' in line:
+            mode, ss_netid = ('netstat', True) if first == 'Proto' else ('ss', first == 'Netid')
+            continue
+        if first.isupper() and 'PORTS' in words:
+            mode, columns = 'docker', _docker_columns(line)
+            continue
+
+        if mode == 'docker':
+            ports = _docker_cell(line, columns, 'PORTS')
+            if '->' not in ports:
+                continue
+            container = _docker_cell(line, columns, 'NAMES')
+            seen = set()
+            for match in _PUBLISHED.finditer(ports):
+                bound, start, end, _, protocol = match.groups()
+                bound = (bound or '').strip('[]')
+                address = WILDCARD if bound in WILDCARD_ADDRESSES else bound
+                for port in range(int(start), int(end or start) + 1):
+                    # docker ps lists IPv4 and IPv6 bindings of one port separately
+                    if (address, port, protocol) not in seen:
+                        seen.add((address, port, protocol))
+                        listeners.append(Listener(protocol, address, port, '', None, container, source, number))
+            continue
+
+        # ss and netstat rows, with or without their header
+        if first in ('tcp', 'udp') and len(words) > 5 and words[1] in LISTENING_STATES:
+            address, port = _address(words[4])
+            for process, pid in _ss_processes(' '.join(words[6:])):
+                listeners.append(Listener(first, address, port, process, pid, '', source, number))
+        elif first in ('tcp', 'tcp6', 'udp', 'udp6') and len(words) > 4 and words[1].isdigit():
+            protocol = first.rstrip('6')
+            # UDP rows usually have no State; the PID/Program column starts with a digit or "-"
+            stateful = len(words) > 5 and not words[5][0].isdigit() and words[5] != '-'
+            if protocol == 'tcp' and (not stateful or words[5] != 'LISTEN'):
+                continue
+            process, pid = _netstat_process(' '.join(words[6 if stateful else 5:]))
+            address, port = _address(words[3])
+            listeners.append(Listener(protocol, address, port, process, pid, '', source, number))
+        elif first in LISTENING_STATES and len(words) > 4 and (mode is None or mode == 'ss' and not ss_netid):
+            # ss -ltnp / -lunp leave out the Netid column
+            address, port = _address(words[3])
+            protocol = 'tcp' if first == 'LISTEN' else 'udp'
+            for process, pid in _ss_processes(' '.join(words[5:])):
+                listeners.append(Listener(protocol, address, port, process, pid, '', source, number))
+    return listeners
+
+
+def capture_local() -> str:
+    """Output of the local ss (or netstat) and docker ps commands, concatenated"""
+    import shutil
+    import subprocess
+
+    outputs = []
+    for alternatives in LOCAL_COMMANDS:
+        for command in alternatives:
+            if shutil.which(command[0]) is None:
+                continue
+            completed = subprocess.run(command, capture_output=True, text=True, timeout=30)
+            if completed.returncode == 0:
+                outputs.append(completed.stdout)
+                break
+    if not outputs:
+        raise OSError("neither ss, netstat nor docker could be run")
+    return '\n'.join(outputs)
+
+
+class ListenerIndex:
+    """Listeners per host IP, keyed by (protocol, port)"""
+
+    def __init__(self):
+        self.hosts: Dict[str, Dict[Tuple[str, int], List[Listener]]] = {}
+
+    def add(self, host_ip: str, listeners: Iterable[Listener]) -> int:
+        by_port = self.hosts.setdefault(host_ip, defaultdict(list))
+        count = 0
+        for listener in listeners:
+            by_port[(listener.protocol, listener.port)].append(listener)
+            count += 1
+        return count
+
+    def at(self, host_ip: str, protocol: str, port: int) -> List[Listener]:
+        by_port = self.hosts.get(host_ip)
+        return by_port.get((protocol, port), []) if by_port else []
+
+    def __len__(self) -> int:
+        return sum(len(listeners) for by_port in self.hosts.values() for listeners in by_port.values())
+
+
+def _ports(ports: List[int]) -> str:
+    """Compact "8100-8103, 8110" form of sorted ports"""
+    runs = []
+    for port in ports:
+        if runs and port == runs[-1][1] + 1:
+            runs[-1][1] = port
+        else:
+            runs.append([port, port])
+    return ', '.join(str(start) if start == end else f"{start}-{end}" for start, end in runs)
+
+
+def compare(model: ConnectivityModel, index: ListenerIndex) -> Tuple[int, List[Tuple[str, str, str, str]]]:
+    """(allocated ports compared, [(severity, code, message, YAML path)]) for the hosts in the index
+
+    CV705: a port is held by another process or container than the service
+    it is allocated to. CV706: a declared service is not listening.
+    CV707: it listens, but not on the address it is allocated on. CV708: a
+    port nothing allocates is in use inside a declared port range, where the
+    allocator would hand it out.
+    """
+    services = model.services_by_name
+    findings = []
+    compared = 0
+    allocated = defaultdict(set)
+    for host_ip in index.hosts:
+        for endpoint in model.endpoints_by_host.get(host_ip, ()):
+            service = services.get(endpoint.service)
+            owner = service.container_name if service and service.container_name else endpoint.service
+            missing, elsewhere = [], []
+            for port in endpoint.ports:
+                compared += 1
+                allocated[host_ip].add((endpoint.protocol, port))
+                listeners = index.at(host_ip, endpoint.protocol, port)
+                if not listeners:
+                    missing.append(port)
+                    continue
+                intruders = _intruders(listeners, (owner, endpoint.service))
+                if intruders:
+                    findings.append(('error', 'CV705',
+                                     f"Port {port}/{endpoint.protocol} on {model.hostname(host_ip)} is held by "
+                                     f"{intruders[0].describe()} ({intruders[0].where}), but allocated to "
+                                     f"{endpoint.service}", endpoint.path))
+                elif not any(listener.serves(host_ip) for listener in listeners):
+                    elsewhere.append((port, listeners[0].address))
+            if missing:
+                findings.append(('warning', 'CV706', f"{endpoint.service} is not listening on "
+                                 f"{host_ip}:{_ports(missing)}/{endpoint.protocol}", endpoint.path))
+            for port, address in elsewhere:
+                findings.append(('warning', 'CV707', f"{endpoint.service} listens on {address}:{port}, "
+                                 f"not on its allocated address {host_ip}", endpoint.path))
+
+    ranges = list(model.port_ranges.values())
+    for host_ip, by_port in index.hosts.items():
+        for (protocol, port), listeners in sorted(by_port.items(), key=lambda item: item[0][1]):
+            if (protocol, port) in allocated[host_ip]:
+                continue
+            bucket = next((port_range for port_range in ranges if port in port_range), None)
+            if bucket is not None:
+                findings.append(('warning', 'CV708',
+                                 f"Port {port}/{protocol} on {model.hostname(host_ip)} is in use by "
+                                 f"{listeners[0].describe()} but not allocated in the spec", bucket.path))
+    return compared, findings
+
+
+def _intruders(listeners: List[Listener], owners: Tuple[str, str]) -> List[Listener]:
+    """Listeners on an allocated port that belong neither to the service's container nor to the service"""
+    foreign = []
+    containers = []
+    owned = False
+    for listener in listeners:
+        if listener.container:
+            if listener.container in owners:
+                owned = True
+            else:
+                containers.append(listener)
+        elif listener.process and listener.process not in DOCKER_PROCESSES and listener.process not in owners:
+            # Without docker ps, a socket no container runtime owns is only known by its process name
+            foreign.append(listener)
+    return foreign if owned or not containers else containers + foreign
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+DoggPack Load Generator
+
+Drives HTTP endpoints with asyncio over pooled keep-alive connections, either
+closed-loop (a fixed number of clients sending back to back) or open-loop (a
+fixed request rate, whatever the server's response times). Latencies go into
+a log-linear histogram in the style of HdrHistogram; in open-loop runs they
+are measured from each request's scheduled send time, so a stalling server
+cannot hide its queueing delay (coordinated omission). Targets come from the
+`ab` commands in validation_procedures.performance_validation.load_testing or
+from service endpoints, and results are compared with the thresholds declared
+next to them.
+"""
+
+import math
+import re
+import shlex
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import health_prober
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+DEFAULT_REQUESTS = 1000
+DEFAULT_CONCURRENCY = 10
+DEFAULT_SIGNIFICANT_DIGITS = 2
+
+# Percentiles printed for every target
+REPORTED_PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Threshold keys such as p95_ms or p999_ms
+_PERCENTILE_KEY = re.compile(r'^p(\d+(?:\.\d+)?)_ms$')
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in microseconds, after HdrHistogram
+
+    Every recorded value is kept to `significant_digits` decimal digits of
+    precision at any magnitude: values are grouped into power-of-two buckets,
+    each split into the same number of linear sub-buckets. Recording is O(1)
+    and memory grows only with the logarithm of the largest value.
+    """
+    __slots__ = ('significant_digits', 'sub_bucket_half_count_magnitude', 'sub_bucket_half_count',
+                 'counts', 'total', 'min', 'max', 'sum')
+
+    def __init__(self, significant_digits: int = DEFAULT_SIGNIFICANT_DIGITS):
+        self.significant_digits = significant_digits
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_half_count_magnitude = int(math.log2(sub_bucket_count)) - 1
+        self.sub_bucket_half_count = sub_bucket_count // 2
+        self.counts: List[int] = []
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+        self.sum = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self.sub_bucket_half_count_magnitude - 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self.sub_bucket_half_count_magnitude) + sub_bucket - self.sub_bucket_half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value that is recorded at `index`"""
+        bucket = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self.sub_bucket_half_count
+            bucket = 0
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency in seconds at or below which `fraction` of the recorded requests fall"""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(fraction * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.total / 1_000_000 if self.total else None
+
+
+class LoadTarget:
+    """An endpoint to drive, with the request count and concurrency its source asked for"""
+    __slots__ = ('name', 'target', 'requests', 'concurrency', 'duration', 'source')
+
+    def __init__(self, name: str, target: health_prober.HealthTarget, requests: Optional[int] = None,
+                 concurrency: Optional[int] = None, duration: Optional[float] = None, source: str = ''):
+        self.name = name
+        self.target = target
+        self.requests = requests
+        self.concurrency = concurrency
+        self.duration = duration
+        # Where the target was declared, e.g. a YAML path
+        self.source = source
+
+    @property
+    def url(self) -> str:
+        return self.target.url
+
+
+def parse_ab_command(command: str, name: str = '', source: str = '') -> Optional[LoadTarget]:
+    """LoadTarget from an `ab -n N -c C [-t S] URL` command, or None when it is not one"""
+    try:
+        words = shlex.split(str(command))
+    except ValueError:
+        return None
+    if not words or words[0] != 'ab':
+        return None
+    options: Dict[str, str] = {}
+    url = None
+    words = iter(words[1:])
+    for word in words:
+        if word in ('-n', '-c', '-t', '-s'):
+            options[word] = next(words, '')
+        elif not word.startswith('-'):
+            url = word
+    target = health_prober.parse_health_url(name or url, '', url) if url else None
+    if target is None:
+        return None
+    try:
+        requests = int(options['-n']) if '-n' in options else None
+        concurrency = int(options['-c']) if '-c' in options else None
+        duration = float(options['-t']) if '-t' in options else None
+    except ValueError:
+        return None
+    return LoadTarget(name or url, target, requests, concurrency, duration, source)
+
+
+def targets_from_spec(config: Dict) -> Tuple[List[LoadTarget], List[Tuple[str, str]]]:
+    """Targets of the `ab` commands in performance_validation.load_testing, plus (path, command) of the rest"""
+    procedures = (config.get('validation_procedures') or {}).get('performance_validation') or {}
+    targets, skipped = [], []
+    for index, command in enumerate(procedures.get('load_testing') or []):
+        path = f"validation_procedures.performance_validation.load_testing[{index}]"
+        target = parse_ab_command(command, source=path)
+        if target is None:
+            skipped.append((path, str(command)))
+        else:
+            targets.append(target)
+    return targets, skipped
+
+
+def service_target(service) -> Optional[LoadTarget]:
+    """LoadTarget for the root of a service's host_port"""
+    if not service.host_port or not service.host_ip:
+        return None
+    url = f"http://{service.host_ip}:{service.host_port}/"
+    return LoadTarget(service.name, health_prober.parse_health_url(service.name, service.host_ip, url),
+                      source=f"{service.path}.host_port")
+
+
+def thresholds_from_spec(config: Dict) -> Dict[str, float]:
+    """performance_validation.thresholds: pNN_ms latency bounds, error_rate and min_rps"""
+    procedures = (config.get('validation_procedures') or {}).get('performance_validation') or {}
+    return {str(key): float(value) for key, value in (procedures.get('thresholds') or {}).items()}
+
+
+def percentile_of(key: str) -> Optional[float]:
+    """Fraction for a pNN_ms threshold key, NN being a percentage: p95_ms is 0.95, p99.9_ms 0.999, p100_ms 1.0"""
+    match = _PERCENTILE_KEY.match(key)
+    if not match:
+        return None
+    percent = float(match.group(1))
+    return round(percent / 100, 12) if 0 < percent <= 100 else None
+
+
+def percentile_label(fraction: float) -> str:
+    return f"p{round(fraction * 100, 3):g}"
+
+
+class LoadResult:
+    """Outcome of driving one target"""
+    __slots__ = ('target', 'mode', 'concurrency', 'rps', 'histogram', 'ok', 'errors', 'elapsed', 'connections')
+
+    def __init__(self, target: LoadTarget, mode: str, concurrency: int, rps: Optional[float]):
+        self.target = target
+        self.mode = mode
+        self.concurrency = concurrency
+        # Requested rate of an open-loop run
+        self.rps = rps
+        self.histogram = LatencyHistogram()
+        self.ok = 0
+        self.errors: Counter = Counter()
+        self.elapsed = 0.0
+        self.connections = 0
+
+    @property
+    def requests(self) -> int:
+        return self.ok + sum(self.errors.values())
+
+    @property
+    def achieved_rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.errors.values()) / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict:
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            'url': self.target.url,
+            'mode': self.mode,
+            'concurrency': self.concurrency,
+            'target_rps': self.rps,
+            'requests': self.requests,
+            'ok': self.ok,
+            'achieved_rps': round(self.achieved_rps, 1),
+            'error_rate': round(self.error_rate, 4),
+            'errors': dict(self.errors),
+            **{f"{percentile_label(fraction)}_ms": ms(self.histogram.percentile(fraction))
+               for fraction in REPORTED_PERCENTILES},
+            'max_ms': ms(self.histogram.max / 1_000_000 if self.histogram.total else None),
+        }
+
+    def check(self, thresholds: Dict[str, float]) -> List[Tuple[str, str, str]]:
+        """(severity, code, message) for every threshold this run misses"""
+        findings = []
+        if not self.ok:
+            reasons = ', '.join(f"{error} ×{count}" for error, count in self.errors.most_common(3))
+            return [('error', 'CV811', f"{self.target.name}: all {self.requests} requests failed ({reasons})")]
+        for key, limit in thresholds.items():
+            fraction = percentile_of(key)
+            if fraction is not None:
+                value = self.histogram.percentile(fraction) * 1000
+                if value > limit:
+                    findings.append(('error', 'CV812', f"{self.target.name}: {percentile_label(fraction)} latency "
+                                                       f"{value:.1f} ms exceeds {limit:g} ms"))
+            elif key == 'error_rate' and self.error_rate > limit:
+                findings.append(('error', 'CV813', f"{self.target.name}: error rate {self.error_rate:.2%} exceeds "
+                                                   f"{limit:.2%} ({sum(self.errors.values())}/{self.requests})"))
+            elif key == 'min_rps' and self.achieved_rps < limit:
+                findings.append(('warning', 'CV814', f"{self.target.name}: {self.achieved_rps:.1f} req/s is below "
+                                                     f"the required {limit:g} req/s"))
+        # An open-loop run that could not keep its schedule understates the load it was meant to apply
+        if self.mode == OPEN and self.rps and self.achieved_rps < self.rps * 0.9:
+            findings.append(('warning', 'CV814', f"{self.target.name}: held {self.achieved_rps:.1f} of the "
+                                                 f"requested {self.rps:g} req/s"))
+        return findings
+
+
+class LoadGenerator:
+    """Closed- or open-loop HTTP load over one keep-alive connection pool per target"""
+
+    def __init__(self, timeout: float = health_prober.DEFAULT_TIMEOUT, resolve: Dict = None):
+        self.timeout = timeout
+        self.resolve = resolve or {}
+
+    def _connect_to(self, target: health_prober.HealthTarget) -> Tuple[str, int]:
+        for key in ((target.host, target.port), (target.host, None)):
+            if key in self.resolve:
+                host, port = self.resolve[key]
+                return host or target.host, port or target.port
+        return target.host, target.port
+
+    async def _request(self, pool, host_header: str, path: str, started: float, result: LoadResult) -> None:
+        """One request; latency counts from `started`, which may be its scheduled time"""
+        import asyncio
+
+        try:
+            status, _ = await asyncio.wait_for(pool.request(host_header, path), self.timeout)
+        except asyncio.TimeoutError:
+            result.errors[f"timeout after {self.timeout:g}s"] += 1
+            return
+        except (OSError, EOFError, asyncio.IncompleteReadError, ValueError) as e:
+            result.errors[str(e) or type(e).__name__] += 1
+            return
+        if status >= health_prober.HEALTHY_BELOW:
+            result.errors[f"HTTP {status}"] += 1
+            return
+        result.ok += 1
+        result.histogram.record(time.perf_counter() - started)
+
+    async def run_async(self, load: LoadTarget, mode: str = CLOSED, requests: Optional[int] = None,
+                        duration: Optional[float] = None, concurrency: Optional[int] = None,
+                        rps: Optional[float] = None) -> LoadResult:
+        """Drive one target until `requests` have been sent or `duration` seconds have passed
+
+        Closed-loop runs keep `concurrency` requests in flight. Open-loop runs
+        send `rps` requests per second over up to `concurrency` connections;
+        requests waiting for a connection count that wait as latency.
+        """
+        import asyncio
+
+        target = load.target
+        requests = requests or load.requests
+        duration = duration or load.duration
+        if requests is None and duration is None:
+            requests = DEFAULT_REQUESTS
+        concurrency = max(1, concurrency or load.concurrency or DEFAULT_CONCURRENCY)
+        if mode == OPEN and not rps:
+            raise ValueError("an open-loop run needs a request rate")
+
+        result = LoadResult(load, mode, concurrency, rps if mode == OPEN else None)
+        host, port = self._connect_to(target)
+        # TLS names the declared host, wherever --resolve sends the connections
+        pool = health_prober.ConnectionPool(target.scheme, host, port, concurrency, self.timeout, target.host)
+        default_port = 443 if target.scheme == 'https' else 80
+        host_header = target.host if target.port == default_port else f"{target.host}:{target.port}"
+
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+        try:
+            if mode == OPEN:
+                in_flight = set()
+                sent = 0
+                while requests is None or sent < requests:
+                    due = start + sent / rps
+                    if deadline is not None and due >= deadline:
+                        break
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    task = asyncio.ensure_future(self._request(pool, host_header, target.path, due, result))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    sent += 1
+                if in_flight:
+                    await asyncio.gather(*in_flight)
+            else:
+                remaining = [requests]
+
+                async def client():
+                    while remaining[0] is None or remaining[0] > 0:
+                        if deadline is not None and time.perf_counter() >= deadline:
+                            return
+                        if remaining[0] is not None:
+                            remaining[0] -= 1
+                        await self._request(pool, host_header, target.path, time.perf_counter(), result)
+
+                await asyncio.gather(*(client() for _ in range(concurrency)))
+        finally:
+            result.elapsed = time.perf_counter() - start
+            result.connections = pool.opened
+            pool.close()
+        return result
+
+    def run(self, load: LoadTarget, mode: str = CLOSED, requests: Optional[int] = None,
+            duration: Optional[float] = None, concurrency: Optional[int] = None,
+            rps: Optional[float] = None) -> LoadResult:
+        """Synchronous wrapper around run_async for non-async callers"""
+        import asyncio
+
+        return asyncio.run(self.run_async(load, mode, requests, duration, concurrency, rps))
+
+
+def format_result(result: LoadResult) -> List[str]:
+    """Report lines for one target"""
+    shape = (f"open loop at {result.rps:g} req/s over {result.concurrency} connection(s)" if result.mode == OPEN
+             else f"closed loop, {result.concurrency} client(s)")
+    lines = [f"   {result.target.name} ({shape})",
+             f"      {result.requests} requests in {result.elapsed:.2f}s = {result.achieved_rps:.1f} req/s, "
+             f"{sum(result.errors.values())} failed, {result.connections} connection(s)"]
+    if result.histogram.total:
+        columns = [f"{percentile_label(fraction)} {health_prober.format_ms(result.histogram.percentile(fraction))}"
+                   for fraction in REPORTED_PERCENTILES]
+        columns.append(f"max {health_prober.format_ms(result.histogram.max / 1_000_000)}")
+        lines.append(f"      ms: {'  '.join(columns)}")
+    for error, count in result.errors.most_common(3):
+        lines.append(f"      ⚠️  {error} ×{count}")
+    return lines
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+DoggPack Network Validator
+
+Turns every VLAN, swarm and bridge subnet into an integer address interval,
+finds all overlaps with a single sorted sweep, and checks container IP
+membership and uniqueness against hash indexes.
+"""
+
+import heapq
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from connectivity_model import ConnectivityModel, Network, Service
+
+DEFAULT_INFRASTRUCTURE_VLAN = '192.168.10.0/24'
+
+_UINT32 = struct.Struct('!I')
+
+
+def parse_ipv4(text) -> Optional[int]:
+    """Strictly parse a dotted-quad IPv4 address into an integer"""
+    try:
+        return _UINT32.unpack(socket.inet_pton(socket.AF_INET, str(text)))[0]
+    except (OSError, ValueError):
+        return None
+
+
+def format_ipv4(value: int) -> str:
+    return socket.inet_ntop(socket.AF_INET, _UINT32.pack(value))
+
+
+class Subnet:
+    """A network as an inclusive integer address interval"""
+    __slots__ = ('name', 'kind', 'cidr', 'start', 'end', 'path')
+
+    def __init__(self, name: str, kind: str, cidr: str, start: int, end: int, path: str = ''):
+        self.name = name
+        self.kind = kind
+        self.cidr = cidr
+        self.start = start
+        self.end = end
+        self.path = path
+
+    def __contains__(self, address: int) -> bool:
+        return self.start <= address <= self.end
+
+    @property
+    def is_docker(self) -> bool:
+        return self.kind != 'vlan'
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.cidr})"
+
+
+def parse_subnet(network: Network) -> Subnet:
+    """Parse a network's CIDR, rejecting host bits set past the prefix"""
+    address, _, prefix = str(network.subnet).partition('/')
+    start = parse_ipv4(address)
+    if start is None or not prefix.isdigit() or not 0 <= int(prefix) <= 32:
+        raise ValueError(f"invalid CIDR {network.subnet}")
+    host_bits = 32 - int(prefix)
+    if start & ((1 << host_bits) - 1):
+        raise ValueError(f"{network.subnet} has host bits set")
+    return Subnet(network.name, network.kind, str(network.subnet), start, start + (1 << host_bits) - 1,
+                  network.path)
+
+
+def compile_subnets(model: ConnectivityModel) -> Tuple[List[Subnet], List[Tuple[str, str]]]:
+    """Parse every declared subnet once, collecting (message, YAML path) parse errors"""
+    subnets = []
+    errors = []
+    for network in model.networks:
+        if not network.subnet:
+            continue
+        try:
+            subnets.append(parse_subnet(network))
+        except ValueError as e:
+            kind = 'VLAN' if network.kind == 'vlan' else 'Docker network'
+            errors.append((f"Invalid subnet for {kind} {network.name}: {e}", network.path))
+    return subnets, errors
+
+
+def find_overlaps(subnets: List[Subnet]) -> List[Tuple[Subnet, Subnet]]:
+    """All overlapping subnet pairs via one sort and sweep, O(n log n + k)"""
+    overlaps = []
+    active: List[Tuple[int, int, Subnet]] = []
+    for seq, subnet in enumerate(sorted(subnets, key=lambda s: (s.start, s.end))):
+        while active and active[0][0] < subnet.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            overlaps.append((other, subnet))
+        heapq.heappush(active, (subnet.end, seq, subnet))
+    return overlaps
+
+
+def describe_overlap(first: Subnet, second: Subnet) -> str:
+    if first.is_docker and second.is_docker:
+        return f"Docker networks overlap: {first.label} and {second.label}"
+    return f"Networks overlap: {first.kind} {first.label} and {second.kind} {second.label}"
+
+
+def infrastructure_vlan(model: ConnectivityModel, subnets: List[Subnet]) -> Optional[Subnet]:
+    """The declared infrastructure VLAN, falling back to the historical default"""
+    for subnet in subnets:
+        if subnet.kind == 'vlan' and subnet.name == 'infrastructure':
+            return subnet
+    if any(network.kind == 'vlan' and network.name == 'infrastructure' for network in model.networks):
+        return None
+    return parse_subnet(Network('infrastructure', 'vlan', DEFAULT_INFRASTRUCTURE_VLAN))
+
+
+def check_container_ips(services: List[Service], subnets: List[Subnet]) -> List[Tuple[str, str]]:
+    """Each container_ip must parse, sit inside its docker_network and be unique
+
+    Returns (message, YAML path) pairs.
+    """
+    errors = []
+    docker_subnets: Dict[str, Subnet] = {subnet.name: subnet for subnet in subnets if subnet.is_docker}
+    owners: Dict[int, str] = {}
+
+    for service in services:
+        if not service.container_ip:
+            continue
+        path = f"{service.path}.container_ip"
+        address = parse_ipv4(service.container_ip)
+        if address is None:
+            errors.append((f"Invalid container IP for {service.name}: {service.container_ip}", path))
+            continue
+
+        if address in owners:
+            errors.append((f"Container IP {service.container_ip} assigned to both "
+                           f"{owners[address]} and {service.name}", path))
+        else:
+            owners[address] = service.name
+
+        if not service.docker_network:
+            continue
+        subnet = docker_subnets.get(service.docker_network)
+        if subnet is None:
+            errors.append((f"{service.name} uses undeclared Docker network {service.docker_network}",
+                           f"{service.path}.docker_network"))
+        elif address not in subnet:
+            errors.append((f"Container IP {service.container_ip} of {service.name} "
+                           f"outside Docker network {subnet.label}", path))
+        elif subnet.end - subnet.start > 1 and address in (subnet.start, subnet.end):
+            errors.append((f"Container IP {service.container_ip} of {service.name} is the "
+                           f"network or broadcast address of {subnet.label}", path))
+    return errors
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+DoggPack Deployment Step Graph
+
+Builds the dependency DAG of a plan's deployment_steps, detects dangling
+references and cycles, computes the critical path, and list-schedules the
+steps onto their execution instances (CDTZ, CCN, CCW) to estimate a
+realistic makespan.
+"""
+
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+VALID_INSTANCES = ('CDTZ', 'CCN', 'CCW')
+
+_DURATION_UNITS = {
+    's': 1 / 60, 'sec': 1 / 60, 'secs': 1 / 60, 'second': 1 / 60, 'seconds': 1 / 60,
+    'm': 1, 'min': 1, 'mins': 1, 'minute': 1, 'minutes': 1,
+    'h': 60, 'hr': 60, 'hrs': 60, 'hour': 60, 'hours': 60,
+}
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*([a-z]+)')
+# What may separate the parts of '1h 30m', '1 hour, 30 minutes' or '1 hour and 30 minutes'
+_DURATION_SEPARATOR = re.compile(r'^\s*(?:,\s*)?(?:and)?\s*$')
+
+
+def parse_duration(text) -> Optional[float]:
+    """Parse '5 minutes', '1.5 hours', '30 seconds', '1h 30m' or '2-3 hours' into minutes
+
+    Ranges resolve to their upper bound so schedules stay conservative.
+    """
+    if isinstance(text, bool):
+        return None
+    if isinstance(text, (int, float)):
+        return float(text) if text >= 0 else None
+    if not isinstance(text, str):
+        return None
+    text = text.strip().lower()
+    total = 0.0
+    position = 0
+    for match in _DURATION_PART.finditer(text):
+        gap = text[position:match.start()]
+        if gap.strip() if position == 0 else not _DURATION_SEPARATOR.match(gap):
+            return None
+        unit = _DURATION_UNITS.get(match.group(3))
+        if unit is None:
+            return None
+        total += float(match.group(2) or match.group(1)) * unit
+        position = match.end()
+    if position == 0 or text[position:].strip():
+        return None
+    return total
+
+
+def parse_instances(assigned_to) -> List[str]:
+    """Split an assigned_to value such as 'CCN,CCW' into instance names"""
+    if not isinstance(assigned_to, str):
+        return []
+    return [part.strip() for part in assigned_to.split(',') if part.strip()]
+
+
+class StepNode:
+    """A deployment step in the dependency graph"""
+    __slots__ = ('name', 'index', 'instances', 'duration', 'dependencies', 'parents',
+                 'dependents', 'start', 'finish', 'rank')
+
+    def __init__(self, name: str, index: int, instances: List[str], duration: float,
+                 dependencies: List[str]):
+        self.name = name
+        self.index = index
+        self.instances = instances
+        self.duration = duration
+        self.dependencies = dependencies
+        # Indexes of the steps this one waits for, and of the steps waiting for it
+        self.parents: List[int] = []
+        self.dependents: List[int] = []
+        self.start = 0.0
+        self.finish = 0.0
+        # Longest duration from the start of this step to the end of the plan
+        self.rank = 0.0
+
+
+class PlanSchedule:
+    """Critical path and per-instance timeline for a plan"""
+
+    def __init__(self):
+        self.serial_total = 0.0
+        self.critical_path: List[str] = []
+        self.critical_length = 0.0
+        self.makespan = 0.0
+        self.timelines: Dict[str, List[Tuple[float, float, str]]] = defaultdict(list)
+
+    @property
+    def parallelism(self) -> float:
+        return self.serial_total / self.makespan if self.makespan else 0.0
+
+    def idle(self, instance: str) -> float:
+        busy = sum(finish - start for start, finish, _ in self.timelines[instance])
+        return self.makespan - busy
+
+
+class StepGraph:
+    """Dependency DAG over a plan's deployment steps
+
+    Nodes are keyed by the step's position, so steps sharing a name are all
+    kept: each is reported in `duplicates`, and a dependency on the shared name
+    waits for every one of them. Steps that are not mappings are left out.
+    """
+
+    def __init__(self, steps: List[Dict]):
+        self.nodes: Dict[int, StepNode] = {}
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        # (name, index, index of the first step with the name) for every later step reusing a name
+        self.duplicates: List[Tuple[str, int, int]] = []
+        self.order: List[StepNode] = []
+        by_name: Dict[object, List[StepNode]] = defaultdict(list)
+
+        for index, step in enumerate(steps):
+            name = step.get('name') if isinstance(step, dict) else None
+            if not isinstance(step, dict) or isinstance(name, (dict, list)):
+                continue
+            duration = parse_duration(step.get('estimated_duration', '0 minutes'))
+            if duration is None:
+                self.warnings.append(f"Step '{name}' has non-standard duration format: "
+                                     f"{step.get('estimated_duration')}")
+                duration = 0.0
+            dependencies = step.get('dependencies') or []
+            if isinstance(dependencies, str):
+                dependencies = [dependencies]
+            elif not isinstance(dependencies, list):
+                dependencies = []
+            node = StepNode(name, index, parse_instances(step.get('assigned_to')), duration,
+                            [dependency for dependency in dependencies if not isinstance(dependency, (dict, list))])
+            if by_name[name]:
+                self.duplicates.append((name, index, by_name[name][0].index))
+            by_name[name].append(node)
+            self.nodes[index] = node
+
+        for node in self.nodes.values():
+            for dependency in node.dependencies:
+                if dependency not in by_name:
+                    self.errors.append(f"Step '{node.name}' depends on unknown step '{dependency}'")
+                elif dependency == node.name:
+                    self.errors.append(f"Step '{node.name}' depends on itself")
+                else:
+                    for parent in by_name[dependency]:
+                        node.parents.append(parent.index)
+                        parent.dependents.append(node.index)
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[StepNode]:
+        """Kahn's algorithm in declaration order; reports a cycle if one exists"""
+        indegree = {index: len(node.parents) for index, node in self.nodes.items()}
+        ready = [index for index, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = self.nodes[heapq.heappop(ready)]
+            order.append(node)
+            for dependent in node.dependents:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+
+        if len(order) < len(self.nodes):
+            remaining = {index for index, degree in indegree.items() if degree > 0}
+            self.errors.append(f"Dependency cycle among steps: {' → '.join(self._find_cycle(remaining))}")
+        return order
+
+    def _find_cycle(self, candidates) -> List[str]:
+        """Walk dependencies inside the unresolved set until a step repeats
+
+        The cycle is returned in execution order, each step preceding the next.
+        """
+        start = min(candidates)
+        path = [start]
+        seen = {start: 0}
+        current = start
+        while True:
+            current = next(parent for parent in self.nodes[current].parents if parent in candidates)
+            if current in seen:
+                return [self.nodes[index].name for index in reversed(path[seen[current]:] + [current])]
+            seen[current] = len(path)
+            path.append(current)
+
+    def schedule(self) -> PlanSchedule:
+        """Critical path plus a greedy list schedule prioritized by remaining path length"""
+        result = PlanSchedule()
+        if self.errors:
+            return result
+
+        # Rank (bottom level) in reverse topological order
+        for node in reversed(self.order):
+            node.rank = node.duration + max((self.nodes[d].rank for d in node.dependents), default=0.0)
+
+        # Critical path: follow the highest-ranked successor from the highest-ranked root
+        roots = [node for node in self.order if not node.parents]
+        if roots:
+            node = max(roots, key=lambda n: (n.rank, -n.index))
+            result.critical_length = node.rank
+            while node:
+                result.critical_path.append(node.name)
+                successors = [self.nodes[d] for d in node.dependents]
+                node = max(successors, key=lambda n: (n.rank, -n.index)) if successors else None
+
+        # Higher rank first; topological position breaks ties, which keeps the order valid
+        position = {node.index: i for i, node in enumerate(self.order)}
+        instance_free: Dict[str, float] = defaultdict(float)
+        for node in sorted(self.order, key=lambda n: (-n.rank, position[n.index])):
+            ready_at = max((self.nodes[d].finish for d in node.parents), default=0.0)
+            node.start = max([ready_at] + [instance_free[i] for i in node.instances])
+            node.finish = node.start + node.duration
+            for instance in node.instances:
+                instance_free[instance] = node.finish
+                result.timelines[instance].append((node.start, node.finish, node.name))
+            result.serial_total += node.duration
+            result.makespan = max(result.makespan, node.finish)
+
+        for timeline in result.timelines.values():
+            timeline.sort()
+        return result
+
+
+def format_minutes(minutes: float) -> str:
+    if minutes >= 60:
+        return f"{minutes / 60:.1f} hours"
+    if minutes and minutes < 1:
+        return f"{minutes * 60:.0f} seconds"
+    return f"{minutes:g} minutes"
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+DoggPack Deployment Plan Index
+
+Indexes every plan under planning/deployment-plans/ once by metadata.name,
+version and status, then resolves prerequisites.dependencies exactly by name
+in constant time. Computes each plan's transitive prerequisite closure and a
+valid rollout order for the active plans, and keeps the resources each plan
+requires of its target machines for capacity planning.
+"""
+
+import json
+import os
+import re
+from bisect import bisect
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from validation_cache import sha256_bytes
+
+PLAN_EXTENSIONS = ('.yml', '.yaml')
+
+# Directories under deployment-plans/ and the lifecycle state they imply
+STATES = ('active', 'completed', 'deprecated', 'templates')
+
+_DATED_FILENAME = re.compile(r'-\d{4}-\d{2}-\d{2}(?:-[A-Za-z]+)?$')
+
+# Dependency resolution outcomes
+SATISFIED = 'satisfied'
+PENDING = 'pending'
+DEPRECATED = 'deprecated'
+MISSING = 'missing'
+
+
+class PlanRecord:
+    """Identity, lifecycle, prerequisites and resource demands of one plan file"""
+    __slots__ = ('path', 'name', 'version', 'status', 'state', 'dependencies', 'parsed', 'resources')
+
+    def __init__(self, path: str, name: str, version: str, status: str, state: str,
+                 dependencies: List[Tuple[str, str]], parsed: bool = True,
+                 resources: Optional[List[Tuple[int, str, Dict]]] = None):
+        self.path = path
+        self.name = name
+        self.version = version
+        self.status = status
+        self.state = state
+        self.dependencies = dependencies
+        self.parsed = parsed
+        # (target_machines index, machine name, resources_required) per machine with requirements
+        self.resources = resources or []
+
+    @property
+    def completed(self) -> bool:
+        return self.state == 'completed' or self.status.startswith('completed')
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanRecord':
+        data = dict(data)
+        data['dependencies'] = [tuple(dependency) for dependency in data['dependencies']]
+        data['resources'] = [tuple(demand) for demand in data['resources']]
+        return cls(**data)
+
+
+def plan_state(path: str) -> str:
+    """Lifecycle state implied by the directory a plan lives in"""
+    parts = os.path.normpath(path).split(os.sep)
+    for part in reversed(parts[:-1]):
+        if part in STATES:
+            return part
+    return 'unknown'
+
+
+def plans_root(plan_file: str) -> str:
+    """The deployment-plans directory containing a plan, or its grandparent
+
+    Relative plan paths give a relative root so indexed paths read the same way.
+    """
+    directory = os.path.dirname(os.path.abspath(plan_file))
+    root = os.path.dirname(directory)
+    probe = directory
+    while probe != os.path.dirname(probe):
+        if os.path.basename(probe) == 'deployment-plans':
+            root = probe
+            break
+        probe = os.path.dirname(probe)
+    return root if os.path.isabs(plan_file) else os.path.relpath(root)
+
+
+def record_from_plan(path: str, plan) -> PlanRecord:
+    """Extract a PlanRecord from a parsed plan (or None when it failed to parse)"""
+    state = plan_state(path)
+    fallback_name = _DATED_FILENAME.sub('', os.path.splitext(os.path.basename(path))[0])
+    if not isinstance(plan, dict):
+        return PlanRecord(path, fallback_name, '', 'unparseable', state, [], parsed=False)
+
+    # Archived plans keep their identity at the top level rather than under metadata
+    metadata = plan.get('metadata') if isinstance(plan.get('metadata'), dict) else plan
+    prerequisites = plan.get('prerequisites') if isinstance(plan.get('prerequisites'), dict) else {}
+    dependencies = []
+    for dependency in prerequisites.get('dependencies') or []:
+        if isinstance(dependency, dict) and dependency.get('deployment'):
+            dependencies.append((str(dependency['deployment']), str(dependency.get('status', 'completed'))))
+    environment = plan.get('environment') if isinstance(plan.get('environment'), dict) else {}
+    resources = []
+    for i, machine in enumerate(environment.get('target_machines') or []):
+        if isinstance(machine, dict) and isinstance(machine.get('resources_required'), dict):
+            required = {str(key): value for key, value in machine['resources_required'].items()
+                        if not isinstance(value, (dict, list))}
+            resources.append((i, str(machine.get('name', '')), required))
+
+    return PlanRecord(path, str(metadata.get('name') or fallback_name), str(metadata.get('version', '')),
+                      str(metadata.get('status', '')), state, dependencies, resources=resources)
+
+
+class Resolution:
+    """How a single dependency resolved"""
+    __slots__ = ('name', 'outcome', 'record')
+
+    def __init__(self, name: str, outcome: str, record: Optional[PlanRecord] = None):
+        self.name = name
+        self.outcome = outcome
+        self.record = record
+
+
+class PlanIndex:
+    """Constant-time lookups over every plan in one or more plan trees"""
+
+    def __init__(self, records: Iterable[PlanRecord] = ()):
+        self.records: List[PlanRecord] = []
+        self.by_path: Dict[str, PlanRecord] = {}
+        self.by_name: Dict[str, List[PlanRecord]] = defaultdict(list)
+        self.by_version: Dict[Tuple[str, str], PlanRecord] = {}
+        self.by_status: Dict[str, List[PlanRecord]] = defaultdict(list)
+        self._closures: Dict[str, Set[str]] = {}
+        self._fingerprint: Optional[str] = None
+        for record in records:
+            self.add(record)
+
+    def add(self, record: PlanRecord) -> None:
+        self.records.append(record)
+        self.by_path[os.path.abspath(record.path)] = record
+        self.by_name[record.name].append(record)
+        self.by_version[(record.name, record.version)] = record
+        self.by_status[record.status].append(record)
+        self._closures.clear()
+        self._fingerprint = None
+
+    def discard(self, path: str) -> Optional[PlanRecord]:
+        """Remove the record of one plan file, returning it"""
+        record = self.by_path.pop(os.path.abspath(path), None)
+        if record is None:
+            return None
+        self.records.remove(record)
+        for lookup, key in ((self.by_name, record.name), (self.by_status, record.status)):
+            lookup[key].remove(record)
+            if not lookup[key]:
+                del lookup[key]
+        self._index_version(record.name, record.version)
+        self._closures.clear()
+        self._fingerprint = None
+        return record
+
+    def update(self, record: PlanRecord) -> Optional[PlanRecord]:
+        """Replace the record of a plan file after it changed, returning the previous one
+
+        Records are kept in the order build() indexes them, so every lookup
+        answers as it would after re-indexing the whole tree.
+        """
+        previous = self.discard(record.path)
+        for records in (self.records, self.by_name[record.name]):
+            records.insert(bisect([_tree_order(other) for other in records], _tree_order(record)), record)
+        self.by_path[os.path.abspath(record.path)] = record
+        self.by_status[record.status].append(record)
+        self._index_version(record.name, record.version)
+        self._closures.clear()
+        self._fingerprint = None
+        return previous
+
+    def _index_version(self, name: str, version: str) -> None:
+        # The last plan in tree order wins, as when records are added in order
+        self.by_version.pop((name, version), None)
+        for record in self.by_name.get(name, ()):
+            if record.version == version:
+                self.by_version[(name, version)] = record
+
+    @classmethod
+    def build(cls, roots: Iterable[str], cache=None, plans: Optional[Dict[str, object]] = None) -> 'PlanIndex':
+        """Index every plan under the given roots, parsing each file at most once
+
+        Already-parsed plans can be passed in `plans`; other files are read
+        through the validation cache when one is given, so unchanged files
+        are never re-parsed.
+        """
+        from spec_loader import parse_yaml
+
+        plans = {os.path.abspath(path): plan for path, plan in (plans or {}).items()}
+        index = cls()
+        for root in sorted(set(roots)):
+            for directory, _, files in sorted(os.walk(root)):
+                for name in sorted(files):
+                    if not name.endswith(PLAN_EXTENSIONS):
+                        continue
+                    path = os.path.normpath(os.path.join(directory, name))
+                    index.add(_load_record(path, plans, cache, parse_yaml))
+        return index
+
+    def fingerprint(self) -> str:
+        """Hash of everything dependency resolution reads from the index (memoized until it changes)"""
+        if self._fingerprint is None:
+            payload = sorted(
+                (os.path.relpath(r.path), r.name, r.version, r.status, r.state, r.dependencies)
+                for r in self.records
+            )
+            self._fingerprint = sha256_bytes(json.dumps(payload).encode())
+        return self._fingerprint
+
+    def get(self, path: str) -> Optional[PlanRecord]:
+        return self.by_path.get(os.path.abspath(path))
+
+    def resolve(self, name: str) -> Resolution:
+        """Resolve a dependency by exact plan name"""
+        candidates = self.by_name.get(name)
+        if not candidates:
+            return Resolution(name, MISSING)
+        for record in candidates:
+            if record.completed:
+                return Resolution(name, SATISFIED, record)
+        live = [record for record in candidates if record.state != 'deprecated']
+        if live:
+            return Resolution(name, PENDING, live[0])
+        return Resolution(name, DEPRECATED, candidates[0])
+
+    def closure(self, name: str) -> Set[str]:
+        """Every plan name transitively required by `name` (memoized)
+
+        Only complete closures are memoized, so plans on a dependency cycle
+        get the same answer whichever of them is asked first.
+        """
+        if name in self._closures:
+            return self._closures[name]
+        required: Set[str] = set()
+        pending = [name]
+        while pending:
+            for record in self.by_name.get(pending.pop(), ()):
+                for dependency, _ in record.dependencies:
+                    if dependency in required:
+                        continue
+                    required.add(dependency)
+                    known = self._closures.get(dependency)
+                    if known is not None:
+                        required |= known
+                    else:
+                        pending.append(dependency)
+        required.discard(name)
+        self._closures[name] = required
+        return required
+
+    def rollout_order(self) -> Tuple[List[str], List[str]]:
+        """Topological order of active plans; second item lists plans stuck in cycles"""
+        active = {record.name for record in self.records if record.state == 'active'}
+        pending = {name: {dependency for record in self.by_name[name] for dependency, _ in record.dependencies
+                          if dependency in active and dependency != name}
+                   for name in active}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for name, requirements in pending.items():
+            for requirement in requirements:
+                dependents[requirement].append(name)
+
+        ready = sorted(name for name, requirements in pending.items() if not requirements)
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in sorted(dependents[name]):
+                pending[dependent].discard(name)
+                if not pending[dependent]:
+                    ready.append(dependent)
+            ready.sort()
+        blocked = sorted(name for name, requirements in pending.items() if requirements)
+        return order, blocked
+
+
+def _tree_order(record: PlanRecord) -> Tuple[str, str]:
+    """Sort key matching the directory walk build() indexes plans in"""
+    return os.path.dirname(record.path), os.path.basename(record.path)
+
+
+def _load_record(path: str, plans: Dict[str, object], cache, parse_yaml) -> PlanRecord:
+    absolute = os.path.abspath(path)
+    if absolute in plans:
+        return record_from_plan(path, plans[absolute])
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    key = cache.key('plan-record', os.path.relpath(path), sha256_bytes(raw)) if cache else None
+    if key:
+        entry = cache.get(key)
+        if entry is not None:
+            return PlanRecord.from_dict(entry)
+
+    try:
+        plan = parse_yaml(raw.decode('utf-8'))
+    except Exception:
+        plan = None
+    record = record_from_plan(path, plan)
+    if key:
+        cache.put(key, record.as_dict())
+    return record
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+DoggPack Deployment Plan Schema
+
+Derives a schema from planning/deployment-plans/templates/deployment-plan-template.yml:
+the type of every section and field the template shows, enums from the
+values that spell out their choices ("low/medium/high"), duration, date and
+resource formats from its example values, and unique names within lists of
+named entries. The sections and fields every plan must have are layered on
+top, and the whole is compiled once into nested validator closures, so one
+traversal of a plan reports every violation with its YAML path instead of
+stopping at the first.
+"""
+
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import capacity_planner
+from plan_graph import VALID_INSTANCES, parse_duration, parse_instances
+from reporting import ERROR, WARNING, Finding
+from validation_cache import sha256_bytes
+
+TEMPLATE = (Path(__file__).resolve().parents[2] / 'planning' / 'deployment-plans' / 'templates'
+            / 'deployment-plan-template.yml')
+
+# Schema paths name list entries with [], as in 'deployment_steps[].name'
+# Sections and fields every plan must have, and the code reporting any that are missing
+REQUIRED = {
+    '': (('metadata', 'description', 'environment', 'deployment_steps', 'rollback_plan'), 'DP101'),
+    'metadata': (('name', 'version', 'created_date', 'status'), 'DP102'),
+    'deployment_steps[]': (('name', 'assigned_to', 'description', 'estimated_duration'), 'DP105'),
+    'rollback_plan': (('trigger_conditions', 'rollback_steps'), 'DP109'),
+    'environment': (('target_machines',), 'DP110'),
+}
+# Fields whose template value lists their choices
+ENUMS = ('metadata.created_by', 'metadata.status', 'metadata.risk_level')
+# Choices the template leaves out: plans moved to deprecated/ say so in their status
+EXTRA_CHOICES = {'metadata.status': ('deprecated',)}
+# Fields naming one or more Claude instances ("CCN,CCW"), and the code reporting any other
+INSTANCE_FIELDS = {'deployment_steps[].assigned_to': 'DP107'}
+# Lists that must not be empty, and the code reporting an empty one
+NON_EMPTY = {'deployment_steps': 'DP103'}
+# Lists of named entries are unique by name; these by another key
+UNIQUE_KEYS = {'prerequisites.dependencies': 'deployment'}
+# Codes for a value of the wrong type, and for a duplicate entry, where not DP115 and DP117
+TYPE_CODES = {'': 'DP002', 'deployment_steps': 'DP103', 'deployment_steps[]': 'DP104'}
+DUPLICATE_CODES = {'deployment_steps': 'DP106'}
+# Findings a template is exempt from: it lists every choice where a plan makes one
+PLACEHOLDER_CODES = ('DP114', 'DP116')
+
+MAPPING = 'mapping'
+LIST = 'list'
+TEXT = 'text'
+NUMBER = 'number'
+BOOLEAN = 'boolean'
+ANY = 'any'
+
+_TYPES = {
+    MAPPING: (dict,),
+    LIST: (list,),
+    TEXT: (str, int, float, date),
+    NUMBER: (int, float),
+    BOOLEAN: (bool,),
+}
+_KIND_NAMES = {MAPPING: 'a mapping', LIST: 'a list', TEXT: 'text', NUMBER: 'a number', BOOLEAN: 'true or false'}
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATE_PLACEHOLDER = 'YYYY-MM-DD'
+
+# A place in a plan as (parent, key or index), None at the top; rendered only for findings
+NodePath = Optional[Tuple]
+# check(value, path, findings) appends what is wrong with value at path
+Check = Callable[[object, NodePath, List[Finding]], None]
+
+
+class Field:
+    """What the schema expects at one place in a plan"""
+    __slots__ = ('kind', 'fields', 'items', 'required', 'missing_code', 'choices', 'format', 'unique')
+
+    def __init__(self, kind: str = ANY):
+        self.kind = kind
+        self.fields: Dict[str, 'Field'] = {}
+        self.items: Optional[Field] = None
+        self.required: Tuple[str, ...] = ()
+        self.missing_code = ''
+        self.choices: Tuple[str, ...] = ()
+        # 'duration', 'date' or 'resource:<cpu|memory|disk>'
+        self.format = ''
+        self.unique = ''
+
+
+def render(path: NodePath) -> str:
+    """A path as findings show it, such as 'deployment_steps[2].assigned_to'"""
+    parts = []
+    while path is not None:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return ''.join(reversed(parts)).lstrip('.')
+
+
+def describe(value) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return _KIND_NAMES[BOOLEAN]
+    for kind in (MAPPING, LIST, NUMBER, TEXT):
+        if isinstance(value, _TYPES[kind]):
+            return _KIND_NAMES[kind]
+    return type(value).__name__
+
+
+def from_template(value, key: str = '', parent: str = '') -> Field:
+    """The field an example value in the template describes"""
+    if isinstance(value, dict):
+        field = Field(MAPPING)
+        for child_key, child in value.items():
+            field.fields[str(child_key)] = from_template(child, str(child_key), key)
+        return field
+    if isinstance(value, list):
+        field = Field(LIST)
+        entries = [from_template(entry, key, parent) for entry in value]
+        if entries and all(entry.kind == MAPPING for entry in entries):
+            # Entries of a list of mappings may each show different optional keys
+            field.items = entries[0]
+            for entry in entries[1:]:
+                for child_key, child in entry.fields.items():
+                    field.items.fields.setdefault(child_key, child)
+            if 'name' in field.items.fields:
+                field.unique = 'name'
+        else:
+            field.items = entries[0] if entries else Field()
+        return field
+    if value is None:
+        return Field()
+    if isinstance(value, bool):
+        return Field(BOOLEAN)
+    if isinstance(value, (int, float)):
+        return Field(NUMBER)
+    field = Field(TEXT)
+    if parent == 'resources_required' and key in capacity_planner.RESOURCES:
+        field.format = f"resource:{key}"
+    elif isinstance(value, date) or value == _DATE_PLACEHOLDER:
+        field.format = 'date'
+    elif isinstance(value, str) and parse_duration(value) is not None:
+        field.format = 'duration'
+    return field
+
+
+def _at(root: Field, path: str) -> Field:
+    """The field at a schema path, creating any the template does not show"""
+    field = root
+    for part in path.split('.') if path else ():
+        name, entries = (part[:-2], True) if part.endswith('[]') else (part, False)
+        if field.kind == ANY:
+            field.kind = MAPPING
+        field = field.fields.setdefault(name, Field())
+        if entries:
+            if field.kind == ANY:
+                field.kind = LIST
+            if field.items is None:
+                field.items = Field()
+            field = field.items
+    return field
+
+
+def derive_schema(template) -> Field:
+    """The template's fields with the required fields, enums and uniqueness rules applied"""
+    root = from_template(template) if isinstance(template, dict) else Field(MAPPING)
+    for path, (fields, code) in REQUIRED.items():
+        field = _at(root, path)
+        field.kind = MAPPING
+        field.required = fields
+        field.missing_code = code
+        for name in fields:
+            _at(field, name)
+    for path in ENUMS:
+        field = _at(root, path)
+        example = template_value(template, path)
+        if isinstance(example, str) and '/' in example:
+            field.choices = tuple(choice.strip() for choice in example.split('/')) + EXTRA_CHOICES.get(path, ())
+    for path in NON_EMPTY:
+        _at(root, path).kind = LIST
+    for path, key in UNIQUE_KEYS.items():
+        field = _at(root, path)
+        field.kind = LIST
+        field.unique = key
+    return root
+
+
+def template_value(template, path: str):
+    """The template's example value at a schema path without list entries, or None"""
+    value = template
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _type_error(expected: str, code: str) -> Check:
+    def check(value, path, findings):
+        where = render(path)
+        findings.append(Finding(code, ERROR, f"{where or 'Plan'} must be {expected}, not {describe(value)}", where))
+    return check
+
+
+def _compile(field: Field, where: str) -> Check:
+    """A closure checking a value against `field`, found at schema path `where`"""
+    if field.kind == ANY:
+        return None
+    types = _TYPES[field.kind]
+    type_error = _type_error(_KIND_NAMES[field.kind], TYPE_CODES.get(where, 'DP115'))
+    boolean = field.kind == BOOLEAN
+
+    if field.kind == MAPPING:
+        prefix = f"{where}." if where else ''
+        children = {key: _compile(child, prefix + key) for key, child in field.fields.items()}
+        children = {key: child for key, child in children.items() if child is not None}
+        required = set(field.required)
+        missing_code = field.missing_code
+        missing_label = 'sections' if not where else 'fields'
+
+        def check(value, path, findings):
+            if not isinstance(value, dict):
+                type_error(value, path, findings)
+                return
+            if required and not required.issubset(value):
+                missing = [key for key in field.required if key not in value]
+                where = render(path)
+                message = f"Missing required {missing_label}{f' in {where}' if where else ''}: {', '.join(missing)}"
+                findings.append(Finding(missing_code, ERROR, message, where))
+            # Plans fill in fewer fields than the template shows, so walk the plan's
+            for key, item in value.items():
+                child = children.get(key)
+                # A required field left blank is as good as missing
+                if child is not None and (item is not None or key in required):
+                    child(item, (path, key), findings)
+        return check
+
+    if field.kind == LIST:
+        entries = _compile(field.items, f"{where}[]") if field.items is not None else None
+        entry_mappings = field.items is not None and field.items.kind == MAPPING
+        empty_code = NON_EMPTY.get(where)
+        unique = field.unique
+        duplicate_code = DUPLICATE_CODES.get(where, 'DP117')
+
+        def check(value, path, findings):
+            if not isinstance(value, list):
+                type_error(value, path, findings)
+                return
+            if empty_code and not value:
+                where = render(path)
+                findings.append(Finding(empty_code, ERROR, f"{where} must be a non-empty list", where))
+            seen = {}
+            for i, item in enumerate(value):
+                if item is None and not entry_mappings:
+                    continue
+                if entries is not None:
+                    entries(item, (path, i), findings)
+                if unique and isinstance(item, dict):
+                    key = item.get(unique)
+                    if isinstance(key, (str, int, float)) and not isinstance(key, bool):
+                        if key in seen:
+                            where = render(path)
+                            findings.append(Finding(duplicate_code, ERROR,
+                                                    f"Duplicate {unique} in {where}: {key} (also {where}[{seen[key]}])",
+                                                    render(((path, i), unique))))
+                        else:
+                            seen[key] = i
+        return check
+
+    if where in INSTANCE_FIELDS:
+        code = INSTANCE_FIELDS[where]
+        valid = set(VALID_INSTANCES)
+
+        # Steps repeat a handful of assignments across every plan
+        known = set()
+
+        def check(value, path, findings):
+            if value.__class__ is str and value in known:
+                return
+            instances = parse_instances(value)
+            if instances and valid.issuperset(instances):
+                known.add(value)
+            else:
+                where = render(path)
+                findings.append(Finding(code, ERROR, f"{where} names an invalid instance: {value} "
+                                                     f"(one or more of {', '.join(VALID_INSTANCES)})", where))
+        return check
+
+    value_check = _format_check(field)
+
+    def check(value, path, findings):
+        if not isinstance(value, types) or (isinstance(value, bool) and not boolean):
+            type_error(value, path, findings)
+        elif value_check is not None:
+            value_check(value, path, findings)
+    return check
+
+
+def _format_check(field: Field) -> Optional[Check]:
+    if field.choices:
+        choices = set(field.choices)
+        listed = ', '.join(field.choices)
+
+        def check(value, path, findings):
+            if str(value) not in choices:
+                where = render(path)
+                findings.append(Finding('DP114', ERROR, f"{where} must be one of {listed}, not '{value}'", where))
+        return check
+    if field.format == 'duration':
+        known = set()
+
+        def check(value, path, findings):
+            if value in known:
+                return
+            if parse_duration(value) is not None:
+                known.add(value)
+            else:
+                where = render(path)
+                findings.append(Finding('DP112', WARNING, f"{where} has non-standard duration format: {value}", where))
+        return check
+    if field.format == 'date':
+        def check(value, path, findings):
+            if isinstance(value, date):
+                return
+            try:
+                if _ISO_DATE.match(str(value)):
+                    date.fromisoformat(value)
+                    return
+            except ValueError:
+                pass
+            where = render(path)
+            findings.append(Finding('DP116', WARNING, f"{where} should be a {_DATE_PLACEHOLDER} date, not '{value}'",
+                                    where))
+        return check
+    if field.format.startswith('resource:'):
+        resource = field.format.split(':', 1)[1]
+        label = capacity_planner.LABELS[resource]
+        hint = capacity_planner.UNIT_HINTS[resource]
+
+        def check(value, path, findings):
+            if capacity_planner.parse_quantity(resource, value) is None:
+                findings.append(Finding('DP111', WARNING, f"{label} specification '{value}' should be {hint}",
+                                        render(path)))
+        return check
+    return None
+
+
+class PlanSchema:
+    """A plan schema compiled into validator closures"""
+    __slots__ = ('root', 'template', 'fingerprint', 'problem', '_check')
+
+    def __init__(self, template_path: Optional[str] = None):
+        from spec_loader import load_yaml
+
+        self.template = str(template_path or TEMPLATE)
+        self.problem = ''
+        template = None
+        try:
+            with open(self.template, 'rb') as f:
+                content = f.read()
+            template = load_yaml(self.template)
+        except OSError as e:
+            content = b''
+            self.problem = f"Plan template unreadable ({e.strerror or e}): {self.template}"
+        except Exception as e:
+            self.problem = f"Plan template unparseable ({e}): {self.template}"
+        if template is not None and not isinstance(template, dict):
+            self.problem = f"Plan template is not a mapping: {self.template}"
+        self.fingerprint = sha256_bytes(content)
+        self.root = derive_schema(template)
+        self._check = _compile(self.root, '')
+
+    def validate(self, plan) -> List[Finding]:
+        """Every violation in the plan, in the order the plan lists its fields"""
+        findings: List[Finding] = []
+        if self.problem:
+            findings.append(Finding('DP004', WARNING, f"{self.problem}; checking required fields only"))
+        self._check(plan, None, findings)
+        return findings
+
+
+_schemas: Dict[str, Tuple[Tuple[int, int], PlanSchema]] = {}
+
+
+def load_schema(template_path: Optional[str] = None) -> PlanSchema:
+    """The compiled schema of a template, compiled again only once the template changes"""
+    template = str(template_path or TEMPLATE)
+    try:
+        stat = os.stat(template)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = (0, -1)
+    cached = _schemas.get(template)
+    if cached is None or cached[0] != signature:
+        cached = _schemas[template] = (signature, PlanSchema(template))
+    return cached[1]
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+DoggPack Port Conflict Engine
+
+Detects overlapping port claims with per-scope, per-protocol sorted interval
+indexes. Single ports, declared ranges and reserved ports are all inclusive
+intervals, so every overlap is found with one sort and sweep per group in
+O(n log n + k) for n intervals and k reported conflicts.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from connectivity_model import ConnectivityModel, parse_port_range
+
+# Interval kinds
+BINDING = 'binding'
+RESERVED = 'reserved'
+RANGE = 'range'
+
+# Scope of ports opened on the router's external interface
+ROUTER_SCOPE = 'router'
+# Scope of the port_allocation.port_ranges buckets, which apply to every host
+ALLOCATION_SCOPE = 'allocation'
+
+ANY_PROTOCOL = 'any'
+PROTOCOLS = ('tcp', 'udp')
+
+MIN_PORT = 1
+MAX_PORT = 65535
+
+# Service fields declaring an ingress listener, which may bind a reserved system port
+INGRESS_FIELDS = ('http_port', 'https_port')
+
+# port_allocation.port_ranges bucket a service is expected in, by a word in its name
+EXPECTED_RANGES = (
+    (('mcp', 'coordinator'), 'mcp_servers'),
+    (('monitoring', 'prometheus'), 'monitoring'),
+    (('api', 'gateway'), 'web_interfaces'),
+)
+# (word, bucket) in the order the words are tried; this runs once per service
+_RANGE_WORDS = tuple((word, bucket) for words, bucket in EXPECTED_RANGES for word in words)
+
+
+class PortInterval:
+    """An inclusive port interval claimed by an owner within a scope"""
+    __slots__ = ('scope', 'protocol', 'start', 'end', 'owner', 'field', 'kind', 'route', 'path')
+
+    def __init__(self, scope: str, protocol: str, start: int, end: int, owner: str,
+                 field: str = '', kind: str = BINDING, route: Optional[Tuple] = None, path: str = ''):
+        self.scope = scope
+        self.protocol = protocol
+        self.start = start
+        self.end = end
+        self.owner = owner
+        self.field = field
+        self.kind = kind
+        # Intervals that share a route describe the same binding and never conflict
+        self.route = route
+        # YAML path of the node that claims the ports
+        self.path = path
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner} ({self.field})" if self.field else self.owner
+
+    @property
+    def ports(self) -> str:
+        return str(self.start) if self.start == self.end else f"{self.start}-{self.end}"
+
+    def __repr__(self) -> str:
+        return f"PortInterval({self.scope}:{self.ports}/{self.protocol} {self.label} {self.kind})"
+
+
+class PortConflict:
+    """Two intervals that overlap in the same scope and protocol"""
+    __slots__ = ('first', 'second', 'protocol')
+
+    def __init__(self, first: PortInterval, second: PortInterval, protocol: str):
+        self.first = first
+        self.second = second
+        self.protocol = protocol
+
+    @property
+    def overlap(self) -> Tuple[int, int]:
+        return max(self.first.start, self.second.start), min(self.first.end, self.second.end)
+
+    @property
+    def kinds(self) -> Tuple[str, str]:
+        return self.first.kind, self.second.kind
+
+    def describe(self) -> str:
+        start, end = self.overlap
+        ports = str(start) if start == end else f"{start}-{end}"
+        return (f"Port conflict on {self.first.scope}:{ports}/{self.protocol}: "
+                f"{self.first.label}, {self.second.label}")
+
+
+def find_conflicts(intervals: Iterable[PortInterval]) -> List[PortConflict]:
+    """Report every overlapping pair of intervals within the same scope and protocol"""
+    groups: Dict[Tuple[str, str], List[PortInterval]] = defaultdict(list)
+    for interval in intervals:
+        protocols = PROTOCOLS if interval.protocol == ANY_PROTOCOL else (interval.protocol,)
+        for protocol in protocols:
+            groups[(interval.scope, protocol)].append(interval)
+
+    conflicts = []
+    for (scope, protocol) in sorted(groups):
+        group = groups[(scope, protocol)]
+        group.sort(key=lambda interval: (interval.start, interval.end))
+
+        # Min-heap of active intervals keyed by end port; every active entry
+        # overlaps the current interval, so scanning it costs only output size
+        active: List[Tuple[int, int, PortInterval]] = []
+        for seq, interval in enumerate(group):
+            while active and active[0][0] < interval.start:
+                heapq.heappop(active)
+            for _, _, other in active:
+                if other.route is not None and other.route == interval.route:
+                    continue
+                # Protocol-agnostic pairs are reported once, under tcp
+                if protocol != PROTOCOLS[0] and other.protocol == interval.protocol == ANY_PROTOCOL:
+                    continue
+                conflicts.append(PortConflict(other, interval, protocol))
+            heapq.heappush(active, (interval.end, seq, interval))
+
+    return conflicts
+
+
+def invalid_intervals(intervals: Iterable[PortInterval]) -> List[PortInterval]:
+    """Intervals that fall outside the valid TCP/UDP port space"""
+    return [interval for interval in intervals
+            if interval.start < MIN_PORT or interval.end > MAX_PORT]
+
+
+def binding_intervals(model: ConnectivityModel) -> List[PortInterval]:
+    """Host bindings from service port fields plus router-side external ports"""
+    intervals = []
+    for endpoint in model.endpoints:
+        intervals.append(PortInterval(
+            endpoint.host_ip, endpoint.protocol, endpoint.port, endpoint.end,
+            endpoint.service, endpoint.field, path=endpoint.path,
+        ))
+
+    for service in model.services:
+        bounds = parse_port_range(service.external_port) if service.external_port else None
+        if bounds:
+            intervals.append(PortInterval(
+                ROUTER_SCOPE, service.protocol, bounds[0], bounds[1],
+                service.name, 'external_port', route=(service.host_ip, service.host_port),
+                path=f"{service.path}.external_port",
+            ))
+
+    for rule in model.forwards:
+        bounds = parse_port_range(rule.external_port) if rule.external_port else None
+        if bounds:
+            owner = f"forward #{rule.index + 1}"
+            if rule.description:
+                owner += f" {rule.description}"
+            intervals.append(PortInterval(
+                ROUTER_SCOPE, rule.protocol, bounds[0], bounds[1],
+                owner, 'external_port', route=(rule.internal_ip, rule.internal_port),
+                path=f"{rule.path}.external_port",
+            ))
+    return intervals
+
+
+def reserved_intervals(model: ConnectivityModel, scopes: Iterable[str]) -> List[PortInterval]:
+    """Reserved system ports, applied to every host scope for both protocols"""
+    return [
+        PortInterval(scope, ANY_PROTOCOL, port, port, 'reserved system port', kind=RESERVED,
+                     path='port_allocation.reserved_system_ports')
+        for scope in scopes if scope != ROUTER_SCOPE
+        for port in model.reserved_ports
+    ]
+
+
+def claims_reserved(interval: PortInterval) -> bool:
+    """Whether a binding is a declared ingress listener, allowed on the reserved ports it serves"""
+    return interval.kind == BINDING and interval.field in INGRESS_FIELDS
+
+
+def range_intervals(model: ConnectivityModel) -> List[PortInterval]:
+    """Declared port_allocation.port_ranges buckets"""
+    return [
+        PortInterval(ALLOCATION_SCOPE, ANY_PROTOCOL, port_range.start, port_range.end,
+                     f"port range {name}", kind=RANGE, path=port_range.path)
+        for name, port_range in model.port_ranges.items()
+    ]
+
+
+def expected_range(service_name: str) -> Optional[str]:
+    """The port range a service's name says its host port belongs in, if any"""
+    name = service_name.lower()
+    for word, bucket in _RANGE_WORDS:
+        if word in name:
+            return bucket
+    return None
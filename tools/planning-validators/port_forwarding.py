@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+DoggPack Port Forwarding Validator
+
+Checks the router's port_forwarding.external_access rules and the services'
+external_port claims against each other and against the host bindings they
+route to. External ports are indexed by (protocol, port) and host bindings by
+(host IP, protocol, port), so collisions, orphaned forwards, exposed services
+without a route and rules outside the external port ranges are all found in
+one linear pass over bindings, rules and services.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from connectivity_model import ConnectivityModel, parse_port_range
+from port_conflicts import MAX_PORT, MIN_PORT
+
+# port_allocation.port_ranges buckets that external ports may be opened in
+FORWARD_RANGES = ('external_access', 'vpn_wireguard')
+
+class ExternalClaim:
+    """A router port opened by a forward rule or a service's external_port"""
+    __slots__ = ('owner', 'route', 'path')
+
+    def __init__(self, owner: str, route: Tuple[str, Optional[int]], path: str):
+        self.owner = owner
+        # (internal IP, internal port) the router sends the port to
+        self.route = route
+        self.path = path
+
+
+def _ports(value) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a port or "start-end" range within 1-65535"""
+    bounds = parse_port_range(value) if value not in (None, '') else None
+    if bounds and MIN_PORT <= bounds[0] and bounds[1] <= MAX_PORT:
+        return bounds
+    return None
+
+
+def _label(rule) -> str:
+    return f"forward #{rule.index + 1}" + (f" {rule.description}" if rule.description else '')
+
+
+def _describe(ports: Tuple[int, int]) -> str:
+    return str(ports[0]) if ports[0] == ports[1] else f"{ports[0]}-{ports[1]}"
+
+
+def _target(route: Tuple[str, Optional[int]]) -> str:
+    return route[0] if route[1] is None else f"{route[0]}:{route[1]}"
+
+
+def check_forwards(model: ConnectivityModel) -> Tuple[int, List[Tuple[str, str, str, str]]]:
+    """Validate the router table; returns (rules and exposed services examined, findings)
+
+    Findings are (severity, code, message, YAML path) tuples:
+      CV111 error    external or internal port missing or outside 1-65535
+      CV112 error    external port claimed by two different routes
+      CV113 error    forward to an address and port no service binds
+      CV114 warning  service with external_access and no forward to it
+      CV115 warning  service external_port differs from the forward routing to it
+      CV116 warning  external port outside the external_access/vpn_wireguard ranges
+    """
+    findings = []
+
+    # Reverse index of host bindings, one entry per bound port
+    bound: Dict[Tuple[str, str, int], str] = {}
+    for host_ip, endpoints in model.endpoints_by_host.items():
+        for endpoint in endpoints:
+            for port in endpoint.ports:
+                bound.setdefault((host_ip, endpoint.protocol, port), endpoint.service)
+    reserved = set(model.reserved_ports)
+    ranges = [model.port_ranges[name] for name in FORWARD_RANGES if name in model.port_ranges]
+
+    claims: Dict[Tuple[str, int], ExternalClaim] = {}
+    # External ports of the forwards reaching each service
+    routed: Dict[str, List[int]] = {}
+
+    def claim(protocol: str, external: Tuple[int, int], internal: Optional[int], owner: str,
+              host_ip: str, path: str) -> None:
+        for offset, port in enumerate(range(external[0], external[1] + 1)):
+            route = (host_ip, None if internal is None else internal + offset)
+            other = claims.setdefault((protocol, port), ExternalClaim(owner, route, path))
+            if other.route != route:
+                findings.append(('error', 'CV112',
+                                 f"External port {port}/{protocol} forwarded by both {other.owner} "
+                                 f"(to {_target(other.route)}) and {owner} (to {_target(route)})", path))
+                return
+        if ranges and not any(external[0] in port_range and external[1] in port_range for port_range in ranges):
+            findings.append(('warning', 'CV116',
+                             f"External port {_describe(external)}/{protocol} of {owner} is outside "
+                             f"the {' and '.join(port_range.name for port_range in ranges)} ranges", path))
+
+    for rule in model.forwards:
+        external = _ports(rule.external_port)
+        internal = _ports(rule.internal_port)
+        if external is None or internal is None or not rule.internal_ip:
+            field, value = (('external_port', rule.external_port) if external is None else
+                            ('internal_port', rule.internal_port) if internal is None else
+                            ('internal_ip', rule.internal_ip))
+            findings.append(('error', 'CV111', f"Invalid {field} for {_label(rule)}: {value}",
+                             f"{rule.path}.{field}"))
+            continue
+        claim(rule.protocol, external, internal[0], _label(rule), rule.internal_ip, f"{rule.path}.external_port")
+
+        # Every internal port must be bound by a service, or be a reserved system port (SSH, RDP, VPN)
+        orphans = []
+        for offset in range(external[1] - external[0] + 1):
+            port = internal[0] + offset
+            service = bound.get((rule.internal_ip, rule.protocol, port))
+            if service is not None:
+                routed.setdefault(service, []).append(external[0] + offset)
+            elif port not in reserved:
+                orphans.append(port)
+        if orphans:
+            other = next((protocol for protocol in ('tcp', 'udp') if protocol != rule.protocol
+                          and (rule.internal_ip, protocol, orphans[0]) in bound), None)
+            reason = f" (bound over {other} only)" if other else ''
+            findings.append(('error', 'CV113',
+                             f"{_label(rule)} forwards {rule.protocol} to {rule.internal_ip}:"
+                             f"{_describe((orphans[0], orphans[-1]))}, "
+                             f"which no service binds{reason}", f"{rule.path}.internal_port"))
+
+    exposed = 0
+    for service in model.services:
+        path = f"{service.path}.external_port"
+        external = None
+        if service.external_port not in (None, ''):
+            external = _ports(service.external_port)
+            if external is None:
+                findings.append(('error', 'CV111',
+                                 f"Invalid external_port for {service.name}: {service.external_port}", path))
+            else:
+                binding = next((endpoint for endpoint in service.endpoints if endpoint.field == 'host_port'), None)
+                claim(service.protocol, external, binding.port if binding else None, service.name,
+                      service.host_ip, path)
+        if not service.external_access:
+            continue
+        exposed += 1
+        forwarded = routed.get(service.name)
+        if not forwarded:
+            findings.append(('warning', 'CV114',
+                             f"{service.name} has external_access but no port_forwarding rule routes to it",
+                             f"{service.path}.external_access"))
+        elif external is not None and external[0] not in forwarded:
+            findings.append(('warning', 'CV115',
+                             f"{service.name} declares external_port {service.external_port}, but the router "
+                             f"forwards {', '.join(map(str, sorted(set(forwarded))))} to it", path))
+
+    return len(model.forwards) + exposed, findings
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+DoggPack Async Port Scanner
+
+Probes (host, port) pairs concurrently with asyncio so that a scan over many
+filtered ports completes in roughly one connect timeout instead of one
+timeout per port.
+"""
+
+import errno
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+OPEN = 'open'
+CLOSED = 'closed'
+FILTERED = 'filtered'
+
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_MAX_CONCURRENCY = 256
+DEFAULT_PER_HOST_LIMIT = 64
+
+# Errors that mean "nothing answered" rather than "the host said no"
+_UNREACHABLE_ERRNOS = {
+    errno.EHOSTUNREACH,
+    errno.ENETUNREACH,
+    errno.ETIMEDOUT,
+}
+
+
+class PortProbe:
+    """Result of probing a single host port"""
+    __slots__ = ('host', 'port', 'state', 'elapsed', 'detail')
+
+    def __init__(self, host: str, port: int, state: str, elapsed: float, detail: str = ''):
+        self.host = host
+        self.port = port
+        self.state = state
+        self.elapsed = elapsed
+        self.detail = detail
+
+    def __repr__(self) -> str:
+        return f"PortProbe({self.host}:{self.port} {self.state} {self.elapsed * 1000:.1f}ms)"
+
+
+async def _probe(host: str, port: int, timeout: float,
+                 global_limit: 'asyncio.Semaphore', host_limit: 'asyncio.Semaphore') -> PortProbe:
+    """Open and immediately close one TCP connection, classifying the outcome"""
+    import asyncio
+
+    # Wait for the host first, so a task queued behind a busy host holds no global slot
+    async with host_limit, global_limit:
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except asyncio.TimeoutError:
+            return PortProbe(host, port, FILTERED, time.perf_counter() - start,
+                             f"no response within {timeout:g}s")
+        except ConnectionRefusedError:
+            return PortProbe(host, port, CLOSED, time.perf_counter() - start)
+        except OSError as e:
+            state = FILTERED if e.errno in _UNREACHABLE_ERRNOS else CLOSED
+            return PortProbe(host, port, state, time.perf_counter() - start, str(e))
+
+        elapsed = time.perf_counter() - start
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return PortProbe(host, port, OPEN, elapsed)
+
+
+async def scan_ports_async(targets: Iterable[Tuple[str, int]],
+                           timeout: float = DEFAULT_TIMEOUT,
+                           max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                           per_host_limit: int = DEFAULT_PER_HOST_LIMIT) -> List[PortProbe]:
+    """Probe every (host, port) pair concurrently, bounded globally and per host"""
+    import asyncio
+
+    unique_targets = sorted(set((host, int(port)) for host, port in targets))
+    if not unique_targets:
+        return []
+
+    global_limit = asyncio.Semaphore(max(1, max_concurrency))
+    host_limits: Dict[str, 'asyncio.Semaphore'] = {}
+    for host, _ in unique_targets:
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(max(1, per_host_limit))
+
+    return list(await asyncio.gather(*(
+        _probe(host, port, timeout, global_limit, host_limits[host])
+        for host, port in unique_targets
+    )))
+
+
+def scan_ports(targets: Iterable[Tuple[str, int]],
+               timeout: float = DEFAULT_TIMEOUT,
+               max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+               per_host_limit: int = DEFAULT_PER_HOST_LIMIT) -> List[PortProbe]:
+    """Synchronous wrapper around scan_ports_async for non-async callers"""
+    import asyncio
+
+    return asyncio.run(scan_ports_async(targets, timeout, max_concurrency, per_host_limit))
+
+
+def summarize(probes: List[PortProbe]) -> Dict[str, int]:
+    """Count probes by state"""
+    counts = Counter(probe.state for probe in probes)
+    return {state: counts.get(state, 0) for state in (OPEN, CLOSED, FILTERED)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Concurrently probe TCP ports')
+    parser.add_argument('targets', nargs='+', help='host:port or host:start-end')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='Connect timeout in seconds')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help='Maximum probes in flight across all hosts')
+    parser.add_argument('--per-host-limit', type=int, default=DEFAULT_PER_HOST_LIMIT,
+                        help='Maximum probes in flight against a single host')
+    args = parser.parse_args(argv)
+
+    targets = []
+    for spec in args.targets:
+        host, _, ports = spec.rpartition(':')
+        if '-' in ports:
+            start, end = map(int, ports.split('-'))
+            targets.extend((host, port) for port in range(start, end + 1))
+        else:
+            targets.append((host, int(ports)))
+
+    start = time.perf_counter()
+    probes = scan_ports(targets, args.timeout, args.max_concurrency, args.per_host_limit)
+    elapsed = time.perf_counter() - start
+
+    for probe in probes:
+        print(f"{probe.host}:{probe.port}\t{probe.state}\t{probe.elapsed * 1000:.1f}ms")
+    counts = summarize(probes)
+    print(f"\n{len(probes)} ports scanned in {elapsed:.2f}s "
+          f"({counts[OPEN]} open, {counts[CLOSED]} closed, {counts[FILTERED]} filtered)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
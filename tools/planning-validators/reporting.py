@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+DoggPack Validation Reporting
+
+Shared result surface for the planning validators: findings with stable
+codes, severities and YAML paths, per-check wall and CPU timings with counts
+of items examined, and renderers for a text timing table, JSON and JUnit XML.
+Also wraps a run in cProfile for --profile.
+"""
+
+import contextlib
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ERROR = 'error'
+WARNING = 'warning'
+
+FORMATS = ('text', 'json', 'junit')
+REPORT_FORMAT = 1
+
+
+class Finding:
+    """A single error or warning raised by a check"""
+    __slots__ = ('code', 'severity', 'message', 'path')
+
+    def __init__(self, code: str, severity: str, message: str, path: str = ''):
+        self.code = code
+        self.severity = severity
+        self.message = message
+        self.path = path
+
+    def as_dict(self) -> Dict:
+        return {'code': self.code, 'severity': self.severity, 'message': self.message, 'path': self.path}
+
+    def __repr__(self) -> str:
+        return f"Finding({self.code} {self.severity} {self.path}: {self.message})"
+
+
+class CheckResult:
+    """Outcome, findings and cost of a single validation check"""
+    __slots__ = ('name', 'errors', 'warnings', 'findings', 'examined', 'wall', 'cpu', 'cached')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.findings: List[Finding] = []
+        self.examined = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        # Replayed from the validation cache; timings are from the original run
+        self.cached = False
+
+    def error(self, message: str, code: str = '', path: str = '') -> None:
+        self.errors.append(message)
+        self.findings.append(Finding(code, ERROR, message, path))
+
+    def warning(self, message: str, code: str = '', path: str = '') -> None:
+        self.warnings.append(message)
+        self.findings.append(Finding(code, WARNING, message, path))
+
+    def add_time(self, timer: 'Timer') -> None:
+        self.wall += timer.wall
+        self.cpu += timer.cpu
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    def as_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'passed': self.passed,
+            'examined': self.examined,
+            'wall_ms': round(self.wall * 1000, 3),
+            'cpu_ms': round(self.cpu * 1000, 3),
+            'cached': self.cached,
+            'findings': [finding.as_dict() for finding in self.findings],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CheckResult':
+        result = cls(data['name'])
+        for finding in data['findings']:
+            add = result.error if finding['severity'] == ERROR else result.warning
+            add(finding['message'], finding['code'], finding['path'])
+        result.examined = data['examined']
+        result.wall = data['wall_ms'] / 1000
+        result.cpu = data['cpu_ms'] / 1000
+        result.cached = data['cached']
+        return result
+
+
+class Timer:
+    """Wall-clock and CPU time of a block; CPU time is per thread"""
+    __slots__ = ('wall', 'cpu', '_wall_start', '_cpu_start')
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self) -> 'Timer':
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall = time.perf_counter() - self._wall_start
+        self.cpu = time.thread_time() - self._cpu_start
+
+
+class Report:
+    """Check results of one validator run, grouped by validated target"""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.suites: List[Tuple[str, List[CheckResult]]] = []
+
+    def add(self, target: str, results: List[CheckResult]) -> None:
+        self.suites.append((target, list(results)))
+
+    @property
+    def success(self) -> bool:
+        return all(result.passed for _, results in self.suites for result in results)
+
+    def counts(self) -> Tuple[int, int]:
+        errors = sum(len(r.errors) for _, results in self.suites for r in results)
+        warnings = sum(len(r.warnings) for _, results in self.suites for r in results)
+        return errors, warnings
+
+    def as_dict(self) -> Dict:
+        errors, warnings = self.counts()
+        return {
+            'format': REPORT_FORMAT,
+            'tool': self.tool,
+            'success': self.success,
+            'errors': errors,
+            'warnings': warnings,
+            'suites': [
+                {
+                    'target': target,
+                    'success': all(result.passed for result in results),
+                    'wall_ms': round(sum(result.wall for result in results) * 1000, 3),
+                    'checks': [result.as_dict() for result in results],
+                }
+                for target, results in self.suites
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_junit(self) -> str:
+        """One testsuite per target and one testcase per check; errors fail the case"""
+        from xml.etree import ElementTree as ET
+
+        root = ET.Element('testsuites', name=self.tool)
+        total_tests = total_failures = 0
+        total_time = 0.0
+        for target, results in self.suites:
+            failures = sum(1 for result in results if not result.passed)
+            elapsed = sum(result.wall for result in results)
+            suite = ET.SubElement(root, 'testsuite', name=target, tests=str(len(results)),
+                                  failures=str(failures), errors='0', time=f"{elapsed:.6f}")
+            for result in results:
+                case = ET.SubElement(suite, 'testcase', classname=f"{self.tool}.{target}",
+                                     name=result.name, time=f"{result.wall:.6f}")
+                errors = [f for f in result.findings if f.severity == ERROR]
+                warnings = [f for f in result.findings if f.severity == WARNING]
+                if errors:
+                    failure = ET.SubElement(case, 'failure', type=errors[0].code,
+                                            message=f"{len(errors)} error(s)")
+                    failure.text = '\n'.join(_finding_line(f) for f in errors)
+                if warnings:
+                    ET.SubElement(case, 'system-out').text = '\n'.join(_finding_line(f) for f in warnings)
+            total_tests += len(results)
+            total_failures += failures
+            total_time += elapsed
+        root.set('tests', str(total_tests))
+        root.set('failures', str(total_failures))
+        root.set('time', f"{total_time:.6f}")
+        ET.indent(root)
+        return ET.tostring(root, encoding='unicode', xml_declaration=True)
+
+    def timing_lines(self) -> List[str]:
+        """Per-check timing table, summed across targets"""
+        totals: Dict[str, List] = OrderedDict()
+        for _, results in self.suites:
+            for result in results:
+                row = totals.setdefault(result.name, [0.0, 0.0, 0, 0, 0])
+                row[0] += result.wall
+                row[1] += result.cpu
+                row[2] += result.examined
+                row[3] += 1
+                row[4] += result.cached
+
+        width = max([len(name) for name in totals] + [5])
+        lines = [f"   {'check':<{width}}  {'wall ms':>9}  {'cpu ms':>9}  {'examined':>8}  runs"]
+        for name, (wall, cpu, examined, runs, cached) in totals.items():
+            note = '' if not cached else ' (cached)' if cached == runs else f" ({cached} cached)"
+            lines.append(f"   {name:<{width}}  {wall * 1000:9.2f}  {cpu * 1000:9.2f}  {examined:8d}  {runs}{note}")
+        wall = sum(row[0] for row in totals.values())
+        cpu = sum(row[1] for row in totals.values())
+        lines.append(f"   {'total':<{width}}  {wall * 1000:9.2f}  {cpu * 1000:9.2f}")
+        return lines
+
+
+def _finding_line(finding: Finding) -> str:
+    location = f" at {finding.path}" if finding.path else ''
+    return f"[{finding.code}]{location}: {finding.message}"
+
+
+def add_reporting_arguments(parser) -> None:
+    """The --format, --timings and --profile options shared by the validators"""
+    parser.add_argument('--format', '-f', choices=FORMATS, default='text',
+                        help='Result format on stdout; json and junit move the text report to stderr')
+    parser.add_argument('--timings', action='store_true',
+                        help='Print wall and CPU time per check in the text report')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Write cProfile statistics for the run to FILE (read with pstats)')
+
+
+def text_output(args):
+    """Where the human-readable report goes for the selected format"""
+    if args.format == 'text':
+        return contextlib.nullcontext()
+    return contextlib.redirect_stdout(sys.stderr)
+
+
+def emit(report: Report, args) -> None:
+    """Print timings (text) or the structured report (json/junit) to stdout"""
+    if args.format == 'json':
+        print(report.to_json())
+    elif args.format == 'junit':
+        print(report.to_junit())
+    elif args.timings:
+        print("\n⏱️  Check timings:")
+        for line in report.timing_lines():
+            print(line)
+
+
+@contextlib.contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """Profile the enclosed block with cProfile and dump pstats to `path`"""
+    if not path:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"📊 Profile written to {path} (python -m pstats {path})", file=sys.stderr)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+DoggPack Resident Spec
+
+Keeps a parsed connectivity spec in memory and, when its file changes,
+re-parses only the entries the edit touched. The file is indexed as a tree
+of block entries (top-level sections, the services or networks inside them,
+the records of a zone, down to entries small enough to parse outright), each
+remembered by its length in the text. A change is located by the common
+prefix and suffix of the old and new text and spliced into the deepest entry
+that contains it; new values are built by copying only the containers on the
+way up, so every other entry keeps the very same parsed object. Specs with
+anchors, aliases or several documents, and edits that change the structure
+above an entry, fall back to parsing the file whole. A spec split across
+files by an include manifest is kept as one resident spec per file.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from spec_loader import INCLUDE_KEY, include_paths, parse_yaml
+
+# Entries at least this long are split into their own entries; smaller ones are parsed whole
+SPLIT_BYTES = 2048
+
+_FIRST_CONTENT = re.compile(r'^( *)[^ #\n]', re.MULTILINE)
+_PREAMBLE = re.compile(r'(?:[ \t]*(?:#[^\n]*)?\n|---[ \t]*(?:#[^\n]*)?\n)*')
+_DOCUMENT_MARKER = re.compile(r'^(?:---|\.\.\.)(?:[ \t]|$)', re.MULTILINE)
+# A mapping key whose value is a block on the following lines
+_BLOCK_HEADER = re.compile(r' *(?:[^\s#\-?:"\'][^:\n]*?|"[^"\n]*"|\'[^\'\n]*\')[ \t]*:[ \t]*(?:#.*)?$')
+# Anchors (&a), aliases (*a) and merge keys tie entries to each other
+_CROSS_REFERENCE = re.compile(r'(?:^[ \t]*(?:-[ \t]+)*|:[ \t]+|[\[{,][ \t]*)[&*][^\s,\[\]{}]|<<[ \t]*:',
+                              re.MULTILINE)
+_MISSING = object()
+
+_patterns: Dict[Tuple[str, int], Tuple['re.Pattern', 're.Pattern']] = {}
+
+
+class _Unsplittable(Exception):
+    """The edited text does not split into entries the way the index expects"""
+
+
+def _references(text: str) -> bool:
+    """Whether text may use anchors, aliases or merge keys (substring tests rule most text out cheaply)"""
+    if '&' not in text and '*' not in text and '<<' not in text:
+        return False
+    return _CROSS_REFERENCE.search(text) is not None
+
+
+def _entry_patterns(kind: str, indent: int) -> Tuple['re.Pattern', 're.Pattern']:
+    """(entry start, line that cannot sit inside this run of entries) for a mapping or sequence at `indent`"""
+    patterns = _patterns.get((kind, indent))
+    if patterns is None:
+        shallower = rf' {{0,{indent - 1}}}[^ \n#]' if indent else None
+        if kind == 'map':
+            start = rf'^ {{{indent}}}(?:[^\s#\-?:"\'][^:\n]*?|"[^"\n]*"|\'[^\'\n]*\')[ \t]*:(?:[ \t]|$)'
+            stray = shallower
+        else:
+            start = rf'^ {{{indent}}}-(?:[ \t]|$)'
+            same = rf' {{{indent}}}(?!-(?:[ \t]|$))[^ \n#]'
+            stray = f'{shallower}|{same}' if shallower else same
+        patterns = _patterns[(kind, indent)] = (re.compile(start, re.MULTILINE),
+                                                re.compile(f'^(?:{stray})', re.MULTILINE) if stray else None)
+    return patterns
+
+
+def _split(text: str, start: int, end: int, kind: str, indent: int) -> List[Tuple[int, int]]:
+    """(start, end) of each entry in text[start:end], which must begin with an entry"""
+    entry, stray = _entry_patterns(kind, indent)
+    starts = [match.start() for match in entry.finditer(text, start, end)]
+    if not starts or starts[0] != start or (stray is not None and stray.search(text, start, end)):
+        raise _Unsplittable()
+    return list(zip(starts, starts[1:] + [end]))
+
+
+def _shallow(text: str, start: int, end: int, indent: int) -> bool:
+    """Whether text[start:end] has a line at or left of `indent`, which may start or end an entry"""
+    return re.compile(rf'^ {{0,{indent}}}[^ \n#]', re.MULTILINE).search(text, start, end) is not None
+
+
+def _common_prefix(a: str, b: str) -> int:
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a.startswith(b[low:middle], low):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a.endswith(b[len(b) - middle:len(b) - low], 0, len(a) - low):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _locate(error: Exception, line: int, indent: int) -> None:
+    """Move a parser error's marks from a dedented block of entries to the file"""
+    from yaml.error import Mark
+
+    for attribute in ('context_mark', 'problem_mark'):
+        mark = getattr(error, attribute, None)
+        if mark is not None:
+            # libyaml's marks are read-only
+            setattr(error, attribute, Mark(mark.name, mark.index, mark.line + line, mark.column + indent, None, None))
+
+
+class _Node:
+    """A span of the spec text holding one entry; split entries keep their own entries as children"""
+    __slots__ = ('length', 'header', 'kind', 'indent', 'children')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.header = 0           # text before the first child (the key line and leading comments)
+        self.kind = None          # 'map' or 'seq' when split
+        self.indent = 0           # indentation of the children
+        self.children: Optional[List['_Node']] = None
+
+
+def _index(text: str, start: int, end: int, value, indent: int, kind: str) -> _Node:
+    """Index one entry of a `kind` container at `indent` whose parsed value is `value`"""
+    node = _Node(end - start)
+    if kind == 'seq' or end - start < SPLIT_BYTES or not isinstance(value, (dict, list)) or not value:
+        return node
+    line_end = text.find('\n', start, end)
+    if line_end < 0 or not _BLOCK_HEADER.match(text, start, line_end):
+        return node
+    first = _FIRST_CONTENT.search(text, line_end + 1, end)
+    if first is None:
+        return node
+    child_indent = len(first.group(1))
+    item = re.match(r'-(?:[ \t]|$)', text[first.end(1):first.end(1) + 2]) is not None
+    child_kind = 'seq' if isinstance(value, list) else 'map'
+    if (child_kind == 'seq') != item or child_indent < indent + (child_kind == 'map'):
+        return node
+    try:
+        spans = _split(text, first.start(), end, child_kind, child_indent)
+    except _Unsplittable:
+        return node
+    if len(spans) != len(value):
+        return node
+
+    node.header = spans[0][0] - start
+    node.kind = child_kind
+    node.indent = child_indent
+    values = value.values() if child_kind == 'map' else value
+    node.children = [_index(text, child_start, child_end, child, child_indent, child_kind)
+                     for (child_start, child_end), child in zip(spans, values)]
+    return node
+
+
+def _index_root(text: str, config: Dict) -> Optional[_Node]:
+    """Index a whole spec, or None when edits to it cannot be spliced"""
+    if not config or _references(text):
+        return None
+    start = _PREAMBLE.match(text).end()
+    if _DOCUMENT_MARKER.search(text, start):
+        return None
+    try:
+        spans = _split(text, start, len(text), 'map', 0)
+    except _Unsplittable:
+        return None
+    if len(spans) != len(config):
+        return None
+    root = _Node(len(text))
+    root.header = start
+    root.kind = 'map'
+    root.children = [_index(text, child_start, child_end, value, 0, 'map')
+                     for (child_start, child_end), value in zip(spans, config.values())]
+    return root
+
+
+class ResidentSpec:
+    """A connectivity spec parsed once and patched in place as its file changes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.config: Dict = {}
+        self._text = None
+        self._root: Optional[_Node] = None
+        # Entries parsed by the last refresh, per top-level section, unless it parsed the file whole
+        self.reparsed: Dict[str, int] = {}
+        self.parsed_whole = False
+        self._section = None
+        # (node, length, children) before each change made by the current patch, to roll back a failed one
+        self._undo: List[Tuple[_Node, int, Optional[List[_Node]]]] = []
+
+    @classmethod
+    def from_text(cls, text: str, config: Dict, path='<text>') -> 'ResidentSpec':
+        """A resident spec of text that has already been parsed into config, indexed without parsing it again"""
+        spec = cls(path)
+        spec.config = config
+        spec._text = text
+        spec._root = _index_root(text, config)
+        return spec
+
+    def refresh(self, text: Optional[str] = None) -> Optional[Set[str]]:
+        """Re-read the file (or take its new text), returning the top-level sections that changed, or None
+        when its text did not
+
+        The first call parses everything. Raises the parser's error, with
+        line numbers in the file, and keeps the previous state when the new
+        text does not parse.
+        """
+        if text is None:
+            text = self.path.read_text(encoding='utf-8')
+        if text == self._text:
+            return None
+        self.reparsed = {}
+        self.parsed_whole = False
+        config = None
+        if self._root is not None:
+            self._undo = []
+            try:
+                config = self._patch(text)
+            except Exception as error:
+                # Keep the index of the last good text, so a broken save costs nothing once fixed
+                for node, length, children in reversed(self._undo):
+                    node.length = length
+                    if children is not None:
+                        node.children = children
+                self._undo = []
+                if getattr(error, 'problem_mark', None) is not None:
+                    # A syntax error inside entries that split cleanly, already located in the file
+                    raise
+            self._undo = []
+        if config is None:
+            # Parse the file whole: the edit may not splice, and its errors carry file line numbers
+            config = parse_yaml(text) or {}
+            if not isinstance(config, dict):
+                raise ValueError("Connectivity spec must be a YAML mapping")
+            self._root = _index_root(text, config)
+            self.parsed_whole = True
+
+        old = self.config
+        self.config = config
+        self._text = text
+        # Unchanged sections are the same objects, and changed ones mostly share their entries
+        return {name for name in old.keys() | config.keys()
+                if old.get(name, _MISSING) is not config.get(name, _MISSING)
+                and old.get(name, _MISSING) != config.get(name, _MISSING)}
+
+    def _patch(self, text: str) -> Dict:
+        old = self._text
+        start = _common_prefix(old, text)
+        end = len(old) - _common_suffix(old, text, min(len(old), len(text)) - start)
+        # Widen the change to whole lines, which is how entries are split
+        start = old.rfind('\n', 0, start) + 1
+        delta = len(text) - len(old)
+        if (end > start and old[end - 1] != '\n') or (end + delta > start and text[end + delta - 1] != '\n'):
+            end = old.find('\n', end) + 1 or len(old)
+        if _references(text[start:end + delta]) or _DOCUMENT_MARKER.search(text, start, end + delta):
+            raise _Unsplittable()
+        config = self._splice(self._root, self.config, text, 0, start, end, delta, True)
+        if not isinstance(config, dict):
+            raise _Unsplittable()
+        return config
+
+    def _count(self, key, top: bool) -> None:
+        section = key if top else self._section
+        self.reparsed[section] = self.reparsed.get(section, 0) + 1
+
+    def _splice(self, node: _Node, value, text: str, offset: int, start: int, end: int, delta: int,
+                top: bool = False):
+        """The new value of the entry at `offset` after old text[start:end] became text[start:end + delta]"""
+        if node.children is None or start < offset + node.header:
+            raise _Unsplittable()
+        children = node.children
+        kind, indent = node.kind, node.indent
+        offsets = list(accumulate([offset + node.header] + [child.length for child in children]))
+        keys = list(value) if kind == 'map' else None
+        shallow = _shallow(text, start, end + delta, indent)
+
+        if end == start:
+            # Whole lines inserted
+            position = bisect_left(offsets, start)
+            if offsets[position] == start:
+                if shallow:
+                    return self._replace(node, value, text, offsets, position, position, start, start + delta, top)
+                if position == 0:
+                    raise _Unsplittable()
+                # Lines indented below the previous entry extend it
+                return self._descend(node, value, keys, text, offsets, position - 1, start, end, delta, top)
+            first = last = position - 1
+        else:
+            first = bisect_right(offsets, start) - 1
+            last = bisect_right(offsets, end - 1) - 1
+            if not delta + (end - start) and start == offsets[first] and end == offsets[last + 1]:
+                # Whole entries deleted
+                return self._replace(node, value, text, offsets, first, last + 1, start, start, top)
+
+        if first == last and start > offsets[first] and not shallow:
+            return self._descend(node, value, keys, text, offsets, first, start, end, delta, top)
+        return self._replace(node, value, text, offsets, first, last + 1,
+                             offsets[first], offsets[last + 1] + delta, top)
+
+    def _descend(self, node: _Node, value, keys, text: str, offsets: List[int], position: int,
+                 start: int, end: int, delta: int, top: bool):
+        """Splice the change into one child, re-parsing the child whole when it will not splice"""
+        key = keys[position] if keys is not None else position
+        if top:
+            self._section = key
+        try:
+            child = self._splice(node.children[position], value[key], text, offsets[position], start, end, delta)
+        except _Unsplittable:
+            return self._replace(node, value, text, offsets, position, position + 1,
+                                 offsets[position], offsets[position + 1] + delta, top)
+        self._undo.append((node, node.length, None))
+        node.length += delta
+        updated = dict(value) if keys is not None else list(value)
+        updated[key] = child
+        return updated
+
+    def _replace(self, node: _Node, value, text: str, offsets: List[int], first: int, last: int,
+                 start: int, end: int, top: bool):
+        """Replace children first..last-1 with the entries parsed from text[start:end]"""
+        kind, indent = node.kind, node.indent
+        spans = _split(text, start, end, kind, indent) if end > start else []
+        items = []
+        if spans:
+            block = text[start:end]
+            if indent:
+                block = re.sub(rf'^ {{1,{indent}}}', '', block, flags=re.MULTILINE)
+            try:
+                parsed = parse_yaml(block)
+            except Exception as error:
+                _locate(error, text.count('\n', 0, start), indent)
+                raise
+            if kind == 'map' and isinstance(parsed, dict) and len(parsed) == len(spans):
+                items = list(parsed.items())
+            elif kind == 'seq' and isinstance(parsed, list) and len(parsed) == len(spans):
+                items = [(None, child) for child in parsed]
+            else:
+                raise _Unsplittable()
+        nodes = [_index(text, child_start, child_end, child, indent, kind)
+                 for (child_start, child_end), (_, child) in zip(spans, items)]
+        for key, _ in items:
+            self._count(key, top)
+
+        if kind == 'map':
+            merged = list(value.items())
+            merged[first:last] = items
+            updated = dict(merged)
+            if len(updated) != len(merged):
+                raise _Unsplittable()
+        else:
+            updated = list(value)
+            updated[first:last] = [child for _, child in items]
+        self._undo.append((node, node.length, node.children))
+        node.children = node.children[:first] + nodes + node.children[last:]
+        node.length += (end - start) - (offsets[last] - offsets[first])
+        return updated
+
+
+class ResidentManifest:
+    """A spec, possibly split by an include manifest, kept resident file by file
+
+    Offers the same interface as ResidentSpec over the merged top-level
+    sections of every file; only the files whose text changed are re-read
+    into their own resident spec.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.specs: Dict[Path, ResidentSpec] = {}
+        self.config: Dict = {}
+        self.reparsed: Dict[str, int] = {}
+        self.parsed_whole = False
+        # Set while a refresh may have left some files ahead of the merged config
+        self._stale = True
+
+    @property
+    def paths(self) -> List[Path]:
+        return list(self.specs)
+
+    def refresh(self) -> Optional[Set[str]]:
+        """Re-read the files, returning the top-level sections that changed, or None when no text did
+
+        Raises like ResidentSpec.refresh, and for sections defined twice or
+        files included twice, keeping the previous merged config.
+        """
+        stale, self._stale = self._stale, True
+        specs: Dict[Path, ResidentSpec] = {}
+        refreshed: List[ResidentSpec] = []
+        self._collect(self.path, specs, refreshed, set())
+        # A file dropped from the manifest changes the spec without any text changing
+        if not refreshed and not stale and list(specs) == list(self.specs):
+            self._stale = False
+            return None
+
+        config = {}
+        owners: Dict[str, Path] = {}
+        for path, spec in specs.items():
+            for name, value in spec.config.items():
+                if name == INCLUDE_KEY:
+                    continue
+                other = owners.setdefault(name, path)
+                if other != path:
+                    raise ValueError(f"Section {name} is defined in both {other} and {path}")
+                config[name] = value
+
+        old = self.config
+        self.specs = specs
+        self.config = config
+        self.reparsed = {}
+        for spec in refreshed:
+            for name, count in spec.reparsed.items():
+                self.reparsed[name] = self.reparsed.get(name, 0) + count
+        self.parsed_whole = any(spec.parsed_whole for spec in refreshed)
+        self._stale = False
+        return {name for name in old.keys() | config.keys()
+                if old.get(name, _MISSING) is not config.get(name, _MISSING)
+                and old.get(name, _MISSING) != config.get(name, _MISSING)}
+
+    def _collect(self, path: Path, specs: Dict[Path, ResidentSpec], refreshed: List[ResidentSpec],
+                 seen: Set[Path]) -> None:
+        resolved = path.resolve()
+        if resolved in seen:
+            raise ValueError(f"{path} is included more than once")
+        seen.add(resolved)
+        spec = self.specs.get(path) or ResidentSpec(path)
+        if spec.refresh() is not None:
+            refreshed.append(spec)
+        specs[path] = spec
+        if INCLUDE_KEY in spec.config:
+            for included in include_paths(path, spec.config[INCLUDE_KEY]):
+                self._collect(included, specs, refreshed, seen)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+DoggPack Semantic Diff
+
+Compares two revisions of the connectivity spec or of a deployment plan as
+entities rather than lines: hosts, subnets, services, port bindings, DNS
+records, forwards, port ranges and reserved ports of the spec; identity,
+steps, dependencies and machine resources of a plan. Spec sections whose
+text is identical on both sides are never parsed, and with the newer
+revision already parsed the older one's changed sections are rebuilt from it
+entry by entry, so diffing costs what the edit touched rather than the size
+of the spec.
+"""
+
+import fnmatch
+import json
+import posixpath
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from connectivity_model import MODEL_SECTIONS, SERVICE_SECTIONS, ConnectivityModel, ModelBuilder
+from spec_loader import INCLUDE_KEY, parse_yaml, spec_files
+from validation_cache import section_spans
+
+# Change actions
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Entity kinds in the order changes are listed
+SPEC_KINDS = ('host', 'subnet', 'port_range', 'reserved_port', 'service', 'binding', 'forward', 'record',
+              'dns_server', 'scaling_target', 'section')
+PLAN_KINDS = ('plan', 'dependency', 'machine', 'step', 'section')
+
+_SYMBOLS = {ADDED: '+', REMOVED: '-', CHANGED: '~'}
+_SERVICE_FIELDS = ('container_name', 'image', 'host_ip', 'host_port', 'container_port', 'docker_network',
+                   'container_ip', 'external_access', 'external_port', 'internal_domain', 'external_domain',
+                   'health_check', 'protocol', 'resources')
+
+# (kind, key) -> (fields, YAML path)
+Entities = Dict[Tuple[str, str], Tuple[Dict[str, Any], str]]
+
+
+class Change:
+    """One entity that differs between two revisions; `old` or `new` is None when it was added or removed"""
+    __slots__ = ('kind', 'key', 'old', 'new', 'path')
+
+    def __init__(self, kind: str, key: str, old: Optional[Dict], new: Optional[Dict], path: str):
+        self.kind = kind
+        self.key = key
+        self.old = old
+        self.new = new
+        # YAML path on the newer side, or the older one for a removal
+        self.path = path
+
+    @property
+    def action(self) -> str:
+        return ADDED if self.old is None else REMOVED if self.new is None else CHANGED
+
+    def fields(self) -> List[str]:
+        """Fields whose value differs, in declaration order"""
+        old, new = self.old or {}, self.new or {}
+        return [field for field in list(old) + [field for field in new if field not in old]
+                if old.get(field) != new.get(field)]
+
+    def describe(self) -> str:
+        text = f"{_SYMBOLS[self.action]} {self.kind.replace('_', ' ')} {self.key}"
+        if self.action == CHANGED:
+            details = [f"{field} {_show((self.old or {}).get(field))} → {_show((self.new or {}).get(field))}"
+                       for field in self.fields()]
+            if details:
+                text += f": {'; '.join(details)}"
+        return text
+
+
+def _show(value) -> str:
+    if value is None:
+        return '∅'
+    if isinstance(value, (dict, list)):
+        text = json.dumps(value, sort_keys=True, default=str)
+        return text if len(text) <= 40 else f"{text[:37]}..."
+    return str(value)
+
+
+def diff_entities(old: Entities, new: Entities, kinds: Tuple[str, ...]) -> List[Change]:
+    """Changes between two entity maps, ordered by kind and then key"""
+    order = {kind: index for index, kind in enumerate(kinds)}
+    changes = []
+    for kind, key in sorted(old.keys() | new.keys(), key=lambda item: (order.get(item[0], len(order)), item[1])):
+        before, after = old.get((kind, key)), new.get((kind, key))
+        if before is not None and after is not None and before[0] == after[0]:
+            continue
+        changes.append(Change(kind, key, before and before[0], after and after[0], (after or before)[1]))
+    return changes
+
+
+def spec_entities(model: ConnectivityModel) -> Entities:
+    """Every entity of a compiled spec (or of the sections it was compiled from)"""
+    entities: Entities = {}
+    for host in model.hosts:
+        entities[('host', host.name)] = ({'ip': host.ip, 'role': host.role, 'os': host.os,
+                                          'docker_role': host.docker_role, 'capacity': host.capacity}, host.path)
+    for network in model.networks:
+        entities[('subnet', f"{network.kind} {network.name}")] = (
+            {'subnet': network.subnet, 'driver': network.driver, 'purpose': network.purpose}, network.path)
+    for name, port_range in model.port_ranges.items():
+        entities[('port_range', name)] = ({'ports': f"{port_range.start}-{port_range.end}"}, port_range.path)
+    for port in model.reserved_ports:
+        entities[('reserved_port', str(port))] = ({}, 'port_allocation.reserved_system_ports')
+    for service in model.services:
+        entities[('service', service.path)] = ({field: getattr(service, field) for field in _SERVICE_FIELDS},
+                                               service.path)
+        for endpoint in service.endpoints:
+            ports = str(endpoint.port) if endpoint.port == endpoint.end else f"{endpoint.port}-{endpoint.end}"
+            # One entity per claim, so a claim on a taken port reads as added rather than as a changed owner list
+            _merge(entities, ('binding', f"{endpoint.host_ip}:{ports}/{endpoint.protocol} {endpoint.service}"),
+                   'field', endpoint.field, endpoint.path)
+    for rule in model.forwards:
+        _merge(entities, ('forward', f"{rule.external_port}/{rule.protocol}"),
+               'to', f"{rule.internal_ip}:{rule.internal_port}", rule.path)
+    for record in model.records:
+        _merge(entities, ('record', f"{record.fqdn} {record.type}"),
+               'value', f"{record.value}{' (proxied)' if record.proxied else ''}", record.path)
+    for zone, server in model.dns_servers.items():
+        entities[('dns_server', zone)] = ({'server': server}, f"domain_mapping.{zone}_domains.dns_server")
+    for name, target in model.scaling_targets.items():
+        entities[('scaling_target', name)] = (dict(target), f"load_balancing.scaling_targets.{name}")
+    return entities
+
+
+def _merge(entities: Entities, key: Tuple[str, str], field: str, value: str, path: str) -> None:
+    """Add an entity; several claims on one key (a conflict, or round-robin records) are listed together"""
+    known = entities.get(key)
+    if known is None:
+        entities[key] = ({field: value}, path)
+    else:
+        entities[key] = ({field: ', '.join(sorted(known[0][field].split(', ') + [value]))}, known[1])
+
+
+class SpecText:
+    """Top-level sections of a spec's files, as source text, parsed on request"""
+
+    def __init__(self, files: Dict[str, str]):
+        # path -> text of each file
+        self.files = files
+        # section -> (text of the section, text of its whole file)
+        self.sections: Dict[str, Tuple[str, str]] = {}
+        for text in files.values():
+            preamble, spans = section_spans(text)
+            for name, (start, end) in spans.items():
+                self.sections.setdefault(name, (text[start:end], text))
+            if not spans and text[preamble:].strip():
+                # A file that cannot be split is one section text, changing whenever the file does
+                whole = parse_yaml(text)
+                for name in whole if isinstance(whole, dict) else ():
+                    self.sections.setdefault(name, (text, text))
+
+    def text(self, name: str) -> Optional[str]:
+        section = self.sections.get(name)
+        return section and section[0]
+
+    def parse(self, names: Iterable[str]) -> Dict[str, Any]:
+        """The given sections, parsed one text slice at a time (the whole file when a slice does not parse alone)"""
+        import yaml
+
+        config = {}
+        for name in names:
+            if name not in self.sections:
+                continue
+            text, whole = self.sections[name]
+            try:
+                value = parse_yaml(text)
+            except yaml.YAMLError:
+                value = None
+            if not (isinstance(value, dict) and list(value) == [name]):
+                value = parse_yaml(whole) or {}
+            config[name] = value.get(name)
+        return config
+
+    def patch(self, names: Iterable[str], newer: 'SpecText', values: Mapping[str, Any]) -> Dict[str, Any]:
+        """The given sections, rebuilt from `newer`'s (which parsed to `values`) by re-parsing only the
+        entries whose text differs"""
+        from resident_spec import ResidentSpec
+
+        config = {}
+        for name in names:
+            if name not in self.sections:
+                continue
+            value = None
+            if name in values and name in newer.sections:
+                spec = ResidentSpec.from_text(newer.text(name), {name: values[name]})
+                try:
+                    spec.refresh(self.text(name))
+                    value = spec.config
+                except Exception:
+                    value = None
+            if isinstance(value, dict) and list(value) == [name]:
+                config[name] = value[name]
+            else:
+                config.update(self.parse([name]))
+        return config
+
+
+def changed_sections(old: SpecText, new: SpecText) -> Set[str]:
+    return {name for name in old.sections.keys() | new.sections.keys()
+            if name != INCLUDE_KEY and old.text(name) != new.text(name)}
+
+
+def spec_changes(old: SpecText, new: SpecText, parsed: Optional[Mapping[str, Any]] = None) -> List[Change]:
+    """Entity changes between two spec revisions, parsing only the sections whose text differs
+
+    `parsed` is the newer revision already parsed (a LazySpec, say): its
+    sections are used as they are, and the older revision's are rebuilt from
+    them by re-parsing only the entries the change touched.
+    """
+    sections = changed_sections(old, new)
+    compiled = [name for name in MODEL_SECTIONS if name in sections]
+    if parsed is None:
+        new_config = new.parse(compiled)
+        old_config = old.parse(compiled)
+    else:
+        new_config = {name: parsed[name] for name in compiled if name in parsed}
+        old_config = old.patch(compiled, new, new_config)
+        # Services the change did not touch are the very same objects on both sides, so only the rest are compiled
+        for name in SERVICE_SECTIONS:
+            before, after = old_config.get(name), new_config.get(name)
+            if isinstance(before, dict) and isinstance(after, dict):
+                old_config[name] = {key: value for key, value in before.items() if after.get(key) is not value}
+                new_config[name] = {key: value for key, value in after.items() if before.get(key) is not value}
+    old_entities = spec_entities(ModelBuilder().feed(old_config, compiled))
+    new_entities = spec_entities(ModelBuilder().feed(new_config, compiled))
+    # Sections no check reads are compared as text
+    for side, entities in ((old, old_entities), (new, new_entities)):
+        for name in sections - set(MODEL_SECTIONS):
+            if name in side.sections:
+                entities[('section', name)] = ({'text': side.text(name)}, name)
+    return _quiet_sections(diff_entities(old_entities, new_entities, SPEC_KINDS))
+
+
+def _quiet_sections(changes: List[Change]) -> List[Change]:
+    """Drop the values of changed whole sections, which are too long to show"""
+    for change in changes:
+        if change.kind == 'section' and change.action == CHANGED:
+            change.old = change.new = {}
+    return changes
+
+
+def spec_at(objects, commit: str, path) -> SpecText:
+    """The spec at `path`, and the files its include manifest named, as they were at the commit"""
+    files = {}
+    pending = [objects.relative(path)]
+    seen = set()
+    while pending:
+        current = pending.pop(0)
+        if current in seen:
+            continue
+        seen.add(current)
+        text = objects.text(commit, current)
+        if text is None:
+            continue
+        files[str(objects.root / current)] = text
+        spec = SpecText({current: text})
+        if INCLUDE_KEY in spec.sections:
+            include = spec.parse([INCLUDE_KEY])[INCLUDE_KEY]
+            patterns = [include] if isinstance(include, str) else include if isinstance(include, list) else []
+            base = posixpath.dirname(current)
+            listing = None
+            for pattern in patterns:
+                pattern = posixpath.normpath(posixpath.join(base, str(pattern)))
+                if any(char in pattern for char in '*?['):
+                    if listing is None:
+                        listing = objects.files(commit, [base or '.'])
+                    pending.extend(sorted(name for name in listing if _glob_match(name, pattern)))
+                else:
+                    pending.append(pattern)
+    return SpecText(files)
+
+
+def spec_now(path) -> SpecText:
+    """The spec at `path`, and the files its include manifest names, in the working tree"""
+    return SpecText({str(spec_path.resolve()): spec_path.read_text(encoding='utf-8') for spec_path in spec_files(path)})
+
+
+def _glob_match(name: str, pattern: str) -> bool:
+    """Path.glob semantics for one pattern: wildcards never cross a /"""
+    parts, globs = name.split('/'), pattern.split('/')
+    return len(parts) == len(globs) and all(fnmatch.fnmatchcase(part, glob) for part, glob in zip(parts, globs))
+
+
+def plan_entities(plan) -> Entities:
+    """Identity, dependencies, machine resources, steps and other sections of a parsed plan"""
+    if not isinstance(plan, dict):
+        return {}
+    entities: Entities = {}
+    metadata = plan.get('metadata') if isinstance(plan.get('metadata'), dict) else {}
+    entities[('plan', 'metadata')] = ({field: metadata.get(field) for field in ('name', 'version', 'status')},
+                                      'metadata')
+    prerequisites = plan.get('prerequisites') if isinstance(plan.get('prerequisites'), dict) else {}
+    for i, dependency in enumerate(prerequisites.get('dependencies') or []):
+        if isinstance(dependency, dict) and dependency.get('deployment'):
+            entities[('dependency', str(dependency['deployment']))] = (
+                {'status': dependency.get('status', 'completed')}, f"prerequisites.dependencies[{i}]")
+    environment = plan.get('environment') if isinstance(plan.get('environment'), dict) else {}
+    for i, machine in enumerate(environment.get('target_machines') or []):
+        if isinstance(machine, dict):
+            entities[('machine', str(machine.get('name', i)))] = (
+                dict(machine.get('resources_required') or {}), f"environment.target_machines[{i}]")
+    for i, step in enumerate(plan.get('deployment_steps') or []):
+        if isinstance(step, dict):
+            entities[('step', str(step.get('name', i)))] = (dict(step), f"deployment_steps[{i}]")
+    for name, value in plan.items():
+        if name != 'deployment_steps':
+            entities[('section', str(name))] = ({'value': value}, str(name))
+    return entities
+
+
+def plan_changes(old_plan, new_plan) -> List[Change]:
+    """Entity changes between two parsed revisions of one plan"""
+    changes = _quiet_sections(diff_entities(plan_entities(old_plan), plan_entities(new_plan), PLAN_KINDS))
+    # A section is not listed as changed when the entities listed for it already say how
+    listed = {'metadata': 'plan', 'prerequisites': 'dependency', 'environment': 'machine'}
+    kinds = {change.kind for change in changes}
+    return [change for change in changes
+            if not (change.kind == 'section' and change.action == CHANGED and listed.get(change.key) in kinds)]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+DoggPack Validation Server Transport
+
+HTTP JSON transport of the resident validation server: a listener on a Unix
+socket, or a loopback TCP port, that hands every connection to a forked copy
+of the server process, and the client side of the same protocol. A forked
+handler sees the warm state exactly as it was when the request arrived, runs
+alongside the others, and may redirect stdout or change directory without
+affecting the server. The client side only needs the standard library's
+http.client, so a thin client starts without importing any validator.
+"""
+
+import json
+import os
+import socket
+import socketserver
+from http.client import HTTPConnection
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from validation_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SOCKET = os.path.join(DEFAULT_CACHE_DIR, 'validation-server.sock')
+# Where clients look for the server: a socket path, or HOST:PORT
+ADDRESS_VARIABLE = 'DOGGPACK_VALIDATION_SERVER'
+
+Address = Union[str, Tuple[str, int]]
+Route = Callable[[Dict], Dict]
+
+
+class RequestError(Exception):
+    """A request the server cannot answer, with the HTTP status to answer it with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_address(text: str) -> Address:
+    """A socket path, or a (host, port) pair for HOST:PORT"""
+    host, _, port = text.rpartition(':')
+    if host and port.isdigit() and os.sep not in text:
+        return host, int(port)
+    return text
+
+
+def default_address() -> Address:
+    return parse_address(os.environ.get(ADDRESS_VARIABLE) or DEFAULT_SOCKET)
+
+
+def describe(address: Address) -> str:
+    return address if isinstance(address, str) else f"http://{address[0]}:{address[1]}"
+
+
+def _handler(routes: Dict[str, Route]):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        # One request per connection: each connection is served by its own fork of the server
+        protocol_version = 'HTTP/1.0'
+
+        def do_GET(self):
+            self._dispatch(None)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self._dispatch(self.rfile.read(length) if length else None)
+
+        def _dispatch(self, body: Optional[bytes]):
+            url = urlsplit(self.path)
+            try:
+                params = dict(parse_qsl(url.query))
+                if body:
+                    try:
+                        data = json.loads(body)
+                    except ValueError as e:
+                        raise RequestError(f"Request body is not JSON: {e}")
+                    if not isinstance(data, dict):
+                        raise RequestError("Request body must be a JSON object")
+                    params.update(data)
+                route = routes.get(url.path.rstrip('/') or '/')
+                if route is None:
+                    raise RequestError(f"Unknown endpoint: {url.path} (try {', '.join(sorted(routes))})", 404)
+                status, answer = 200, route(params)
+            except RequestError as e:
+                status, answer = e.status, {'error': str(e)}
+            except Exception as e:
+                status, answer = 500, {'error': f"{type(e).__name__}: {e}"}
+            payload = json.dumps(answer).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def make_server(address: Address, routes: Dict[str, Route], idle: Callable[[], None]):
+    """A server answering `routes` at the address; `idle` runs in the server process between requests
+    and before each one is handed off, so state it updates is current for every request
+
+    Raises OSError when the address is taken; a socket file left behind by a
+    server that is no longer running is replaced.
+    """
+    unix = isinstance(address, str)
+    base = socketserver.UnixStreamServer if unix else socketserver.TCPServer
+    # Where fork is unavailable, requests are answered one at a time
+    mixins = (socketserver.ForkingMixIn,) if hasattr(os, 'fork') else ()
+
+    class Server(*mixins, base):
+        allow_reuse_address = True
+        block_on_close = False
+
+        def service_actions(self):
+            super().service_actions()
+            idle()
+
+        def process_request(self, request, client_address):
+            idle()
+            super().process_request(request, client_address)
+
+        def server_close(self):
+            super().server_close()
+            if unix:
+                try:
+                    os.unlink(address)
+                except FileNotFoundError:
+                    pass
+
+    if unix:
+        if os.path.exists(address):
+            if _listening(address):
+                raise OSError(f"a validation server is already listening on {address}")
+            os.unlink(address)
+        os.makedirs(os.path.dirname(address) or '.', exist_ok=True)
+    server = Server(address, _handler(routes))
+    if unix:
+        # Requests can run validators with arbitrary arguments; keep them to this user
+        os.chmod(address, 0o600)
+    return server
+
+
+def _listening(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+class UnixConnection(HTTPConnection):
+    """HTTP connection over a Unix socket"""
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(address: Address, endpoint: str, params: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> Tuple[int, Dict]:
+    """POST params to an endpoint, returning (HTTP status, answer)
+
+    Raises OSError when no server is listening at the address.
+    """
+    if isinstance(address, str):
+        connection = UnixConnection(address, timeout)
+    else:
+        connection = HTTPConnection(*address, timeout=timeout)
+    try:
+        connection.request('POST', endpoint, json.dumps(params or {}), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
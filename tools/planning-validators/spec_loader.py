@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+DoggPack Spec Loader
+
+Parses YAML with libyaml's CSafeLoader when PyYAML was built with it, and
+falls back to the pure-Python SafeLoader otherwise. Specs are opened lazily:
+each top-level section is parsed on first access, and a spec may be split
+across files joined by an include manifest. Parsed sections can also be
+kept as binary snapshots that are reused while the source file's mtime and
+size, or failing that its SHA-256, are unchanged. Given the earlier text of
+an edited file (from git, say), a snapshot taken of that text still serves:
+unchanged sections are reused and changed ones re-parse only the entries
+that differ. PyYAML itself is only imported when a file actually has to be
+parsed.
+"""
+
+import hashlib
+import os
+import pickle
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+SNAPSHOT_FORMAT = 2
+
+# Top-level key of a manifest listing the files a split spec is made of
+INCLUDE_KEY = 'include'
+
+_loader = None
+_MISSING = object()
+
+
+def yaml_loader():
+    """The fastest available safe loader class"""
+    global _loader
+    if _loader is None:
+        import yaml
+        _loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return _loader
+
+
+def using_libyaml() -> bool:
+    return yaml_loader().__name__ == 'CSafeLoader'
+
+
+def parse_yaml(stream) -> Any:
+    """Equivalent to yaml.safe_load, accelerated by libyaml when available"""
+    import yaml
+    return yaml.load(stream, Loader=yaml_loader())
+
+
+def load_yaml(path) -> Any:
+    with open(path, 'r') as f:
+        return parse_yaml(f)
+
+
+def _snapshot_path(snapshot_dir, source: Path) -> Path:
+    name = hashlib.sha256(str(source.resolve()).encode()).hexdigest()[:32]
+    return Path(snapshot_dir) / f"{name}.snapshot"
+
+
+def _read_snapshot(path: Path, source: Path, stat: os.stat_result) -> Tuple[Optional[Dict], bool]:
+    """Return (payload, header_is_stale) for a snapshot that still matches its source"""
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            if header.get('format') != SNAPSHOT_FORMAT:
+                return None, False
+            if header['mtime_ns'] == stat.st_mtime_ns and header['size'] == stat.st_size:
+                return pickle.load(f), False
+            # Touched but possibly unchanged (checkout, copy): fall back to the content hash
+            if hashlib.sha256(source.read_bytes()).hexdigest() == header['sha256']:
+                return pickle.load(f), True
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, ValueError):
+        pass
+    return None, False
+
+
+def _read_earlier_snapshot(path: Path, digest: str) -> Optional[Dict]:
+    """Return the payload of a snapshot taken of an earlier text of its source, given that text's SHA-256"""
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            if header.get('format') == SNAPSHOT_FORMAT and header['sha256'] == digest:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, ValueError):
+        pass
+    return None
+
+
+def _write_snapshot(path: Path, stat: os.stat_result, digest: str, payload: Dict) -> None:
+    header = {'format': SNAPSHOT_FORMAT, 'mtime_ns': stat.st_mtime_ns,
+              'size': stat.st_size, 'sha256': digest}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+class _SpecFile:
+    """One file of a spec, indexed by top-level section, with the sections parsed so far
+
+    Sections are parsed one text slice at a time. A slice that does not
+    parse on its own (an alias to another section's anchor, a flow-style
+    root) makes the file fall back to being parsed whole, which also gives
+    real syntax errors their line numbers in the file.
+    """
+
+    def __init__(self, path: Path, snapshot_dir: Optional[str], earlier: Optional[str] = None):
+        from validation_cache import sha256_bytes, section_spans
+
+        self.path = path
+        self.stat = path.stat()
+        self.snapshot = _snapshot_path(snapshot_dir, path) if snapshot_dir else None
+        self._text: Optional[str] = None
+        self._whole: Optional[Dict] = None
+        # Pickled sections, kept for the snapshot
+        self.blobs: Dict[str, bytes] = {}
+        self.dirty = False
+        # (text, spans, pickled sections) of the earlier version of the file a snapshot was taken of
+        self._earlier: Optional[Tuple[str, Dict[str, Tuple[int, int]], Dict[str, bytes]]] = None
+
+        payload = None
+        if self.snapshot is not None:
+            payload, stale_header = _read_snapshot(self.snapshot, path, self.stat)
+            self.dirty = stale_header
+        if payload is not None:
+            self.spans, self.hashes, self.blobs = payload['spans'], payload['sections'], payload['blobs']
+            # Mark it used so the cache prune evicts snapshots least recently used first, like entries
+            try:
+                os.utime(self.snapshot)
+            except OSError:
+                pass
+            return
+        text = self.text
+        preamble, self.spans = section_spans(text)
+        self.hashes = {'': sha256_bytes(text[:preamble].encode())}
+        self.hashes.update((name, sha256_bytes(text[start:end].encode())) for name, (start, end) in self.spans.items())
+        if self.snapshot is not None and earlier is not None:
+            previous = _read_earlier_snapshot(self.snapshot, hashlib.sha256(earlier.encode()).hexdigest())
+            if previous is not None:
+                for name, blob in previous['blobs'].items():
+                    if name in self.spans and previous['sections'].get(name) == self.hashes[name]:
+                        self.blobs[name] = blob
+                self._earlier = (earlier, previous['spans'], previous['blobs'])
+        if not self.spans and text[preamble:].strip():
+            # Nothing to split on (a flow-style root, a quoted key); the file is parsed as one document
+            self._parse_whole()
+        self.dirty = self.snapshot is not None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.path.read_text(encoding='utf-8')
+        return self._text
+
+    def parse(self, name: str) -> Any:
+        blob = self.blobs.get(name)
+        if blob is not None:
+            return pickle.loads(blob)
+        if self._whole is None:
+            import yaml
+
+            value = self._patch_earlier(name)
+            if value is not _MISSING:
+                return self._keep(name, value)
+            start, end = self.spans[name]
+            try:
+                value = parse_yaml(self.text[start:end])
+            except yaml.YAMLError:
+                value = None
+            if isinstance(value, dict) and list(value) == [name]:
+                return self._keep(name, value[name])
+            self._parse_whole()
+        return self._whole.get(name)
+
+    def _patch_earlier(self, name: str) -> Any:
+        """A changed section rebuilt from the earlier version's, re-parsing only the entries whose text differs"""
+        from resident_spec import ResidentSpec
+
+        if self._earlier is None:
+            return _MISSING
+        text, spans, blobs = self._earlier
+        earlier_span, span = spans.get(name, (0, 0)), self.spans[name]
+        if name not in blobs or earlier_span == (0, 0) or span == (0, 0):
+            return _MISSING
+        spec = ResidentSpec.from_text(text[slice(*earlier_span)], {name: pickle.loads(blobs[name])})
+        try:
+            spec.refresh(self.text[slice(*span)])
+        except Exception:
+            # Parsed again below, where a syntax error gets its line number in the file
+            return _MISSING
+        value = spec.config
+        return value[name] if isinstance(value, dict) and list(value) == [name] else _MISSING
+
+    def _parse_whole(self) -> None:
+        whole = parse_yaml(self.text) or {}
+        if not isinstance(whole, dict):
+            raise ValueError(f"{self.path} must be a YAML mapping")
+        self._whole = whole
+        digest = hashlib.sha256(self.text.encode()).hexdigest()
+        for name in whole:
+            # Sections the scan could not find change whenever the file does
+            if name not in self.spans:
+                self.spans[name] = (0, 0)
+                self.hashes[name] = digest
+            self._keep(name, whole[name])
+
+    def _keep(self, name: str, value: Any) -> Any:
+        if self.snapshot is not None and name not in self.blobs:
+            self.blobs[name] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self.dirty = True
+        return value
+
+    def save(self) -> None:
+        """Write the snapshot when sections were parsed since it was read"""
+        if self.snapshot is None or not self.dirty:
+            return
+        digest = hashlib.sha256(self.path.read_bytes()).hexdigest()
+        _write_snapshot(self.snapshot, self.stat, digest,
+                        {'spans': self.spans, 'sections': self.hashes, 'blobs': self.blobs})
+        self.dirty = False
+
+
+def include_paths(manifest: Path, include) -> List[Path]:
+    """Files named by a manifest's include section; globs expand in sorted order"""
+    patterns = [include] if isinstance(include, str) else include
+    if not isinstance(patterns, list) or not all(isinstance(pattern, str) for pattern in patterns):
+        raise ValueError(f"{INCLUDE_KEY} in {manifest} must be a path or a list of paths")
+    paths = []
+    for pattern in patterns:
+        if any(char in pattern for char in '*?['):
+            paths.extend(sorted(manifest.parent.glob(pattern)))
+        else:
+            path = manifest.parent / pattern
+            if not path.exists():
+                raise FileNotFoundError(f"Included spec file not found: {path}")
+            paths.append(path)
+    return paths
+
+
+class LazySpec(Mapping):
+    """A spec whose top-level sections are parsed on first access
+
+    The spec file may be an include manifest: its `include` section lists
+    further files (globs allowed, relative to the manifest) whose top-level
+    sections join the spec, so it can be split into one file per section.
+    Opening a spec only reads the files and finds where each section starts;
+    a command that reads three sections parses three sections.
+    """
+
+    def __init__(self, path, snapshot_dir: Optional[str] = None, earlier: Optional[Mapping] = None):
+        self.path = Path(path)
+        # Earlier texts of the spec's files by resolved path, to reuse snapshots taken of them
+        self._earlier = earlier or {}
+        self.files: List[_SpecFile] = []
+        self.section_hashes: Dict[str, str] = {}
+        self._owners: Dict[str, _SpecFile] = {}
+        self._values: Dict[str, Any] = {}
+        self._add(self.path, snapshot_dir, set())
+
+    def _add(self, path: Path, snapshot_dir: Optional[str], seen: Set[Path]) -> None:
+        resolved = path.resolve()
+        if resolved in seen:
+            raise ValueError(f"{path} is included more than once")
+        seen.add(resolved)
+        spec_file = _SpecFile(path, snapshot_dir, self._earlier.get(resolved))
+        self.files.append(spec_file)
+        if len(self.files) == 1:
+            self.section_hashes[''] = spec_file.hashes['']
+        for name in spec_file.spans:
+            if name == INCLUDE_KEY:
+                continue
+            other = self._owners.setdefault(name, spec_file)
+            if other is not spec_file:
+                raise ValueError(f"Section {name} is defined in both {other.path} and {path}")
+            self.section_hashes[name] = spec_file.hashes[name]
+        if INCLUDE_KEY in spec_file.spans:
+            for included in include_paths(path, spec_file.parse(INCLUDE_KEY)):
+                self._add(included, snapshot_dir, seen)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._owners[name].parse(name)
+        return self._values[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._owners
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._owners)
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    @property
+    def parsed(self) -> Set[str]:
+        return set(self._values)
+
+    def load(self, sections: Optional[Iterable[str]] = None) -> None:
+        """Parse the given sections (all when None) that the spec has"""
+        for name in self if sections is None else sections:
+            if name in self._owners:
+                self[name]
+
+    def save(self) -> None:
+        for spec_file in self.files:
+            spec_file.save()
+
+
+def spec_files(path) -> List[Path]:
+    """The spec file and every file its include manifest pulls in"""
+    return [spec_file.path for spec_file in LazySpec(path).files]
+
+
+def spec_digest(path) -> str:
+    """SHA-256 over the bytes of every file of a spec"""
+    digest = hashlib.sha256()
+    for spec_path in spec_files(path):
+        digest.update(hashlib.sha256(spec_path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def load_spec(path, snapshot_dir: Optional[str] = None, sections: Optional[Iterable[str]] = None,
+              earlier: Optional[Mapping] = None) -> Tuple[LazySpec, Dict[str, str]]:
+    """Open a spec and parse the given sections (all when None), via snapshots where current
+
+    Returns the spec and its per-section hashes. Other sections are parsed
+    when first read. Snapshots keep each section pickled separately and
+    gain the sections later runs parse. `earlier` maps resolved file paths
+    to an earlier text whose snapshot may stand in for an edited file.
+    """
+    spec = LazySpec(path, snapshot_dir, earlier)
+    spec.load(sections)
+    spec.save()
+    return spec, spec.section_hashes
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+DoggPack Spec Stream
+
+Reads a connectivity spec from the YAML event stream (libyaml when PyYAML
+was built with it) instead of loading it as one tree. Collections the model
+builder splits are composed one element at a time, sections it never reads
+are skipped without building anything, and each entry is handed over and
+dropped as soon as it is complete, so the parse needs memory for the largest
+single entry rather than the whole spec; only the compiled model, a fixed-size
+record per entry, grows with the spec. Anchored collections are the exception:
+they may be aliased later, so they are built whole. Entries merged in with
+`<<` are delivered after the mapping's own and never override them. A spec
+split by an include manifest is streamed file by file.
+"""
+
+from typing import Any, Callable, Iterator, Tuple
+
+from connectivity_model import SECTION_END
+from spec_loader import spec_files, yaml_loader
+
+STR_TAG = 'tag:yaml.org,2002:str'
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+# Scalars repeat heavily (protocols, booleans, ports, host IPs); resolve and store each once
+_SCALAR_CACHE_LIMIT = 65536
+
+
+class SpecStream:
+    """Composes (path, value) spec entries from YAML parser events"""
+
+    def __init__(self, stream, splits: Callable[[Tuple], bool], reads: Callable[[Tuple], bool]):
+        import yaml.events as events
+        import yaml.nodes as nodes
+
+        self._events = events
+        self._scalar_node = nodes.ScalarNode
+        self.loader = yaml_loader()(stream)
+        self.splits = splits
+        self.reads = reads
+        self.anchors = {}
+        self._scalars = {}
+        self._strings = {}
+
+    def __iter__(self) -> Iterator[Tuple[Tuple, Any]]:
+        """Every entry of the first document, then ((section,), SECTION_END) per top-level section"""
+        events = self._events
+        loader = self.loader
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(events.StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStart
+            root = loader.get_event()
+            if not isinstance(root, events.MappingStartEvent):
+                if not isinstance(root, events.ScalarEvent) or root.value:
+                    raise ValueError("spec root must be a mapping")
+                return
+            while not loader.check_event(events.MappingEndEvent):
+                section = self._compose(loader.get_event())
+                yield from self._walk((section,), loader.get_event())
+                yield (section,), SECTION_END
+        finally:
+            loader.dispose()
+
+    def _walk(self, path: Tuple, event) -> Iterator[Tuple[Tuple, Any]]:
+        events = self._events
+        loader = self.loader
+        if isinstance(event, events.CollectionStartEvent) and event.anchor is not None and self.splits(path):
+            # An anchored collection may be aliased later, so it is built whole and split afterwards
+            yield from self._entries(path, self._compose(event))
+        elif isinstance(event, events.MappingStartEvent) and self.splits(path):
+            # Merged entries are delivered after the mapping's own, and only for keys it does not set
+            own = set()
+            merged = []
+            while not loader.check_event(events.MappingEndEvent):
+                key_event = loader.get_event()
+                key = self._compose(key_event)
+                if key == '<<' and self._is_merge(key_event):
+                    item = self._compose(loader.get_event())
+                    merged.extend(item if isinstance(item, list) else [item])
+                    continue
+                own.add(key)
+                yield from self._walk(path + (key,), loader.get_event())
+            loader.get_event()
+            # The first mapping merged wins, as in a whole-document load
+            for defaults in merged:
+                for child, value in defaults.items():
+                    if child not in own:
+                        own.add(child)
+                        if self.reads(path + (child,)):
+                            yield path + (child,), value
+        elif isinstance(event, events.SequenceStartEvent) and self.splits(path):
+            index = 0
+            while not loader.check_event(events.SequenceEndEvent):
+                yield from self._walk(path + (index,), loader.get_event())
+                index += 1
+            loader.get_event()
+        elif self.reads(path):
+            yield path, self._compose(event)
+        else:
+            self._skip(event)
+
+    def _entries(self, path: Tuple, value: Any) -> Iterator[Tuple[Tuple, Any]]:
+        """Entries of an already composed node, split as the stream would have split it"""
+        if isinstance(value, dict) and self.splits(path):
+            for key, item in value.items():
+                yield from self._entries(path + (key,), item)
+        elif isinstance(value, list) and self.splits(path):
+            for index, item in enumerate(value):
+                yield from self._entries(path + (index,), item)
+        elif self.reads(path):
+            yield path, value
+
+    def _skip(self, event) -> None:
+        """Consume the events of a node without building it"""
+        events = self._events
+        if isinstance(event, events.ScalarEvent) and event.anchor is None:
+            return
+        if not isinstance(event, events.CollectionStartEvent):
+            # Anchored or aliased nodes may be referenced later, so build them
+            self._compose(event)
+            return
+        if event.anchor is not None:
+            self._compose(event)
+            return
+        depth = 1
+        while depth:
+            event = self.loader.get_event()
+            if isinstance(event, events.CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, events.CollectionEndEvent):
+                depth -= 1
+
+    def _compose(self, event) -> Any:
+        """Build the value of the node starting at `event`"""
+        events = self._events
+        loader = self.loader
+        if isinstance(event, events.ScalarEvent):
+            value = self._scalar(event)
+        elif isinstance(event, events.AliasEvent):
+            if event.anchor not in self.anchors:
+                raise ValueError(f"found undefined alias {event.anchor!r} at {event.start_mark}")
+            return self.anchors[event.anchor]
+        elif isinstance(event, events.SequenceStartEvent):
+            value = []
+            if event.anchor is not None:
+                self.anchors[event.anchor] = value
+            while not loader.check_event(events.SequenceEndEvent):
+                value.append(self._compose(loader.get_event()))
+            loader.get_event()
+            return value
+        elif isinstance(event, events.MappingStartEvent):
+            value = {}
+            if event.anchor is not None:
+                self.anchors[event.anchor] = value
+            merged = []
+            while not loader.check_event(events.MappingEndEvent):
+                key_event = loader.get_event()
+                key = self._compose(key_event)
+                item = self._compose(loader.get_event())
+                if key == '<<' and self._is_merge(key_event):
+                    merged.extend(item if isinstance(item, list) else [item])
+                else:
+                    value[key] = item
+            loader.get_event()
+            if merged:
+                # Merged keys come first and the first mapping merged wins, as PyYAML orders them
+                own = dict(value)
+                value.clear()
+                for defaults in reversed(merged):
+                    value.update(defaults)
+                value.update(own)
+            return value
+        else:
+            raise ValueError(f"unexpected YAML event {event}")
+
+        if event.anchor is not None:
+            self.anchors[event.anchor] = value
+        return value
+
+    def _is_merge(self, event) -> bool:
+        return isinstance(event, self._events.ScalarEvent) and event.tag is None and event.implicit[0]
+
+    def _scalar(self, event) -> Any:
+        if event.tag is None and event.implicit[0]:
+            shared = self._scalars.get(event.value, self._scalars)
+            if shared is not self._scalars:
+                return shared
+            tag = self.loader.resolve(self._scalar_node, event.value, (True, False))
+        elif event.tag in (None, '!'):
+            # Quoted, or explicitly non-specific: share repeated strings (images, host IPs, networks)
+            return self._share(self._strings, event.value, event.value)
+        else:
+            tag = event.tag
+
+        if tag in (STR_TAG, MERGE_TAG):
+            value = event.value
+        else:
+            # Call the constructor directly; construct_object would keep every node alive
+            constructors = self.loader.yaml_constructors
+            construct = constructors.get(tag, constructors[None])
+            value = construct(self.loader, self._scalar_node(tag, event.value, event.start_mark, event.end_mark))
+        if event.tag is None:
+            return self._share(self._scalars, event.value, value)
+        return value
+
+    @staticmethod
+    def _share(cache: dict, key: str, value):
+        """Return the cached instance for `key`, caching `value` first if needed
+
+        The cache is dropped whenever it fills up, so hot values survive while
+        unique ones (names, container IPs) cannot grow it without bound.
+        """
+        shared = cache.get(key, cache)
+        if shared is not cache:
+            return shared
+        if len(cache) >= _SCALAR_CACHE_LIMIT:
+            cache.clear()
+        cache[key] = value
+        return value
+
+def stream_entries(path, splits: Callable[[Tuple], bool], reads: Callable[[Tuple], bool]
+                   ) -> Iterator[Tuple[Tuple, Any]]:
+    """Entries of the spec at `path` and the files it includes, read incrementally from disk"""
+    for spec_path in spec_files(path):
+        with open(spec_path, 'r') as f:
+            yield from SpecStream(f, splits, reads)
@@ -6,343 +6,722 @@ Validates port allocations, network connectivity, and service configurations
 to prevent conflicts and ensure optimal deployment.
 """
 
-import yaml
-import socket
-import subprocess
-import ipaddress
 import sys
 import argparse
+import contextlib
+import functools
+import io
+import threading
+import time
 from collections import defaultdict, Counter
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Callable, Dict, List, Optional, Tuple, Set
+
+import dns_graph
+import listener_index
+import port_conflicts
+import port_forwarding
+import port_scanner
+import reporting
+import spec_loader
+from connectivity_model import (MODEL_SECTIONS, SECTION_END, SERVICE_SECTIONS, ConnectivityModel, DnsRecord,
+                                ModelBuilder)
+from reporting import CheckResult, Report, Timer
+from validation_cache import DEFAULT_CACHE_DIR, ValidationCache
+
+# Top-level spec sections each cacheable check reads
+CHECK_SECTIONS = {
+    'port_conflicts': SERVICE_SECTIONS,
+    'ip_assignments': ('network_architecture', 'docker_networking'),
+    'port_ranges': SERVICE_SECTIONS + ('port_allocation', 'port_forwarding'),
+    'domain_mappings': SERVICE_SECTIONS + ('domain_mapping',),
+    'system_ports': SERVICE_SECTIONS + ('port_allocation', 'port_forwarding'),
+    'port_forwarding': SERVICE_SECTIONS + ('port_allocation', 'port_forwarding'),
+    'docker_networking': SERVICE_SECTIONS + ('network_architecture', 'docker_networking'),
+}
+
+# Top-level spec sections read by the checks that are never cached, and by the subcommands
+LIVE_SECTIONS = {
+    'port_availability': SERVICE_SECTIONS + ('network_architecture',),
+    'health_probe': SERVICE_SECTIONS + ('network_architecture',),
+    'dns_query': SERVICE_SECTIONS + ('domain_mapping',),
+    'listeners': SERVICE_SECTIONS + ('network_architecture', 'port_allocation'),
+    'port_summary': ('network_architecture',),
+    'load_test': SERVICE_SECTIONS + ('validation_procedures',),
+    'allocate': SERVICE_SECTIONS + ('network_architecture', 'docker_networking', 'port_allocation'),
+}
+
+def sections_read(*names: str) -> Tuple[str, ...]:
+    """Every top-level section the named checks or subcommands read, in spec order"""
+    wanted = {section for name in names for section in CHECK_SECTIONS.get(name) or LIVE_SECTIONS[name]}
+    return tuple(section for section in MODEL_SECTIONS if section in wanted) + tuple(
+        sorted(section for section in wanted if section not in MODEL_SECTIONS))
+
+# Changes listed by --since before the changed entities are validated
+MAX_CHANGES_SHOWN = 50
+
+# Validator state a check produces for later checks and the summary
+CHECK_STATE = {
+    'port_conflicts': 'port_allocations',
+    'ip_assignments': 'ip_allocations',
+}
+
+# Validator state each check reads, beyond the compiled model
+CHECK_READS = {
+    'system_ports': ('port_allocations',),
+    'port_availability': ('port_allocations',),
+    'port_summary': ('port_allocations', 'ip_allocations'),
+}
+
+# Checks that must finish before another starts, because they produce the state it reads
+CHECK_AFTER = {
+    name: tuple(producer for producer, state in CHECK_STATE.items() if state in reads)
+    for name, reads in CHECK_READS.items()
+}
 
 class ConnectivityValidator:
-    def __init__(self, config_file: str = None):
+    def __init__(self, config_file: str = None, cache: ValidationCache = None, jobs: int = None):
         """Initialize the validator with configuration"""
         self.config_file = config_file or "planning/specifications/connectivity-port-mapping.yml"
+        self.cache = cache
+        # Checks run at once; 1 runs them in sequence, None check_graph's default
+        self.jobs = jobs
         self.config = {}
+        self.section_hashes = {}
+        self.model = ConnectivityModel()
+        self._compiled_subnets = None
+        self._record_graph = None
+        # Guards the subnets and DNS graph that concurrent checks build on first use
+        self._lock = threading.Lock()
+        # Compiled entries kept between rebuilds of a watched spec (see ModelBuilder)
+        self._compiled_entries = None
         self.errors = []
         self.warnings = []
+        self.results: Dict[str, CheckResult] = {}
         self.port_allocations = defaultdict(list)
         self.ip_allocations = {}
         
-    def load_config(self) -> bool:
-        """Load the connectivity configuration file"""
-        try:
-            config_path = Path(self.config_file)
-            if not config_path.exists():
-                self.errors.append(f"Configuration file not found: {self.config_file}")
-                return False
-                
-            with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
-            print(f"✅ Loaded configuration from {self.config_file}")
-            return True
-        except Exception as e:
-            self.errors.append(f"Failed to load configuration: {e}")
+    def load_config(self, sections: Tuple[str, ...] = MODEL_SECTIONS, earlier: Optional[Dict] = None) -> bool:
+        """Load the connectivity configuration file and compile the given sections into the model
+        
+        Only those sections are parsed now; any other section is parsed when
+        first read, so a command that needs a few sections never parses the rest.
+        `earlier` maps spec files to an earlier text whose snapshot may stand in for them.
+        """
+        result = CheckResult('load_spec')
+        config_path = Path(self.config_file)
+        with Timer() as timer:
+            try:
+                if config_path.exists():
+                    snapshot_dir = self.cache.snapshot_dir if self.cache else None
+                    self.config, self.section_hashes = spec_loader.load_spec(config_path, snapshot_dir, sections,
+                                                                             earlier)
+                else:
+                    result.error(f"Configuration file not found: {self.config_file}", 'CV001')
+            except Exception as e:
+                result.error(f"Failed to load configuration: {e}", 'CV001')
+        result.add_time(timer)
+        result.examined = len(self.section_hashes)
+        if not self._record(result):
             return False
+        
+        return self._compile(sections)
+    
+    def _compile(self, sections: Tuple[str, ...] = None) -> bool:
+        """Compile the loaded config (only the given sections, when given) into the model, recording its issues"""
+        result = CheckResult('compile_spec')
+        with Timer() as timer:
+            try:
+                builder = ModelBuilder(self._compiled_entries)
+                self.model = builder.feed(self.config, sections)
+                self._compiled_entries = builder.compiled
+                self._compiled_subnets = None
+            except Exception as e:
+                result.error(f"Failed to load configuration: {e}", 'CV001')
+        result.add_time(timer)
+        if not result.passed:
+            return self._record(result)
+        print(f"✅ Loaded configuration from {self.config_file}")
+        
+        model = self.model
+        result.examined = (len(model.hosts) + len(model.networks) + len(model.services)
+                           + len(model.records) + len(model.forwards))
+        for severity, code, message, path in model.issues:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
+        return self._record(result)
+    
+    def _record(self, result: CheckResult) -> bool:
+        """Store a check result and merge its findings into the run totals"""
+        self.results[result.name] = result
+        self.errors.extend(result.errors)
+        self.warnings.extend(result.warnings)
+        return result.passed
     
     def validate_port_conflicts(self) -> bool:
-        """Check for port conflicts across all services"""
+        """Check for port conflicts across all services on each host (router ports: validate_port_forwarding)"""
         print("\n🔍 Validating port allocations...")
+        result = CheckResult('port_conflicts')
         
-        # Collect all port allocations
-        services = {}
+        intervals = [interval for interval in port_conflicts.binding_intervals(self.model)
+                     if interval.scope != port_conflicts.ROUTER_SCOPE]
+        result.examined = len(intervals)
         
-        # Foundation services
-        if 'foundation_services' in self.config:
-            services.update(self.config['foundation_services'])
-            
-        # Application services
-        if 'application_services' in self.config:
-            services.update(self.config['application_services'])
-            
-        # Monitoring stack
-        if 'monitoring_stack' in self.config:
-            services.update(self.config['monitoring_stack'])
-            
-        # Development environments
-        if 'development_environments' in self.config:
-            services.update(self.config['development_environments'])
-            
-        # Check for port conflicts
-        port_conflicts = defaultdict(list)
-        
-        for service_name, service_config in services.items():
-            if isinstance(service_config, dict):
-                host_ip = service_config.get('host_ip', 'unknown')
-                host_port = service_config.get('host_port')
-                ssh_port = service_config.get('ssh_port')
-                vnc_port = service_config.get('vnc_port')
-                
-                # Check host ports
-                if host_port:
-                    key = f"{host_ip}:{host_port}"
-                    port_conflicts[key].append(f"{service_name} (host_port)")
-                    self.port_allocations[host_ip].append(host_port)
-                
-                # Check SSH ports
-                if ssh_port:
-                    key = f"{host_ip}:{ssh_port}"
-                    port_conflicts[key].append(f"{service_name} (ssh_port)")
-                    self.port_allocations[host_ip].append(ssh_port)
-                
-                # Check VNC ports
-                if vnc_port:
-                    key = f"{host_ip}:{vnc_port}"
-                    port_conflicts[key].append(f"{service_name} (vnc_port)")
-                    self.port_allocations[host_ip].append(vnc_port)
+        for interval in intervals:
+            self.port_allocations[interval.scope].extend(range(interval.start, interval.end + 1))
+        
+        for interval in port_conflicts.invalid_intervals(intervals):
+            result.error(f"Invalid port {interval.ports} for {interval.label} on {interval.scope}",
+                         'CV101', interval.path)
         
         # Report conflicts
-        conflicts_found = False
-        for port_key, service_list in port_conflicts.items():
-            if len(service_list) > 1:
-                self.errors.append(f"Port conflict on {port_key}: {', '.join(service_list)}")
-                conflicts_found = True
+        for conflict in port_conflicts.find_conflicts(intervals):
+            result.error(conflict.describe(), 'CV102', conflict.second.path)
         
-        if not conflicts_found:
+        if result.passed:
             print("   ✅ No port conflicts detected")
         
-        return not conflicts_found
+        return self._record(result)
+    
+    def _subnets(self) -> Tuple[List['network_validator.Subnet'], List[Tuple[str, str]]]:
+        """Parse every declared subnet once per loaded model"""
+        import network_validator
+        
+        with self._lock:
+            if self._compiled_subnets is None:
+                self._compiled_subnets = network_validator.compile_subnets(self.model)
+            return self._compiled_subnets
     
     def validate_ip_assignments(self) -> bool:
         """Validate IP address assignments and subnets"""
         print("\n🌐 Validating IP address assignments...")
+        import network_validator
+        
+        result = CheckResult('ip_assignments')
+        subnets, subnet_errors = self._subnets()
         
         # Check physical infrastructure IPs
-        if 'network_architecture' in self.config:
-            phys_infra = self.config['network_architecture'].get('physical_infrastructure', {})
-            
-            for machine_name, machine_config in phys_infra.items():
-                ip = machine_config.get('ip')
-                if ip:
-                    try:
-                        ip_obj = ipaddress.IPv4Address(ip)
-                        # Check if IP is in the infrastructure VLAN
-                        infra_network = ipaddress.IPv4Network('192.168.10.0/24')
-                        if ip_obj not in infra_network:
-                            self.warnings.append(f"Machine {machine_name} IP {ip} not in infrastructure VLAN")
-                        
-                        self.ip_allocations[ip] = machine_name
-                    except Exception as e:
-                        self.errors.append(f"Invalid IP address for {machine_name}: {ip}")
-        
-        # Check Docker network subnets
-        if 'docker_networking' in self.config:
-            docker_nets = self.config['docker_networking'].get('swarm_networks', {})
-            
-            for net_name, net_config in docker_nets.items():
-                subnet = net_config.get('subnet')
-                if subnet:
-                    try:
-                        net_obj = ipaddress.IPv4Network(subnet)
-                        print(f"   ✅ Docker network {net_name}: {subnet}")
-                    except Exception as e:
-                        self.errors.append(f"Invalid subnet for Docker network {net_name}: {subnet}")
+        infra_network = network_validator.infrastructure_vlan(self.model, subnets)
+        for host in self.model.hosts:
+            if host.ip:
+                result.examined += 1
+                address = network_validator.parse_ipv4(host.ip)
+                if address is None:
+                    result.error(f"Invalid IP address for {host.name}: {host.ip}", 'CV201', f"{host.path}.ip")
+                    continue
+                
+                # Check if IP is in the infrastructure VLAN
+                if infra_network and address not in infra_network:
+                    result.warning(f"Machine {host.name} IP {host.ip} not in infrastructure VLAN",
+                                   'CV202', f"{host.path}.ip")
+                
+                if host.ip in self.ip_allocations:
+                    result.error(f"IP address {host.ip} assigned to both "
+                                 f"{self.ip_allocations[host.ip]} and {host.name}", 'CV203', f"{host.path}.ip")
+                else:
+                    self.ip_allocations[host.ip] = host.name
         
-        return len([e for e in self.errors if 'IP' in e or 'subnet' in e]) == 0
+        # Check network subnets
+        for message, path in subnet_errors:
+            result.error(message, 'CV204', path)
+        for subnet in subnets:
+            result.examined += 1
+            if subnet.is_docker:
+                print(f"   ✅ Docker network {subnet.name}: {subnet.cidr}")
+        
+        return self._record(result)
     
     def validate_port_ranges(self) -> bool:
         """Validate that services are using appropriate port ranges"""
         print("\n📊 Validating port range compliance...")
+        result = CheckResult('port_ranges')
         
-        if 'port_allocation' not in self.config:
-            self.warnings.append("No port allocation ranges defined")
-            return True
-            
-        port_ranges = self.config['port_allocation'].get('port_ranges', {})
-        range_violations = []
+        if 'port_allocation' not in self.model.sections:
+            result.warning("No port allocation ranges defined", 'CV301', 'port_allocation')
+            return self._record(result)
         
-        # Parse port ranges
-        ranges = {}
-        for range_name, range_str in port_ranges.items():
-            if '-' in range_str:
-                start, end = map(int, range_str.split('-'))
-                ranges[range_name] = (start, end)
+        ranges = self.model.port_ranges
         
         # Check services against ranges
-        services = {}
-        if 'foundation_services' in self.config:
-            services.update(self.config['foundation_services'])
-        if 'application_services' in self.config:
-            services.update(self.config['application_services'])
-        if 'monitoring_stack' in self.config:
-            services.update(self.config['monitoring_stack'])
-            
-        for service_name, service_config in services.items():
-            if isinstance(service_config, dict):
-                host_port = service_config.get('host_port')
-                if host_port:
-                    # Determine expected range based on service type
-                    expected_range = None
-                    if 'mcp' in service_name.lower() or 'coordinator' in service_name.lower():
-                        expected_range = 'mcp_servers'
-                    elif 'monitoring' in service_name.lower() or 'prometheus' in service_name.lower():
-                        expected_range = 'monitoring'
-                    elif 'api' in service_name.lower() or 'gateway' in service_name.lower():
-                        expected_range = 'web_interfaces'
-                    
-                    if expected_range and expected_range in ranges:
-                        start, end = ranges[expected_range]
-                        if not (start <= host_port <= end):
-                            range_violations.append(
-                                f"{service_name} port {host_port} outside expected range {expected_range} ({start}-{end})"
-                            )
-        
-        if range_violations:
-            for violation in range_violations:
-                self.warnings.append(violation)
-        else:
+        for service in self.model.services:
+            host_port = service.host_port
+            if host_port:
+                result.examined += 1
+                # Determine expected range based on service type
+                expected_range = port_conflicts.expected_range(service.name)
+                if expected_range and expected_range in ranges:
+                    port_range = ranges[expected_range]
+                    if host_port not in port_range:
+                        result.warning(
+                            f"{service.name} port {host_port} outside expected range {expected_range} "
+                            f"({port_range.start}-{port_range.end})",
+                            'CV302', f"{service.path}.host_port"
+                        )
+        
+        # Declared buckets must not overlap each other or the reserved ports
+        intervals = port_conflicts.range_intervals(self.model)
+        intervals += port_conflicts.reserved_intervals(self.model, [port_conflicts.ALLOCATION_SCOPE])
+        for conflict in port_conflicts.find_conflicts(intervals):
+            start, end = conflict.overlap
+            result.warning(
+                f"{conflict.first.label} overlaps {conflict.second.label} on ports "
+                f"{start if start == end else f'{start}-{end}'}",
+                'CV303', conflict.second.path
+            )
+        
+        if not result.warnings:
             print("   ✅ All services using appropriate port ranges")
             
-        return True
+        return self._record(result)
     
     def validate_domain_mappings(self) -> bool:
         """Validate domain name mappings and DNS configuration"""
         print("\n🌍 Validating domain mappings...")
+        from network_validator import parse_ipv4
         
-        if 'domain_mapping' not in self.config:
-            self.warnings.append("No domain mapping configuration found")
-            return True
-            
-        domain_config = self.config['domain_mapping']
-        
-        # Check internal domains
-        internal_domains = domain_config.get('internal_domains', {})
-        if 'records' in internal_domains:
-            for record in internal_domains['records']:
-                name = record.get('name')
-                record_type = record.get('type')
-                value = record.get('value')
-                
-                if record_type == 'A':
-                    try:
-                        ipaddress.IPv4Address(value)
-                        print(f"   ✅ Internal A record: {name}.doggpack.local → {value}")
-                    except Exception:
-                        self.errors.append(f"Invalid IP in A record: {name} → {value}")
-                elif record_type == 'CNAME':
-                    print(f"   ✅ Internal CNAME record: {name}.doggpack.local → {value}")
-        
-        # Check external domains
-        external_domains = domain_config.get('external_domains', {})
-        if 'records' in external_domains:
-            for record in external_domains['records']:
-                name = record.get('name')
-                record_type = record.get('type')
-                value = record.get('value')
-                proxied = record.get('proxied', False)
-                
-                print(f"   ✅ External {record_type} record: {name}.doggpack.net → {value} (Proxied: {proxied})")
+        result = CheckResult('domain_mappings')
+        
+        if 'domain_mapping' not in self.model.sections:
+            result.warning("No domain mapping configuration found", 'CV401', 'domain_mapping')
+            return self._record(result)
+        
+        for record in self.model.records:
+            result.examined += 1
+            if record.zone == 'internal':
+                # Check internal domains
+                if record.type == 'A':
+                    if parse_ipv4(record.value) is not None:
+                        print(f"   ✅ Internal A record: {record.fqdn} → {record.value}")
+                    else:
+                        result.error(f"Invalid IP in A record: {record.name} → {record.value}",
+                                     'CV402', f"{record.path}.value")
+                elif record.type == 'CNAME':
+                    print(f"   ✅ Internal CNAME record: {record.fqdn} → {record.value}")
+            else:
+                # Check external domains
+                print(f"   ✅ External {record.type} record: {record.fqdn} → {record.value} "
+                      f"(Proxied: {record.proxied})")
         
-        return len([e for e in self.errors if 'domain' in e.lower()]) == 0
+        self._check_record_graph(result)
+        return self._record(result)
+    
+    def _dns_graph(self) -> dns_graph.DnsGraph:
+        """The DNS record graph of the model, kept across rebuilds that leave domain_mapping untouched"""
+        source = self.config.get('domain_mapping')
+        with self._lock:
+            if self._record_graph is not None:
+                model, known_source, graph = self._record_graph
+                if model is self.model or (source is not None and known_source is source):
+                    return graph
+            graph = dns_graph.DnsGraph(self.model)
+            self._record_graph = (self.model, source, graph)
+            return graph
+    
+    def _check_record_graph(self, result: CheckResult) -> None:
+        """Resolve every record and service domain through the memoized DNS record graph"""
+        graph = self._dns_graph()
+        examined, findings = dns_graph.check_service_domains(graph, self.model.services)
+        result.examined += examined
+        for severity, code, message, path in dns_graph.check_records(graph) + findings:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
     
     def check_system_ports(self) -> bool:
         """Check if any allocated ports conflict with system/reserved ports"""
         print("\n⚠️  Checking for system port conflicts...")
+        result = CheckResult('system_ports')
         
-        if 'port_allocation' not in self.config:
-            return True
-            
-        reserved_ports = self.config['port_allocation'].get('reserved_system_ports', [])
+        if 'port_allocation' not in self.model.sections:
+            return self._record(result)
         
-        conflicts = []
-        for host_ip, ports in self.port_allocations.items():
-            for port in ports:
-                if port in reserved_ports:
-                    conflicts.append(f"Service port {port} on {host_ip} conflicts with reserved system port")
+        # An ingress listener declared on a reserved port (http_port: 80) is what the port is reserved for
+        bindings = [
+            interval for interval in port_conflicts.binding_intervals(self.model)
+            if interval.scope in self.port_allocations and not port_conflicts.claims_reserved(interval)
+        ]
+        reserved = port_conflicts.reserved_intervals(self.model, self.port_allocations)
+        result.examined = len(bindings)
         
-        if conflicts:
-            for conflict in conflicts:
-                self.errors.append(conflict)
-        else:
+        for conflict in port_conflicts.find_conflicts(bindings + reserved):
+            if sorted(conflict.kinds) == [port_conflicts.BINDING, port_conflicts.RESERVED]:
+                start, end = conflict.overlap
+                service = conflict.second if conflict.first.kind == port_conflicts.RESERVED else conflict.first
+                for port in range(start, end + 1):
+                    result.error(f"Service port {port} on {service.scope} conflicts with reserved system port "
+                                 f"({service.label})", 'CV501', service.path)
+        
+        if result.passed:
             print("   ✅ No conflicts with reserved system ports")
             
-        return len(conflicts) == 0
+        return self._record(result)
+    
+    def validate_port_forwarding(self) -> bool:
+        """Check router forwards and service external ports against each other and the host bindings"""
+        print("\n🔀 Validating port forwarding...")
+        result = CheckResult('port_forwarding')
+        
+        result.examined, findings = port_forwarding.check_forwards(self.model)
+        for severity, code, message, path in findings:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
+        
+        if result.passed and not result.warnings:
+            print(f"   ✅ {len(self.model.forwards)} forwards route to declared services")
+        
+        return self._record(result)
     
     def validate_docker_networking(self) -> bool:
         """Validate Docker networking configuration"""
         print("\n🐳 Validating Docker networking...")
+        import network_validator
         
-        if 'docker_networking' not in self.config:
-            self.warnings.append("No Docker networking configuration found")
-            return True
-            
-        docker_config = self.config['docker_networking']
+        result = CheckResult('docker_networking')
         
-        # Check overlay networks don't overlap
-        overlay_networks = docker_config.get('swarm_networks', {})
-        networks = []
+        if 'docker_networking' not in self.model.sections:
+            result.warning("No Docker networking configuration found", 'CV601', 'docker_networking')
+            return self._record(result)
         
-        for net_name, net_config in overlay_networks.items():
-            subnet = net_config.get('subnet')
-            if subnet:
-                try:
-                    net_obj = ipaddress.IPv4Network(subnet)
-                    networks.append((net_name, net_obj))
-                except Exception as e:
-                    self.errors.append(f"Invalid Docker network subnet {net_name}: {subnet}")
+        subnets, _ = self._subnets()
+        result.examined = len(subnets)
         
-        # Check for overlapping networks
-        for i, (name1, net1) in enumerate(networks):
-            for name2, net2 in networks[i+1:]:
-                if net1.overlaps(net2):
-                    self.errors.append(f"Docker networks overlap: {name1} ({net1}) and {name2} ({net2})")
+        # Check that no two networks (Docker or VLAN) overlap
+        for first, second in network_validator.find_overlaps(subnets):
+            result.error(network_validator.describe_overlap(first, second), 'CV602', second.path)
         
-        if not any('Docker networks overlap' in e for e in self.errors):
-            print(f"   ✅ {len(networks)} Docker overlay networks configured without overlap")
+        # Check container IP membership and uniqueness
+        for message, path in network_validator.check_container_ips(self.model.services, subnets):
+            result.error(message, 'CV603', path)
+        
+        if result.passed:
+            docker_count = sum(1 for subnet in subnets if subnet.is_docker)
+            print(f"   ✅ {docker_count} Docker networks configured without overlap")
             
-        return len([e for e in self.errors if 'Docker' in e]) == 0
+        return self._record(result)
     
-    def check_port_availability(self, host_ips: List[str] = None) -> bool:
+    def check_port_availability(self, host_ips: List[str] = None,
+                                timeout: float = port_scanner.DEFAULT_TIMEOUT,
+                                max_concurrency: int = port_scanner.DEFAULT_MAX_CONCURRENCY,
+                                per_host_limit: int = port_scanner.DEFAULT_PER_HOST_LIMIT) -> bool:
         """Check if ports are actually available on target hosts"""
         print("\n🔌 Checking port availability on target hosts...")
+        result = CheckResult('port_availability')
         
         if not host_ips:
             # Use IPs from configuration
-            host_ips = []
-            if 'network_architecture' in self.config:
-                phys_infra = self.config['network_architecture'].get('physical_infrastructure', {})
-                host_ips = [config.get('ip') for config in phys_infra.values() if config.get('ip')]
+            host_ips = [host.ip for host in self.model.hosts if host.ip]
         
-        availability_issues = []
+        targets = [
+            (host_ip, port)
+            for host_ip in host_ips if host_ip in self.port_allocations
+            for port in self.port_allocations[host_ip]
+        ]
         
-        for host_ip in host_ips:
-            if host_ip in self.port_allocations:
-                ports_to_check = self.port_allocations[host_ip]
-                
-                for port in ports_to_check:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(1)
-                    
-                    try:
-                        result = sock.connect_ex((host_ip, port))
-                        if result == 0:
-                            # Port is open - might be in use
-                            availability_issues.append(f"Port {port} appears to be in use on {host_ip}")
-                        else:
-                            # Port is available
-                            pass
-                    except Exception as e:
-                        self.warnings.append(f"Could not check port {port} on {host_ip}: {e}")
-                    finally:
-                        sock.close()
-        
-        if availability_issues:
-            for issue in availability_issues:
-                self.warnings.append(issue)
-        else:
+        start = time.perf_counter()
+        try:
+            probes = port_scanner.scan_ports(targets, timeout, max_concurrency, per_host_limit)
+        except Exception as e:
+            result.warning(f"Could not scan ports: {e}", 'CV701')
+            self._record(result)
+            return True
+        elapsed = time.perf_counter() - start
+        
+        counts = port_scanner.summarize(probes)
+        print(f"   Probed {len(probes)} ports in {elapsed:.2f}s "
+              f"({counts['open']} open, {counts['closed']} closed, {counts['filtered']} filtered)")
+        
+        result.examined = len(probes)
+        in_use = False
+        filtered = defaultdict(list)
+        
+        for probe in probes:
+            if probe.state == port_scanner.OPEN:
+                # Port is open - might be in use
+                result.warning(f"Port {probe.port} appears to be in use on {probe.host}", 'CV702',
+                               self._binding_path(probe.host, probe.port))
+                in_use = True
+            elif probe.state == port_scanner.FILTERED:
+                filtered[probe.host].append(probe.port)
+        
+        for host_ip, ports in filtered.items():
+            result.warning(
+                f"Could not check {len(ports)} port(s) on {host_ip} "
+                f"(no response within {timeout:g}s): {', '.join(map(str, ports))}",
+                'CV703'
+            )
+        
+        if not in_use:
             print(f"   ✅ All allocated ports appear available on target hosts")
+        
+        # Availability findings are advisory only
+        self._record(result)
+        return True
+    
+    def _binding_path(self, host_ip: str, port: int) -> str:
+        """YAML path of the service field that binds a host port"""
+        for endpoint in self.model.endpoints_by_host.get(host_ip, ()):
+            if endpoint.port <= port <= endpoint.end:
+                return endpoint.path
+        return ''
+    
+    def check_listeners(self, snapshots: List[str]) -> bool:
+        """Compare saved (or local) ss/netstat/docker ps output per host with every allocated port"""
+        print("\n👂 Comparing listener snapshots with allocations...")
+        import subprocess
+        
+        result = CheckResult('listeners')
+        
+        index = listener_index.ListenerIndex()
+        start = time.perf_counter()
+        for entry in snapshots:
+            host, _, source = entry.partition('=')
+            known = self.model.hosts_by_name.get(host) or self.model.hosts_by_ip.get(host)
+            if known is None or not known.ip:
+                result.error(f"Listener snapshot {source} is for {host}, which is not a host in the spec", 'CV704')
+                continue
+            try:
+                text = listener_index.capture_local() if source == 'local' else Path(source).read_text()
+            except (OSError, UnicodeDecodeError, subprocess.SubprocessError) as e:
+                result.error(f"Could not read listener snapshot {source} for {host}: {e}", 'CV704')
+                continue
+            index.add(known.ip, listener_index.parse_snapshot(text, source))
+        
+        result.examined, findings = listener_index.compare(self.model, index)
+        print(f"   Indexed {len(index)} listeners on {len(index.hosts)} host(s) and compared "
+              f"{result.examined} allocated ports in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for severity, code, message, path in findings:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
+        
+        if result.passed and not result.warnings and index.hosts:
+            print(f"   ✅ Every allocated port is served by its service")
+        
+        return self._record(result)
+    
+    def probe_health(self, samples: int = None, timeout: float = None, retries: int = None,
+                     max_concurrency: int = None, connections_per_host: int = None,
+                     resolve: List[str] = None) -> bool:
+        """Sample every service health endpoint and report availability and latency percentiles
+        
+        Options left as None take health_prober's defaults.
+        """
+        print("\n🩺 Probing service health endpoints...")
+        import health_prober
+        
+        result = CheckResult('health_probe')
+        
+        targets, invalid = health_prober.targets_from_model(self.model)
+        for service, url in invalid:
+            result.warning(f"Unsupported health_check URL for {service}: {url}", 'CV803',
+                           f"{self.model.services_by_name[service].path}.health_check")
+        if not targets:
+            print("   No health endpoints declared")
+            return self._record(result)
+        
+        try:
+            overrides = health_prober.parse_resolve(resolve)
+        except ValueError as e:
+            result.error(f"Invalid --resolve: {e}", 'CV801')
+            return self._record(result)
+        
+        prober = health_prober.HealthProber(
+            health_prober.DEFAULT_TIMEOUT if timeout is None else timeout,
+            health_prober.DEFAULT_RETRIES if retries is None else retries,
+            max_concurrency or health_prober.DEFAULT_MAX_CONCURRENCY,
+            connections_per_host or health_prober.DEFAULT_CONNECTIONS_PER_HOST, overrides)
+        start = time.perf_counter()
+        probes = prober.probe(targets, samples or health_prober.DEFAULT_SAMPLES)
+        elapsed = time.perf_counter() - start
+        result.examined = len(probes)
+        print(f"   {len(probes)} samples of {len(targets)} endpoints in {elapsed:.2f}s "
+              f"({prober.requests} requests over {prober.connections} connection(s))")
+        
+        by_service = health_prober.aggregate(probes, lambda target: target.service)
+        by_host = health_prober.aggregate(probes, lambda target: self.model.hostname(target.host_ip))
+        for title, groups in (('service', by_service), ('host', by_host)):
+            width = max(len(name) for name in groups)
+            print(f"\n   {title:<{width}}  {'avail':>6}  {'p50 ms':>7}  {'p95 ms':>7}  {'p99 ms':>7}")
+            for name, stats in groups.items():
+                print(f"   {name:<{width}}  {stats.availability:6.1%}  {health_prober.format_ms(stats.percentile(0.5)):>7}  "
+                      f"{health_prober.format_ms(stats.percentile(0.95)):>7}  "
+                      f"{health_prober.format_ms(stats.percentile(0.99)):>7}")
+        
+        for name, stats in by_service.items():
+            path = f"{self.model.services_by_name[name].path}.health_check"
+            reasons = ', '.join(f"{error} ×{count}" for error, count in stats.errors.items())
+            if not stats.ok:
+                result.error(f"Health endpoint of {name} unavailable ({reasons})", 'CV801', path)
+            elif stats.ok < stats.samples:
+                result.warning(f"Health endpoint of {name} answered {stats.ok}/{stats.samples} samples "
+                               f"({reasons})", 'CV802', path)
+        
+        if result.passed and not result.warnings:
+            print(f"\n   ✅ All {len(by_service)} health endpoints available")
+        
+        return self._record(result)
+    
+    def query_dns(self, server: str = None, timeout: float = None, retries: int = None) -> bool:
+        """Query every managed record at its zone's DNS server and compare the answers with the spec"""
+        print("\n🧭 Querying DNS servers...")
+        import dns_probe
+        
+        result = CheckResult('dns_query')
+        graph = self._dns_graph()
+        
+        # Names per server; --dns-server sends every zone to one server
+        by_server: Dict[Tuple[str, int], Dict[str, DnsRecord]] = {}
+        for name, records in graph.records.items():
+            zone = records[0].zone
+            address = server or self.model.dns_servers.get(zone)
+            if not address:
+                continue
+            try:
+                endpoint = dns_probe.parse_server(str(address))
+            except ValueError:
+                result.error(f"Invalid DNS server for {zone} domains: {address}", 'CV901')
+                return self._record(result)
+            by_server.setdefault(endpoint, {})[name] = records[0]
+        if not by_server:
+            print("   No dns_server declared for any zone")
+            return self._record(result)
+        
+        for endpoint, names in by_server.items():
+            start = time.perf_counter()
+            answers = dns_probe.query_all(names, endpoint, timeout or dns_probe.DEFAULT_TIMEOUT,
+                                          dns_probe.DEFAULT_RETRIES if retries is None else retries)
+            elapsed = time.perf_counter() - start
+            result.examined += len(answers)
+            answered = sum(answer.answered for answer in answers)
+            print(f"   {endpoint[0]}:{endpoint[1]}: {answered}/{len(answers)} names answered in {elapsed:.2f}s")
             
+            for answer in answers:
+                record = names[answer.name]
+                expected = graph.resolve(answer.name)
+                if not answer.answered:
+                    result.warning(f"No answer for {answer.name} from {endpoint[0]} ({answer.error})",
+                                   'CV901', record.path)
+                elif answer.rcode == dns_probe.RCODE_NXDOMAIN:
+                    result.error(f"{endpoint[0]} does not know {answer.name} (NXDOMAIN)", 'CV902', record.path)
+                elif answer.rcode != dns_probe.RCODE_OK:
+                    # A looping chain fails on the server as well and is already reported offline
+                    if expected.outcome != dns_graph.LOOP:
+                        result.warning(f"{endpoint[0]} failed to resolve {answer.name} (rcode {answer.rcode})",
+                                       'CV901', record.path)
+                else:
+                    mismatch = dns_probe.compare(graph, answer)
+                    if mismatch:
+                        result.error(f"{endpoint[0]} differs from the spec: {mismatch}", 'CV903', record.path)
+        
+        if result.passed and not result.warnings:
+            print(f"   ✅ All {result.examined} names answered as specified")
+        
+        return self._record(result)
+    
+    def load_test(self, urls: List[str] = None, services: List[str] = None, mode: str = 'closed',
+                  requests: int = None, duration: float = None, concurrency: int = None, rps: float = None,
+                  timeout: float = None, resolve: List[str] = None,
+                  stand_in: Dict = None) -> bool:
+        """Drive the spec's ab load tests (or the given services and URLs) and check the spec's thresholds
+        
+        With `stand_in` ({'latency': s, 'failure_rate': r}), every target is
+        answered by a loopback stand-in server instead of the real endpoint.
+        """
+        import health_prober
+        import load_generator
+        
+        print("🔍 DoggPack Load Test")
+        print("=" * 40)
+        if not self.load_config(sections_read('load_test')):
+            return False
+        
+        print("\n🏋️  Generating load...")
+        result = CheckResult('load_test')
+        targets = []
+        for name in services or ():
+            service = self.model.services_by_name.get(name)
+            target = load_generator.service_target(service) if service else None
+            if target is None:
+                result.error(f"No load test target for service {name}: "
+                             f"{'no host_port' if service else 'not in the spec'}", 'CV811')
+            else:
+                targets.append(target)
+        for url in urls or ():
+            target = health_prober.parse_health_url(url, '', url)
+            if target is None:
+                result.error(f"Unsupported load test URL: {url}", 'CV811')
+            else:
+                targets.append(load_generator.LoadTarget(url, target))
+        if not services and not urls:
+            targets, skipped = load_generator.targets_from_spec(self.config)
+            for path, command in skipped:
+                print(f"   Skipping {command!r}: not an ab load test")
+        if not targets:
+            print("   No load tests to run")
+            return self._record(result)
+        
+        thresholds = load_generator.thresholds_from_spec(self.config)
+        try:
+            overrides = health_prober.parse_resolve(resolve)
+        except ValueError as e:
+            result.error(f"Invalid --resolve: {e}", 'CV811')
+            return self._record(result)
+        
+        server = None
+        if stand_in is not None:
+            server = health_prober.StandInServer([target.target for target in targets], same_ports=False,
+                                                 **stand_in).start()
+            overrides.update(server.resolve)
+            print(f"   Answering {len(targets)} target(s) from {len(server.servers)} loopback stand-in(s)")
+        
+        generator = load_generator.LoadGenerator(health_prober.DEFAULT_TIMEOUT if timeout is None else timeout,
+                                                 overrides)
+        try:
+            with Timer() as timer:
+                for target in targets:
+                    outcome = generator.run(target, mode, requests, duration, concurrency, rps)
+                    result.examined += outcome.requests
+                    for line in load_generator.format_result(outcome):
+                        print(line)
+                    for severity, code, message in outcome.check(thresholds):
+                        if severity == 'error':
+                            result.error(message, code, target.source)
+                        else:
+                            result.warning(message, code, target.source)
+        finally:
+            if server is not None:
+                server.stop()
+        result.add_time(timer)
+        
+        if thresholds:
+            print(f"\n   Thresholds: {', '.join(f'{key} {value:g}' for key, value in thresholds.items())}")
+        self._record(result)
+        print(f"\n📊 Load Test Results:")
+        print(f"   Errors: {len(self.errors)}")
+        print(f"   Warnings: {len(self.warnings)}")
+        for finding in result.findings:
+            print(f"   {'❌' if finding.severity == 'error' else '⚠️ '} [{finding.code}] {finding.message}")
+        if self.errors:
+            print(f"\n❌ Load test failed")
+            return False
+        print(f"\n✅ Load test passed")
         return True
     
-    def generate_port_summary(self) -> None:
+    def generate_port_summary(self) -> bool:
         """Generate a summary of port allocations"""
         print("\n📋 Port Allocation Summary:")
         print("=" * 50)
+        result = CheckResult('port_summary')
+        result.examined = len(self.port_allocations)
         
         for host_ip, ports in self.port_allocations.items():
-            hostname = self.ip_allocations.get(host_ip, host_ip)
+            hostname = self.ip_allocations.get(host_ip) or self.model.hostname(host_ip)
             ports_sorted = sorted(set(ports))
             print(f"\n{hostname} ({host_ip}):")
             
@@ -369,32 +748,413 @@ class ConnectivityValidator:
                 
                 print(f"   Ports: {', '.join(ranges)}")
                 print(f"   Total: {len(ports_sorted)} ports")
+        
+        return self._record(result)
     
-    def run_validation(self, check_availability: bool = False) -> bool:
-        """Run all validation checks"""
+    def _run_check(self, name: str, check) -> bool:
+        """Run and time a check, replaying its cached result when its spec sections are unchanged"""
+        import check_graph
+        
+        cacheable = self.cache is not None and name in CHECK_SECTIONS
+        if cacheable:
+            key = self.cache.key('connectivity-check', name,
+                                 [self.section_hashes.get(section) for section in CHECK_SECTIONS[name]])
+            entry = self.cache.get(key)
+            if entry is not None:
+                print(entry['output'], end='')
+                result = CheckResult.from_dict(entry['result'])
+                result.cached = True
+                if name in CHECK_STATE:
+                    getattr(self, CHECK_STATE[name]).update(entry['state'])
+                return self._record(result)
+        
+        output = io.StringIO()
+        capture = check_graph.tee(output) if cacheable else contextlib.nullcontext()
+        with capture, Timer() as timer:
+            passed = check()
+        result = self.results[name]
+        result.add_time(timer)
+        if cacheable:
+            entry = {'output': output.getvalue(), 'result': result.as_dict()}
+            if name in CHECK_STATE:
+                entry['state'] = getattr(self, CHECK_STATE[name])
+            self.cache.put(key, entry)
+        return passed
+    
+    def run_validation(self, check_availability: bool = False, scan_options: Dict = None,
+                       health_options: Dict = None, dns_options: Dict = None,
+                       listener_snapshots: List[str] = None) -> bool:
+        """Run all validation checks; health endpoints and DNS servers are queried when their options are given"""
+        # Live probes and listener snapshots are never cached, so only offline runs can be replayed whole
+        live = check_availability or health_options is not None or dns_options is not None or listener_snapshots
+        if self.cache is None or live or not Path(self.config_file).exists():
+            return self._run_validation(check_availability, scan_options, health_options, dns_options,
+                                        listener_snapshots)
+        
+        try:
+            # Covers every file an include manifest pulls in; the replayed output names the spec's path
+            key = self.cache.key('connectivity-run', self.config_file, spec_loader.spec_digest(self.config_file))
+        except Exception:
+            # Let load_config report why the spec cannot be read
+            return self._run_validation(check_availability, scan_options, health_options, dns_options, None)
+        entry = self.cache.get(key)
+        if entry is not None:
+            print(entry['output'], end='')
+            for data in entry['results']:
+                result = CheckResult.from_dict(data)
+                result.cached = True
+                self._record(result)
+            return entry['success']
+        
+        import check_graph
+        
+        output = io.StringIO()
+        with check_graph.tee(output):
+            success = self._run_validation(check_availability, scan_options, health_options, dns_options, None)
+        self.cache.put(key, {
+            'output': output.getvalue(),
+            'results': [result.as_dict() for result in self.results.values()],
+            'success': success,
+        })
+        self.cache.prune()
+        return success
+    
+    def _run_validation(self, check_availability: bool, scan_options: Dict, health_options: Dict,
+                        dns_options: Dict, listener_snapshots: List[str]) -> bool:
         print("🔍 DoggPack Connectivity Validation")
         print("=" * 40)
         
         if not self.load_config():
             return False
         
-        validation_passed = True
+        # Run all validation checks, overlapping the offline ones with the live probes
+        return self._finish_validation(True, check_availability, scan_options, health_options, dns_options,
+                                       listener_snapshots, self._spec_checks())
+    
+    def _spec_checks(self) -> List[Tuple[str, Callable[[], bool]]]:
+        """The offline checks, in reporting order"""
+        return [
+            ('port_conflicts', self.validate_port_conflicts),
+            ('ip_assignments', self.validate_ip_assignments),
+            ('port_ranges', self.validate_port_ranges),
+            ('domain_mappings', self.validate_domain_mappings),
+            ('system_ports', self.check_system_ports),
+            ('port_forwarding', self.validate_port_forwarding),
+            ('docker_networking', self.validate_docker_networking),
+        ]
+    
+    def _finish_validation(self, validation_passed: bool, check_availability: bool, scan_options: Dict,
+                           health_options: Dict, dns_options: Dict, listener_snapshots: List[str] = None,
+                           checks: List[Tuple[str, Callable[[], bool]]] = ()) -> bool:
+        """Run the remaining checks with the live probes and the summary, then report"""
+        checks = list(checks)
+        if check_availability:
+            checks.append(('port_availability', lambda: self.check_port_availability(**(scan_options or {}))))
         
-        # Run all validation checks
-        validation_passed &= self.validate_port_conflicts()
-        validation_passed &= self.validate_ip_assignments()
-        validation_passed &= self.validate_port_ranges()
-        validation_passed &= self.validate_domain_mappings()
-        validation_passed &= self.check_system_ports()
-        validation_passed &= self.validate_docker_networking()
+        if health_options is not None:
+            checks.append(('health_probe', lambda: self.probe_health(**health_options)))
         
-        if check_availability:
-            validation_passed &= self.check_port_availability()
+        if dns_options is not None:
+            checks.append(('dns_query', lambda: self.query_dns(**dns_options)))
+        
+        if listener_snapshots:
+            checks.append(('listeners', lambda: self.check_listeners(listener_snapshots)))
         
         # Generate summary
-        self.generate_port_summary()
+        checks.append(('port_summary', self.generate_port_summary))
+        
+        passed = self._run_checks(checks)
+        validation_passed &= all(ok for name, ok in passed.items() if name != 'port_summary')
+        return self._report_results(validation_passed)
+    
+    def _run_checks(self, checks: List[Tuple[str, Callable[[], bool]]]) -> Dict[str, bool]:
+        """Run checks as a dependency graph, keeping results and totals in registration order"""
+        import check_graph
+        
+        known = list(self.results)
+        passed = check_graph.run_checks(
+            [(name, functools.partial(self._run_check, name, check)) for name, check in checks],
+            CHECK_AFTER, check_graph.DEFAULT_JOBS if self.jobs is None else self.jobs)
+        
+        # Checks record their results as they finish; a sequential run would have recorded them in order
+        order = known + [name for name, _ in checks] + list(self.results)
+        self.results = {name: self.results[name] for name in order if name in self.results}
+        self.errors = [error for result in self.results.values() for error in result.errors]
+        self.warnings = [warning for result in self.results.values() for warning in result.warnings]
+        return passed
+    
+    def stream_validation(self, check_availability: bool = False, scan_options: Dict = None,
+                          health_options: Dict = None, dns_options: Dict = None,
+                          listener_snapshots: List[str] = None) -> bool:
+        """Validate while the spec is being parsed, keeping only the compiled model in memory
+        
+        Each check runs as soon as every section it reads has been parsed, and
+        compile errors are printed as they are found. Nothing is cached.
+        """
+        import spec_stream
+        
+        print("🔍 DoggPack Connectivity Validation (streaming)")
+        print("=" * 40)
+        
+        result = CheckResult('stream_spec')
+        # Reserve the first slot so the parse leads the report
+        self.results[result.name] = result
+        if not Path(self.config_file).exists():
+            result.error(f"Configuration file not found: {self.config_file}", 'CV001')
+            return self._record(result)
+        
+        builder = ModelBuilder()
+        self.model = builder.model
+        self._compiled_subnets = None
+        entries = spec_stream.stream_entries(self.config_file, builder.splits, builder.reads)
+        pending = self._spec_checks()
+        validation_passed = True
+        compiled = True
+        reported = 0
+        
+        while True:
+            with Timer() as timer:
+                try:
+                    entry = next(entries, None)
+                    if entry is not None:
+                        builder.add(*entry)
+                except Exception as e:
+                    result.error(f"Failed to load configuration: {e}", 'CV001')
+                    entry = None
+            result.add_time(timer)
+            
+            for severity, code, message, path in self.model.issues[reported:]:
+                print(f"   {'❌' if severity == 'error' else '⚠️ '} [{code}] {message} ({path})")
+                compiled &= severity != 'error'
+            reported = len(self.model.issues)
+            
+            if entry is None:
+                break
+            # As in a full run, no check sees a model the compiler found errors in
+            if entry[1] is SECTION_END and compiled:
+                validation_passed &= self._run_ready(pending)
+        
+        result.examined = builder.entries
+        for severity, code, message, path in self.model.issues:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
+        if not result.passed:
+            return self._record(result)
+        self._record(result)
+        print(f"\n✅ Streamed {builder.entries} entries from {self.config_file}")
+        
+        # Sections that never appeared are only known to be absent now
+        return self._finish_validation(validation_passed, check_availability, scan_options, health_options,
+                                       dns_options, listener_snapshots, pending)
+    
+    def _run_ready(self, pending: List[Tuple[str, Callable[[], bool]]]) -> bool:
+        """Run, in order, the pending checks whose sections and prerequisite checks are complete"""
+        passed = True
+        for name, check in list(pending):
+            ready = set(CHECK_SECTIONS[name]) <= self.model.sections
+            if ready and all(other in self.results for other in CHECK_AFTER.get(name, ())):
+                passed &= self._run_check(name, check)
+                pending.remove((name, check))
+        return passed
+    
+    def watch(self, check_availability: bool = False, scan_options: Dict = None, health_options: Dict = None,
+              dns_options: Dict = None, listener_snapshots: List[str] = None,
+              interval: float = None, polling: bool = False,
+              on_cycle: Callable[[], None] = None) -> bool:
+        """Validate, then re-validate on every save until interrupted
+        
+        The parsed spec, model and check results stay in memory. Each save
+        re-parses only the entries whose text changed and re-runs only the
+        checks that read a changed section; live checks run after every change.
+        """
+        import file_watcher
+        
+        spec = self.resident_spec()
+        live = (check_availability, scan_options, health_options, dns_options, listener_snapshots)
+        passed = self.revalidate(spec, live)
+        if on_cycle:
+            on_cycle()
+        
+        watched = self.watched_paths(spec)
+        interval = file_watcher.DEFAULT_INTERVAL if interval is None else interval
+        with file_watcher.FileWatcher(watched, interval=interval, polling=polling) as watcher:
+            print(f"\n👀 Watching {', '.join(watched)} ({watcher.backend}); press Ctrl-C to stop")
+            try:
+                while True:
+                    if not watcher.wait():
+                        continue
+                    outcome = self.revalidate(spec, live)
+                    if outcome is not None:
+                        passed = outcome
+                        if on_cycle:
+                            on_cycle()
+            except KeyboardInterrupt:
+                print()
+        return passed
+    
+    def resident_spec(self) -> 'resident_spec.ResidentManifest':
+        """The spec kept in memory file by file, for revalidate; compiled entries are kept between rebuilds"""
+        from resident_spec import ResidentManifest
+        
+        self._compiled_entries = {}
+        return ResidentManifest(self.config_file)
+    
+    def watched_paths(self, spec: 'resident_spec.ResidentManifest') -> List[str]:
+        """What to watch for saves to a resident spec"""
+        # A split spec is watched by directory, so files it starts to include are seen too
+        paths = spec.paths
+        return [self.config_file] if len(paths) <= 1 else sorted({str(path.parent) for path in paths})
+    
+    def revalidate(self, spec: 'resident_spec.ResidentManifest',
+                   live: Tuple = (False, None, None, None, None)) -> Optional[bool]:
+        """Bring the resident results up to date with the file; None when nothing needed re-validating
+        
+        `live` holds the check_availability, scan, health, DNS and listener
+        options of run_validation; by default only the offline checks run.
+        """
+        start = time.perf_counter()
+        first = not any(name in self.results for name in CHECK_SECTIONS)
+        result = CheckResult('load_spec')
+        with Timer() as timer:
+            try:
+                changed = spec.refresh()
+            except Exception as e:
+                result.error(f"Failed to load configuration: {e}", 'CV001')
+        result.add_time(timer)
+        
+        stamp = time.strftime('%H:%M:%S')
+        if not result.passed:
+            # Keep the last good model so the next save is compared against it
+            print(f"\n[{stamp}] ❌ [CV001] {result.errors[0]}")
+            print("   Waiting for the next save")
+            return self._record(result)
+        if changed is None:
+            if self.results.get('load_spec') is None or self.results['load_spec'].passed:
+                return None
+            print(f"\n[{stamp}] ✅ {self.config_file} parses again and matches the last validated version")
+            result.examined = len(spec.config)
+            self.results['load_spec'] = result
+            return all(check.passed for check in self.results.values())
+        
+        if first:
+            print("🔍 DoggPack Connectivity Validation (watch)")
+            print("=" * 40)
+        else:
+            print(f"\n[{stamp}] 🔁 {self.config_file} changed: "
+                  f"{', '.join(sorted(changed)) or 'comments and layout only'}")
+        check_sections = {section for sections in CHECK_SECTIONS.values() for section in sections}
+        if not first and not changed & check_sections:
+            print("   No check reads the changed sections; results are unchanged")
+            return None
+        
+        self.config = spec.config
+        result.examined = len(spec.config)
+        self._record(result)
+        if not self._compile():
+            self._report_results(False)
+            return False
+        
+        # Re-run the checks reading a changed section, and those using their state
+        rerun = []
+        names = set()
+        for name, check in self._spec_checks():
+            if (first or changed & set(CHECK_SECTIONS[name])
+                    or any(other in names for other in CHECK_AFTER.get(name, ()))):
+                rerun.append((name, check))
+                names.add(name)
+        if 'port_conflicts' in names:
+            self.port_allocations = defaultdict(list)
+        if 'ip_assignments' in names:
+            self.ip_allocations = {}
         
-        # Report results
+        # Live results and the summary are rebuilt every cycle, alongside the checks re-run
+        for name in ('port_availability', 'health_probe', 'dns_query', 'listeners', 'port_summary'):
+            self.results.pop(name, None)
+        validation_passed = all(check.passed for name, check in self.results.items() if name not in names)
+        passed = self._finish_validation(validation_passed, *live, rerun)
+        
+        reparsed = sum(spec.reparsed.values())
+        parsed = ('parsed the whole spec' if spec.parsed_whole
+                  else f"re-parsed {reparsed} entr{'y' if reparsed == 1 else 'ies'}")
+        print(f"\n⏱️  Validated in {(time.perf_counter() - start) * 1000:.0f} ms: {parsed}, "
+              f"re-ran {len(rerun)}/{len(self._spec_checks())} checks")
+        return passed
+    
+    def validate_since(self, rev: str) -> bool:
+        """Validate only the spec entities changed since a git revision, against the rest of the working tree
+        
+        The spec as it was at the revision is read from git objects. Sections
+        with identical text are never parsed, those that differ are rebuilt
+        from the current spec by re-parsing only the entries the change
+        touched, and an unchanged spec is not loaded at all.
+        """
+        import delta_checks
+        import git_objects
+        import semantic_diff
+        
+        print(f"🔍 DoggPack Connectivity Validation (changes since {rev})")
+        print("=" * 40)
+        result = CheckResult('spec_diff')
+        with Timer() as timer:
+            try:
+                with git_objects.GitObjects(Path(self.config_file).resolve().parent) as objects:
+                    old = semantic_diff.spec_at(objects, objects.commit(rev), self.config_file)
+                new = semantic_diff.spec_now(self.config_file)
+                sections = semantic_diff.changed_sections(old, new)
+            except Exception as e:
+                result.error(f"Cannot compare {self.config_file} with {rev}: {e}", 'CV002')
+        result.add_time(timer)
+        if not result.passed or not sections:
+            if self._record(result):
+                print(f"✅ No changes to {self.config_file} since {rev}")
+                return True
+            return self._report_results(False)
+        
+        # The current spec is both the index changes are checked against and the base the old one is rebuilt from
+        earlier = {Path(path).resolve(): text for path, text in old.files.items()}
+        if not self.load_config(earlier=earlier):
+            return self._report_results(False)
+        with Timer() as timer:
+            try:
+                changes = semantic_diff.spec_changes(old, new, self.config)
+            except Exception as e:
+                result.error(f"Cannot compare {self.config_file} with {rev}: {e}", 'CV002')
+        result.add_time(timer)
+        if not self._record(result):
+            return self._report_results(False)
+        result.examined = len(changes)
+        if not changes:
+            print(f"✅ Only comments or layout of {self.config_file} changed since {rev}")
+            return True
+        
+        print(f"🔀 {len(changes)} change{'' if len(changes) == 1 else 's'} since {rev}:")
+        for change in changes[:MAX_CHANGES_SHOWN]:
+            print(f"   {change.describe()}")
+        if len(changes) > MAX_CHANGES_SHOWN:
+            print(f"   ... and {len(changes) - MAX_CHANGES_SHOWN} more")
+        
+        print("\n🔍 Validating changed entities...")
+        result = CheckResult('changed_entities')
+        with Timer() as timer:
+            result.examined, findings = delta_checks.check_changes(self.model, changes)
+        result.add_time(timer)
+        for severity, code, message, path in findings:
+            if severity == 'error':
+                result.error(message, code, path)
+            else:
+                result.warning(message, code, path)
+        if result.passed and not result.warnings:
+            print("   ✅ Changed entities are consistent with the rest of the spec")
+        self._record(result)
+        for interval in port_conflicts.binding_intervals(self.model):
+            if interval.scope != port_conflicts.ROUTER_SCOPE:
+                self.port_allocations[interval.scope].extend(range(interval.start, interval.end + 1))
+        return self._report_results(result.passed)
+    
+    def _report_results(self, validation_passed: bool) -> bool:
+        """Print the error and warning totals and the final verdict"""
         print(f"\n📊 Validation Results:")
         print(f"   Errors: {len(self.errors)}")
         print(f"   Warnings: {len(self.warnings)}")
@@ -417,6 +1177,50 @@ class ConnectivityValidator:
             print(f"\n❌ Validation failed - please fix errors before deployment")
             return False
 
+def run_allocate(validator: ConnectivityValidator, args) -> int:
+    """Propose ports and container IPs for new services as a YAML patch"""
+    import yaml
+    from allocator import AllocationError, AllocationRequest, Allocator, build_patch
+    
+    # Keep stdout clean so the patch can be piped straight into a file
+    with contextlib.redirect_stdout(sys.stderr):
+        loaded = validator.load_config(sections_read('allocate'))
+    if not loaded:
+        for error in validator.errors:
+            print(f"❌ {error}")
+        return 1
+    
+    requests = []
+    if args.batch:
+        with open(args.batch, 'r') as f:
+            entries = yaml.safe_load(f) or []
+        for entry in entries:
+            requests.append(AllocationRequest(entry['name'], entry.get('type', args.type),
+                                              entry.get('host', args.host), entry.get('network', args.network)))
+    for name in args.name or []:
+        requests.append(AllocationRequest(name, args.type, args.host, args.network))
+    
+    allocator = Allocator(validator.model)
+    if not requests:
+        print(yaml.safe_dump({'capacity': allocator.capacity()}, sort_keys=False), end='')
+        return 0
+    
+    try:
+        allocations = allocator.allocate_batch(requests)
+    except (AllocationError, KeyError) as e:
+        print(f"❌ Allocation failed: {e}")
+        return 1
+    
+    patch = f"# Proposed additions to {validator.config_file}\n"
+    patch += yaml.safe_dump(build_patch(allocations, args.section), sort_keys=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(patch)
+        print(f"✅ Proposed {len(allocations)} allocation(s) written to {args.output}")
+    else:
+        print(patch, end='')
+    return 0
+
 def main():
     parser = argparse.ArgumentParser(description='Validate DoggPack connectivity configuration')
     parser.add_argument('--config', '-c', 
@@ -425,22 +1229,176 @@ def main():
     parser.add_argument('--check-availability', '-a', 
                        action='store_true',
                        help='Check if ports are actually available on target hosts')
+    parser.add_argument('--timeout', type=float, default=port_scanner.DEFAULT_TIMEOUT,
+                       help='Connect timeout in seconds for --check-availability')
+    parser.add_argument('--max-concurrency', type=int, default=port_scanner.DEFAULT_MAX_CONCURRENCY,
+                       help='Maximum port probes in flight across all hosts')
+    parser.add_argument('--per-host-limit', type=int, default=port_scanner.DEFAULT_PER_HOST_LIMIT,
+                       help='Maximum port probes in flight against a single host')
+    parser.add_argument('--probe-health', action='store_true',
+                       help='Sample every declared health_check URL and report latency percentiles')
+    parser.add_argument('--samples', type=int, default=None,
+                       help='Requests per health endpoint for --probe-health')
+    parser.add_argument('--health-timeout', type=float, default=None,
+                       help='Per-request timeout in seconds for --probe-health')
+    parser.add_argument('--retries', type=int, default=None,
+                       help='Retries per failed health request')
+    parser.add_argument('--connections-per-host', type=int, default=None,
+                       help='Keep-alive connections pooled per health endpoint origin')
+    parser.add_argument('--resolve', action='append', default=[], metavar='HOST[:PORT]=HOST[:PORT]',
+                       help='Send health requests for an origin elsewhere, e.g. to a stand-in (repeatable)')
+    parser.add_argument('--query-dns', action='store_true',
+                       help="Query each zone's dns_server for every managed record and compare with the spec")
+    parser.add_argument('--dns-server', metavar='HOST[:PORT]',
+                       help="Query this server for every zone instead of the spec's dns_server")
+    parser.add_argument('--dns-timeout', type=float, default=None,
+                       help='Per-query timeout in seconds for --query-dns')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Checks and probes run at once on a thread pool (default: 4)')
+    parser.add_argument('--listeners', action='append', default=[], metavar='HOST=FILE|local',
+                       help='Compare saved ss/netstat/docker ps output for a host with its allocations; '
+                            '"local" runs the commands here (repeatable)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignore and do not update the validation result cache')
+    parser.add_argument('--cache-dir', default=None,
+                       help=f'Validation cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--stream', action='store_true',
+                       help='Validate sections while the spec is parsed, in bounded memory (never cached)')
+    parser.add_argument('--watch', '-w', action='store_true',
+                       help='Re-validate on every save, re-running only the checks the edit affects')
+    parser.add_argument('--poll', action='store_true',
+                       help='Watch by polling file metadata instead of inotify (e.g. on network filesystems)')
+    parser.add_argument('--poll-interval', type=float, default=None,
+                       help='Seconds between polls when watching without inotify')
+    parser.add_argument('--since', metavar='REV',
+                       help='Validate only what changed in the spec since this git revision, '
+                            'against the rest of the working tree')
     parser.add_argument('--summary-only', '-s',
                        action='store_true', 
                        help='Only show port allocation summary')
+    reporting.add_reporting_arguments(parser)
+    
+    subparsers = parser.add_subparsers(dest='command')
+    allocate = subparsers.add_parser('allocate',
+                                     help='Propose host ports and container IPs for new services')
+    allocate.add_argument('--name', '-n', action='append',
+                          help='New service name (repeatable); omit to print free capacity')
+    allocate.add_argument('--type', '-t', default='mcp_servers',
+                          help='Service type, i.e. a port_allocation.port_ranges bucket')
+    allocate.add_argument('--host', default='nucdogg', help='Target host name or IP')
+    allocate.add_argument('--network', help='Docker network for the container IP (default by type)')
+    allocate.add_argument('--batch', '-b',
+                          help='YAML list of {name, type, host, network} entries to assign in one pass')
+    allocate.add_argument('--section', default='application_services',
+                          help='Spec section the proposed services are added under')
+    allocate.add_argument('--output', '-o', help='Write the proposed YAML patch to this file')
+    load_test = subparsers.add_parser('load-test',
+                                      help="Run the spec's ab load tests with the built-in load generator")
+    load_test.add_argument('--url', action='append', help='Load test this URL instead (repeatable)')
+    load_test.add_argument('--service', action='append',
+                           help="Load test this service's host_port instead (repeatable)")
+    load_test.add_argument('--mode', choices=('closed', 'open'), default='closed',
+                           help='closed: fixed clients sending back to back; open: fixed request rate')
+    load_test.add_argument('--rps', type=float, help='Request rate held by --mode open')
+    load_test.add_argument('--requests', '-n', type=int,
+                           help='Requests per target (default: the ab -n value, else 1000)')
+    load_test.add_argument('--duration', type=float, help='Seconds per target; stops early like ab -t')
+    load_test.add_argument('--concurrency', type=int,
+                           help='Clients (closed) or connections (open) per target (default: ab -c, else 10)')
+    load_test.add_argument('--request-timeout', type=float, default=None,
+                           help='Per-request timeout in seconds, including any wait for a connection')
+    load_test.add_argument('--stand-in', action='store_true',
+                           help='Answer every target from a loopback stand-in server instead')
+    load_test.add_argument('--stand-in-latency', type=float, default=0.0,
+                           help='Seconds the stand-in delays every response')
+    load_test.add_argument('--stand-in-failure-rate', type=float, default=0.0,
+                           help='Share of requests the stand-in answers with 503')
     
     args = parser.parse_args()
+    if args.command == 'load-test' and args.mode == 'open' and not args.rps:
+        parser.error('load-test --mode open needs --rps')
+    if args.watch and args.stream:
+        parser.error('--watch keeps the whole spec resident and cannot be combined with --stream')
+    if args.since and (args.watch or args.stream or args.command):
+        parser.error('--since validates one change and cannot be combined with --watch, --stream or a command')
+    for entry in args.listeners:
+        if '=' not in entry:
+            parser.error(f'--listeners expects HOST=FILE or HOST=local, got {entry!r}')
+    if args.jobs is None and args.profile:
+        # Keep validation work on the profiled thread
+        args.jobs = 1
+    
+    # Watching keeps results in memory instead of the on-disk cache
+    cache = None if args.no_cache or args.stream or args.watch else ValidationCache(args.cache_dir)
+    validator = ConnectivityValidator(args.config, cache, args.jobs)
     
-    validator = ConnectivityValidator(args.config)
+    if args.command == 'allocate':
+        sys.exit(run_allocate(validator, args))
     
     if args.summary_only:
-        if validator.load_config():
+        if validator.load_config(sections_read('port_conflicts', 'port_summary')):
             # Just collect port allocations and show summary
             validator.validate_port_conflicts()  # This populates the port allocations
             validator.generate_port_summary()
         return
     
-    success = validator.run_validation(check_availability=args.check_availability)
+    scan_options = {
+        'timeout': args.timeout,
+        'max_concurrency': args.max_concurrency,
+        'per_host_limit': args.per_host_limit,
+    }
+    health_options = None
+    if args.probe_health:
+        health_options = {
+            'samples': args.samples,
+            'timeout': args.health_timeout,
+            'retries': args.retries,
+            'max_concurrency': args.max_concurrency,
+            'connections_per_host': args.connections_per_host,
+            'resolve': args.resolve,
+        }
+    dns_options = None
+    if args.query_dns:
+        dns_options = {'server': args.dns_server, 'timeout': args.dns_timeout}
+    stdout = sys.stdout
+    
+    def emit_report():
+        report = Report('validate-connectivity')
+        report.add(validator.config_file, list(validator.results.values()))
+        with contextlib.redirect_stdout(stdout):
+            reporting.emit(report, args)
+            stdout.flush()
+    
+    if args.command == 'load-test':
+        stand_in = None
+        if args.stand_in:
+            stand_in = {'latency': args.stand_in_latency, 'failure_rate': args.stand_in_failure_rate}
+        with reporting.profiled(args.profile), reporting.text_output(args):
+            success = validator.load_test(args.url, args.service, args.mode, args.requests, args.duration,
+                                          args.concurrency, args.rps, args.request_timeout, args.resolve, stand_in)
+        emit_report()
+        sys.exit(0 if success else 1)
+    
+    if args.watch:
+        # One report per validation, so json and junit consumers see every update
+        with reporting.profiled(args.profile), reporting.text_output(args):
+            success = validator.watch(args.check_availability, scan_options, health_options, dns_options,
+                                      args.listeners, args.poll_interval, args.poll, on_cycle=emit_report)
+        sys.exit(0 if success else 1)
+    
+    if args.since:
+        with reporting.profiled(args.profile), reporting.text_output(args):
+            success = validator.validate_since(args.since)
+        emit_report()
+        sys.exit(0 if success else 1)
+    
+    run = validator.stream_validation if args.stream else validator.run_validation
+    with reporting.profiled(args.profile), reporting.text_output(args):
+        success = run(check_availability=args.check_availability, scan_options=scan_options,
+                      health_options=health_options, dns_options=dns_options,
+                      listener_snapshots=args.listeners)
+    
+    emit_report()
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
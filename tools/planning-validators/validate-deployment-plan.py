@@ -2,217 +2,729 @@
 """
 Validate deployment plan structure and dependencies
 """
-import yaml
 import sys
 import os
+import argparse
+import contextlib
+import glob
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def validate_deployment_plan(plan_file):
-    """Validate a deployment plan file for structural integrity and requirements"""
-    print(f"🔍 Validating deployment plan: {plan_file}")
+import capacity_planner
+import plan_schema
+import reporting
+from connectivity_model import compile_spec
+from plan_graph import StepGraph, format_minutes
+from plan_index import (DEPRECATED, MISSING, PENDING, PLAN_EXTENSIONS, PlanIndex,
+                        plan_state, plans_root, record_from_plan)
+from reporting import ERROR, CheckResult, Finding, Report, Timer
+from spec_loader import load_yaml
+from validation_cache import DEFAULT_CACHE_DIR, ValidationCache, sha256_file
+
+# Index shared by pool workers, installed once per process by use_plan_index
+_plan_index = None
+
+def use_plan_index(index):
+    global _plan_index
+    _plan_index = index
+
+def build_plan_index(plan_files, cache=None):
+    """Index every plan in the trees the given plans belong to"""
+    return PlanIndex.build({plans_root(plan_file) for plan_file in plan_files}, cache)
+
+def load_plan(plan_file):
+    """Parse a plan file once, returning (plan, error message)"""
+    import yaml
     
     try:
-        with open(plan_file, 'r') as f:
-            plan = yaml.safe_load(f)
+        return load_yaml(plan_file), None
     except FileNotFoundError:
-        print(f"❌ Plan file not found: {plan_file}")
-        return False
+        return None, f"Plan file not found: {plan_file}"
     except yaml.YAMLError as e:
-        print(f"❌ YAML parsing error: {e}")
-        return False
-    
-    # Required top-level sections
-    required_sections = [
-        'metadata', 'description', 'environment', 
-        'deployment_steps', 'rollback_plan'
-    ]
-    
-    missing_sections = []
-    for section in required_sections:
-        if section not in plan:
-            missing_sections.append(section)
-    
-    if missing_sections:
-        print(f"❌ Missing required sections: {', '.join(missing_sections)}")
-        return False
-    
-    # Validate metadata section
-    metadata = plan.get('metadata', {})
-    required_metadata = ['name', 'version', 'created_date', 'status']
-    missing_metadata = [field for field in required_metadata if field not in metadata]
-    
-    if missing_metadata:
-        print(f"❌ Missing metadata fields: {', '.join(missing_metadata)}")
-        return False
+        return None, f"YAML parsing error: {e}"
+
+def _fail(result, code, message, path=''):
+    """Print and record an error that stops structural validation"""
+    print(f"❌ {message}")
+    result.error(message, code, path)
+    return False
+
+def validate_deployment_plan(plan_file, plan=None, result=None):
+    """Validate a deployment plan file for structural integrity and requirements"""
+    print(f"🔍 Validating deployment plan: {plan_file}")
+    result = result if result is not None else CheckResult('structure')
     
-    # Validate deployment steps
-    steps = plan.get('deployment_steps', [])
-    if not isinstance(steps, list) or len(steps) == 0:
-        print("❌ deployment_steps must be a non-empty list")
-        return False
+    if plan is None:
+        plan, error = load_plan(plan_file)
+        if error:
+            return _fail(result, 'DP001', error)
     
-    step_names = set()
-    for i, step in enumerate(steps):
-        if not isinstance(step, dict):
-            print(f"❌ Step {i+1} must be a dictionary")
-            return False
-        
-        required_step_fields = ['name', 'assigned_to', 'description', 'estimated_duration']
-        missing_step_fields = [field for field in required_step_fields if field not in step]
-        
-        if missing_step_fields:
-            print(f"❌ Step {i+1} missing fields: {', '.join(missing_step_fields)}")
-            return False
-        
-        step_name = step.get('name')
-        if step_name in step_names:
-            print(f"❌ Duplicate step name: {step_name}")
-            return False
-        step_names.add(step_name)
-        
-        # Validate assigned_to is one of the valid Claude instances
-        assigned_to = step.get('assigned_to')
-        if assigned_to not in ['CDTZ', 'CCN', 'CCW']:
-            print(f"❌ Step '{step_name}' assigned to invalid instance: {assigned_to}")
-            return False
+    # Every schema violation in one pass over the plan
+    findings = plan_schema.load_schema().validate(plan)
+    if plan_state(plan_file) == 'templates':
+        findings = [finding for finding in findings if finding.code not in plan_schema.PLACEHOLDER_CODES]
     
-    # Validate rollback plan
-    rollback = plan.get('rollback_plan', {})
-    if 'trigger_conditions' not in rollback or 'rollback_steps' not in rollback:
-        print("❌ rollback_plan must include trigger_conditions and rollback_steps")
-        return False
+    steps = plan.get('deployment_steps') if isinstance(plan, dict) else None
+    graph = None
+    if isinstance(steps, list):
+        result.examined = len(steps)
+        # Validate the dependency graph of the steps the schema could read
+        graph = StepGraph(steps)
+        findings.extend(Finding('DP108', ERROR, error, 'deployment_steps') for error in graph.errors)
+        # The schema reports most reused names already; the graph also sees those it could not compare
+        reported = {(finding.code, finding.path) for finding in findings}
+        for name, index, first in graph.duplicates:
+            path = f"deployment_steps[{index}].name"
+            if ('DP106', path) not in reported:
+                findings.append(Finding('DP106', ERROR, f"Duplicate step name: {name} (also step {first + 1})", path))
     
-    # Validate environment section
-    environment = plan.get('environment', {})
-    if 'target_machines' not in environment:
-        print("❌ environment section must include target_machines")
+    valid = True
+    for finding in findings:
+        if finding.severity == ERROR:
+            print(f"❌ {finding.message}")
+            result.error(finding.message, finding.code, finding.path)
+            valid = False
+        else:
+            print(f"⚠️  Warning: {finding.message}")
+            result.warning(finding.message, finding.code, finding.path)
+    if not valid:
         return False
-    
-    # Check for reasonable resource requirements
-    machines = environment.get('target_machines', [])
-    for machine in machines:
-        if 'resources_required' in machine:
-            resources = machine['resources_required']
-            if 'memory' in resources:
-                memory = resources['memory']
-                if not memory.endswith('GB') and not memory.endswith('MB'):
-                    print(f"⚠️  Warning: Memory specification '{memory}' should include GB or MB")
+    machines = plan['environment']['target_machines']
     
     print(f"✅ {plan_file} is structurally valid")
     
-    # Additional validations and warnings
+    # Additional validations and warnings as (code, message, path)
     warnings = []
+    schedule = graph.schedule()
     
-    # Check for estimated duration format
-    total_duration = 0
-    for step in steps:
-        duration_str = step.get('estimated_duration', '0 minutes')
-        try:
-            # Simple parsing for "X minutes" format
-            if 'minute' in duration_str:
-                duration = int(duration_str.split()[0])
-                total_duration += duration
-        except (ValueError, IndexError):
-            warnings.append(f"Step '{step['name']}' has non-standard duration format: {duration_str}")
-    
-    if total_duration > 120:  # More than 2 hours
-        warnings.append(f"Total estimated duration ({total_duration} minutes) is quite long - consider breaking into smaller deployments")
+    if schedule.makespan > 120:  # More than 2 hours
+        warnings.append(('DP113', f"Estimated makespan ({format_minutes(schedule.makespan)}) is quite long - consider breaking into smaller deployments", 'deployment_steps'))
     
     # Check for external integrations
-    external_integrations = plan.get('external_integrations', {})
+    external_integrations = plan.get('external_integrations') or {}
     if external_integrations:
         print(f"ℹ️  External integrations required: {', '.join(external_integrations.keys())}")
     
     # Display warnings
-    for warning in warnings:
+    for code, warning, path in warnings:
         print(f"⚠️  Warning: {warning}")
+        result.warning(warning, code, path)
     
     # Summary
     print(f"📊 Plan summary:")
     print(f"   • {len(steps)} deployment steps")
     print(f"   • {len(machines)} target machines")
-    print(f"   • {total_duration} minutes estimated duration")
+    print(f"   • {format_minutes(schedule.serial_total)} estimated duration if run serially")
+    print(f"   • {format_minutes(schedule.makespan)} estimated makespan with parallel instances "
+          f"({schedule.parallelism:.2f}x average parallelism)")
     print(f"   • {len(external_integrations)} external integrations")
     
+    if schedule.critical_path:
+        print(f"🛤️  Critical path ({format_minutes(schedule.critical_length)}): "
+              f"{' → '.join(schedule.critical_path)}")
+    print(f"🗓️  Instance timeline:")
+    for instance in sorted(schedule.timelines):
+        timeline = schedule.timelines[instance]
+        steps_text = ', '.join(f"{name} @{start:g}-{finish:g}m" for start, finish, name in timeline)
+        print(f"   • {instance}: {steps_text} (idle {format_minutes(schedule.idle(instance))})")
+    
     return True
 
-def validate_dependencies(plan_file):
-    """Check if plan dependencies are satisfied"""
-    try:
-        with open(plan_file, 'r') as f:
-            plan = yaml.safe_load(f)
-    except:
+def validate_dependencies(plan_file, plan=None, index=None, result=None):
+    """Resolve plan dependencies exactly by name against the plan index"""
+    if plan is None:
+        plan, error = load_plan(plan_file)
+        if error:
+            return False
+    if not isinstance(plan, dict):
         return False
     
-    dependencies = plan.get('prerequisites', {}).get('dependencies', [])
+    dependencies = (plan.get('prerequisites') or {}).get('dependencies') or []
     if not dependencies:
         print("ℹ️  No dependencies specified")
         return True
     
+    index = index or _plan_index or build_plan_index([plan_file])
+    result = result if result is not None else CheckResult('dependencies')
+    result.examined = len(dependencies)
+    name = (plan.get('metadata') or {}).get('name')
     print(f"🔗 Checking {len(dependencies)} dependencies...")
     
-    # Check if dependency deployment plans exist and are completed
-    for dep in dependencies:
-        dep_name = dep.get('deployment')
+    valid = True
+    direct = set()
+    for i, dep in enumerate(dependencies):
+        dep_name = dep.get('deployment') if isinstance(dep, dict) else None
         if not dep_name:
             continue
+        path = f"prerequisites.dependencies[{i}].deployment"
+        direct.add(dep_name)
+        required_status = dep.get('status', 'completed')
+        resolution = index.resolve(dep_name)
+        record = resolution.record
         
-        # Look for the dependency in completed deployments
-        completed_dir = os.path.join(os.path.dirname(plan_file), '..', 'completed')
-        if os.path.exists(completed_dir):
-            completed_files = [f for f in os.listdir(completed_dir) if f.endswith('.yml')]
-            dep_found = any(dep_name in f for f in completed_files)
-            if dep_found:
-                print(f"   ✅ Dependency '{dep_name}' found in completed deployments")
-            else:
-                print(f"   ⚠️  Dependency '{dep_name}' not found in completed deployments")
+        if dep_name == name or (name and name in index.closure(dep_name)):
+            message = f"Dependency '{dep_name}' depends back on '{name}' (circular dependency)"
+            print(f"   ❌ {message}")
+            result.error(message, 'DP203', path)
+            valid = False
+        elif resolution.outcome == MISSING:
+            message = f"Dependency '{dep_name}' does not match any deployment plan"
+            print(f"   ❌ {message}")
+            result.error(message, 'DP201', path)
+            valid = False
+        elif resolution.outcome == DEPRECATED:
+            message = f"Dependency '{dep_name}' only exists as a deprecated plan ({record.path})"
+            print(f"   ❌ {message}")
+            result.error(message, 'DP202', path)
+            valid = False
+        elif resolution.outcome == PENDING and required_status == 'completed':
+            message = (f"Dependency '{dep_name}' is not completed yet "
+                       f"({record.state}, status: {record.status}, {record.path})")
+            print(f"   ⚠️  {message}")
+            result.warning(message, 'DP204', path)
         else:
-            print(f"   ⚠️  Completed deployments directory not found")
+            print(f"   ✅ Dependency '{dep_name}' satisfied by {record.path} (status: {record.status})")
     
-    return True
+    transitive = set()
+    for dep_name in direct:
+        transitive |= index.closure(dep_name)
+    transitive -= direct | {name}
+    if transitive:
+        print(f"   • Transitive prerequisites: {', '.join(sorted(transitive))}")
+    
+    return valid
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: validate-deployment-plan.py <plan-file>")
-        print("       validate-deployment-plan.py --help")
-        sys.exit(1)
+def validate_plan_file(plan_file, index=None, loaded=None):
+    """Parse and validate one plan, capturing its report and timed check results
+    
+    `loaded` is an already-parsed (plan, error) pair from load_plan.
+    """
+    output = io.StringIO()
+    results = [CheckResult('load_plan')]
+    with contextlib.redirect_stdout(output):
+        with Timer() as timer:
+            plan, error = loaded or load_plan(plan_file)
+        results[0].add_time(timer)
+        results[0].examined = 1
+        if error:
+            print(f"🔍 Validating deployment plan: {plan_file}")
+            print(f"❌ {error}")
+            results[0].error(error, 'DP001')
+            success = False
+        else:
+            # Run validations
+            results.append(CheckResult('structure'))
+            with Timer() as timer:
+                structure_valid = validate_deployment_plan(plan_file, plan, results[-1])
+            results[-1].add_time(timer)
+            
+            results.append(CheckResult('dependencies'))
+            with Timer() as timer:
+                dependencies_valid = validate_dependencies(plan_file, plan, index, results[-1])
+            results[-1].add_time(timer)
+            success = structure_valid and dependencies_valid
+    return plan_file, success, output.getvalue(), [result.as_dict() for result in results]
+
+def expand_plan_paths(patterns):
+    """Expand files, directories and globs (including **) into a sorted list of plan files"""
+    plan_files = set()
+    missing = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches or not all(os.path.exists(match) for match in matches):
+            missing.append(pattern)
+            continue
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, files in os.walk(match):
+                    plan_files.update(os.path.join(root, name) for name in files
+                                      if name.endswith(PLAN_EXTENSIONS))
+            elif match.endswith(PLAN_EXTENSIONS) or not glob.has_magic(pattern):
+                plan_files.add(match)
+    return sorted(plan_files), missing
+
+def plan_cache_key(cache, plan_file, index):
+    """Cache key covering the plan's bytes, location and state, the schema template and the identity of every
+    plan it may depend on"""
+    # The replayed output names the plan, and its state decides which checks apply
+    return cache.key('deployment-plan', os.path.realpath(plan_file), plan_state(plan_file), sha256_file(plan_file),
+                     index.fingerprint(), plan_schema.load_schema().fingerprint)
+
+def validate_plans(plan_files, jobs=None, cache=None, index=None):
+    """Validate plans across a process pool, returning results in input order"""
+    index = index or build_plan_index(plan_files, cache)
+    results = {}
+    pending = []
+    keys = {}
+    for plan_file in plan_files:
+        if cache is not None:
+            keys[plan_file] = plan_cache_key(cache, plan_file, index)
+            entry = cache.get(keys[plan_file])
+            if entry is not None:
+                for result in entry['results']:
+                    result['cached'] = True
+                results[plan_file] = (plan_file, entry['success'], entry['output'], entry['results'])
+                continue
+        pending.append(plan_file)
+    
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) <= 1:
+        fresh = [validate_plan_file(plan_file, index) for plan_file in pending]
+    else:
+        # Ship the index to each worker once rather than with every task
+        chunksize = max(1, len(pending) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)),
+                                 initializer=use_plan_index, initargs=(index,)) as pool:
+            fresh = list(pool.map(validate_plan_file, pending, chunksize=chunksize))
+    
+    for plan_file, success, output, check_results in fresh:
+        results[plan_file] = (plan_file, success, output, check_results)
+        if cache is not None:
+            cache.put(keys[plan_file], {'success': success, 'output': output, 'results': check_results})
+    if cache is not None:
+        cache.prune()
+    
+    return [results[plan_file] for plan_file in plan_files]
+
+def check_rollout_order(index):
+    """Show the order active plans can be rolled out in, honouring their dependencies"""
+    result = CheckResult('rollout_order')
+    with Timer() as timer:
+        order, blocked = index.rollout_order()
+    result.add_time(timer)
+    result.examined = len(order) + len(blocked)
+    if order:
+        print(f"🧭 Rollout order for active plans: {' → '.join(order)}")
+    if blocked:
+        message = f"Circular dependencies between active plans: {', '.join(blocked)}"
+        print(f"   ❌ {message}")
+        result.error(message, 'DP205')
+    return result
+
+def load_fleet(args):
+    """Machines and service demand from the connectivity spec, or None when it cannot be read"""
+    try:
+        model = compile_spec(load_yaml(args.spec))
+    except FileNotFoundError:
+        print(f"ℹ️  Connectivity spec {args.spec} not found; capacity check skipped")
+        return None
+    except Exception as e:
+        print(f"⚠️  Warning: cannot read connectivity spec {args.spec} ({e}); capacity check skipped")
+        return None
+    return capacity_planner.fleet_from_model(model, args.capacity or ())
+
+def check_capacity(index, fleet):
+    """Add up what active plans and spec services demand of each machine, and propose a placement"""
+    result = CheckResult('capacity')
+    with Timer() as timer:
+        plan = capacity_planner.plan_capacity(fleet, capacity_planner.plan_demands(index.records))
+    result.add_time(timer)
+    result.examined = len(plan.demands)
+    untracked = f", {fleet.undeclared} services declare no resources" if fleet.undeclared else ""
+    print(f"🧮 Capacity: {len(plan.demands)} demands on {len(plan.load)} machines{untracked}")
+    for line in capacity_planner.format_plan(fleet, plan):
+        print(line)
+    for severity, code, message, path in plan.findings:
+        if severity == 'error':
+            print(f"   ❌ {message}")
+            result.error(message, code, path)
+        else:
+            print(f"   ⚠️  {message}")
+            result.warning(message, code, path)
+    return result
+
+def run_plans(args):
+    """Validate the requested plans, printing the text report; returns (report, success)"""
+    report = Report('validate-deployment-plan')
+    plan_files, missing = expand_plan_paths(args.plans)
+    for pattern in missing:
+        print(f"❌ Plan file not found: {pattern}")
+        load = CheckResult('load_plan')
+        load.error(f"Plan file not found: {pattern}", 'DP001')
+        report.add(pattern, [load])
+    if not plan_files:
+        return report, False
+    
+    start = time.perf_counter()
+    cache = None if args.no_cache else ValidationCache(args.cache_dir)
+    index = build_plan_index(plan_files, cache)
+    results = validate_plans(plan_files, args.jobs, cache, index)
+    elapsed = time.perf_counter() - start
+    
+    for plan_file, _, output, _ in results:
+        print(output, end='')
+    summary = f"in {elapsed:.2f}s" + (f" ({cache.describe()})" if cache else "")
+    fleet = load_fleet(args) if len(results) > 1 else None
+    return finish_batch(report, results, index, missing, summary if len(results) > 1 else None, fleet)
+
+def finish_batch(report, results, index, missing, summary=None, fleet=None):
+    """Report every plan's results and the verdict; with a summary, also the batch summary, rollout order
+    and, given the fleet, capacity"""
+    for plan_file, _, _, check_results in results:
+        report.add(plan_file, [CheckResult.from_dict(data) for data in check_results])
+    
+    failed = [plan_file for plan_file, success, _, _ in results if not success]
+    
+    if summary is not None:
+        print(f"\n📊 Batch summary: {len(results) - len(failed)}/{len(results)} plans valid {summary}")
+        for plan_file in failed:
+            print(f"   ❌ {plan_file}")
+        rollout = check_rollout_order(index)
+        report.add('rollout', [rollout])
+        if not rollout.passed:
+            failed.append('rollout order')
+        if fleet is not None:
+            capacity = check_capacity(index, fleet)
+            report.add('capacity', [capacity])
+            if not capacity.passed:
+                failed.append('capacity')
+    
+    if not failed and not missing:
+        print(f"\n🎉 Deployment plan validation successful!")
+        return report, True
+    else:
+        print(f"\n❌ Deployment plan validation failed!")
+        return report, False
+
+def plan_readers(plan_files, index, names):
+    """Plans whose dependency check reads a plan with one of these names (directly, through their
+    transitive prerequisites, or by sharing it)"""
+    readers = set()
+    for plan_file in plan_files:
+        record = index.get(plan_file)
+        if record is not None and ({record.name} | index.closure(record.name)) & names:
+            readers.add(plan_file)
+    return readers
+
+def plans_at(rev, roots):
+    """Plan files under the roots that differ from the revision, with their change kind and the plan as it was
+    
+    Returns {absolute path: (kind, parsed plan at the revision or None)}, reading the old
+    revision from git objects; raises ValueError for an unknown revision or outside a repository.
+    """
+    import yaml
+    import git_objects
+    from spec_loader import parse_yaml
+    
+    plans = {}
+    with git_objects.GitObjects(roots[0]) as objects:
+        commit = objects.commit(rev)
+        for path, kind in objects.changed(commit, [objects.relative(root) for root in roots]).items():
+            if not path.endswith(PLAN_EXTENSIONS):
+                continue
+            text = None if kind == git_objects.ADDED else objects.text(commit, path)
+            try:
+                old = None if text is None else parse_yaml(text)
+            except yaml.YAMLError:
+                old = None
+            plans[str(objects.root / path)] = (kind, old)
+    return plans
+
+def _identity(record):
+    """What another plan's dependency check reads of a plan record"""
+    if record is None:
+        return None
+    return record.name, record.version, record.status, record.state, tuple(record.dependencies)
+
+def run_since(args):
+    """Validate only the plans changed since a git revision and the plans whose dependency checks read them;
+    returns (report, success)"""
+    import git_objects
+    import semantic_diff
+    
+    report = Report('validate-deployment-plan')
+    print(f"🔍 Deployment plan changes since {args.since}")
+    plan_files, missing = expand_plan_paths(args.plans)
+    for pattern in missing:
+        print(f"❌ Plan file not found: {pattern}")
+        load = CheckResult('load_plan')
+        load.error(f"Plan file not found: {pattern}", 'DP001')
+        report.add(pattern, [load])
+    if not plan_files:
+        return report, False
+    
+    start = time.perf_counter()
+    roots = sorted({plans_root(plan_file) for plan_file in plan_files})
+    diff = CheckResult('plan_diff')
+    with Timer() as timer:
+        try:
+            changed = plans_at(args.since, roots)
+        except ValueError as e:
+            print(f"❌ Cannot compare plans with {args.since}: {e}")
+            diff.error(f"Cannot compare plans with {args.since}: {e}", 'DP003')
+    diff.add_time(timer)
+    report.add('changes', [diff])
+    if not diff.passed:
+        return report, False
+    diff.examined = len(changed)
+    if not changed:
+        print(f"✅ No plan changes since {args.since}")
+        return report, not missing
+    
+    cache = None if args.no_cache else ValidationCache(args.cache_dir)
+    index = build_plan_index(plan_files, cache)
+    names = set()
+    active = False
+    for absolute in sorted(changed):
+        kind, old = changed[absolute]
+        new = load_plan(absolute)[0] if kind != git_objects.DELETED else None
+        if (old is None and kind != git_objects.ADDED) or (new is None and kind != git_objects.DELETED):
+            print(f"🔀 {os.path.relpath(absolute)} ({kind}): unparseable, not compared")
+        else:
+            changes = semantic_diff.plan_changes(old, new)
+            print(f"🔀 {os.path.relpath(absolute)} ({kind}): {len(changes)} change{'' if len(changes) == 1 else 's'}")
+            for change in changes:
+                print(f"   {change.describe()}")
+        records = [record_from_plan(absolute, old) if kind != git_objects.ADDED else None, index.get(absolute)]
+        # Dependency checks read only a plan's identity, so an edit that keeps it affects no other plan
+        identities = {_identity(record) for record in records}
+        if len(identities) > 1:
+            names |= {record.name for record in records if record is not None}
+        active |= any(record is not None and record.state == 'active' for record in records)
+    
+    readers = plan_readers(plan_files, index, names)
+    targets = [plan_file for plan_file in plan_files
+               if os.path.abspath(plan_file) in changed or plan_file in readers]
+    print()
+    results = validate_plans(targets, args.jobs, cache, index)
+    elapsed = time.perf_counter() - start
+    for plan_file, _, output, _ in results:
+        print(output, end='')
+    summary = (f"({len(targets)} of {len(plan_files)} plans affected by changes since {args.since}, "
+               f"in {elapsed:.2f}s)")
+    fleet = load_fleet(args) if active else None
+    return finish_batch(report, results, index, missing, summary, fleet)
+
+class ResidentPlans:
+    """Parsed plans, the plan index and per-plan results kept in memory while watching
+    
+    A save re-parses only the files that changed and updates their index
+    records in place. Besides the changed plans themselves, only the plans
+    whose dependency checks read a changed plan's name (directly, through
+    their transitive prerequisites, or by sharing it) are re-validated.
+    """
+    
+    def __init__(self, patterns, fleet=None):
+        self.patterns = patterns
+        self.fleet = fleet
+        self.plan_files, self.missing = expand_plan_paths(patterns)
+        self.roots = sorted({plans_root(plan_file) for plan_file in self.plan_files})
+        self.loaded = {plan_file: load_plan(plan_file) for plan_file in self.plan_files}
+        self.index = PlanIndex.build(self.roots, plans={plan_file: plan
+                                                        for plan_file, (plan, _) in self.loaded.items()})
+        self.results = {}
+    
+    def validate(self, plan_files):
+        for plan_file in plan_files:
+            self.results[plan_file] = validate_plan_file(plan_file, self.index, self.loaded[plan_file])
+    
+    def _index_path(self, absolute):
+        """A changed file's path as PlanIndex.build would record it, or None outside the plan trees"""
+        for root in self.roots:
+            base = os.path.abspath(root)
+            if absolute.startswith(base + os.sep):
+                return os.path.normpath(os.path.join(root, os.path.relpath(absolute, base)))
+        return None
+    
+    def _readers(self, names):
+        return plan_readers(self.plan_files, self.index, names)
+    
+    def apply(self, changed):
+        """Bring plans and the index up to date with changed paths; returns the plans to re-validate"""
+        changed = {os.path.abspath(path) for path in changed}
+        # A directory moved away takes its plans with it
+        moved = [path for path in changed if not path.endswith(PLAN_EXTENSIONS) and not os.path.exists(path)]
+        for record in self.index.records:
+            absolute = os.path.abspath(record.path)
+            if any(absolute.startswith(directory + os.sep) for directory in moved):
+                changed.add(absolute)
+        
+        plan_files, self.missing = expand_plan_paths(self.patterns)
+        requested = {os.path.abspath(plan_file): plan_file for plan_file in plan_files}
+        loaded = {}
+        records = {}
+        for absolute in changed:
+            path = self._index_path(absolute)
+            if path is None or not absolute.endswith(PLAN_EXTENSIONS):
+                continue
+            if os.path.exists(absolute):
+                loaded[absolute] = load_plan(requested.get(absolute, path))
+                records[absolute] = record_from_plan(path, loaded[absolute][0])
+            else:
+                records[absolute] = None
+        
+        names = {record.name for record in records.values() if record is not None}
+        names |= {self.index.get(absolute).name for absolute in records if self.index.get(absolute)}
+        rerun = self._readers(names)
+        if os.path.abspath(plan_schema.load_schema().template) in changed:
+            # Every plan is checked against the schema derived from the template
+            rerun |= set(plan_files)
+        for absolute, record in records.items():
+            if record is None:
+                self.index.discard(absolute)
+            else:
+                self.index.update(record)
+        self.plan_files = plan_files
+        rerun |= self._readers(names)
+        
+        self.loaded = {plan_file: loaded.get(os.path.abspath(plan_file)) or self.loaded.get(plan_file)
+                       or load_plan(plan_file) for plan_file in plan_files}
+        self.results = {plan_file: result for plan_file, result in self.results.items()
+                        if plan_file in self.loaded and os.path.abspath(plan_file) not in loaded}
+        return [plan_file for plan_file in plan_files if plan_file in rerun or plan_file not in self.results]
+    
+    def report(self, summary):
+        report = Report('validate-deployment-plan')
+        for pattern in self.missing:
+            load = CheckResult('load_plan')
+            load.error(f"Plan file not found: {pattern}", 'DP001')
+            report.add(pattern, [load])
+        results = [self.results[plan_file] for plan_file in self.plan_files]
+        return finish_batch(report, results, self.index, self.missing, summary, self.fleet)
+
+def _findings(result):
+    """What a plan result reports, without timings, to tell whether re-validating changed it"""
+    if result is None:
+        return None
+    return [(check['name'], [(finding['code'], finding['message'], finding['path']) for finding in check['findings']])
+            for check in result[3]]
+
+def watch_plans(args, on_cycle=None):
+    """Validate, then re-validate the plans each save affects until interrupted"""
+    import file_watcher
+    
+    start = time.perf_counter()
+    resident = ResidentPlans(args.plans, load_fleet(args))
+    for pattern in resident.missing:
+        print(f"❌ Plan file not found: {pattern}")
+    if not resident.plan_files:
+        return False
+    resident.validate(resident.plan_files)
+    for plan_file in resident.plan_files:
+        print(resident.results[plan_file][2], end='')
+    report, passed = resident.report(f"in {time.perf_counter() - start:.2f}s")
+    if on_cycle:
+        on_cycle(report)
     
-    if sys.argv[1] == '--help':
-        print("""
-Deployment Plan Validator
+    interval = file_watcher.DEFAULT_INTERVAL if args.poll_interval is None else args.poll_interval
+    with file_watcher.FileWatcher(resident.roots, suffixes=PLAN_EXTENSIONS, interval=interval,
+                                  polling=args.poll) as watcher:
+        print(f"\n👀 Watching {', '.join(resident.roots)} ({watcher.backend}); press Ctrl-C to stop")
+        try:
+            while True:
+                changed = watcher.wait()
+                if not changed:
+                    continue
+                start = time.perf_counter()
+                rerun = resident.apply(changed)
+                previous = {plan_file: _findings(resident.results.get(plan_file)) for plan_file in rerun}
+                resident.validate(rerun)
+                
+                names = sorted(os.path.relpath(path) for path in changed)
+                shown = ', '.join(names[:5]) + (f" and {len(names) - 5} more" if len(names) > 5 else "")
+                print(f"\n[{time.strftime('%H:%M:%S')}] 🔁 {len(names)} plan file"
+                      f"{'' if len(names) == 1 else 's'} changed: {shown}")
+                # Plans re-checked only because a dependency changed are shown when their findings did
+                touched = {os.path.abspath(path) for path in changed}
+                for plan_file in rerun:
+                    if (os.path.abspath(plan_file) in touched
+                            or _findings(resident.results[plan_file]) != previous[plan_file]):
+                        print(resident.results[plan_file][2], end='')
+                elapsed = (time.perf_counter() - start) * 1000
+                report, passed = resident.report(f"(re-validated {len(rerun)} in {elapsed:.0f} ms)")
+                if on_cycle:
+                    on_cycle(report)
+        except KeyboardInterrupt:
+            print()
+    return passed
+
+def capacity_override(text):
+    try:
+        return capacity_planner.parse_capacity_override(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validate DoggPack deployment plans',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
 This tool validates DoggPack deployment plans for structural integrity,
 required fields, and logical consistency.
 
-Validation checks:
+Validation checks (every violation in one run):
 • Required sections and fields
-• Step name uniqueness
-• Valid Claude instance assignments
-• Resource specification format
-• Dependency consistency
+• Types, metadata created_by/status/risk_level choices, and duration, date
+  and resource formats, all from the plan template in
+  planning/deployment-plans/templates/
+• Step, target machine, network and rollback step name uniqueness
+• Valid Claude instance assignments (including "CCN,CCW")
+• Step dependency graph (dangling references, cycles)
+• Critical path and parallel makespan per instance
+• Cross-plan dependencies resolved by exact name (missing, deprecated,
+  not yet completed, circular), transitive prerequisites and rollout order
+• Per-machine capacity: active plan resources_required plus spec service
+  resources times scaling_targets max_replicas, against the capacity
+  declared under physical_infrastructure, with a proposed placement
 • Duration estimates
 
 Usage:
     python validate-deployment-plan.py path/to/plan.yml
+    python validate-deployment-plan.py 'planning/deployment-plans/**' --jobs 4
+    python validate-deployment-plan.py 'planning/deployment-plans/**' --format junit > plans.xml
+    python validate-deployment-plan.py planning/deployment-plans/active --watch
+    python validate-deployment-plan.py 'planning/deployment-plans/**' --since origin/main
+    python validate-deployment-plan.py planning/deployment-plans/active --capacity nucdogg=cpu:8,memory:32GB
         """)
-        sys.exit(0)
+    parser.add_argument('plans', nargs='+',
+                        help='Plan files, directories or globs (quote ** patterns)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Worker processes for batch validation (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore and do not update the validation result cache')
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'Validation cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Re-validate on every save, re-checking only the plans the edit affects')
+    parser.add_argument('--poll', action='store_true',
+                        help='Watch by polling file metadata instead of inotify (e.g. on network filesystems)')
+    parser.add_argument('--poll-interval', type=float, default=None,
+                        help='Seconds between polls when watching without inotify')
+    parser.add_argument('--since', metavar='REV',
+                        help='Validate only the plans changed since this git revision and the plans depending on them')
+    parser.add_argument('--spec', default='planning/specifications/connectivity-port-mapping.yml',
+                        help='Connectivity spec declaring machines, their capacity and service resources')
+    parser.add_argument('--capacity', action='append', type=capacity_override, metavar='HOST=cpu:N,memory:SIZE',
+                        help='Capacity of a machine, replacing what the spec declares (repeatable)')
+    reporting.add_reporting_arguments(parser)
     
-    plan_file = sys.argv[1]
+    args = parser.parse_args()
+    if args.profile and args.jobs is None:
+        # Keep validation work in the profiled process
+        args.jobs = 1
     
-    if not os.path.exists(plan_file):
-        print(f"❌ Plan file not found: {plan_file}")
-        sys.exit(1)
+    if args.since and args.watch:
+        parser.error('--since validates one change and cannot be combined with --watch')
     
-    # Run validations
-    structure_valid = validate_deployment_plan(plan_file)
-    dependencies_valid = validate_dependencies(plan_file)
+    if args.watch:
+        stdout = sys.stdout
+        
+        def emit_report(report):
+            # One report per validation, so json and junit consumers see every update
+            with contextlib.redirect_stdout(stdout):
+                reporting.emit(report, args)
+                stdout.flush()
+        
+        with reporting.profiled(args.profile), reporting.text_output(args):
+            success = watch_plans(args, emit_report)
+        sys.exit(0 if success else 1)
     
-    if structure_valid and dependencies_valid:
-        print(f"\n🎉 Deployment plan validation successful!")
-        sys.exit(0)
-    else:
-        print(f"\n❌ Deployment plan validation failed!")
-        sys.exit(1)
+    with reporting.profiled(args.profile), reporting.text_output(args):
+        report, success = run_since(args) if args.since else run_plans(args)
+    reporting.emit(report, args)
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
     main()
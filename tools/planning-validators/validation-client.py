@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+DoggPack Validation Client
+
+Drop-in replacement for the validator CLIs that runs them in a warm
+validation-server.py: the first argument names the validator, the rest are
+its usual arguments, and stdout, stderr and the exit code are the ones the
+CLI would have produced. Without a reachable server (or for --watch, which
+never finishes) the validator runs here instead, so scripts can use the
+client unconditionally.
+
+Usage:
+    python validation-client.py validate-connectivity --format json
+    python validation-client.py validate-deployment-plan 'planning/deployment-plans/**'
+"""
+
+import os
+import runpy
+import sys
+
+from server_transport import default_address, describe, request
+
+TOOLS = ('validate-connectivity', 'validate-deployment-plan')
+
+
+def run_here(tool: str, argv) -> None:
+    """Run the validator in this process, exactly as its script would"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{tool}.py")
+    sys.argv = [script] + list(argv)
+    runpy.run_path(script, run_name='__main__')
+    sys.exit(0)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        asked = len(sys.argv) >= 2
+        print(__doc__.strip().split('\n\n', 1)[1], file=sys.stdout if asked else sys.stderr)
+        sys.exit(0 if asked else 2)
+    tool = sys.argv[1][:-3] if sys.argv[1].endswith('.py') else sys.argv[1]
+    tool = os.path.basename(tool)
+    argv = sys.argv[2:]
+    if tool not in TOOLS:
+        print(f"❌ Unknown validator: {tool} (one of {', '.join(TOOLS)})", file=sys.stderr)
+        sys.exit(2)
+    if '--watch' in argv or '-w' in argv:
+        run_here(tool, argv)
+
+    address = default_address()
+    try:
+        status, answer = request(address, '/run', {'tool': tool, 'argv': argv, 'cwd': os.getcwd()})
+    except OSError:
+        run_here(tool, argv)
+    if status != 200:
+        print(f"⚠️  Validation server at {describe(address)} failed ({answer.get('error')}); running here",
+              file=sys.stderr)
+        run_here(tool, argv)
+    sys.stdout.write(answer['stdout'])
+    sys.stderr.write(answer['stderr'])
+    sys.exit(answer['exit'])
+
+
+if __name__ == "__main__":
+    main()
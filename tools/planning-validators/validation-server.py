@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+DoggPack Validation Server
+
+Keeps the connectivity spec, its compiled model and check results, and the
+deployment plans with their index and results resident in one long-running
+process, and answers validation, allocation and lookup requests over a local
+HTTP JSON API, so agents and CI jobs stop paying for an interpreter start,
+imports and a spec parse on every call. Saved files are picked up the way
+--watch picks them up: only the entries and plans a save touched are
+re-parsed and only the checks and plans they affect are re-validated, before
+the next request is answered. validation-client.py runs the validator CLIs
+through the server.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import os
+import signal
+import sys
+import time
+import traceback
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import dns_graph
+import file_watcher
+import port_conflicts
+from allocator import AllocationError, AllocationRequest, Allocator, build_patch
+from capacity_planner import fleet_from_model
+from plan_index import PLAN_EXTENSIONS
+from reporting import CheckResult, Report
+from spec_loader import parse_yaml
+from server_transport import RequestError, default_address, describe, make_server, parse_address
+
+HERE = Path(__file__).resolve().parent
+# Validator CLIs the run endpoint executes, by the name clients use
+TOOLS = ('validate-connectivity', 'validate-deployment-plan')
+# Port ranges up to this wide are indexed port by port for lookups; wider ones are scanned
+INDEXED_SPAN = 1024
+# Without fork every request runs in the server itself, so nothing may change its state
+FORKING = hasattr(os, 'fork')
+
+
+def load_script(name: str):
+    """Import a hyphenated validator script as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), HERE / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def working_directory(path: Optional[str]):
+    """Resolve a request's relative paths from the client's directory"""
+    if not path:
+        yield
+        return
+    previous = os.getcwd()
+    try:
+        os.chdir(path)
+    except OSError as e:
+        raise RequestError(f"Cannot change to {path}: {e}")
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _service(service) -> Dict:
+    return {
+        'name': service.name,
+        'section': service.section,
+        'host_ip': service.host_ip,
+        'host_port': service.host_port,
+        'protocol': service.protocol,
+        'docker_network': service.docker_network,
+        'container_ip': service.container_ip,
+        'internal_domain': service.internal_domain,
+        'external_domain': service.external_domain,
+        'path': service.path,
+    }
+
+
+class WarmState:
+    """The resident spec and plans with everything requests read, kept current as files change"""
+
+    def __init__(self, connectivity, plans, args):
+        self.connectivity = connectivity
+        self.plans = plans
+        self.args = args
+        self.tools = {TOOLS[0]: connectivity, TOOLS[1]: plans}
+        self.validator = connectivity.ConnectivityValidator(args.config, None, args.jobs)
+        self.spec = self.validator.resident_spec()
+        self.resident = None
+        self.watcher: Optional[file_watcher.FileWatcher] = None
+        self.spec_report: Dict = {}
+        self.plan_report: Dict = {}
+        self.plan_output = ''
+        self.refreshes = 0
+        self.started = time.time()
+        self._next_poll = 0.0
+        # Lookup indexes over the last model that compiled
+        self.allocator = None
+        self.graph = None
+        self.hosts: Dict[str, str] = {}
+        self.ports: Dict[int, List[port_conflicts.PortInterval]] = defaultdict(list)
+        self.wide: List[port_conflicts.PortInterval] = []
+        self.domains: Dict[str, List] = defaultdict(list)
+
+    def load(self) -> List[str]:
+        """Validate the spec and every plan; returns the paths to watch"""
+        start = time.perf_counter()
+        self._revalidate_spec()
+        self._log_spec(start)
+        start = time.perf_counter()
+        self.resident = self.plans.ResidentPlans(self.args.plans, self._fleet())
+        self.resident.validate(self.resident.plan_files)
+        self._report_plans(f"in {time.perf_counter() - start:.2f}s")
+        failed = sum(1 for result in self.resident.results.values() if not result[1])
+        print(f"{'✅' if self.plan_report['success'] else '❌'} {len(self.resident.plan_files)} plans, "
+              f"{failed} invalid ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        for pattern in self.resident.missing:
+            print(f"   ❌ Plan file not found: {pattern}")
+        self._settle()
+        watched = self.validator.watched_paths(self.spec) + self.resident.roots
+        return [path for path in watched if os.path.exists(path)]
+
+    def _settle(self) -> None:
+        """Keep the warm objects out of the collections forked requests run, which would otherwise
+        touch, and so copy, every page of the heap"""
+        gc.collect()
+        gc.freeze()
+
+    def _revalidate_spec(self) -> bool:
+        """Bring spec results and lookup indexes up to date; False when nothing needed re-validating"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            outcome = self.validator.revalidate(self.spec)
+        if outcome is None and self.spec_report:
+            return False
+        report = Report('validate-connectivity')
+        report.add(self.validator.config_file, list(self.validator.results.values()))
+        self.spec_report = report.as_dict()
+        self._index_model()
+        return True
+
+    def _index_model(self) -> None:
+        model = self.validator.model
+        self.allocator = Allocator(model)
+        # Build every port bitmap here, where it outlives the request, instead of in each forked one
+        self.allocator.capacity()
+        self.graph = dns_graph.DnsGraph(model)
+        self.hosts = {host.ip: host.name for host in model.hosts if host.ip}
+        self.ports = defaultdict(list)
+        self.wide = []
+        for interval in port_conflicts.binding_intervals(model):
+            if interval.end - interval.start < INDEXED_SPAN:
+                for port in range(interval.start, interval.end + 1):
+                    self.ports[port].append(interval)
+            else:
+                self.wide.append(interval)
+        self.domains = defaultdict(list)
+        for service in model.services:
+            for domain in (service.internal_domain, service.external_domain):
+                if domain:
+                    self.domains[dns_graph.normalize(domain)].append(service)
+
+    def _fleet(self):
+        return fleet_from_model(self.validator.model, self.args.capacity or ()) if self.validator.model.hosts else None
+
+    def _report_plans(self, summary: str) -> None:
+        resident = self.resident
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for pattern in resident.missing:
+                print(f"❌ Plan file not found: {pattern}")
+            for plan_file in resident.plan_files:
+                print(resident.results[plan_file][2], end='')
+            # A single plan gets no batch summary, as on the command line
+            report, _ = resident.report(summary if len(resident.plan_files) > 1 else None)
+        self.plan_report = report.as_dict()
+        self.plan_output = output.getvalue()
+
+    def _log_spec(self, start: float) -> None:
+        results = self.validator.results.values()
+        errors = sum(len(result.errors) for result in results)
+        warnings = sum(len(result.warnings) for result in results)
+        print(f"{'✅' if self.spec_report['success'] else '❌'} {self.validator.config_file}: "
+              f"{len(self.validator.model.services)} services, {errors} errors, {warnings} warnings "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def poll(self) -> None:
+        """Apply saved changes; runs in the server process between requests and before each one"""
+        if self.watcher is None:
+            return
+        if self.watcher.backend == 'polling':
+            # Scanning every file is too slow to do for every request
+            if time.monotonic() < self._next_poll:
+                return
+            self._next_poll = time.monotonic() + self.watcher.interval
+        changed = self.watcher.wait(0)
+        if not changed:
+            return
+        try:
+            self.refresh(changed)
+        except Exception as e:
+            print(f"⚠️  Could not apply changes to {', '.join(sorted(changed))}: {e}")
+        self._settle()
+
+    def refresh(self, changed) -> None:
+        self.refreshes += 1
+        stamp = time.strftime('%H:%M:%S')
+        spec_paths = [os.path.abspath(path) for path in self.validator.watched_paths(self.spec)]
+        if any(path == watched or path.startswith(watched + os.sep) for path in changed for watched in spec_paths):
+            start = time.perf_counter()
+            if self._revalidate_spec():
+                print(f"[{stamp}] 🔁 ", end='')
+                self._log_spec(start)
+                self.resident.fleet = self._fleet()
+                self._report_plans("(capacity re-checked)")
+
+        roots = [os.path.abspath(root) for root in self.resident.roots]
+        plan_changes = {path for path in changed if any(path.startswith(root + os.sep) for root in roots)}
+        if plan_changes:
+            start = time.perf_counter()
+            rerun = self.resident.apply(plan_changes)
+            self.resident.validate(rerun)
+            elapsed = (time.perf_counter() - start) * 1000
+            self._report_plans(f"(re-validated {len(rerun)} in {elapsed:.0f} ms)")
+            print(f"[{stamp}] 🔁 {len(plan_changes)} plan file{'' if len(plan_changes) == 1 else 's'} changed: "
+                  f"re-validated {len(rerun)} plan{'' if len(rerun) == 1 else 's'} in {elapsed:.0f} ms")
+
+    def routes(self) -> Dict:
+        return {
+            '/status': self.status,
+            '/spec': lambda params: {'report': self.spec_report},
+            '/plans': self.validate_plans,
+            '/allocate': self.allocate,
+            '/lookup': self.lookup,
+            '/run': self.run_tool,
+        }
+
+    def status(self, params: Dict) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'uptime_s': round(time.time() - self.started, 1),
+            'spec': {'path': self.validator.config_file, 'success': self.spec_report['success'],
+                     'services': len(self.validator.model.services)},
+            'plans': {'patterns': self.resident.patterns, 'count': len(self.resident.plan_files),
+                      'success': self.plan_report['success']},
+            'refreshes': self.refreshes,
+            'watching': self.watcher.backend if self.watcher else None,
+        }
+
+    def validate_plans(self, params: Dict) -> Dict:
+        """The resident batch; the named plans (files, directories or globs); or a draft plan's text"""
+        plans = self.plans
+        if 'text' not in params and not params.get('plans'):
+            return {'report': self.plan_report, 'output': self.plan_output}
+
+        report = Report('validate-deployment-plan')
+        output = io.StringIO()
+        with working_directory(params.get('cwd')), contextlib.redirect_stdout(output):
+            if 'text' in params:
+                # A draft is checked against the resident plans without being written anywhere
+                import yaml
+                try:
+                    loaded = parse_yaml(str(params['text'])), None
+                except yaml.YAMLError as e:
+                    loaded = None, f"YAML parsing error: {e}"
+                results = [plans.validate_plan_file(str(params.get('path') or '<draft>'), self.resident.index,
+                                                    loaded)]
+                missing = []
+            else:
+                patterns = params['plans']
+                patterns = [patterns] if isinstance(patterns, str) else [str(pattern) for pattern in patterns]
+                plan_files, missing = plans.expand_plan_paths(patterns)
+                for pattern in missing:
+                    print(f"❌ Plan file not found: {pattern}")
+                    load = CheckResult('load_plan')
+                    load.error(f"Plan file not found: {pattern}", 'DP001')
+                    report.add(pattern, [load])
+                resident = {os.path.abspath(plan_file): result for plan_file, result in self.resident.results.items()}
+                # Plans outside the resident trees are validated now, against their own trees
+                others = [plan_file for plan_file in plan_files if os.path.abspath(plan_file) not in resident]
+                fresh = iter(plans.validate_plans(others, 1) if others else ())
+                results = [(plan_file,) + resident[os.path.abspath(plan_file)][1:]
+                           if os.path.abspath(plan_file) in resident else next(fresh) for plan_file in plan_files]
+            for result in results:
+                print(result[2], end='')
+            if results:
+                report, _ = plans.finish_batch(report, results, self.resident.index, missing)
+        return {'report': report.as_dict(), 'output': output.getvalue()}
+
+    def allocate(self, params: Dict) -> Dict:
+        """Ports and container IPs for new services, or free capacity when none are named; nothing is reserved"""
+        import yaml
+
+        service_type = params.get('type', 'mcp_servers')
+        host = params.get('host', 'nucdogg')
+        network = params.get('network')
+        section = params.get('section', 'application_services')
+        requests = []
+        try:
+            for entry in params.get('requests') or []:
+                requests.append(AllocationRequest(entry['name'], entry.get('type', service_type),
+                                                  entry.get('host', host), entry.get('network', network)))
+        except (KeyError, TypeError, AttributeError):
+            raise RequestError("requests must be a list of {name, type, host, network} objects")
+        names = params.get('name') or []
+        for name in [names] if isinstance(names, str) else names:
+            requests.append(AllocationRequest(str(name), service_type, host, network))
+
+        # A forked request allocates from its own copy of the warm allocator
+        allocator = self.allocator if FORKING else Allocator(self.validator.model)
+        if not requests:
+            return {'capacity': allocator.capacity()}
+        try:
+            allocations = allocator.allocate_batch(requests)
+        except (AllocationError, KeyError) as e:
+            raise RequestError(f"Allocation failed: {e}", 409)
+        patch = build_patch(allocations, section)
+        return {
+            'allocations': patch[section],
+            'patch': f"# Proposed additions to {self.validator.config_file}\n"
+                     + yaml.safe_dump(patch, sort_keys=False),
+        }
+
+    def lookup(self, params: Dict) -> Dict:
+        """What claims a port (on a host, for a protocol), or where a domain leads and which services use it"""
+        model = self.validator.model
+        if 'port' in params:
+            try:
+                port = int(params['port'])
+            except (TypeError, ValueError):
+                raise RequestError(f"Invalid port: {params['port']}")
+            host = params.get('host')
+            scope = model.hosts_by_name[host].ip if host in model.hosts_by_name else host
+            protocol = params.get('protocol')
+            claims = []
+            for interval in self.ports.get(port, []) + [interval for interval in self.wide
+                                                         if interval.start <= port <= interval.end]:
+                if (scope and interval.scope != scope) or (protocol and interval.protocol != protocol):
+                    continue
+                service = model.services_by_name.get(interval.owner)
+                claims.append({
+                    'owner': interval.owner,
+                    'field': interval.field,
+                    'scope': interval.scope,
+                    'host': self.hosts.get(interval.scope),
+                    'protocol': interval.protocol,
+                    'ports': interval.ports,
+                    'path': interval.path,
+                    'service': _service(service) if service else None,
+                })
+            return {'port': port, 'claims': claims}
+        if 'domain' in params:
+            name = dns_graph.normalize(params['domain'])
+            resolution = self.graph.resolve(name)
+            return {
+                'domain': name,
+                'resolution': {'outcome': resolution.outcome, 'chain': list(resolution.chain),
+                               'addresses': list(resolution.addresses)},
+                'services': [_service(service) for service in self.domains.get(name, ())],
+            }
+        raise RequestError("lookup needs a port (with optional host and protocol) or a domain")
+
+    def run_tool(self, params: Dict) -> Dict:
+        """Run a validator CLI with the client's arguments in the warm process; returns its exit code and output"""
+        tool = str(params.get('tool', ''))
+        tool = tool[:-3] if tool.endswith('.py') else tool
+        module = self.tools.get(os.path.basename(tool))
+        if module is None:
+            raise RequestError(f"Unknown tool: {tool} (one of {', '.join(TOOLS)})")
+        argv = params.get('argv') or []
+        if not isinstance(argv, list):
+            raise RequestError("argv must be a list of arguments")
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        saved = sys.argv, sys.stdout, sys.stderr
+        sys.argv = [f"{os.path.basename(tool)}.py"] + [str(arg) for arg in argv]
+        sys.stdout, sys.stderr = stdout, stderr
+        try:
+            with working_directory(params.get('cwd')):
+                module.main()
+            code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except RequestError:
+            raise
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.argv, sys.stdout, sys.stderr = saved
+        return {'exit': code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    connectivity = load_script('validate-connectivity')
+    plans = load_script('validate-deployment-plan')
+
+    parser = argparse.ArgumentParser(
+        description='Serve DoggPack validation from a resident process',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Endpoints (GET with query parameters, or POST with a JSON object):
+    /status                           what is resident and whether it validates
+    /spec                             connectivity report (as --format json)
+    /plans                            plan batch report and text output
+    /plans  {"plans": [PATTERN]}      only these plans
+    /plans  {"path", "text"}          a draft plan, against the resident plans
+    /allocate  {"name": [..], "type", "host", "network", "section"}
+    /lookup?port=N[&host=H][&protocol=P]   what claims a port
+    /lookup?domain=NAME               where a domain leads and who uses it
+    /run  {"tool", "argv", "cwd"}     run a validator CLI; validation-client.py uses this
+
+Usage:
+    python validation-server.py &
+    curl --unix-socket .validation-cache/validation-server.sock 'http://localhost/lookup?port=8080'
+    python validation-client.py validate-deployment-plan 'planning/deployment-plans/**'
+        """)
+    parser.add_argument('--config', '-c', default='planning/specifications/connectivity-port-mapping.yml',
+                        help='Connectivity spec kept resident')
+    parser.add_argument('--plans', action='append', metavar='PATTERN',
+                        help='Plan files, directories or globs kept resident (repeatable; '
+                             "default: 'planning/deployment-plans/**')")
+    parser.add_argument('--socket', help=f'Unix socket to listen on (default: ${{DOGGPACK_VALIDATION_SERVER}} '
+                                         f'or {default_address()})')
+    parser.add_argument('--port', type=int,
+                        help='Listen on this loopback TCP port instead; any local user can reach it')
+    parser.add_argument('--capacity', action='append', type=plans.capacity_override, metavar='HOST=cpu:N,memory:SIZE',
+                        help='Capacity of a machine, replacing what the spec declares (repeatable)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Spec checks re-run at once on a thread pool')
+    parser.add_argument('--poll', action='store_true',
+                        help='Watch by polling file metadata instead of inotify (e.g. on network filesystems)')
+    parser.add_argument('--poll-interval', type=float, default=file_watcher.DEFAULT_INTERVAL,
+                        help='Seconds between polls when watching without inotify')
+    args = parser.parse_args()
+    args.plans = args.plans or ['planning/deployment-plans/**']
+    address = ('127.0.0.1', args.port) if args.port else parse_address(args.socket) if args.socket \
+        else default_address()
+    # Logs reach a redirected stdout as they happen
+    sys.stdout.reconfigure(line_buffering=True)
+
+    print("🔍 DoggPack Validation Server")
+    print("=" * 40)
+    state = WarmState(connectivity, plans, args)
+    watched = state.load()
+    with file_watcher.FileWatcher(watched, suffixes=PLAN_EXTENSIONS, interval=args.poll_interval,
+                                  polling=args.poll) as watcher:
+        state.watcher = watcher
+        try:
+            server = make_server(address, state.routes(), state.poll)
+        except OSError as e:
+            print(f"❌ Cannot listen on {describe(address)}: {e}")
+            sys.exit(1)
+        signal.signal(signal.SIGTERM, _stop)
+        print(f"\n🛰️  Listening on {describe(address)}, watching {', '.join(watched)} ({watcher.backend}); "
+              f"press Ctrl-C to stop")
+        try:
+            server.serve_forever(poll_interval=min(args.poll_interval, 0.5))
+        except KeyboardInterrupt:
+            print()
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
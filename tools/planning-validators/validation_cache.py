@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+DoggPack Validation Cache
+
+Content-addressed on-disk cache for validator results. Entries are keyed by
+the SHA-256 of the inputs a result depends on (a plan file, or the top-level
+sections of the connectivity spec a check reads) plus a fingerprint of the
+validator sources, so edits to either invalidate them automatically. The
+cache is bounded in size and age: entries and the parsed-spec snapshots kept
+beside them are evicted least recently used first.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = '.validation-cache'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+# Unindented content: a plain key (group 1), or anything else but a sequence item or document marker
+_TOP_LEVEL_LINE = re.compile(r'^(?:([A-Za-z_][\w-]*)\s*:|(?!-(?:[ \t-]|$))[^\s#])', re.MULTILINE)
+_validator_fingerprint = None
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path) -> str:
+    with open(path, 'rb') as f:
+        return sha256_bytes(f.read())
+
+
+def validator_fingerprint() -> str:
+    """Hash of every validator module, standing in for the validator version"""
+    global _validator_fingerprint
+    if _validator_fingerprint is None:
+        digest = hashlib.sha256(f"format:{CACHE_FORMAT}".encode())
+        for path in sorted(Path(__file__).resolve().parent.glob('*.py')):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        _validator_fingerprint = digest.hexdigest()
+    return _validator_fingerprint
+
+
+def section_spans(text: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """End of the preamble and (start, end) of each top-level block of a block-style YAML document
+
+    Sections are split on unindented mapping keys. Comments and blank lines
+    between sections are attributed to the preceding section. A document with
+    any other unindented content (a quoted key, a flow-style root) cannot be
+    split this way: it gets no sections and no preamble, and is parsed whole.
+    """
+    matches = list(_TOP_LEVEL_LINE.finditer(text))
+    if not matches:
+        return len(text), {}
+    if not all(match.group(1) for match in matches):
+        return 0, {}
+    spans = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        spans[match.group(1)] = (match.start(), following.start() if following else len(text))
+    return matches[0].start(), spans
+
+
+def section_hashes(text: str) -> Dict[str, str]:
+    """SHA-256 of each top-level block of a block-style YAML document
+
+    A change inside one section only changes that section's hash; the
+    preamble before the first section is hashed under ''.
+    """
+    preamble, spans = section_spans(text)
+    hashes = {'': sha256_bytes(text[:preamble].encode())}
+    for name, (start, end) in spans.items():
+        hashes[name] = sha256_bytes(text[start:end].encode())
+    return hashes
+
+
+class ValidationCache:
+    """Size-bounded LRU store of JSON results addressed by content hash"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True, max_age: float = DEFAULT_MAX_AGE):
+        self.directory = Path(directory or os.environ.get('DOGGPACK_VALIDATION_CACHE', DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._written = 0
+
+    def key(self, *parts) -> str:
+        """Derive an entry key from the validator fingerprint and input parts"""
+        payload = json.dumps([validator_fingerprint(), *parts], sort_keys=True, default=str)
+        return sha256_bytes(payload.encode())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+            # Touch on read so eviction order tracks recency of use
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict) -> None:
+        if not self.enabled:
+            return
+        import tempfile
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(value, separators=(',', ':'))
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            self._written += len(data)
+        except OSError:
+            # A cache that cannot be written simply behaves as a miss next time
+            pass
+
+    def prune(self) -> int:
+        """Evict entries and snapshots unused for max_age, then least recently used ones until the cache fits max_bytes"""
+        if not self.enabled or not self._written:
+            return 0
+        cutoff = time.time() - self.max_age
+        entries = []
+        total = 0
+        for path in itertools.chain(self.directory.glob('*.json'), self.snapshot_dir.glob('*.snapshot')):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        evicted = 0
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and mtime >= cutoff:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._written = 0
+        return evicted
+
+    @property
+    def snapshot_dir(self) -> Optional[Path]:
+        """Where parsed-spec snapshots live, or None when caching is disabled"""
+        return self.directory / 'snapshots' if self.enabled else None
+
+    def describe(self) -> str:
+        return f"cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def directory_fingerprint(paths: Iterable[str]) -> str:
+    """Hash of the sorted file names under the given directories"""
+    names = []
+    for path in paths:
+        if os.path.isdir(path):
+            names.extend(sorted(os.listdir(path)))
+    return sha256_bytes('\n'.join(names).encode())